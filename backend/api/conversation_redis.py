@@ -0,0 +1,275 @@
+"""
+Redis conversation store - sessions shared by every worker process.
+
+Same public API as ConversationStore, over any server that speaks the
+Redis protocol (RESP). Each session is one list of JSON messages,
+CONVERSATION_REDIS_PREFIX + session_id:
+- an append batch is one pipelined round trip: RPUSH the messages, LTRIM
+  to the newest max_messages, PEXPIRE the key by the TTL
+- a context or history read is one LRANGE of the newest messages
+
+The server expires idle sessions itself, so there is nothing to sweep
+(start_sweeper is a no-op), and max_sessions is left to its maxmemory
+policy. Sessions exist implicitly, as in the SQLite store.
+
+The client comes from make_client(): redis-py (the optional "redis"
+package) when it is installed, else RespClient, a small pipelined client
+for the handful of commands used here so the backend needs no extra
+dependency. Both take a redis:// or rediss:// (TLS) URL with optional
+username and password (ACL login).
+"""
+
+import json
+import logging
+import os
+import socket
+import ssl
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from api.conversation_store import render_context
+
+logger = logging.getLogger(__name__)
+
+REDIS_PY_AVAILABLE = False
+try:
+    import redis
+    REDIS_PY_AVAILABLE = True
+except ImportError:
+    redis = None
+
+REDIS_URL = os.getenv("CONVERSATION_REDIS_URL", "redis://localhost:6379/0")
+KEY_PREFIX = os.getenv("CONVERSATION_REDIS_PREFIX", "conversation:")
+
+
+class RespError(Exception):
+    """Error reply from the server."""
+
+
+class RespClient:
+    """
+    Minimal Redis protocol client with pipelining.
+
+    Usage:
+        client = RespClient("redis://localhost:6379/0")
+        client.execute("PING")
+        client.pipeline([("RPUSH", "key", "a"), ("PEXPIRE", "key", 1000)])
+    """
+
+    def __init__(self, url: str = REDIS_URL, timeout: float = 5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.tls = parsed.scheme == "rediss"
+        self.username = parsed.username
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _setup_commands(self) -> List[Tuple[Any, ...]]:
+        setup: List[Tuple[Any, ...]] = []
+        if self.password:
+            setup.append(("AUTH", self.username, self.password) if self.username else ("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        return setup
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.tls:
+                sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+            conn = self._local.conn = (sock, sock.makefile("rb"))
+            setup = self._setup_commands()
+            if setup:
+                try:
+                    self.pipeline(setup)
+                except Exception:
+                    # Never reuse a connection that failed AUTH or SELECT
+                    self.close_thread_connection()
+                    raise
+        return conn
+
+    @staticmethod
+    def _encode(command: Tuple[Any, ...]) -> bytes:
+        parts = [f"*{len(command)}\r\n".encode()]
+        for arg in command:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _read(self, reader) -> Any:
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            return RespError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self._read(reader) for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply: {line!r}")
+
+    def pipeline(self, commands: List[Tuple[Any, ...]]) -> List[Any]:
+        """Send commands in one write and read their replies; raises on an error reply."""
+        sock, reader = self._connection()
+        try:
+            sock.sendall(b"".join(self._encode(command) for command in commands))
+            replies = [self._read(reader) for _ in commands]
+        except (OSError, ConnectionError):
+            # Reconnect on the next call
+            self.close_thread_connection()
+            raise
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def execute(self, *command: Any) -> Any:
+        return self.pipeline([command])[0]
+
+    def close_thread_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+            self._local.conn = None
+
+
+class RedisPyClient:
+    """
+    RespClient's execute/pipeline interface over redis-py.
+
+    redis-py handles TLS, ACL logins and its own connection pool.
+    """
+
+    def __init__(self, url: str = REDIS_URL, timeout: float = 5.0):
+        self._redis = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+    def pipeline(self, commands: List[Tuple[Any, ...]]) -> List[Any]:
+        """Send commands in one round trip and return their replies; raises on an error reply."""
+        pipe = self._redis.pipeline(transaction=False)
+        for command in commands:
+            pipe.execute_command(*command)
+        return pipe.execute()
+
+    def execute(self, *command: Any) -> Any:
+        return self._redis.execute_command(*command)
+
+
+def make_client(url: str = REDIS_URL):
+    """redis-py client if the package is installed, else the built-in RespClient."""
+    if REDIS_PY_AVAILABLE:
+        return RedisPyClient(url)
+    return RespClient(url)
+
+
+class RedisConversationStore:
+    """
+    Conversation sessions in Redis (or any RESP server), shared across processes.
+
+    Usage:
+        store = RedisConversationStore(make_client("redis://localhost:6379/0"))
+        store.add_messages(session_id, [("user", "hi"), ("assistant", "hello")])
+    """
+
+    def __init__(
+        self,
+        client: Optional[Any] = None,
+        ttl_minutes: float = 60,
+        max_messages: int = 100,
+        prefix: str = KEY_PREFIX
+    ):
+        self._client = client or make_client()
+        self._ttl_ms = max(int(ttl_minutes * 60 * 1000), 1)
+        self._max_messages = max_messages
+        self._prefix = prefix
+
+    def _key(self, session_id: str) -> str:
+        return self._prefix + session_id
+
+    def _keys(self) -> List[bytes]:
+        keys, cursor = [], b"0"
+        while True:
+            cursor, batch = self._client.execute("SCAN", cursor, "MATCH", self._prefix + "*", "COUNT", 1000)
+            keys.extend(batch)
+            # RespClient returns the cursor as bytes, redis-py as an int
+            if int(cursor) == 0:
+                return keys
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def get_or_create_session(self, session_id: Optional[str] = None) -> str:
+        """Session ID to use; the session's list is created by its first message."""
+        return session_id or str(uuid.uuid4())
+
+    def add_message(self, session_id: str, role: str, content: str) -> None:
+        """Add a message to a conversation."""
+        self.add_messages(session_id, [(role, content)])
+
+    def add_messages(self, session_id: str, messages: Iterable[Tuple[str, str]]) -> None:
+        """Add (role, content) messages to a conversation in one round trip."""
+        now = time.time()
+        payloads = [json.dumps({"role": role, "content": content, "ts": now}) for role, content in messages]
+        if not payloads:
+            return
+        key = self._key(session_id)
+        self._client.pipeline([
+            ("RPUSH", key, *payloads),
+            ("LTRIM", key, -self._max_messages, -1),
+            ("PEXPIRE", key, self._ttl_ms),
+        ])
+
+    def _recent(self, session_id: str, max_messages: int) -> List[Tuple[str, str]]:
+        if max_messages <= 0:
+            return []
+        rows = self._client.execute("LRANGE", self._key(session_id), -max_messages, -1)
+        return [(message["role"], message["content"]) for message in map(json.loads, rows)]
+
+    def get_history(self, session_id: str, max_messages: int = 20) -> List[Dict[str, str]]:
+        """Get conversation history for a session."""
+        return [{"role": role, "content": content} for role, content in self._recent(session_id, max_messages)]
+
+    def get_context_summary(self, session_id: str, max_messages: int = 10) -> str:
+        """Get conversation context summary for LLM routing."""
+        return render_context(self._recent(session_id, max_messages))
+
+    def clear_session(self, session_id: str) -> None:
+        """Clear a specific session."""
+        if self._client.execute("DEL", self._key(session_id)):
+            logger.info(f"Cleared conversation session: {session_id}")
+
+    def clear_all(self) -> int:
+        """Clear all conversation sessions. Returns count of cleared sessions."""
+        keys = self._keys()
+        count = self._client.execute("DEL", *keys) if keys else 0
+        logger.info(f"Cleared all {count} conversation sessions")
+        return count
+
+    # The server expires sessions by their TTL
+
+    def sweep_expired(self) -> int:
+        return 0
+
+    def start_sweeper(self) -> None:
+        pass
+
+    def stop_sweeper(self) -> None:
+        pass
@@ -0,0 +1,203 @@
+"""
+SQLite conversation store - sessions shared by every worker process.
+
+Same public API as ConversationStore, backed by one SQLite database in
+WAL mode, so any uvicorn worker can continue any session:
+- sessions(id, created_at, last_activity) with an index on last_activity
+- messages(id, session_id, role, content, created_at), newest found
+  through the (session_id, id) index
+
+Sessions exist implicitly: get_or_create_session only mints IDs, and the
+first append creates the row. Each append batch is one IMMEDIATE
+transaction that also trims the session to max_messages. The TTL is
+enforced by the database: reads only see sessions active within it, an
+append to an expired session starts it over, and the background sweep
+(run by any worker) deletes expired sessions and the max_sessions
+overflow with indexed DELETEs.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from api.conversation_store import SWEEP_INTERVAL, SweeperMixin, render_context
+
+logger = logging.getLogger(__name__)
+
+SQLITE_PATH = Path(os.getenv(
+    "CONVERSATION_SQLITE_PATH",
+    str(Path(__file__).resolve().parent.parent / "data" / "conversations.sqlite3")
+))
+
+SCHEMA = """
+PRAGMA journal_mode = WAL;
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    last_activity REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_activity ON sessions(last_activity);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, id);
+"""
+
+
+class SQLiteConversationStore(SweeperMixin):
+    """
+    Conversation sessions in SQLite (WAL mode), shared across processes.
+
+    Usage:
+        store = SQLiteConversationStore(Path("conversations.sqlite3"))
+        store.add_messages(session_id, [("user", "hi"), ("assistant", "hello")])
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        ttl_minutes: int = 60,
+        max_messages: int = 100,
+        max_sessions: int = 1000,
+        sweep_interval: float = SWEEP_INTERVAL
+    ):
+        self.db_path = Path(db_path) if db_path else SQLITE_PATH
+        self._ttl = ttl_minutes * 60
+        self._max_messages = max_messages
+        self._max_sessions = max_sessions
+        self._sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection (autocommit; transactions are explicit)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        self.stop_sweeper()
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def __len__(self) -> int:
+        cutoff = time.time() - self._ttl
+        return self._connect().execute("SELECT COUNT(*) FROM sessions WHERE last_activity >= ?", (cutoff,)).fetchone()[0]
+
+    def get_or_create_session(self, session_id: Optional[str] = None) -> str:
+        """Session ID to use; the session row is created by its first message."""
+        return session_id or str(uuid.uuid4())
+
+    def add_message(self, session_id: str, role: str, content: str) -> None:
+        """Add a message to a conversation."""
+        self.add_messages(session_id, [(role, content)])
+
+    def add_messages(self, session_id: str, messages: Iterable[Tuple[str, str]]) -> None:
+        """Add (role, content) messages to a conversation in one transaction."""
+        now = time.time()
+        rows = [(session_id, role, content, now) for role, content in messages]
+        with self._write() as conn:
+            row = conn.execute("SELECT last_activity FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None or row[0] < now - self._ttl:
+                if row is not None:
+                    # Expired but not swept yet: start over
+                    conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                conn.execute("INSERT INTO sessions VALUES (?, ?, ?)", (session_id, now, now))
+                logger.info(f"Created new conversation session: {session_id}")
+            else:
+                conn.execute("UPDATE sessions SET last_activity = ? WHERE id = ?", (now, session_id))
+            conn.executemany("INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)", rows)
+            # Keep the newest max_messages
+            conn.execute(
+                """DELETE FROM messages WHERE session_id = ? AND id < (
+                       SELECT id FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)""",
+                (session_id, session_id, self._max_messages - 1)
+            )
+
+    def _recent(self, session_id: str, max_messages: int) -> List[Tuple[str, str]]:
+        """(role, content) of the last max_messages messages of a live session, oldest first."""
+        if max_messages <= 0:
+            return []
+        rows = self._connect().execute(
+            """SELECT m.role, m.content FROM messages m
+               JOIN sessions s ON s.id = m.session_id AND s.last_activity >= ?
+               WHERE m.session_id = ? ORDER BY m.id DESC LIMIT ?""",
+            (time.time() - self._ttl, session_id, max_messages)
+        ).fetchall()
+        rows.reverse()
+        return rows
+
+    def get_history(self, session_id: str, max_messages: int = 20) -> List[Dict[str, str]]:
+        """Get conversation history for a session."""
+        return [{"role": role, "content": content} for role, content in self._recent(session_id, max_messages)]
+
+    def get_context_summary(self, session_id: str, max_messages: int = 10) -> str:
+        """Get conversation context summary for LLM routing."""
+        return render_context(self._recent(session_id, max_messages))
+
+    def clear_session(self, session_id: str) -> None:
+        """Clear a specific session."""
+        with self._write() as conn:
+            if not conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount:
+                return
+        logger.info(f"Cleared conversation session: {session_id}")
+
+    def clear_all(self) -> int:
+        """Clear all conversation sessions. Returns count of cleared sessions."""
+        with self._write() as conn:
+            count = conn.execute("DELETE FROM sessions").rowcount
+            conn.execute("DELETE FROM messages")
+        logger.info(f"Cleared all {count} conversation sessions")
+        return count
+
+    # ==================== EXPIRY ====================
+
+    def sweep_expired(self) -> int:
+        """Delete expired sessions and the least recently active over max_sessions. Returns how many."""
+        with self._write() as conn:
+            expired = conn.execute("DELETE FROM sessions WHERE last_activity < ?", (time.time() - self._ttl,)).rowcount
+            evicted = conn.execute(
+                """DELETE FROM sessions WHERE id IN (
+                       SELECT id FROM sessions ORDER BY last_activity DESC LIMIT -1 OFFSET ?)""",
+                (self._max_sessions,)
+            ).rowcount
+        if expired or evicted:
+            logger.info(f"Expired {expired} and evicted {evicted} conversation sessions")
+        return expired + evicted
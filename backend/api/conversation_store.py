@@ -4,154 +4,391 @@ Server-side conversation memory store.
 Stores conversation history by session_id for context-aware routing.
 Uses in-memory storage - suitable for demo purposes.
 For production, consider Redis or a database.
+
+Sessions are kept in least-recently-active order. Every session has the
+same TTL, so that order is also expiry order: touching a session moves it
+to the end, and expired sessions and the max_sessions overflow are popped
+from the front, each in O(1). Expired sessions are dropped by a periodic
+background sweep (start_sweeper) rather than on the request path; a
+lookup of an expired session that wasn't swept yet treats it as gone.
+
+Each conversation keeps its last max_messages in a list-backed ring
+buffer of __slots__ messages and caches its rendered context summary until the
+next message arrives. With CONVERSATION_COMPRESSION on, bodies older than
+the context window are kept zlib-compressed for the rest of the TTL.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from dataclasses import dataclass, field
+import os
+import threading
+import time
 import uuid
 import logging
+import zlib
 
 logger = logging.getLogger(__name__)
 
+# Session storage: memory (this process only), sqlite or redis (shared by workers)
+CONVERSATION_BACKEND = os.getenv("CONVERSATION_BACKEND", "memory").strip().lower()
+
+# Seconds between background sweeps of expired sessions
+SWEEP_INTERVAL = float(os.getenv("CONVERSATION_SWEEP_SECONDS", "30"))
+
+# zlib-compress message bodies once they're older than the most recent
+# CONVERSATION_PLAIN_MESSAGES (those stay plain for the context summary)
+COMPRESSION_ENABLED = os.getenv("CONVERSATION_COMPRESSION", "false").lower() == "true"
+PLAIN_MESSAGES = int(os.getenv("CONVERSATION_PLAIN_MESSAGES", "4"))
+# Shorter bodies don't shrink enough to be worth it
+COMPRESS_MIN_CHARS = 256
+
+# Characters of each message shown in the context summary
+CONTEXT_MESSAGE_CHARS = 200
+
+
+def render_context(messages: Iterable[Tuple[str, str]]) -> str:
+    """Context summary text for (role, content) pairs, oldest first (shared by every backend)."""
+    lines = []
+    for role, content in messages:
+        prefix = "User" if role == "user" else "Assistant"
+        # Truncate long messages for context (reduced to avoid token limit)
+        if len(content) > CONTEXT_MESSAGE_CHARS:
+            content = content[:CONTEXT_MESSAGE_CHARS] + "..."
+        lines.append(f"{prefix}: {content}")
+    return "\n".join(lines)
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _seconds(moment: datetime) -> float:
+    """UTC datetime as epoch seconds (for snapshots)."""
+    return (moment - _EPOCH).total_seconds()
+
+
+def _datetime(seconds: float) -> datetime:
+    return _EPOCH + timedelta(seconds=seconds)
+
 
-@dataclass
 class Message:
     """A single message in a conversation."""
-    role: str  # "user" or "assistant"
-    content: str
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+
+    __slots__ = ("role", "_body", "_time")
+
+    def __init__(self, role: str, content: str):
+        self.role = role  # "user" or "assistant"
+        # str, or zlib-compressed UTF-8 bytes (see compress())
+        self._body = content
+        self._time = time.time()
+
+    @classmethod
+    def restored(cls, role: str, body: Union[str, bytes], sent_at: float) -> "Message":
+        """A message from a warm-restart snapshot, body as it was stored (plain or compressed)."""
+        message = cls.__new__(cls)
+        message.role, message._body, message._time = role, body, sent_at
+        return message
+
+    @property
+    def content(self) -> str:
+        body = self._body
+        return zlib.decompress(body).decode() if isinstance(body, bytes) else body
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.utcfromtimestamp(self._time)
+
+    def compress(self) -> None:
+        """Store the body compressed if it's long enough to shrink."""
+        body = self._body
+        if isinstance(body, str) and len(body) >= COMPRESS_MIN_CHARS:
+            packed = zlib.compress(body.encode())
+            if len(packed) < len(body):
+                self._body = packed
 
 
-@dataclass
 class Conversation:
     """A conversation session with message history."""
-    session_id: str
-    messages: List[Message] = field(default_factory=list)
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    last_activity: datetime = field(default_factory=datetime.utcnow)
+
+    __slots__ = ("session_id", "_ring", "_head", "_capacity", "created_at", "last_activity", "_context")
+
+    def __init__(self, session_id: str, max_messages: int = 100):
+        self.session_id = session_id
+        # Ring buffer of the last max_messages: grows to capacity, then
+        # each append overwrites the oldest message at _head
+        self._ring: List[Message] = []
+        self._head = 0
+        self._capacity = max_messages
+        self.created_at = datetime.utcnow()
+        self.last_activity = self.created_at
+        # (max_messages, rendered summary) from the last get_context_summary; reset on append
+        self._context: Optional[Tuple[int, str]] = None
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    @property
+    def messages(self) -> List[Message]:
+        """Messages oldest first."""
+        return self._ring[self._head:] + self._ring[:self._head]
 
     def add_message(self, role: str, content: str) -> None:
         """Add a message to the conversation."""
-        self.messages.append(Message(role=role, content=content))
+        ring = self._ring
+        message = Message(role, content)
+        if len(ring) < self._capacity:
+            ring.append(message)
+        else:
+            ring[self._head] = message
+            self._head = (self._head + 1) % self._capacity
         self.last_activity = datetime.utcnow()
+        self._context = None
+        if COMPRESSION_ENABLED and len(ring) > PLAIN_MESSAGES:
+            # The message that just left the plain window
+            ring[(self._head - PLAIN_MESSAGES - 1) % len(ring)].compress()
+
+    def _recent(self, max_messages: int) -> List[Message]:
+        """The last max_messages messages, oldest first."""
+        ring, count = self._ring, min(max_messages, len(self._ring))
+        return [ring[(self._head - count + n) % len(ring)] for n in range(count)]
 
     def get_history(self, max_messages: int = 20) -> List[Dict[str, str]]:
         """Get recent message history as list of dicts."""
-        recent = self.messages[-max_messages:] if len(self.messages) > max_messages else self.messages
-        return [{"role": m.role, "content": m.content} for m in recent]
+        return [{"role": m.role, "content": m.content} for m in self._recent(max_messages)]
 
     def get_context_summary(self, max_messages: int = 10) -> str:
-        """Get a text summary of recent conversation for LLM context."""
-        recent = self.messages[-max_messages:] if len(self.messages) > max_messages else self.messages
-        if not recent:
-            return ""
+        """Get a text summary of recent conversation for LLM context (cached until the next message)."""
+        cached = self._context
+        if cached is not None and cached[0] == max_messages:
+            return cached[1]
 
-        lines = []
-        for msg in recent:
-            prefix = "User" if msg.role == "user" else "Assistant"
-            # Truncate long messages for context (reduced to avoid token limit)
-            content = msg.content[:200] + "..." if len(msg.content) > 200 else msg.content
-            lines.append(f"{prefix}: {content}")
+        summary = render_context((m.role, m.content) for m in self._recent(max_messages))
+        self._context = (max_messages, summary)
+        return summary
 
-        return "\n".join(lines)
+    def export_state(self) -> tuple:
+        """(session_id, created, last activity, [(role, body, sent_at)]) with epoch-second times."""
+        return (
+            self.session_id, _seconds(self.created_at), _seconds(self.last_activity),
+            [(m.role, m._body, m._time) for m in self.messages],
+        )
+
+    @classmethod
+    def from_state(cls, state: tuple, max_messages: int) -> "Conversation":
+        """Conversation rebuilt from export_state() output, keeping its last max_messages."""
+        session_id, created_at, last_activity, messages = state
+        conversation = cls(session_id, max_messages)
+        conversation.created_at = _datetime(created_at)
+        conversation.last_activity = _datetime(last_activity)
+        conversation._ring = [
+            Message.restored(*message) for message in messages[max(len(messages) - max_messages, 0):]
+        ]
+        return conversation
 
 
-class ConversationStore:
+class SweeperMixin:
+    """
+    Periodic background sweep for stores that expire sessions themselves.
+
+    The store provides sweep_expired() and sets _sweep_interval, _stop and
+    _sweeper (None) in __init__.
+    """
+
+    def start_sweeper(self) -> None:
+        """Sweep expired sessions every sweep_interval seconds in a background thread."""
+        if self._sweeper is not None:
+            return
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._run_sweeper, name="conversation-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        """Stop the background sweep."""
+        if self._sweeper is None:
+            return
+        self._stop.set()
+        self._sweeper.join()
+        self._sweeper = None
+
+    def _run_sweeper(self) -> None:
+        while not self._stop.wait(self._sweep_interval):
+            try:
+                self.sweep_expired()
+            except Exception as e:
+                logger.warning(f"Conversation sweep failed: {e}")
+
+
+class ConversationStore(SweeperMixin):
     """
     In-memory store for conversation sessions.
 
     Features:
     - Automatic session creation
-    - TTL-based expiration (default 1 hour)
-    - Max messages per conversation (default 100)
+    - TTL-based expiration (default 1 hour), swept in the background
+    - Max messages per conversation (default 100), kept in a ring buffer
+    - Max sessions (default 1000); the least recently active is evicted
     """
 
     def __init__(
         self,
         ttl_minutes: int = 60,
         max_messages: int = 100,
-        max_sessions: int = 1000
+        max_sessions: int = 1000,
+        sweep_interval: float = SWEEP_INTERVAL
     ):
-        self._conversations: Dict[str, Conversation] = {}
+        # Least recently active first
+        self._conversations: "OrderedDict[str, Conversation]" = OrderedDict()
         self._ttl = timedelta(minutes=ttl_minutes)
         self._max_messages = max_messages
         self._max_sessions = max_sessions
+        self._sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
 
-    def get_or_create_session(self, session_id: Optional[str] = None) -> str:
-        """Get existing session or create a new one."""
-        # Clean up expired sessions periodically
-        self._cleanup_expired()
+    def __len__(self) -> int:
+        return len(self._conversations)
 
-        if session_id and session_id in self._conversations:
-            return session_id
+    def _live(self, session_id: str) -> Optional[Conversation]:
+        """The session if it exists and hasn't expired (caller holds the lock)."""
+        conversation = self._conversations.get(session_id)
+        if conversation is not None and datetime.utcnow() - conversation.last_activity > self._ttl:
+            del self._conversations[session_id]
+            logger.info(f"Expired conversation session: {session_id}")
+            return None
+        return conversation
 
-        # Create new session
-        new_id = session_id or str(uuid.uuid4())
-        self._conversations[new_id] = Conversation(session_id=new_id)
-        logger.info(f"Created new conversation session: {new_id}")
-        return new_id
+    def _create(self, session_id: str) -> Conversation:
+        """Add a session, evicting the least recently active over the limit (caller holds the lock)."""
+        conversation = self._conversations[session_id] = Conversation(session_id, self._max_messages)
+        while len(self._conversations) > self._max_sessions:
+            old_id, _ = self._conversations.popitem(last=False)
+            logger.info(f"Removed old session due to limit: {old_id}")
+        logger.info(f"Created new conversation session: {session_id}")
+        return conversation
+
+    def get_or_create_session(self, session_id: Optional[str] = None) -> str:
+        """Get existing session or create a new one."""
+        with self._lock:
+            if session_id and self._live(session_id) is not None:
+                return session_id
+            new_id = session_id or str(uuid.uuid4())
+            self._create(new_id)
+            return new_id
 
     def add_message(self, session_id: str, role: str, content: str) -> None:
         """Add a message to a conversation."""
-        if session_id not in self._conversations:
-            self.get_or_create_session(session_id)
-
-        conversation = self._conversations[session_id]
-        conversation.add_message(role, content)
+        self.add_messages(session_id, [(role, content)])
 
-        # Trim if too many messages
-        if len(conversation.messages) > self._max_messages:
-            conversation.messages = conversation.messages[-self._max_messages:]
+    def add_messages(self, session_id: str, messages: Iterable[Tuple[str, str]]) -> None:
+        """Add (role, content) messages to a conversation in one batch."""
+        with self._lock:
+            conversation = self._live(session_id) or self._create(session_id)
+            for role, content in messages:
+                conversation.add_message(role, content)
+            self._conversations.move_to_end(session_id)
 
     def get_history(self, session_id: str, max_messages: int = 20) -> List[Dict[str, str]]:
         """Get conversation history for a session."""
-        if session_id not in self._conversations:
-            return []
-        return self._conversations[session_id].get_history(max_messages)
+        with self._lock:
+            conversation = self._live(session_id)
+            return conversation.get_history(max_messages) if conversation is not None else []
 
     def get_context_summary(self, session_id: str, max_messages: int = 10) -> str:
         """Get conversation context summary for LLM routing."""
-        if session_id not in self._conversations:
-            return ""
-        return self._conversations[session_id].get_context_summary(max_messages)
+        with self._lock:
+            conversation = self._live(session_id)
+            return conversation.get_context_summary(max_messages) if conversation is not None else ""
 
     def clear_session(self, session_id: str) -> None:
         """Clear a specific session."""
-        if session_id in self._conversations:
-            del self._conversations[session_id]
-            logger.info(f"Cleared conversation session: {session_id}")
+        with self._lock:
+            if self._conversations.pop(session_id, None) is None:
+                return
+        logger.info(f"Cleared conversation session: {session_id}")
 
     def clear_all(self) -> int:
         """Clear all conversation sessions. Returns count of cleared sessions."""
-        count = len(self._conversations)
-        self._conversations.clear()
+        with self._lock:
+            count = len(self._conversations)
+            self._conversations.clear()
         logger.info(f"Cleared all {count} conversation sessions")
         return count
 
-    def _cleanup_expired(self) -> None:
-        """Remove expired sessions."""
-        now = datetime.utcnow()
-        expired = [
-            sid for sid, conv in self._conversations.items()
-            if now - conv.last_activity > self._ttl
-        ]
-        for sid in expired:
-            del self._conversations[sid]
-            logger.info(f"Expired conversation session: {sid}")
-
-        # Also enforce max sessions limit
-        if len(self._conversations) > self._max_sessions:
-            # Remove oldest sessions
-            sorted_sessions = sorted(
-                self._conversations.items(),
-                key=lambda x: x[1].last_activity
-            )
-            to_remove = len(self._conversations) - self._max_sessions
-            for sid, _ in sorted_sessions[:to_remove]:
-                del self._conversations[sid]
-                logger.info(f"Removed old session due to limit: {sid}")
+    # ==================== EXPIRY ====================
+
+    def sweep_expired(self) -> int:
+        """Remove expired sessions from the front of the LRU order. Returns how many."""
+        cutoff = datetime.utcnow() - self._ttl
+        expired = 0
+        with self._lock:
+            while self._conversations:
+                session_id, conversation = next(iter(self._conversations.items()))
+                if conversation.last_activity >= cutoff:
+                    break
+                del self._conversations[session_id]
+                expired += 1
+        if expired:
+            logger.info(f"Expired {expired} conversation sessions")
+        return expired
+
+    # ==================== WARM RESTART ====================
+
+    # Bump when the tuples export_state() returns change
+    STATE_VERSION = 1
+
+    def export_state(self) -> List[tuple]:
+        """Unexpired sessions, least recently active first, for a warm-restart snapshot (see api/warm_state.py)."""
+        cutoff = datetime.utcnow() - self._ttl
+        with self._lock:
+            return [
+                conversation.export_state() for conversation in self._conversations.values()
+                if conversation.last_activity >= cutoff
+            ]
+
+    def restore_state(self, sessions: List[tuple]) -> int:
+        """
+        Add sessions from export_state() output. Returns how many.
+
+        They go in front of the sessions this process already has (which
+        are more recent, and win on a shared ID). Expired sessions, and
+        the least recently active past max_sessions, are skipped.
+        """
+        cutoff = _seconds(datetime.utcnow() - self._ttl)
+        restored = 0
+        with self._lock:
+            # Most recent first, each moved in front of the previous one
+            for state in reversed(sessions):
+                if state[2] < cutoff or len(self._conversations) >= self._max_sessions:
+                    break
+                session_id = state[0]
+                if session_id in self._conversations:
+                    continue
+                self._conversations[session_id] = Conversation.from_state(state, self._max_messages)
+                self._conversations.move_to_end(session_id, last=False)
+                restored += 1
+        if restored:
+            logger.info(f"Restored {restored} conversation sessions")
+        return restored
+
+
+def get_conversation_store():
+    """
+    Create the conversation store for CONVERSATION_BACKEND.
+
+    "memory" (default) keeps sessions in this process. "sqlite" and
+    "redis" share them between worker processes (see
+    api/conversation_sqlite.py and api/conversation_redis.py), so a
+    follow-up message can land on any worker.
+    """
+    if CONVERSATION_BACKEND == "sqlite":
+        from api.conversation_sqlite import SQLiteConversationStore
+        return SQLiteConversationStore()
+    if CONVERSATION_BACKEND == "redis":
+        from api.conversation_redis import RedisConversationStore
+        return RedisConversationStore()
+    return ConversationStore()
 
 
 # Global instance for the application
-conversation_store = ConversationStore()
+conversation_store = get_conversation_store()
@@ -10,20 +10,26 @@ Features:
 """
 
 import os
+import json
+import asyncio
 import logging
 import httpx
 from datetime import datetime, timedelta
 from fastapi import FastAPI, HTTPException, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from dotenv import load_dotenv
 
 from auth.okta_auth import get_okta_auth
-from auth.agent_config import get_all_agent_configs, DEMO_AGENTS
-from orchestrator.orchestrator import Orchestrator
+from auth.agent_config import get_all_agent_configs, get_agent_registry, DEMO_AGENTS
+from auth.multi_agent_auth import get_multi_agent_exchange
+from orchestrator.orchestrator import get_orchestrator
+from orchestrator.routing import routing_cache, routing_stats
 from api.conversation_store import conversation_store
-from data.demo_store import get_demo_store
+from api.warm_state import WARM_STATE_ENABLED, save_warm_state, start_warm_restore
+from data.demo_store import get_demo_store, close_demo_stores
 
 # Load environment variables
 load_dotenv()
@@ -49,6 +55,37 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def warm_orchestrator():
+    """Build the shared orchestrator (compiled graph + LLM clients) once at startup."""
+    # Agent registry and SDK handles are immutable after this point
+    get_agent_registry()
+    get_multi_agent_exchange()
+    conversation_store.start_sweeper()
+    if WARM_STATE_ENABLED:
+        # Sessions, routing cache and indexes from before the restart, restored behind live traffic
+        start_warm_restore()
+    try:
+        get_orchestrator()
+        logger.info("Orchestrator engine initialized")
+    except Exception as e:
+        # Defer the failure to the first chat request so health checks still work
+        logger.warning(f"Orchestrator warm-up failed: {e}")
+
+
+@app.on_event("shutdown")
+async def close_clients():
+    """Release shared HTTP clients, stop the session sweep, snapshot warm state and checkpoint demo data journals."""
+    await get_okta_auth().aclose()
+    conversation_store.stop_sweeper()
+    if WARM_STATE_ENABLED:
+        try:
+            save_warm_state()
+        except Exception as e:
+            logger.warning(f"Warm state snapshot failed: {e}")
+    close_demo_stores()
+
+
 # --- Request/Response Models ---
 
 class ChatMessage(BaseModel):
@@ -94,6 +131,7 @@ class AgentFlowStep(BaseModel):
     status: str
     color: Optional[str] = None
     agents: Optional[List[str]] = None
+    routing: Optional[str] = None  # "local", "llm", "keyword_fallback"
 
 
 class ChatResponse(BaseModel):
@@ -103,6 +141,7 @@ class ChatResponse(BaseModel):
     agent_flow: List[AgentFlowStep]
     token_exchanges: List[TokenExchange]
     user_info: Optional[Dict[str, Any]] = None
+    store_version: Optional[int] = None  # Demo data version the answer was read from (after its write, if any)
 
 
 # --- Health Check ---
@@ -132,30 +171,9 @@ async def root():
 
 # --- Chat Endpoint ---
 
-@app.post("/api/chat", response_model=ChatResponse)
-async def chat(
-    request: ChatRequest,
-    authorization: Optional[str] = Header(None, alias="Authorization"),
-    x_theme: Optional[str] = Header(None, alias="X-Theme")
-):
-    """
-    Main chat endpoint.
-
-    This will:
-    1. Authenticate the user (via Okta token)
-    2. Load theme-specific data (chocolate, tech, or travel)
-    3. Route to appropriate agent(s) via orchestrator
-    4. Perform ID-JAG token exchange for each agent
-    5. Return response with agent flow and token exchanges
-    """
-    # Get theme from header or request body
-    theme = x_theme or request.theme or "chocolate"
-    logger.info(f"=== Chat Request (Theme: {theme}) ===")
-    logger.info(f"Message: {request.message[:50]}...")
-    logger.info(f"Has auth header: {authorization is not None}")
-
+async def _authenticate(authorization: Optional[str]):
+    """Extract and validate the user's bearer token. Returns (user_token, user_info)."""
     okta_auth = get_okta_auth()
-    user_info = None
 
     # Extract user token
     user_token = None
@@ -179,52 +197,183 @@ async def chat(
     else:
         user_info = {"email": "anonymous", "groups": []}
 
+    return user_token, user_info
+
+
+async def _prepare_chat(request: ChatRequest, authorization: Optional[str], x_theme: Optional[str]) -> Dict[str, Any]:
+    """Authenticate, load session context and theme store for a chat turn."""
+    # Get theme from header or request body
+    theme = x_theme or request.theme or "chocolate"
+    logger.info(f"=== Chat Request (Theme: {theme}) ===")
+    logger.info(f"Message: {request.message[:50]}...")
+    logger.info(f"Has auth header: {authorization is not None}")
+
+    user_token, user_info = await _authenticate(authorization)
+
     # Get or create conversation session
     session_id = conversation_store.get_or_create_session(request.session_id)
 
     # Get conversation context for routing (reduced to avoid token limit)
     conversation_context = conversation_store.get_context_summary(session_id, max_messages=2)
 
-    # Store the user's message
-    conversation_store.add_message(session_id, "user", request.message)
-
-    # Get theme-specific data store
-    demo_store = get_demo_store(theme)
+    # Get theme-specific data store (the session's sandbox when enabled)
+    demo_store = get_demo_store(theme, session_id=session_id)
     logger.info(f"Using data store for theme: {theme}")
 
-    # Create orchestrator and process request with conversation context
-    try:
-        orchestrator = Orchestrator(
-            user_token=user_token or "",
-            user_info=user_info,
-            demo_store=demo_store
-        )
-        result = await orchestrator.process(request.message, conversation_context)
+    return {
+        "session_id": session_id,
+        "message": request.message,
+        "conversation_context": conversation_context,
+        "user_token": user_token or "",
+        "user_info": user_info,
+        "demo_store": demo_store,
+    }
 
-        # Store the assistant's response
-        conversation_store.add_message(session_id, "assistant", result["content"])
 
-        return ChatResponse(
-            content=result["content"],
-            session_id=session_id,
-            agent_flow=[AgentFlowStep(**step) for step in result["agent_flow"]],
-            token_exchanges=[TokenExchange(**ex) for ex in result["token_exchanges"]],
-            user_info=user_info
+def _record_turn(turn: Dict[str, Any], reply: Optional[str] = None, user_recorded: bool = False) -> None:
+    """Store the user's message (unless already stored) and the assistant's reply (if any) in one batch."""
+    messages = [] if user_recorded else [("user", turn["message"])]
+    if reply is not None:
+        messages.append(("assistant", reply))
+    if messages:
+        conversation_store.add_messages(turn["session_id"], messages)
+
+
+def _build_chat_response(result: Dict[str, Any], turn: Dict[str, Any], user_recorded: bool = False) -> ChatResponse:
+    """Build the response model and store the turn."""
+    response = ChatResponse(
+        content=result["content"],
+        session_id=turn["session_id"],
+        agent_flow=[AgentFlowStep(**step) for step in result["agent_flow"]],
+        token_exchanges=[TokenExchange(**ex) for ex in result["token_exchanges"]],
+        user_info=turn["user_info"],
+        store_version=result.get("store_version")
+    )
+    _record_turn(turn, result["content"], user_recorded)
+    return response
+
+
+def _error_chat_response(request: ChatRequest, error: Exception, user_info: Dict[str, Any]) -> ChatResponse:
+    """Error response with empty flows."""
+    logger.error(f"Orchestrator error: {error}")
+    return ChatResponse(
+        content=f"I encountered an error processing your request: {str(error)}",
+        session_id=request.session_id or "session-1",
+        agent_flow=[
+            AgentFlowStep(step="error", action=str(error), status="error")
+        ],
+        token_exchanges=[],
+        user_info=user_info
+    )
+
+
+@app.post("/api/chat", response_model=ChatResponse)
+async def chat(
+    request: ChatRequest,
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+    x_theme: Optional[str] = Header(None, alias="X-Theme")
+):
+    """
+    Main chat endpoint.
+
+    This will:
+    1. Authenticate the user (via Okta token)
+    2. Load theme-specific data (chocolate, tech, or travel)
+    3. Route to appropriate agent(s) via orchestrator
+    4. Perform ID-JAG token exchange for each agent
+    5. Return response with agent flow and token exchanges
+    """
+    turn = await _prepare_chat(request, authorization, x_theme)
+
+    # Process request through the shared orchestrator with per-request context
+    try:
+        result = await get_orchestrator().process(
+            request.message,
+            turn["conversation_context"],
+            user_token=turn["user_token"],
+            user_info=turn["user_info"],
+            demo_store=turn["demo_store"]
         )
+        return _build_chat_response(result, turn)
 
     except Exception as e:
-        logger.error(f"Orchestrator error: {e}")
-
-        # Return error response with empty flows
-        return ChatResponse(
-            content=f"I encountered an error processing your request: {str(e)}",
-            session_id=request.session_id or "session-1",
-            agent_flow=[
-                AgentFlowStep(step="error", action=str(e), status="error")
-            ],
-            token_exchanges=[],
-            user_info=user_info
-        )
+        _record_turn(turn)
+        return _error_chat_response(request, e, turn["user_info"])
+
+
+# Streamed turns still running after their client disconnected; held so
+# the event loop doesn't garbage-collect them before the reply is recorded
+_detached_turns: set = set()
+
+
+def _sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """Format one Server-Sent Event."""
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+    x_theme: Optional[str] = Header(None, alias="X-Theme")
+):
+    """
+    Streaming chat endpoint (Server-Sent Events).
+
+    Same flow as /api/chat, but events are sent as the workflow runs:
+    - agent_flow: each agent flow step as it happens
+    - token_exchange: each token exchange record
+    - token: response text as the LLM generates it
+    - error: synthesis failed mid-stream; discard the streamed tokens
+    - final: the full ChatResponse payload (authoritative content)
+
+    The user's message is stored before streaming starts. If the client
+    disconnects mid-turn the workflow keeps running in the background and
+    the assistant reply is recorded when it completes, so a follow-up
+    keeps its context.
+    """
+    turn = await _prepare_chat(request, authorization, x_theme)
+    _record_turn(turn)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def sink(event: str, data: Any) -> None:
+        queue.put_nowait((event, data))
+
+    async def run_turn():
+        try:
+            result = await get_orchestrator().process(
+                request.message,
+                turn["conversation_context"],
+                user_token=turn["user_token"],
+                user_info=turn["user_info"],
+                demo_store=turn["demo_store"],
+                event_sink=sink
+            )
+            response = _build_chat_response(result, turn, user_recorded=True)
+        except Exception as e:
+            response = _error_chat_response(request, e, turn["user_info"])
+        queue.put_nowait(("final", response.model_dump()))
+        queue.put_nowait(None)
+
+    async def event_stream():
+        task = asyncio.create_task(run_turn())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield _sse(*item)
+        finally:
+            if not task.done():
+                _detached_turns.add(task)
+                task.add_done_callback(_detached_turns.discard)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # --- Agent Status Endpoint ---
@@ -266,6 +415,22 @@ async def agent_status():
     }
 
 
+# --- Token Cache Stats Endpoint ---
+
+@app.get("/api/auth/token-cache")
+async def token_cache_stats():
+    """Hit/miss counters for the per-user agent token cache."""
+    return get_multi_agent_exchange().token_cache.stats()
+
+
+# --- Routing Stats Endpoint ---
+
+@app.get("/api/orchestrator/routing-stats")
+async def orchestrator_routing_stats():
+    """How routing decisions were made (local, cache, LLM) and cache hit rates."""
+    return {**routing_stats.snapshot(), "cache": routing_cache.stats()}
+
+
 # --- Okta Config Endpoint (for frontend) ---
 
 @app.get("/api/config/okta")
@@ -364,6 +529,46 @@ async def reset_demo(theme: Optional[str] = "chocolate"):
         raise HTTPException(status_code=500, detail=f"Reset failed: {str(e)}")
 
 
+# --- Demo Change Events (SSE) ---
+
+# Seconds between keep-alive comments on an idle event stream
+EVENTS_HEARTBEAT_SECONDS = 15
+
+
+@app.get("/api/demo/events")
+async def demo_events(
+    theme: Optional[str] = "chocolate",
+    since: Optional[int] = None,
+    session_id: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Stream demo data changes (Server-Sent Events).
+
+    Each store mutation is sent as an event named after its type
+    (inventory, pricing, discounts, reset) with the store version it
+    produced as the event id. Pass since - or reconnect with
+    Last-Event-ID - to have missed events replayed first. A "resync"
+    event means they are no longer buffered: refetch what you display.
+    """
+    demo_store = get_demo_store(theme, session_id=session_id)
+    if since is None and last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    async def event_stream():
+        async for event in demo_store.changes.subscribe(since, heartbeat=EVENTS_HEARTBEAT_SECONDS):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield _sse(event.type, event.to_dict(), event_id=event.version)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # --- Okta System Logs Endpoint (for governance demo) ---
 
 @app.get("/api/okta/logs")
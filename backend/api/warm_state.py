@@ -0,0 +1,215 @@
+"""
+Warm restart - in-memory state carried across a restart.
+
+On orderly shutdown the API snapshots what a fresh process would
+otherwise have to rebuild or lose, and on startup a background thread
+restores it while requests are already being served (cold until then):
+- conversation sessions of the in-memory ConversationStore (the SQLite
+  and Redis backends keep theirs already)
+- the routing decision cache, with each entry's remaining TTL
+- the StoreIndex of every theme's initial data (see data/layered.py),
+  used only while that file is unchanged
+
+The file is a header plus one section per kind of state:
+- header: magic, format version, and the Python and marshal versions the
+  payloads were written with (marshal is only stable within one)
+- section: tag, section version, size, then a zlib-compressed marshal
+  payload (plain containers only, so loading it runs no code)
+
+A snapshot from another format, Python or marshal version is ignored
+as a whole; a section whose version changed (its class's STATE_VERSION)
+is skipped, as is the routing cache when the agents or routing tables
+it was decided under changed. Credentials are never written: the agent
+token cache (auth/token_cache.py) and registry keys are not part of any
+section, and the file is created readable by its owner only.
+"""
+
+import hashlib
+import json
+import logging
+import marshal
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from api.conversation_store import ConversationStore, conversation_store
+from auth.agent_config import get_agent_registry
+from data.layered import cached_bases, restore_base
+from data.store_index import StoreIndex
+from orchestrator.routing import AGENT_KEYWORDS, SCOPE_DEFINITIONS, RoutingCache, routing_cache
+
+logger = logging.getLogger(__name__)
+
+WARM_STATE_ENABLED = os.getenv("WARM_STATE_ENABLED", "false").lower() == "true"
+WARM_STATE_PATH = Path(os.getenv(
+    "WARM_STATE_PATH",
+    str(Path(__file__).resolve().parent.parent / "data" / "warm_state.bin")
+))
+
+MAGIC = b"WARMSTAT"
+FORMAT_VERSION = 1
+# magic, format version, Python major, minor, marshal version, saved at (epoch seconds)
+HEADER = struct.Struct("<8sHBBHd")
+# tag, section version, payload size
+SECTION = struct.Struct("<4sHI")
+
+_restore_thread: Optional[threading.Thread] = None
+
+
+# ==================== SECTIONS ====================
+
+def _export_sessions() -> Optional[list]:
+    # Only the in-memory store has sessions to lose
+    export = getattr(conversation_store, "export_state", None)
+    return export() if export is not None else None
+
+
+def _restore_sessions(sessions: list, elapsed: float) -> int:
+    restore = getattr(conversation_store, "restore_state", None)
+    return restore(sessions) if restore is not None else 0
+
+
+def _routing_fingerprint() -> str:
+    """Hash of what a cached routing decision depends on besides the message."""
+    agents = {agent_type: sorted(config.scopes) for agent_type, config in get_agent_registry().items()}
+    tables = json.dumps([agents, AGENT_KEYWORDS, SCOPE_DEFINITIONS], sort_keys=True)
+    return hashlib.sha256(tables.encode()).hexdigest()
+
+
+def _export_routing() -> Tuple[str, list]:
+    return _routing_fingerprint(), routing_cache.export_state()
+
+
+def _restore_routing(payload: Tuple[str, list], elapsed: float) -> int:
+    fingerprint, entries = payload
+    if fingerprint != _routing_fingerprint():
+        logger.info("Agents or routing tables changed since the snapshot, not restoring routing cache")
+        return 0
+    return routing_cache.restore_state(entries, elapsed)
+
+
+def _export_indexes() -> list:
+    # Each index marshalled on its own, so restore only decodes the ones it can use
+    return [
+        (str(path), columnar, mtime, marshal.dumps(base.index.export_state()))
+        for path, columnar, mtime, base in cached_bases()
+        if isinstance(base.index, StoreIndex)
+    ]
+
+
+def _restore_indexes(indexes: list, elapsed: float) -> int:
+    restored = 0
+    for path, columnar, mtime, state in indexes:
+        try:
+            path = Path(path)
+            if path.stat().st_mtime_ns != mtime:
+                continue
+            restored += restore_base(path, columnar, mtime, StoreIndex.from_state(marshal.loads(state)))
+        except Exception as e:
+            logger.warning(f"Can't restore index for {path}: {e}")
+    return restored
+
+
+# tag -> (name, version, export, restore), written and restored in this order
+SECTIONS: Dict[bytes, Tuple[str, int, Callable[[], Any], Callable[[Any, float], int]]] = {
+    b"SESS": ("sessions", ConversationStore.STATE_VERSION, _export_sessions, _restore_sessions),
+    b"ROUT": ("routing", RoutingCache.STATE_VERSION, _export_routing, _restore_routing),
+    b"INDX": ("indexes", StoreIndex.STATE_VERSION, _export_indexes, _restore_indexes),
+}
+
+
+# ==================== SNAPSHOT / RESTORE ====================
+
+def save_warm_state(path: Path = WARM_STATE_PATH) -> int:
+    """
+    Snapshot every section to path, replacing it atomically. Returns the
+    file size.
+
+    Waits for a restore still running, so a quick restart can't save
+    less than it was handed.
+    """
+    if _restore_thread is not None:
+        _restore_thread.join()
+    start = time.perf_counter()
+    path = Path(path)
+    chunks = [HEADER.pack(MAGIC, FORMAT_VERSION, *sys.version_info[:2], marshal.version, time.time())]
+    for tag, (name, version, export, _) in SECTIONS.items():
+        payload = export()
+        if payload is None:
+            continue
+        packed = zlib.compress(marshal.dumps(payload), 1)
+        chunks.append(SECTION.pack(tag, version, len(packed)))
+        chunks.append(packed)
+    data = b"".join(chunks)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    logger.info(f"Saved warm state to {path} ({len(data)} bytes) in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return len(data)
+
+
+def restore_warm_state(path: Path = WARM_STATE_PATH) -> Dict[str, int]:
+    """
+    Restore what the snapshot at path holds. Returns how many entries
+    each section restored (empty if there is no usable snapshot).
+    """
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}
+    except OSError as e:
+        logger.warning(f"Can't read warm state {path}: {e}")
+        return {}
+
+    if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+        logger.warning(f"{path} is not a warm state snapshot, ignoring it")
+        return {}
+    _, version, major, minor, marshal_version, saved_at = HEADER.unpack_from(data)
+    if (version, major, minor, marshal_version) != (FORMAT_VERSION, *sys.version_info[:2], marshal.version):
+        logger.info(f"Warm state {path} was written by another version, ignoring it")
+        return {}
+    elapsed = max(time.time() - saved_at, 0.0)
+
+    restored: Dict[str, int] = {}
+    offset = HEADER.size
+    while offset + SECTION.size <= len(data):
+        tag, section_version, size = SECTION.unpack_from(data, offset)
+        offset += SECTION.size
+        payload, offset = data[offset:offset + size], offset + size
+        section = SECTIONS.get(tag)
+        if section is None or section[1] != section_version or len(payload) < size:
+            logger.info(f"Skipping warm state section {tag!r} (unknown, other version or truncated)")
+            continue
+        name, _, _, restore = section
+        try:
+            restored[name] = restore(marshal.loads(zlib.decompress(payload)), elapsed)
+        except Exception as e:
+            logger.warning(f"Can't restore warm state section {name}: {e}")
+
+    logger.info(f"Restored warm state {restored} from {path} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return restored
+
+
+def start_warm_restore(path: Path = WARM_STATE_PATH) -> threading.Thread:
+    """Restore the snapshot in a background thread; requests are served cold until it's done."""
+    global _restore_thread
+    _restore_thread = threading.Thread(target=restore_warm_state, args=(path,), name="warm-restore", daemon=True)
+    _restore_thread.start()
+    return _restore_thread
@@ -18,13 +18,14 @@ Environment variables:
 import os
 import json
 import logging
-from typing import Dict, Any, Optional, List
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Mapping, Callable
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True)
 class AgentConfig:
     """Configuration for a single AI agent."""
     name: str  # MCP name for Token Exchange card (e.g., "Inventory MCP")
@@ -57,17 +58,9 @@ def _parse_private_key(key_str: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def get_agent_config(agent_type: str) -> Optional[AgentConfig]:
-    """
-    Get configuration for a specific agent type.
-
-    Args:
-        agent_type: One of sales, inventory, customer, pricing
-
-    Returns:
-        AgentConfig or None if not configured
-    """
-    configs = {
+def _load_agent_configs() -> Dict[str, AgentConfig]:
+    """Read agent configuration from the environment and parse private keys."""
+    return {
         AGENT_SALES: AgentConfig(
             name="Sales MCP",
             display_name="Sales MCP",
@@ -134,16 +127,60 @@ def get_agent_config(agent_type: str) -> Optional[AgentConfig]:
         ),
     }
 
-    return configs.get(agent_type)
+
+# Immutable registry built once (at startup or first use)
+_agent_registry: Optional[Mapping[str, AgentConfig]] = None
+_reload_listeners: List[Callable[[], None]] = []
+
+
+def get_agent_registry() -> Mapping[str, AgentConfig]:
+    """
+    Get the read-only agent registry.
+
+    Environment variables are read and private keys parsed only once;
+    call reload_agent_registry() to pick up configuration changes.
+    """
+    global _agent_registry
+    if _agent_registry is None:
+        _agent_registry = MappingProxyType(_load_agent_configs())
+        logger.info(f"Agent registry built with {len(_agent_registry)} agents")
+    return _agent_registry
+
+
+def reload_agent_registry() -> Mapping[str, AgentConfig]:
+    """Rebuild the registry from the environment and notify listeners."""
+    global _agent_registry
+    _agent_registry = MappingProxyType(_load_agent_configs())
+    logger.info("Agent registry reloaded")
+    for listener in list(_reload_listeners):
+        try:
+            listener()
+        except Exception as e:
+            logger.error(f"Agent registry reload listener failed: {e}")
+    return _agent_registry
+
+
+def on_agent_registry_reload(listener: Callable[[], None]) -> None:
+    """Register a callback invoked after reload_agent_registry()."""
+    _reload_listeners.append(listener)
+
+
+def get_agent_config(agent_type: str) -> Optional[AgentConfig]:
+    """
+    Get configuration for a specific agent type.
+
+    Args:
+        agent_type: One of sales, inventory, customer, pricing
+
+    Returns:
+        AgentConfig or None if not configured
+    """
+    return get_agent_registry().get(agent_type)
 
 
 def get_all_agent_configs() -> Dict[str, AgentConfig]:
     """Get all agent configurations."""
-    return {
-        agent_type: get_agent_config(agent_type)
-        for agent_type in [AGENT_SALES, AGENT_INVENTORY, AGENT_CUSTOMER, AGENT_PRICING]
-        if get_agent_config(agent_type) is not None
-    }
+    return dict(get_agent_registry())
 
 
 def is_agent_configured(agent_type: str) -> bool:
@@ -0,0 +1,174 @@
+"""
+JWKS Key Set Cache
+
+Fetches and caches Okta signing keys for token signature validation.
+
+Features:
+- One shared httpx.AsyncClient for all fetches
+- HTTP caching: honours Cache-Control max-age and revalidates with ETag
+- Endpoint discovery: jwks_uri is read from the issuer's OpenID configuration
+- Key rotation: an unknown kid triggers a refetch, rate-limited per issuer
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE = 3600  # Used when the response has no max-age
+MIN_REFETCH_INTERVAL = 30  # Seconds between kid-miss refetches per issuer
+
+
+class JWKSClient:
+    """
+    Async JWKS fetcher with an in-memory, per-issuer key cache.
+
+    Usage:
+        jwks = JWKSClient()
+        key = await jwks.get_signing_key(issuer, kid)
+    """
+
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        min_refetch_interval: float = MIN_REFETCH_INTERVAL,
+        default_max_age: float = DEFAULT_MAX_AGE,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._http_client = http_client
+        self._min_refetch_interval = min_refetch_interval
+        self._default_max_age = default_max_age
+        self._clock = clock
+
+        # issuer -> {"keys": {kid: jwk}, "etag": str, "expires_at": float, "fetched_at": float}
+        self._key_sets: Dict[str, Dict[str, Any]] = {}
+        self._jwks_uris: Dict[str, str] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.fetch_count = 0
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, created on first use."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=10.0)
+        return self._http_client
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    @staticmethod
+    def default_jwks_uri(issuer: str) -> str:
+        """
+        Okta's JWKS endpoint for an issuer, used when discovery fails.
+
+        Custom authorization servers (.../oauth2/{id}) publish keys at
+        {issuer}/v1/keys; the Org authorization server (bare org URL)
+        publishes them at {issuer}/oauth2/v1/keys.
+        """
+        issuer = issuer.rstrip("/")
+        if "/oauth2/" in issuer:
+            return f"{issuer}/v1/keys"
+        return f"{issuer}/oauth2/v1/keys"
+
+    async def jwks_uri(self, issuer: str) -> str:
+        """Resolve the issuer's JWKS endpoint via /.well-known/openid-configuration."""
+        uri = self._jwks_uris.get(issuer)
+        if uri is not None:
+            return uri
+
+        discovery_url = f"{issuer.rstrip('/')}/.well-known/openid-configuration"
+        try:
+            response = await self.http_client.get(discovery_url, headers={"Accept": "application/json"})
+            uri = response.json().get("jwks_uri") if response.status_code == 200 else None
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"OpenID discovery failed for {issuer}: {e}")
+            uri = None
+
+        if not uri:
+            # Not cached, so discovery is retried on the next key refresh
+            uri = self.default_jwks_uri(issuer)
+            logger.info(f"Using default JWKS endpoint for {issuer}: {uri}")
+            return uri
+        self._jwks_uris[issuer] = uri
+        return uri
+
+    async def get_signing_key(self, issuer: str, kid: str) -> Dict[str, Any]:
+        """
+        Get the JWK for kid from the issuer's key set.
+
+        Raises:
+            ValueError: If the key is not found after an allowed refetch
+        """
+        key_set = self._key_sets.get(issuer)
+        now = self._clock()
+
+        if key_set is None or key_set["expires_at"] <= now:
+            key_set = await self._refresh(issuer, force=False)
+
+        key = key_set["keys"].get(kid)
+        if key is not None:
+            return key
+
+        # Unknown kid - keys may have rotated. Refetch, but not more than
+        # once per interval so garbage kids can't hammer Okta.
+        if now - key_set["fetched_at"] >= self._min_refetch_interval:
+            key_set = await self._refresh(issuer, force=True)
+            key = key_set["keys"].get(kid)
+            if key is not None:
+                return key
+
+        raise ValueError(f"Signing key not found: kid={kid}")
+
+    async def _refresh(self, issuer: str, force: bool) -> Dict[str, Any]:
+        """Fetch the issuer's key set, deduplicating concurrent fetches."""
+        lock = self._locks.setdefault(issuer, asyncio.Lock())
+        async with lock:
+            key_set = self._key_sets.get(issuer)
+            now = self._clock()
+            # Another coroutine may have refreshed while we waited
+            if key_set is not None:
+                if not force and key_set["expires_at"] > now:
+                    return key_set
+                if force and now - key_set["fetched_at"] < self._min_refetch_interval:
+                    return key_set
+
+            headers = {"Accept": "application/json"}
+            if key_set and key_set.get("etag"):
+                headers["If-None-Match"] = key_set["etag"]
+
+            response = await self.http_client.get(await self.jwks_uri(issuer), headers=headers)
+            self.fetch_count += 1
+            max_age = self._parse_max_age(response.headers.get("Cache-Control", ""))
+
+            if response.status_code == 304 and key_set is not None:
+                logger.debug(f"JWKS not modified for {issuer}")
+                keys = key_set["keys"]
+                etag = key_set.get("etag")
+            elif response.status_code == 200:
+                keys = {jwk["kid"]: jwk for jwk in response.json().get("keys", []) if "kid" in jwk}
+                etag = response.headers.get("ETag")
+                logger.info(f"Fetched JWKS for {issuer}: {len(keys)} keys")
+            else:
+                raise ValueError(f"JWKS fetch failed: {response.status_code}")
+
+            key_set = {
+                "keys": keys,
+                "etag": etag,
+                "expires_at": now + max_age,
+                "fetched_at": now,
+            }
+            self._key_sets[issuer] = key_set
+            return key_set
+
+    def _parse_max_age(self, cache_control: str) -> float:
+        """Extract max-age from a Cache-Control header."""
+        match = re.search(r"max-age=(\d+)", cache_control)
+        return float(match.group(1)) if match else self._default_max_age
@@ -9,17 +9,21 @@ When a user doesn't have access to an agent (based on group membership),
 the exchange returns access_denied instead of failing.
 """
 
+import asyncio
+import functools
 import logging
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
 from .agent_config import (
-    AgentConfig, get_agent_config, get_all_agent_configs,
+    AgentConfig, get_agent_config, get_all_agent_configs, on_agent_registry_reload,
     AGENT_SALES, AGENT_INVENTORY, AGENT_CUSTOMER, AGENT_PRICING,
     DEMO_AGENTS
 )
+from .token_cache import AgentTokenCache, make_cache_key, token_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +36,11 @@ try:
 except ImportError as e:
     logger.warning(f"Okta AI SDK not available: {e}. Using demo mode.")
 
+# Fan-out limits for exchange_for_all_agents
+DEFAULT_EXCHANGE_CONCURRENCY = int(os.getenv("OKTA_EXCHANGE_MAX_CONCURRENCY", "4"))
+DEFAULT_EXCHANGE_TIMEOUT = float(os.getenv("OKTA_EXCHANGE_TIMEOUT_SECONDS", "10"))
+DEFAULT_EXCHANGE_WORKERS = int(os.getenv("OKTA_EXCHANGE_MAX_WORKERS", "16"))
+
 
 class MultiAgentTokenExchange:
     """
@@ -41,23 +50,60 @@ class MultiAgentTokenExchange:
     Returns access_denied for unauthorized requests instead of errors.
     """
 
-    def __init__(self):
-        """Initialize token exchange managers for all configured agents."""
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_EXCHANGE_CONCURRENCY,
+        exchange_timeout: float = DEFAULT_EXCHANGE_TIMEOUT,
+        max_workers: int = DEFAULT_EXCHANGE_WORKERS
+    ):
+        """
+        Initialize token exchange managers for all configured agents.
+
+        Args:
+            max_concurrency: Max agents exchanged concurrently per request
+            exchange_timeout: Per-agent timeout in seconds for the full exchange
+            max_workers: Size of the thread pool running blocking SDK calls
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.exchange_timeout = exchange_timeout
+
+        # Per-user, per-scope cache of exchanged agent tokens
+        self.token_cache = AgentTokenCache()
+
+        # The Okta SDK is synchronous - run its network calls off the event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="okta-exchange"
+        )
+
         self.okta_domain = os.getenv("OKTA_DOMAIN", "").strip()
         if self.okta_domain and not self.okta_domain.startswith("http"):
             self.okta_domain = f"https://{self.okta_domain}"
 
         self.main_auth_server_id = os.getenv("OKTA_MAIN_AUTH_SERVER_ID", "default").strip()
 
-        # SDK instances per agent
+        # SDK instances per agent, plus main-server SDKs keyed by agent client ID
         self._sdks: Dict[str, OktaAISDK] = {}
         self._configs: Dict[str, OktaAIConfig] = {}
+        self._main_sdks: Dict[str, OktaAISDK] = {}
+
+        if SDK_AVAILABLE:
+            self._initialize_sdks()
+
+        on_agent_registry_reload(self.reload)
 
+    def reload(self) -> None:
+        """Rebuild SDK handles from the agent registry and drop cached tokens."""
+        self._sdks = {}
+        self._configs = {}
+        self._main_sdks = {}
+        self.token_cache.invalidate()
         if SDK_AVAILABLE:
             self._initialize_sdks()
+        logger.info("Token exchange SDKs reloaded")
 
     def _initialize_sdks(self):
-        """Initialize SDK instances for each configured agent."""
+        """Initialize SDK instances for each configured agent (built once)."""
         for agent_type in [AGENT_SALES, AGENT_INVENTORY, AGENT_CUSTOMER, AGENT_PRICING]:
             config = get_agent_config(agent_type)
             if not config or not config.agent_id or not config.private_key:
@@ -78,24 +124,39 @@ class MultiAgentTokenExchange:
                 logger.info(f"Initialized SDK for {agent_type} agent")
             except Exception as e:
                 logger.error(f"Failed to initialize SDK for {agent_type}: {e}")
+                continue
+
+            self._get_main_sdk(config)
 
     def is_agent_available(self, agent_type: str) -> bool:
         """Check if an agent's SDK is properly initialized."""
         return agent_type in self._sdks
 
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking SDK call on the bounded exchange thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
     async def exchange_token_for_agent(
         self,
         agent_type: str,
         user_id_token: str,
-        requested_scopes: Optional[List[str]] = None
+        requested_scopes: Optional[List[str]] = None,
+        user_subject: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Exchange user's ID token for agent-specific access token.
 
+        Results are served from the token cache when the same user asks the
+        same agent for the same scopes with an unexpired token.
+
         Args:
             agent_type: sales, inventory, customer, or pricing
             user_id_token: User's Okta ID token
             requested_scopes: Optional specific scopes to request
+            user_subject: Validated user subject (sub claim) for cache keying
 
         Returns:
             Dict with:
@@ -116,6 +177,26 @@ class MultiAgentTokenExchange:
         if agent_type not in self._sdks:
             return self._demo_result(agent_type, user_id_token, scopes)
 
+        fingerprint = token_fingerprint(user_id_token)
+        cache_key = make_cache_key(user_subject or fingerprint, agent_type, scopes)
+        result, cache_hit = await self.token_cache.get_or_exchange(
+            cache_key,
+            fingerprint,
+            lambda: self._exchange_with_sdk(agent_type, config, user_id_token, scopes)
+        )
+        if cache_hit:
+            logger.info(f"[{agent_type}] Token cache hit for scopes: {scopes}")
+        result["cached"] = cache_hit
+        return result
+
+    async def _exchange_with_sdk(
+        self,
+        agent_type: str,
+        config: AgentConfig,
+        user_id_token: str,
+        scopes: List[str]
+    ) -> Dict[str, Any]:
+        """Perform the two-step ID-JAG exchange against Okta (uncached)."""
         sdk = self._sdks[agent_type]
         okta_config = self._configs[agent_type]
 
@@ -131,7 +212,8 @@ class MultiAgentTokenExchange:
             if not main_sdk:
                 return self._error_result(agent_type, config, "Main SDK not available")
 
-            id_jag_result = main_sdk.cross_app_access.exchange_id_token(
+            id_jag_result = await self._run_blocking(
+                main_sdk.cross_app_access.exchange_id_token,
                 id_token=user_id_token,
                 audience=target_audience,
                 scope=scope_string
@@ -149,7 +231,8 @@ class MultiAgentTokenExchange:
                 private_jwk=okta_config.private_jwk
             )
 
-            token_result = sdk.cross_app_access.exchange_id_jag_for_auth_server_token(
+            token_result = await self._run_blocking(
+                sdk.cross_app_access.exchange_id_jag_for_auth_server_token,
                 auth_server_request
             )
 
@@ -208,6 +291,11 @@ class MultiAgentTokenExchange:
         if not SDK_AVAILABLE or not agent_config.private_key:
             return None
 
+        # Agents sharing credentials share one main-server SDK
+        main_sdk = self._main_sdks.get(agent_config.agent_id)
+        if main_sdk is not None:
+            return main_sdk
+
         try:
             main_config = OktaAIConfig(
                 oktaDomain=self.okta_domain,
@@ -217,7 +305,9 @@ class MultiAgentTokenExchange:
                 principalId=agent_config.agent_id,
                 privateJWK=agent_config.private_key
             )
-            return OktaAISDK(main_config)
+            main_sdk = OktaAISDK(main_config)
+            self._main_sdks[agent_config.agent_id] = main_sdk
+            return main_sdk
         except Exception as e:
             logger.error(f"Failed to create main SDK: {e}")
             return None
@@ -268,31 +358,50 @@ class MultiAgentTokenExchange:
         self,
         user_id_token: str,
         agent_types: Optional[List[str]] = None,
-        agent_scopes: Optional[Dict[str, List[str]]] = None
+        agent_scopes: Optional[Dict[str, List[str]]] = None,
+        user_subject: Optional[str] = None
     ) -> Dict[str, Dict[str, Any]]:
         """
-        Exchange tokens for multiple agents at once.
+        Exchange tokens for multiple agents concurrently.
+
+        Agents are exchanged in parallel, bounded by max_concurrency, and each
+        exchange is capped by exchange_timeout. A timed-out agent gets an error
+        result; the others are unaffected.
 
         Args:
             user_id_token: User's ID token
             agent_types: List of agent types, or None for all
             agent_scopes: Optional dict mapping agent_type to specific scopes to request
+            user_subject: Validated user subject (sub claim) for token cache keying
 
         Returns:
-            Dict mapping agent_type to exchange result
+            Dict mapping agent_type to exchange result, in agent_types order
         """
         if agent_types is None:
             agent_types = [AGENT_SALES, AGENT_INVENTORY, AGENT_CUSTOMER, AGENT_PRICING]
 
-        results = {}
-        for agent_type in agent_types:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def exchange_one(agent_type: str) -> Dict[str, Any]:
             # Get specific scopes for this agent if provided
             scopes = agent_scopes.get(agent_type) if agent_scopes else None
-            results[agent_type] = await self.exchange_token_for_agent(
-                agent_type, user_id_token, scopes
-            )
-
-        return results
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.exchange_token_for_agent(agent_type, user_id_token, scopes, user_subject),
+                        timeout=self.exchange_timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.error(f"[{agent_type}] Token exchange timed out after {self.exchange_timeout}s")
+                    return self._error_result(
+                        agent_type,
+                        get_agent_config(agent_type),
+                        f"Token exchange timed out after {self.exchange_timeout}s",
+                        scopes
+                    )
+
+        exchanged = await asyncio.gather(*(exchange_one(agent_type) for agent_type in agent_types))
+        return dict(zip(agent_types, exchanged))
 
 
 # Singleton instance
@@ -12,24 +12,31 @@ import os
 import json
 import time
 import uuid
+import hashlib
 import httpx
+from collections import OrderedDict
 from typing import Optional, Dict, Any, List
 from jose import jwt, JWTError
 from jose.constants import ALGORITHMS
 import logging
 
+from .jwks import JWKSClient
+
 logger = logging.getLogger(__name__)
 
 # MCP scopes available for the Sales Agent (orchestrator)
 MCP_SCOPES = ["mcp:read", "mcp:inventory", "mcp:pricing", "mcp:customers"]
 
+# Max verified tokens kept in memory (entries also expire at the token's exp)
+VERIFIED_CLAIMS_CACHE_SIZE = int(os.getenv("OKTA_VERIFIED_CLAIMS_CACHE_SIZE", "10000"))
+
 
 class OktaAuth:
     """
     Okta authentication and token exchange manager for AI Agents.
 
     Implements:
-    - Token validation using Okta JWKS
+    - Token validation using Okta JWKS (cached key set + verified claims)
     - Token exchange (RFC 8693) with JWT Bearer client assertion
     - ID-JAG cross-app access for MCP servers
     - Proper AI Agent authentication using JWK private keys
@@ -52,10 +59,19 @@ class OktaAuth:
         self.main_auth_server_id = os.getenv("OKTA_MAIN_AUTH_SERVER_ID", "aus8x7md5e7ObXMAH0g7")
         self.main_audience = os.getenv("OKTA_MAIN_AUDIENCE", "api://progear-main")
 
+        # Issuer whose tokens we accept. Users sign in through the Org
+        # authorization server, whose issuer is the bare org URL.
+        issuer = os.getenv("OKTA_ISSUER", "").strip().rstrip("/")
+        if not issuer and self.domain:
+            issuer = self.domain if self.domain.startswith("http") else f"https://{self.domain}"
+        self.trusted_issuers = {issuer} if issuer else set()
+
         # Token cache
         self._token_cache: Dict[str, Dict[str, Any]] = {}
-        self._jwks_cache: Optional[Dict] = None
-        self._jwks_cache_time: float = 0
+
+        # Signing keys and verified claims (token hash -> claims, until exp)
+        self._jwks = JWKSClient()
+        self._verified_claims: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 
     @property
     def agent_private_key(self) -> Optional[Dict]:
@@ -143,15 +159,62 @@ class OktaAuth:
                 "name": "Demo User",
             }
 
+        # Without an Okta issuer configured there is nothing to verify against
+        if not self.trusted_issuers:
+            try:
+                return jwt.get_unverified_claims(token)
+            except JWTError as e:
+                logger.error(f"Token validation failed: {e}")
+                raise ValueError(f"Invalid token: {e}")
+
+        # Repeat requests in a session skip signature verification
+        cache_key = hashlib.sha256(token.encode()).hexdigest()
+        cached = self._verified_claims.get(cache_key)
+        if cached is not None:
+            if cached.get("exp", 0) > time.time():
+                self._verified_claims.move_to_end(cache_key)
+                return cached
+            del self._verified_claims[cache_key]
+
         try:
-            # For production, implement proper JWKS validation
-            # For now, decode without verification (demo only!)
-            claims = jwt.get_unverified_claims(token)
-            return claims
-        except JWTError as e:
+            header = jwt.get_unverified_header(token)
+            issuer = jwt.get_unverified_claims(token).get("iss", "")
+            if issuer not in self.trusted_issuers:
+                raise ValueError(f"Untrusted issuer: {issuer}")
+            if header.get("alg") != ALGORITHMS.RS256:
+                raise ValueError(f"Unsupported algorithm: {header.get('alg')}")
+
+            signing_key = await self._jwks.get_signing_key(issuer, header.get("kid"))
+            claims = jwt.decode(
+                token,
+                signing_key,
+                algorithms=[ALGORITHMS.RS256],
+                issuer=issuer,
+                # ID tokens are audienced to the app client, access tokens to the API
+                options={"verify_aud": False, "verify_at_hash": False},
+            )
+        except (JWTError, ValueError, httpx.HTTPError) as e:
             logger.error(f"Token validation failed: {e}")
             raise ValueError(f"Invalid token: {e}")
 
+        audiences = claims.get("aud", [])
+        if isinstance(audiences, str):
+            audiences = [audiences]
+        allowed = {self.client_id, self.main_audience} - {""}
+        if allowed and not allowed.intersection(audiences):
+            logger.error(f"Token validation failed: unexpected audience {audiences}")
+            raise ValueError("Invalid token: unexpected audience")
+
+        self._verified_claims[cache_key] = claims
+        while len(self._verified_claims) > VERIFIED_CLAIMS_CACHE_SIZE:
+            self._verified_claims.popitem(last=False)
+
+        return claims
+
+    async def aclose(self) -> None:
+        """Release the shared JWKS HTTP client."""
+        await self._jwks.aclose()
+
     async def exchange_token_for_mcp(
         self,
         user_token: str,
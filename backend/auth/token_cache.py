@@ -0,0 +1,166 @@
+"""
+Agent Token Cache
+
+Caches ID-JAG exchange results per (user subject, agent_type, scopes) so
+repeated chat turns don't redo the two-step exchange against Okta.
+
+Features:
+- LRU eviction with a bounded number of entries
+- TTL from the token's expires_in, refreshed early by a safety margin
+- Short negative TTL for access-denied results
+- Single-flight: concurrent requests for the same key share one exchange
+"""
+
+import asyncio
+import copy
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("OKTA_TOKEN_CACHE_MAX_ENTRIES", "1024"))
+DEFAULT_REFRESH_MARGIN = float(os.getenv("OKTA_TOKEN_CACHE_REFRESH_MARGIN_SECONDS", "60"))
+DEFAULT_NEGATIVE_TTL = float(os.getenv("OKTA_TOKEN_CACHE_NEGATIVE_TTL_SECONDS", "30"))
+
+CacheKey = Tuple[str, str, Tuple[str, ...]]
+
+
+def token_fingerprint(token: str) -> str:
+    """Stable, non-reversible fingerprint of a user token."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def make_cache_key(user_subject: str, agent_type: str, scopes) -> CacheKey:
+    """Build the cache key: (user subject, agent_type, sorted scopes)."""
+    return (user_subject, agent_type, tuple(sorted(scopes)))
+
+
+class AgentTokenCache:
+    """
+    Bounded, TTL-aware LRU cache of agent token exchange results.
+
+    Each entry is bound to the fingerprint of the user token it was
+    exchanged for; a different token for the same subject is treated as a
+    miss and replaces the entry, so a cached agent token is never handed to
+    a caller that did not present the original user token.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._entries: "OrderedDict[CacheKey, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[CacheKey, str], asyncio.Task] = {}
+        self._max_entries = max_entries
+        self._refresh_margin = refresh_margin
+        self._negative_ttl = negative_ttl
+        self._clock = clock
+
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    async def get_or_exchange(
+        self,
+        key: CacheKey,
+        fingerprint: str,
+        exchange: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Return a cached result for key, or run exchange() once and cache it.
+
+        Args:
+            key: Cache key from make_cache_key()
+            fingerprint: token_fingerprint() of the user token
+            exchange: Coroutine factory performing the real exchange
+
+        Returns:
+            Tuple of (result copy, cache_hit)
+        """
+        entry = self._entries.get(key)
+        if entry and entry["fingerprint"] == fingerprint and entry["expires_at"] > self._clock():
+            self._entries.move_to_end(key)
+            if entry["result"].get("access_denied"):
+                self._negative_hits += 1
+            else:
+                self._hits += 1
+            return copy.deepcopy(entry["result"]), True
+
+        flight_key = (key, fingerprint)
+        task = self._inflight.get(flight_key)
+        if task is None:
+            self._misses += 1
+            task = asyncio.ensure_future(self._exchange_and_store(key, fingerprint, exchange))
+            self._inflight[flight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        else:
+            self._coalesced += 1
+
+        # Shield so a caller's timeout doesn't cancel the shared exchange
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result), False
+
+    async def _exchange_and_store(
+        self,
+        key: CacheKey,
+        fingerprint: str,
+        exchange: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Run the exchange and cache the outcome according to its type."""
+        result = await exchange()
+
+        if result.get("access_denied"):
+            ttl = self._negative_ttl
+        elif result.get("success"):
+            ttl = float(result.get("expires_in") or 0) - self._refresh_margin
+        else:
+            ttl = 0  # Never cache transient errors
+
+        if ttl > 0:
+            self._entries[key] = {
+                "result": result,
+                "fingerprint": fingerprint,
+                "expires_at": self._clock() + ttl,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+        return result
+
+    def invalidate(self, user_subject: Optional[str] = None) -> int:
+        """Drop entries for one subject, or everything. Returns count removed."""
+        if user_subject is None:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+        keys = [key for key in self._entries if key[0] == user_subject]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring."""
+        lookups = self._hits + self._negative_hits + self._misses + self._coalesced
+        return {
+            "size": len(self._entries),
+            "max_entries": self._max_entries,
+            "hits": self._hits,
+            "negative_hits": self._negative_hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "evictions": self._evictions,
+            "in_flight": len(self._inflight),
+            "hit_rate": round((self._hits + self._negative_hits + self._coalesced) / lookups, 4) if lookups else 0.0,
+        }
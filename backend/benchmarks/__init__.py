@@ -0,0 +1 @@
+# ProGear Sales AI - Benchmarks
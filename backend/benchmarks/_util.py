@@ -0,0 +1,8 @@
+"""Helpers shared by the benchmark scripts (no LLM or auth dependencies)."""
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
@@ -0,0 +1,93 @@
+"""
+Token exchange setup-cost micro-benchmark.
+
+Measures the per-exchange setup work that used to happen on the hot path
+(re-reading agent env vars, re-parsing private key JSON, and building a
+main-server OktaAIConfig + OktaAISDK) against the startup-built registry
+and cached SDK handles.
+
+Usage (from backend/):
+    python -m benchmarks.bench_agent_registry --iterations 2000
+"""
+
+import argparse
+import base64
+import json
+import os
+import time
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+def _b64(value: int) -> str:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def generate_private_jwk() -> dict:
+    """Generate an RSA private JWK shaped like an Okta agent key."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    numbers = key.private_numbers()
+    public = numbers.public_numbers
+    return {
+        "kty": "RSA", "kid": "bench", "alg": "RS256",
+        "n": _b64(public.n), "e": _b64(public.e), "d": _b64(numbers.d),
+        "p": _b64(numbers.p), "q": _b64(numbers.q),
+        "dp": _b64(numbers.dmp1), "dq": _b64(numbers.dmq1), "qi": _b64(numbers.iqmp),
+    }
+
+
+os.environ.setdefault("OKTA_DOMAIN", "https://bench.okta.example")
+os.environ.setdefault("OKTA_AI_AGENT_ID", "wlp-bench")
+os.environ.setdefault("OKTA_MCP_AUTH_SERVER_ID", "aus-bench")
+os.environ.setdefault("OKTA_AI_AGENT_PRIVATE_KEY", json.dumps(generate_private_jwk()))
+
+from auth import agent_config
+from auth.agent_config import AGENT_INVENTORY, get_agent_config, get_all_agent_configs
+from auth.multi_agent_auth import MultiAgentTokenExchange, SDK_AVAILABLE
+
+
+def timed(label: str, iterations: int, func) -> None:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    per_call = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{label:<40} {per_call:10.2f} us/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    exchange = MultiAgentTokenExchange()
+    config = get_agent_config(AGENT_INVENTORY)
+
+    def uncached_config():
+        # Old behaviour: every lookup re-read env and re-parsed the key
+        return agent_config._load_agent_configs()[AGENT_INVENTORY]
+
+    def uncached_all_configs():
+        # Old get_all_agent_configs called get_agent_config twice per agent
+        configs = [agent_config._load_agent_configs() for _ in range(8)]
+        return configs
+
+    timed("get_agent_config (env + parse)", args.iterations, uncached_config)
+    timed("get_agent_config (registry)", args.iterations, lambda: get_agent_config(AGENT_INVENTORY))
+    timed("get_all_agent_configs (env + parse)", args.iterations // 10 or 1, uncached_all_configs)
+    timed("get_all_agent_configs (registry)", args.iterations, get_all_agent_configs)
+
+    if SDK_AVAILABLE:
+        def uncached_main_sdk():
+            exchange._main_sdks.clear()
+            return exchange._get_main_sdk(config)
+
+        timed("main-server SDK (build per exchange)", args.iterations // 10 or 1, uncached_main_sdk)
+        exchange._get_main_sdk(config)
+        timed("main-server SDK (cached handle)", args.iterations, lambda: exchange._get_main_sdk(config))
+    else:
+        print("Okta AI SDK not installed - skipping SDK construction timings")
+
+
+if __name__ == "__main__":
+    main()
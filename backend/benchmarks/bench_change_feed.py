@@ -0,0 +1,117 @@
+"""
+Change feed fan-out benchmark.
+
+Runs thousands of subscribers on one event loop (one worker), each
+consuming the store's change feed as /api/demo/events does, while a
+writer thread applies inventory updates. Reports delivery latency (from
+publish to each subscriber receiving the event) and deliveries per
+second, and checks that every subscriber saw every event in order.
+
+Also checks catch-up (a late subscriber replays from its since version,
+or gets "resync" once the buffer has moved past it) and compares the
+size of one change event with the inventory summary a poller refetches.
+
+Usage (from backend/):
+    python -m benchmarks.bench_change_feed --subscribers 1000,5000,10000 --events 200
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+
+from benchmarks.bench_store_index import make_data, make_store
+from data.change_feed import ChangeFeed
+
+
+async def fan_out(store, subscribers: int, events: int, interval: float):
+    """Deliver events to subscribers; returns (latencies in ms, elapsed seconds)."""
+    skus = list(store.get_all_inventory())
+    since = store.version
+    latencies = []
+    ready = asyncio.Event()
+    started = 0
+
+    async def subscriber():
+        nonlocal started
+        received = []
+        stream = store.changes.subscribe(since)
+        started += 1
+        if started == subscribers:
+            ready.set()
+        async for event in stream:
+            latencies.append(time.time() - event.timestamp)
+            received.append(event.version)
+            if len(received) == events:
+                break
+        assert received == list(range(since + 1, since + events + 1)), "events missing or out of order"
+
+    def writer():
+        for i in range(events):
+            store.increment_inventory(skus[i % len(skus)], 1)
+            time.sleep(interval)
+
+    tasks = [asyncio.create_task(subscriber()) for _ in range(subscribers)]
+    await ready.wait()
+    # Let every subscriber reach its first wait
+    await asyncio.sleep(0.1)
+    start = time.perf_counter()
+    thread = threading.Thread(target=writer)
+    thread.start()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    thread.join()
+    return [latency * 1000 for latency in latencies], elapsed
+
+
+async def check_catch_up(store) -> None:
+    skus = list(store.get_all_inventory())
+    since = store.version
+    for sku in skus[:10]:
+        store.increment_inventory(sku, 1)
+    replayed = []
+    async for event in store.changes.subscribe(since):
+        replayed.append(event)
+        if len(replayed) == 10:
+            break
+    assert [e.key for e in replayed] == skus[:10] and replayed[-1].version == store.version
+
+    small = ChangeFeed(capacity=4)
+    store.changes, feed = small, store.changes
+    for sku in skus[:10]:
+        store.increment_inventory(sku, 1)
+    first = await small.subscribe(since).__anext__()
+    assert first.type == "resync" and first.version == store.version
+    store.changes = feed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--subscribers", default="1000,5000,10000")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.005, help="Seconds between writes")
+    args = parser.parse_args()
+
+    store = make_store(make_data(args.size))
+    print(f"{args.events} events, one write every {args.interval * 1000:.0f} ms")
+    print(f"{'subscribers':>11} {'deliveries/s':>13} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for subscribers in (int(n) for n in args.subscribers.split(",")):
+        latencies, elapsed = asyncio.run(fan_out(store, subscribers, args.events, args.interval))
+        latencies.sort()
+        print(f"{subscribers:>11} {len(latencies) / elapsed:>13.0f} {statistics.median(latencies):>8.2f} "
+              f"{latencies[int(len(latencies) * 0.99)]:>8.2f} {latencies[-1]:>8.2f}")
+
+    event = store.changes.events_since(store.version - 1)[0]
+    event_bytes = len(json.dumps(event.to_dict()))
+    summary_bytes = len(json.dumps(store.get_inventory_summary()))
+    print(f"payload per change: event {event_bytes} B vs inventory summary {summary_bytes} B")
+
+    asyncio.run(check_catch_up(store))
+    print("catch-up ok (replay and resync)")
+
+
+if __name__ == "__main__":
+    main()
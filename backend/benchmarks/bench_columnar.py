@@ -0,0 +1,103 @@
+"""
+Columnar inventory benchmark: Python dict loops vs NumPy reductions.
+
+For each catalog size, times the per-category summary, the low-stock
+scan and the per-category margin analysis as the previous loops over
+every product dict and as vectorized reductions over ColumnarInventory,
+checking both give the same answer. Also reports the column build time
+and the cost of mirroring one update into the columns.
+
+Usage (from backend/):
+    python -m benchmarks.bench_columnar --sizes 100000,1000000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.bench_store_index import make_data
+from data.columnar import ColumnarInventory, NUMPY_AVAILABLE
+from data.store_aggregates import StoreAggregates
+
+
+# Previous dict-loop implementations, for comparison
+def loop_inventory_summary(inventory, pricing):
+    expected = StoreAggregates()
+    expected.rebuild(inventory, pricing, {})
+    return expected.inventory_summary()
+
+
+def loop_low_stock(inventory):
+    return [
+        sku for sku, item in inventory.items()
+        if item.get("status") == "low" or item.get("quantity", 0) <= item.get("reorder_point", 0)
+    ]
+
+
+def loop_margin_by_category(inventory, pricing):
+    categories = {}
+    for sku, item in inventory.items():
+        if sku in pricing:
+            categories.setdefault(item["category"], []).append(pricing[sku]["margin"])
+    return {cat: sum(margins) / len(margins) for cat, margins in categories.items()}
+
+
+def best_of(fn, repeat: int):
+    """(best time in ms, last result)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100000,1000000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        raise SystemExit("numpy is not installed")
+
+    print(f"{'size':>9} {'operation':<20} {'dict loop ms':>13} {'columnar ms':>12} {'speedup':>8}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        data = make_data(size)
+        inventory, pricing = data["inventory"], data["pricing"]
+        rng = random.Random(size)
+        for sku in rng.sample(list(pricing), size // 3):
+            pricing[sku] = {**pricing[sku], "margin": round(rng.uniform(5, 70), 1)}
+
+        columns = ColumnarInventory()
+        build_ms, _ = best_of(lambda: columns.rebuild(inventory, pricing), 1)
+        print(f"{size:>9} {'build columns':<20} {'':>13} {build_ms:>12.1f}")
+
+        for label, loop, vectorized in (
+            ("inventory summary", lambda: loop_inventory_summary(inventory, pricing), columns.inventory_summary),
+            ("low stock", lambda: loop_low_stock(inventory), columns.low_stock_skus),
+            ("margin by category", lambda: loop_margin_by_category(inventory, pricing), columns.margin_by_category),
+        ):
+            loop_ms, expected = best_of(loop, args.repeat)
+            columnar_ms, actual = best_of(vectorized, args.repeat)
+            if label == "margin by category":
+                assert expected.keys() == actual.keys()
+                assert all(abs(expected[c] - actual[c]) < 1e-9 for c in expected), (expected, actual)
+            else:
+                assert expected == actual, label
+            print(f"{size:>9} {label:<20} {loop_ms:>13.1f} {columnar_ms:>12.2f} {loop_ms / columnar_ms:>7.0f}x")
+
+        skus = list(inventory)
+
+        def mirror_updates():
+            for _ in range(1000):
+                sku = rng.choice(skus)
+                item = {**inventory[sku], "quantity": rng.randint(0, 5000)}
+                columns.update_product(sku, item, pricing[sku])
+
+        update_ms, _ = best_of(mirror_updates, args.repeat)
+        print(f"{size:>9} {'row update (each)':<20} {'':>13} {update_ms / 1000:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
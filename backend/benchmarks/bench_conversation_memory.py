@@ -0,0 +1,168 @@
+"""
+Conversation memory benchmark: bytes per session and context rendering.
+
+Fills stores with many sessions of realistic chat turns (short user
+messages, multi-line assistant answers) and measures the memory held per
+session with tracemalloc for:
+- the previous layout: dataclass messages in a list, re-sliced whenever
+  it grew past max_messages
+- the ring buffer of __slots__ messages
+- the same with older bodies zlib-compressed (CONVERSATION_COMPRESSION)
+
+Also times get_context_summary as the chat endpoint calls it, rendered on
+every call (previous) vs cached until the next message, and checks that
+compressed conversations return the same history and context.
+
+Usage (from backend/):
+    python -m benchmarks.bench_conversation_memory --sessions 100000 --turns 20
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List
+
+import api.conversation_store as conversation_store
+from api.conversation_store import ConversationStore
+
+PRODUCTS = ["Dark Chocolate 72% Single Origin", "Milk Chocolate Classic Bar", "Ruby Chocolate Premium Bar",
+            "Hazelnut Praline Box", "Sea Salt Caramel Truffles", "White Chocolate Raspberry Bar"]
+
+
+@dataclass
+class LegacyMessage:
+    role: str
+    content: str
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class LegacyConversation:
+    session_id: str
+    messages: List[LegacyMessage] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    last_activity: datetime = field(default_factory=datetime.utcnow)
+
+    def add_message(self, role: str, content: str) -> None:
+        self.messages.append(LegacyMessage(role=role, content=content))
+        self.last_activity = datetime.utcnow()
+
+    def get_context_summary(self, max_messages: int = 10) -> str:
+        recent = self.messages[-max_messages:] if len(self.messages) > max_messages else self.messages
+        lines = []
+        for msg in recent:
+            prefix = "User" if msg.role == "user" else "Assistant"
+            content = msg.content[:200] + "..." if len(msg.content) > 200 else msg.content
+            lines.append(f"{prefix}: {content}")
+        return "\n".join(lines)
+
+
+class LegacyStore:
+    """Previous message storage (list append, then re-slice over max_messages) in the same LRU container."""
+
+    def __init__(self, max_messages: int = 100):
+        self._conversations = OrderedDict()
+        self._max_messages = max_messages
+
+    def add_message(self, session_id: str, role: str, content: str) -> None:
+        conversation = self._conversations.get(session_id)
+        if conversation is None:
+            conversation = self._conversations[session_id] = LegacyConversation(session_id=session_id)
+        conversation.add_message(role, content)
+        self._conversations.move_to_end(session_id)
+        if len(conversation.messages) > self._max_messages:
+            conversation.messages = conversation.messages[-self._max_messages:]
+
+    def get_context_summary(self, session_id: str, max_messages: int = 10) -> str:
+        return self._conversations[session_id].get_context_summary(max_messages)
+
+
+def make_turns(rng: random.Random, turns: int) -> List[tuple]:
+    messages = []
+    for _ in range(turns // 2):
+        product = rng.choice(PRODUCTS)
+        messages.append(("user", f"How many {product} do we have, and should we reorder?"))
+        rows = "\n".join(
+            f"- **{rng.choice(PRODUCTS)}**: {rng.randint(0, 900)} units (reorder point: {rng.randint(50, 200)})"
+            for _ in range(rng.randint(4, 12))
+        )
+        messages.append(("assistant", f"[Inventory Agent]\n**Inventory for {product}:**\n{rows}\n\n"
+                                      f"Recommend reordering {rng.randint(100, 500)} units this week."))
+    return messages
+
+
+def fill(store, sessions: int, turns: int) -> int:
+    """Returns bytes allocated while filling."""
+    rng = random.Random(0)
+    gc.collect()
+    tracemalloc.start()
+    for n in range(sessions):
+        session_id = f"session-{n:07d}"
+        for role, content in make_turns(rng, turns):
+            store.add_message(session_id, role, content)
+    gc.collect()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used
+
+
+def context_us(store, sessions: int, calls: int) -> float:
+    rng = random.Random(1)
+    picks = [f"session-{rng.randrange(sessions):07d}" for _ in range(calls)]
+    start = time.perf_counter()
+    for session_id in picks:
+        store.get_context_summary(session_id, max_messages=2)
+    return (time.perf_counter() - start) * 1e6 / calls
+
+
+def check_compressed_equivalence(turns: int) -> None:
+    plain, packed = ConversationStore(), ConversationStore()
+    conversation_store.COMPRESSION_ENABLED = True
+    for role, content in make_turns(random.Random(2), max(turns, 40)):
+        packed.add_message("s", role, content)
+    conversation_store.COMPRESSION_ENABLED = False
+    for role, content in make_turns(random.Random(2), max(turns, 40)):
+        plain.add_message("s", role, content)
+    assert any(isinstance(m._body, bytes) for m in packed._conversations["s"].messages), "nothing compressed"
+    assert not any(isinstance(m._body, bytes) for m in packed._conversations["s"].messages[-conversation_store.PLAIN_MESSAGES:])
+    assert packed.get_history("s", 100) == plain.get_history("s", 100)
+    assert packed.get_context_summary("s", 30) == plain.get_context_summary("s", 30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--turns", type=int, default=20, help="Messages per session")
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+
+    check_compressed_equivalence(args.turns)
+    print("compressed history/context match plain ok")
+
+    print(f"{args.sessions} sessions x {args.turns} messages")
+    print(f"{'layout':<22} {'MB':>8} {'bytes/session':>14} {'context us/call':>16}")
+    layouts = (
+        ("list + dataclass", LegacyStore, False),
+        ("ring + slots", lambda: ConversationStore(max_sessions=args.sessions), False),
+        ("ring + slots + zlib", lambda: ConversationStore(max_sessions=args.sessions), True),
+    )
+    for label, make, compress in layouts:
+        conversation_store.COMPRESSION_ENABLED = compress
+        store = make()
+        used = fill(store, args.sessions, args.turns)
+        # Render once so the cached rows measure the steady state
+        context_us(store, args.sessions, args.sessions)
+        print(f"{label:<22} {used / 2 ** 20:>8.1f} {used / args.sessions:>14.0f} "
+              f"{context_us(store, args.sessions, args.calls):>16.2f}")
+        del store
+        gc.collect()
+    conversation_store.COMPRESSION_ENABLED = False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Conversation store benchmark: per-request cost vs live session count.
+
+Replays the chat endpoint's session calls (get_or_create_session,
+get_context_summary, two add_message) against stores holding 1k to 100k
+live sessions. Compares the previous store, which scanned every session
+for expiry on each request and sorted them all once max_sessions was
+exceeded, with the LRU-ordered store, whose request path is O(1) and whose
+expiry runs in a background sweep.
+
+Also checks the expiry semantics: the sweep drops exactly the sessions
+idle past the TTL, a lookup of an expired session not yet swept starts a
+new one, and the max_sessions overflow evicts the least recently active.
+
+Usage (from backend/):
+    python -m benchmarks.bench_conversation_store --sessions 1000,10000,100000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from api.conversation_store import ConversationStore
+
+
+class LegacyConversationStore(ConversationStore):
+    """Previous behaviour: a full expiry scan (and sort over the limit) on every session lookup."""
+
+    def get_or_create_session(self, session_id=None):
+        self._cleanup_expired()
+        return super().get_or_create_session(session_id)
+
+    def _cleanup_expired(self):
+        now = datetime.utcnow()
+        expired = [sid for sid, conv in self._conversations.items() if now - conv.last_activity > self._ttl]
+        for sid in expired:
+            del self._conversations[sid]
+        if len(self._conversations) > self._max_sessions:
+            sorted_sessions = sorted(self._conversations.items(), key=lambda x: x[1].last_activity)
+            for sid, _ in sorted_sessions[:len(self._conversations) - self._max_sessions]:
+                del self._conversations[sid]
+
+
+def populate(store: ConversationStore, sessions: int) -> list:
+    ids = [f"session-{n}" for n in range(sessions)]
+    for session_id in ids:
+        store.add_message(session_id, "user", "show me low stock items")
+    return ids
+
+
+def request(store: ConversationStore, session_id: str) -> None:
+    """The conversation store calls made by one /api/chat request."""
+    session_id = store.get_or_create_session(session_id)
+    store.get_context_summary(session_id, max_messages=2)
+    store.add_message(session_id, "user", "yes, do it")
+    store.add_message(session_id, "assistant", "Done - inventory updated.")
+
+
+def per_request_us(store: ConversationStore, ids: list, requests: int) -> float:
+    rng = random.Random(0)
+    picks = [rng.choice(ids) for _ in range(requests)]
+    start = time.perf_counter()
+    for session_id in picks:
+        request(store, session_id)
+    return (time.perf_counter() - start) * 1e6 / requests
+
+
+def check_expiry() -> None:
+    store = ConversationStore(ttl_minutes=60, max_sessions=5, sweep_interval=3600)
+    ids = populate(store, 5)
+    for n, session_id in enumerate(ids[:3]):
+        # Idle past the TTL, oldest first (as they were touched)
+        store._conversations[session_id].last_activity = datetime.utcnow() - timedelta(minutes=120 - n)
+    assert store.get_context_summary(ids[0]) == "", "expired session still readable"
+    assert store.sweep_expired() == 2 and len(store) == 2
+
+    store.add_message(ids[3], "user", "touch")
+    for n in range(4):
+        store.get_or_create_session(f"new-{n}")
+    # ids[4] was the least recently active live session, so it went first
+    assert ids[3] in store._conversations and ids[4] not in store._conversations and len(store) == 5
+
+    store.start_sweeper()
+    store.stop_sweeper()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", default="1000,10000,100000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--legacy-requests", type=int, default=200)
+    args = parser.parse_args()
+
+    check_expiry()
+    print("expiry/eviction semantics ok")
+
+    print(f"{'sessions':>9} {'legacy us/req':>14} {'lru us/req':>11} {'sweep ms':>9}")
+    for sessions in (int(n) for n in args.sessions.split(",")):
+        legacy = LegacyConversationStore(max_sessions=sessions * 2)
+        ids = populate(legacy, sessions)
+        legacy_us = per_request_us(legacy, ids, args.legacy_requests)
+
+        store = ConversationStore(max_sessions=sessions)
+        ids = populate(store, sessions)
+        lru_us = per_request_us(store, ids + [f"overflow-{n}" for n in range(args.requests)], args.requests)
+        assert len(store) == sessions
+
+        # A sweep with nothing expired stops at the first session
+        start = time.perf_counter()
+        store.sweep_expired()
+        sweep_ms = (time.perf_counter() - start) * 1000
+        print(f"{sessions:>9} {legacy_us:>14.1f} {lru_us:>11.1f} {sweep_ms:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Multi-worker chat benchmark for the conversation store backends.
+
+Runs N worker processes, each with its own store instance as a uvicorn
+worker would have, and replays multi-turn chat sessions where
+consecutive turns of a session always land on different workers. A turn
+does what /api/chat does with the store: get_or_create_session, read the
+2-message routing context, "process" the message (a sleep standing in for
+the orchestrator's LLM and token exchange wait), then append the user
+message and reply in one add_messages batch.
+
+Every turn checks that its routing context holds the previous turn of
+its session. Before the run, the SQLite and Redis backends are checked
+against the memory store (history, context, trimming) and for TTL
+expiry and sweeps. Reports chat turns per second, store time per turn and how
+many turns lost their context, for the in-process memory store (which
+can't share sessions, so it only works with one worker), the SQLite
+backend and the Redis backend (against the local RESP stand-in in
+benchmarks/resp_server.py unless --redis-url is given).
+
+Usage (from backend/):
+    python -m benchmarks.bench_conversation_workers --workers 1,2,4,8
+"""
+
+import argparse
+import multiprocessing as mp
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from api.conversation_redis import RedisConversationStore, make_client
+from api.conversation_sqlite import SQLiteConversationStore
+from api.conversation_store import ConversationStore
+
+
+def make_store(backend: str, target: str):
+    if backend == "sqlite":
+        return SQLiteConversationStore(Path(target))
+    if backend == "redis":
+        return RedisConversationStore(make_client(target), prefix="bench:")
+    return ConversationStore()
+
+
+def worker(backend, target, index, workers, sessions, turns, work_s, barrier, results):
+    store = make_store(backend, target)
+    store_time, misses, done = 0.0, 0, 0
+    barrier.wait()
+    for turn in range(turns):
+        for session in range(sessions):
+            if (session + turn) % workers != index:
+                continue
+            session_id = f"bench-{session}"
+            start = time.perf_counter()
+            store.get_or_create_session(session_id)
+            context = store.get_context_summary(session_id, max_messages=2)
+            store_time += time.perf_counter() - start
+            if turn and f"session {session} turn {turn - 1}" not in context:
+                misses += 1
+
+            time.sleep(work_s)
+
+            start = time.perf_counter()
+            store.add_messages(session_id, [
+                ("user", f"session {session} turn {turn}: increase dark chocolate by 10"),
+                ("assistant", f"[Inventory Agent] Updated for session {session} turn {turn}."),
+            ])
+            store_time += time.perf_counter() - start
+            done += 1
+        # Next turn only after every worker finished this one
+        barrier.wait()
+    results.put((store_time, misses, done))
+
+
+def run(backend: str, target: str, workers: int, sessions: int, turns: int, work_s: float):
+    barrier = mp.Barrier(workers + 1)
+    results = mp.Queue()
+    procs = [
+        mp.Process(target=worker, args=(backend, target, n, workers, sessions, turns, work_s, barrier, results))
+        for n in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for _ in range(turns):
+        barrier.wait()
+    elapsed = time.perf_counter() - start
+    totals = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    store_time = sum(t for t, _, _ in totals)
+    misses = sum(m for _, m, _ in totals)
+    done = sum(d for _, _, d in totals)
+    return done / elapsed, store_time * 1000 / done, misses, sessions * (turns - 1)
+
+
+def check_backends(tmp: str, redis_url: str) -> None:
+    """Shared backends answer like the memory store; trimming, TTL and sweeps hold."""
+    stores = {
+        "memory": ConversationStore(max_messages=5),
+        "sqlite": SQLiteConversationStore(Path(tmp) / "check.sqlite3", max_messages=5),
+        "redis": RedisConversationStore(make_client(redis_url), max_messages=5, prefix="check:"),
+    }
+    for store in stores.values():
+        store.clear_all()
+        for n in range(7):
+            store.add_messages("a", [("user", f"question {n}"), ("assistant", "answer " + "x" * (n * 60))])
+        store.add_message("b", "user", "hello")
+    expected = stores["memory"]
+    for name, store in stores.items():
+        for max_messages in (0, 1, 2, 10):
+            assert store.get_history("a", max_messages) == expected.get_history("a", max_messages), name
+            assert store.get_context_summary("a", max_messages) == expected.get_context_summary("a", max_messages), name
+        assert len(store) == 2 and store.get_context_summary("missing") == "", name
+        store.clear_session("b")
+        assert len(store) == 1, name
+
+    sqlite = stores["sqlite"]
+    sqlite._connect().execute("UPDATE sessions SET last_activity = last_activity - 7200 WHERE id = 'a'")
+    assert sqlite.get_context_summary("a") == "" and len(sqlite) == 0
+    sqlite.add_message("a", "user", "fresh start")
+    assert sqlite.get_history("a") == [{"role": "user", "content": "fresh start"}]
+    sqlite._connect().execute("UPDATE sessions SET last_activity = last_activity - 7200")
+    assert sqlite.sweep_expired() == 1
+    sqlite.close()
+
+    redis = RedisConversationStore(make_client(redis_url), ttl_minutes=0.001, prefix="check:")
+    redis.add_message("ttl", "user", "gone soon")
+    time.sleep(0.1)
+    assert redis.get_context_summary("ttl") == "", "Redis TTL not applied"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--sessions", type=int, default=48)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--work-ms", type=float, default=10, help="Simulated orchestration time per turn")
+    parser.add_argument("--redis-url", default=None, help="Real Redis server (default: local stand-in)")
+    args = parser.parse_args()
+
+    stand_in = None
+    redis_url = args.redis_url
+    if redis_url is None:
+        port = free_port()
+        stand_in = subprocess.Popen([sys.executable, "-m", "benchmarks.resp_server", "--port", str(port)])
+        redis_url = f"redis://127.0.0.1:{port}/0"
+        for _ in range(100):
+            try:
+                make_client(redis_url).execute("PING")
+                break
+            except OSError:
+                time.sleep(0.05)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            check_backends(tmp, redis_url)
+            print("backend semantics ok (history, context, trimming, TTL, sweep)")
+            print(f"{args.sessions} sessions x {args.turns} turns, {args.work_ms:.0f} ms simulated work per turn")
+            print(f"{'backend':<8} {'workers':>7} {'turns/s':>8} {'store ms/turn':>14} {'lost context':>13}")
+            for backend in ("memory", "sqlite", "redis"):
+                for workers in (int(n) for n in args.workers.split(",")):
+                    if backend == "sqlite":
+                        target = str(Path(tmp) / f"conversations-{workers}.sqlite3")
+                    else:
+                        target = redis_url
+                        if backend == "redis":
+                            RedisConversationStore(make_client(redis_url), prefix="bench:").clear_all()
+                    rate, store_ms, misses, checked = run(
+                        backend, target, workers, args.sessions, args.turns, args.work_ms / 1000
+                    )
+                    print(f"{backend:<8} {workers:>7} {rate:>8.0f} {store_ms:>14.3f} {misses:>6}/{checked:<6}")
+                    if backend != "memory" or workers == 1:
+                        assert not misses, f"{backend} lost context with {workers} workers"
+    finally:
+        if stand_in is not None:
+            stand_in.terminate()
+            stand_in.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Fast-path router accuracy and latency benchmark.
+
+Runs the local classifier over a labelled message corpus and reports how
+many messages it answers locally, how accurate those decisions are, its
+per-message latency, and the LLM routing time saved (using an assumed
+LLM round-trip latency). Also feeds the documented quote requests through
+the router and the quote parser and checks every line prices the intended
+product.
+
+Usage (from backend/):
+    python -m benchmarks.bench_fast_router --llm-ms 900
+"""
+
+import argparse
+import time
+
+from orchestrator.quote_request import parse_quote_request
+from orchestrator.routing import FastPathRouter
+from data.demo_store import get_demo_store
+
+# (message, expected agents) - None means it should defer to the LLM
+CORPUS = [
+    ("show low stock", ["inventory"]),
+    ("what's in stock right now", ["inventory"]),
+    ("list all products", ["inventory"]),
+    ("how many units of Dark Chocolate 72% Single Origin do we have", ["inventory"]),
+    ("add 500 units to Milk Chocolate Classic Bar", ["inventory"]),
+    ("increase inventory of Ruby Chocolate Premium Bar by 20%", ["inventory"]),
+    ("any reorder alerts?", ["inventory"]),
+    ("check the warehouse", ["inventory"]),
+    ("what are the margins on truffles", ["pricing"]),
+    ("show me profit by category", ["pricing"]),
+    ("what's the price of the Whole Hazelnut Milk Bar", ["pricing"]),
+    ("wholesale pricing please", ["pricing"]),
+    ("markup on gift collections", ["pricing"]),
+    ("platinum customers", ["customer"]),
+    ("who is our biggest client", ["customer"]),
+    ("Sweet Delights Retail", ["customer"]),
+    ("show customer accounts in Los Angeles", ["customer"]),
+    ("loyalty tier breakdown", ["customer"]),
+    ("show me revenue", ["sales"]),
+    ("what's in the pipeline", ["sales"]),
+    ("create a quote", ["sales"]),
+    ("place order for Gourmet Gift Emporium", ["sales", "customer"]),
+    ("stock and margins for truffles", ["inventory", "pricing"]),
+    ("customer revenue this quarter", ["sales", "customer"]),
+    ("truffles", ["inventory"]),
+    ("chocolate bars", ["inventory"]),
+    ("yes", None),
+    ("do it", None),
+    ("go ahead", None),
+    ("yes, increase it by 10%", None),
+    ("what about that one", None),
+    ("reduce the price of truffles", None),
+    ("hello there", None),
+    ("can you help me", None),
+]
+
+# (quote request, expected tier, expected product per line)
+QUOTE_CORPUS = [
+    ("quote 50 dark truffles, 200 x hazelnut bars and 10 units of champagne truffles for sweet delights",
+     "Platinum", ["Dark Chocolate Ganache Truffle Box", "Whole Hazelnut Milk Bar", "Champagne Truffle Collection"]),
+    ("quote 50 dark chocolate truffles and 20 milk chocolate bars for platinum",
+     "Platinum", ["Dark Chocolate Ganache Truffle Box", "Milk Chocolate Classic Bar"]),
+    ("quote 50 dark truffles and 20 milk chocolate bars",
+     None, ["Dark Chocolate Ganache Truffle Box", "Milk Chocolate Classic Bar"]),
+    ("estimate for 120 sea salt caramel bars and 30 espresso truffles for the chocolate gallery",
+     "Gold", ["Sea Salt & Caramel Bar", "Espresso Truffle Set"]),
+]
+
+
+def check_quote_phrases(router, store) -> None:
+    """Route each quote request locally and price it through parse_quote_request + store.quote."""
+    for message, tier, products in QUOTE_CORPUS:
+        decision = router.route(message, store)
+        assert decision is not None and "sales:quote" in decision.agent_scopes.get("sales", []), \
+            f"{message!r} not routed to sales:quote ({decision})"
+        _, got_tier, lines = parse_quote_request(store, message.lower(), "")
+        quote = store.quote(lines)
+        names = [line["name"] for line in quote["lines"]]
+        assert got_tier == tier and names == products and not quote["unknown"], \
+            f"{message!r} quoted {names} at {got_tier} (unknown: {quote['unknown']})"
+    print(f"quote requests priced   {len(QUOTE_CORPUS)}/{len(QUOTE_CORPUS)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--llm-ms", type=float, default=900.0, help="Assumed LLM routing latency")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    router = FastPathRouter()
+    store = get_demo_store()
+
+    check_quote_phrases(router, store)
+
+    local = correct = deferred_ok = wrong_local = 0
+    for message, expected in CORPUS:
+        decision = router.route(message, store)
+        if decision is None:
+            deferred_ok += expected is None
+            continue
+        local += 1
+        if expected is not None and sorted(decision.agents) == sorted(expected):
+            correct += 1
+        else:
+            wrong_local += 1
+            print(f"  mismatch: {message!r} -> {decision.agents} (expected {expected})")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for message, _ in CORPUS:
+            router.route(message, store)
+    per_message_us = (time.perf_counter() - start) / (args.repeat * len(CORPUS)) * 1e6
+
+    print(f"messages                {len(CORPUS)}")
+    print(f"answered locally        {local} ({local / len(CORPUS):.0%})")
+    print(f"local accuracy          {correct}/{local} ({correct / local:.0%})" if local else "local accuracy          n/a")
+    print(f"deferred as expected    {deferred_ok}/{sum(1 for _, e in CORPUS if e is None)}")
+    print(f"local routing latency   {per_message_us:.1f} us/message")
+    print(f"LLM time saved          {local * args.llm_ms / 1000:.1f} s per corpus pass "
+          f"({local / len(CORPUS) * args.llm_ms:.0f} ms/message average)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Token validation benchmark against a local stub JWKS server.
+
+Generates RSA key sets locally, serves them from a stub Okta Org issuer
+(OpenID discovery + /oauth2/v1/keys with ETag/max-age headers), and checks
+that OktaAuth.validate_token:
+- resolves the Org server's key endpoint through discovery
+- verifies signatures (forged tokens are rejected)
+- fetches the key set once and serves repeat tokens from the claims cache
+- picks up a rotated key via a rate-limited kid-miss refetch
+
+Usage (from backend/):
+    python -m benchmarks.bench_jwks_validation --tokens 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from jose import jwt
+
+from benchmarks.bench_agent_registry import generate_private_jwk
+
+CLIENT_ID = "0oa-bench"
+
+
+class StubJWKSHandler(BaseHTTPRequestHandler):
+    """Serves discovery and the current key set with ETag and Cache-Control: max-age."""
+
+    public_keys = []
+    requests = 0
+
+    def do_GET(self):
+        if self.path == "/.well-known/openid-configuration":
+            issuer = f"http://{self.headers['Host']}"
+            self._send_json(json.dumps({"issuer": issuer, "jwks_uri": f"{issuer}/oauth2/v1/keys"}).encode())
+            return
+        if self.path != "/oauth2/v1/keys":
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        StubJWKSHandler.requests += 1
+        body = json.dumps({"keys": StubJWKSHandler.public_keys}).encode()
+        etag = f'"{hash(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self._send_json(body, {"Cache-Control": "max-age=300", "ETag": etag})
+
+    def _send_json(self, body, headers=None):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def public_jwk(private: dict) -> dict:
+    return {k: private[k] for k in ("kty", "kid", "alg", "n", "e")} | {"use": "sig"}
+
+
+def sign(private: dict, issuer: str, sub: str) -> str:
+    now = int(time.time())
+    claims = {"iss": issuer, "aud": CLIENT_ID, "sub": sub, "iat": now, "exp": now + 3600}
+    return jwt.encode(claims, private, algorithm="RS256", headers={"kid": private["kid"]})
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=200)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubJWKSHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Org authorization server: the issuer is the bare org URL
+    issuer = f"http://127.0.0.1:{server.server_address[1]}"
+
+    os.environ.pop("OKTA_ISSUER", None)
+    os.environ["OKTA_DOMAIN"] = issuer
+    os.environ["OKTA_CLIENT_ID"] = CLIENT_ID
+    from auth.okta_auth import OktaAuth
+    auth = OktaAuth()
+
+    key_a = generate_private_jwk() | {"kid": "key-a"}
+    StubJWKSHandler.public_keys = [public_jwk(key_a)]
+    tokens = [sign(key_a, issuer, f"user-{i}") for i in range(args.tokens)]
+
+    start = time.perf_counter()
+    for token in tokens:
+        await auth.validate_token(token)
+    cold = (time.perf_counter() - start) / len(tokens) * 1e6
+
+    start = time.perf_counter()
+    for token in tokens:
+        await auth.validate_token(token)
+    warm = (time.perf_counter() - start) / len(tokens) * 1e6
+
+    assert StubJWKSHandler.requests == 1, "key set should be fetched once"
+    print(f"first validation (RSA verify)  {cold:10.1f} us/token")
+    print(f"repeat validation (cached)     {warm:10.1f} us/token")
+    print(f"JWKS fetches                   {StubJWKSHandler.requests}")
+    print(f"JWKS endpoint (discovered)     {await auth._jwks.jwks_uri(issuer)}")
+
+    # Forged token: right kid, wrong key
+    forged = sign(generate_private_jwk() | {"kid": "key-a"}, issuer, "attacker")
+    try:
+        await auth.validate_token(forged)
+        raise AssertionError("forged token accepted")
+    except ValueError:
+        print("forged token rejected         ok")
+
+    # Rotation: new kid triggers one refetch; a garbage kid right after does not
+    key_b = generate_private_jwk() | {"kid": "key-b"}
+    StubJWKSHandler.public_keys = [public_jwk(key_a), public_jwk(key_b)]
+    auth._jwks._min_refetch_interval = 0
+    await auth.validate_token(sign(key_b, issuer, "rotated"))
+    auth._jwks._min_refetch_interval = 60
+    fetches = StubJWKSHandler.requests
+    for _ in range(5):
+        try:
+            await auth.validate_token(sign(generate_private_jwk() | {"kid": "unknown"}, issuer, "x"))
+        except ValueError:
+            pass
+    assert StubJWKSHandler.requests == fetches, "kid-miss refetch must be rate limited"
+    print(f"rotated key accepted, JWKS fetches now {StubJWKSHandler.requests} (garbage kids rate limited)")
+
+    await auth.aclose()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Low-stock alert benchmark: full scan vs ranked top-N.
+
+Times the previous alert query (scan every product, collect the low ones)
+against get_low_stock_items and the ranked get_low_stock_alerts(k) on both
+backends, after a burst of random quantity writes. Checks the top-N
+against a brute-force sort by shortfall, and that the "alert" events
+match the threshold crossings the writes caused.
+
+Usage (from backend/):
+    python -m benchmarks.bench_low_stock --sizes 10000,100000 --k 10
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_store_backends import make_sqlite_store
+from benchmarks.bench_store_index import make_data, make_store
+from data.low_stock import is_low_stock, shortfall
+
+
+def scan_low_stock(store):
+    """Previous alert query: every product checked on each call."""
+    return [{**item, "sku": sku} for sku, item in store.get_all_inventory().items() if is_low_stock(item)]
+
+
+def expected_top(store, k: int):
+    inventory = store.get_all_inventory()
+    ordinals = {sku: n for n, sku in enumerate(inventory)}
+    low = [sku for sku, item in inventory.items() if is_low_stock(item)]
+    return sorted(low, key=lambda sku: (shortfall(inventory[sku]), ordinals[sku]))[:k]
+
+
+def per_call_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) * 1000 / repeat)
+    return best
+
+
+def write_burst(store, writes: int, rng: random.Random) -> int:
+    """Random quantity writes; returns how many crossed a reorder point."""
+    skus = list(store.get_all_inventory())
+    crossings = alerts = 0
+    for _ in range(writes):
+        sku = rng.choice(skus)
+        before, version = is_low_stock(store.get_inventory_by_sku(sku)), store.version
+        store.update_inventory_quantity(sku, rng.randint(0, 400), "set")
+        crossings += before != is_low_stock(store.get_inventory_by_sku(sku))
+        alerts += sum(event.type == "alert" for event in store.changes.events_since(version))
+    assert alerts == crossings, f"{alerts} alert events for {crossings} crossings"
+    return crossings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'SKUs':>8} {'backend':<7} {'low':>7} {'crossings':>9} {'scan ms':>9} {'all low ms':>10} {f'top {args.k} ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(n) for n in args.sizes.split(",")):
+            data = make_data(size)
+            for label, store in (("json", make_store(data)), ("sqlite", make_sqlite_store(data, Path(tmp), f"low{size}"))):
+                crossings = write_burst(store, args.writes, random.Random(size))
+                assert [item["sku"] for item in store.get_low_stock_alerts(args.k)] == expected_top(store, args.k)
+                assert store.count_low_stock() == len(store.get_low_stock_items())
+                print(f"{size:>8} {label:<7} {store.count_low_stock():>7} {crossings:>9} "
+                      f"{per_call_ms(lambda: scan_low_stock(store), args.repeat):>9.2f} "
+                      f"{per_call_ms(store.get_low_stock_items, args.repeat):>10.2f} "
+                      f"{per_call_ms(lambda: store.get_low_stock_alerts(args.k), args.repeat * 20):>10.3f}")
+                store.close()
+
+
+if __name__ == "__main__":
+    main()
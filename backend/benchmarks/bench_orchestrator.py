@@ -0,0 +1,87 @@
+"""
+Orchestrator overhead benchmark.
+
+Compares per-request overhead of building a new Orchestrator on every
+request (two ChatAnthropic clients + StateGraph compile) against reusing
+the shared engine. LLM calls are stubbed so only framework overhead is
+measured.
+
+Usage (from backend/):
+    python -m benchmarks.bench_orchestrator --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "sk-ant-bench-placeholder")
+
+from benchmarks._util import percentile
+from orchestrator.orchestrator import Orchestrator
+from data.demo_store import get_demo_store
+
+
+class StubLLM:
+    """Minimal async chat model returning a canned response."""
+
+    def __init__(self, content: str):
+        self._content = content
+
+    async def ainvoke(self, messages):
+        return type("StubMessage", (), {"content": self._content})()
+
+
+ROUTING_JSON = json.dumps({
+    "sales": {"needed": False},
+    "inventory": {"needed": True, "scopes": ["inventory:read"]},
+    "customer": {"needed": False},
+    "pricing": {"needed": False},
+})
+
+
+async def run_per_request(store, requests: int):
+    """Old behaviour: construct a fresh Orchestrator for every request."""
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        orchestrator = Orchestrator()
+        orchestrator.router_llm = StubLLM(ROUTING_JSON)
+        orchestrator.response_llm = StubLLM("ok")
+        await orchestrator.process("show low stock", user_token="demo-token", demo_store=store)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def run_shared(store, requests: int):
+    """New behaviour: one engine, per-request context passed to process()."""
+    orchestrator = Orchestrator(router_llm=StubLLM(ROUTING_JSON), response_llm=StubLLM("ok"))
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await orchestrator.process("show low stock", user_token="demo-token", demo_store=store)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples):
+    print(
+        f"{label:<22} p50={percentile(samples, 50):8.3f} ms  "
+        f"p99={percentile(samples, 99):8.3f} ms  mean={statistics.mean(samples):8.3f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    store = get_demo_store()
+    report("per-request build", await run_per_request(store, args.requests))
+    report("shared engine", await run_shared(store, args.requests))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""
+Quote engine benchmark: per-line discount lookups vs one batched quote.
+
+Prices multi-line orders the way a caller had to before store.quote(): per
+line, get_price_by_sku plus calculate_total_discount, whose volume lookup
+re-sorted the thresholds and int()-parsed them every call. Compares that
+with store.quote() on compiled tables, with and without NumPy, on both
+backends, and checks every result matches the per-line reference to the
+cent.
+
+Usage (from backend/):
+    python -m benchmarks.bench_quotes --lines 100,1000,10000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import data.quotes as quotes
+from benchmarks.bench_store_backends import make_sqlite_store
+from benchmarks.bench_store_index import make_data, make_store
+from data.store_aggregates import from_cents, to_cents
+
+TIERS = ["Platinum", "Gold", "Silver", "Bronze"]
+DISCOUNTS = {
+    "tier_discounts": {"Platinum": 5, "Gold": 3, "Silver": 1, "Bronze": 0},
+    "volume_discounts": {"10": 5, "25": 7, "50": 10, "100": 15, "250": 17, "500": 20, "1000": 22},
+}
+
+
+def legacy_volume_discount(volume_discounts: dict, quantity: int) -> int:
+    """Previous get_volume_discount: sort and parse the thresholds on every call."""
+    discount = 0
+    for threshold, disc in sorted(volume_discounts.items(), key=lambda x: int(x[0])):
+        if quantity >= int(threshold):
+            discount = disc
+    return discount
+
+
+def per_line_quote(store, lines):
+    """Reference: one price lookup and one discount calculation per line."""
+    volume_discounts = store.get_discount_structure()["volume_discounts"]
+    priced = []
+    for sku, quantity, tier in lines:
+        price = store.get_price_by_sku(sku)
+        tier_disc = store.get_tier_discount(tier)
+        total = tier_disc + legacy_volume_discount(volume_discounts, quantity)
+        list_cents = to_cents(price["price"]) * quantity
+        discount = (list_cents * total + 50) // 100
+        priced.append((sku, total, from_cents(list_cents - discount)))
+    return priced
+
+
+def make_quote_data(size: int, seed: int = 3) -> dict:
+    data = make_data(size)
+    rng = random.Random(seed)
+    for row in data["pricing"].values():
+        cost = round(rng.uniform(1, 60), 2)
+        price = round(cost * rng.uniform(1.2, 3), 2)
+        row.update(price=price, cost=cost, margin=round((price - cost) / price * 100, 1))
+    data["discounts"] = DISCOUNTS
+    return data
+
+
+def best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20000, help="Catalog size")
+    parser.add_argument("--lines", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_quote_data(args.size)
+    rng = random.Random(1)
+    skus = list(data["inventory"])
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = (("json", make_store(data)), ("sqlite", make_sqlite_store(data, Path(tmp), "quotes")))
+        print(f"{'lines':>6} {'backend':<7} {'per-line ms':>11} {'quote ms':>9} {'no numpy ms':>11} {'speedup':>8}")
+        for count in (int(n) for n in args.lines.split(",")):
+            lines = [(rng.choice(skus), rng.randint(1, 1500), rng.choice(TIERS)) for _ in range(count)]
+            for label, store in stores:
+                expected = per_line_quote(store, lines)
+                for numpy in (True, False):
+                    quotes.NUMPY_AVAILABLE = numpy and quotes.np is not None
+                    got = [(line["sku"], line["total_discount"], line["line_total"]) for line in store.quote(lines)["lines"]]
+                    assert got == expected, f"{label} quote differs from per-line pricing (numpy={numpy})"
+
+                per_line = best_ms(lambda: per_line_quote(store, lines), args.repeat)
+                quotes.NUMPY_AVAILABLE = quotes.np is not None
+                batched = best_ms(lambda: store.quote(lines), args.repeat)
+                quotes.NUMPY_AVAILABLE = False
+                pure = best_ms(lambda: store.quote(lines), args.repeat)
+                quotes.NUMPY_AVAILABLE = quotes.np is not None
+                print(f"{count:>6} {label:<7} {per_line:>11.2f} {batched:>9.2f} {pure:>11.2f} {per_line / batched:>7.1f}x")
+        for _, store in stores:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
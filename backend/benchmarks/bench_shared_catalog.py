@@ -0,0 +1,253 @@
+"""
+Shared catalog benchmark: memory per worker and read latency.
+
+Parity: seeds a SharedDemoStore from every theme's initial JSON plus a
+synthetic catalog, runs the bench_store_backends scenario against it and
+the in-memory DemoStore (with the default compaction thresholds, then
+compacting every few changed rows, then every few delta generations), and
+checks that a second store over the same files - another worker -
+replays the chain to the same data.
+
+Workers: starts N worker processes (spawned, like uvicorn workers) that
+each open the theme's store - a DemoStore loaded from the JSON file
+(json) or a SharedDemoStore mapping the published snapshot (shared) -
+and then run a mix of hot reads, calling refresh() every few reads as
+get_demo_store does per request. A writer process meanwhile increments
+one watched product plus one random product per write, so the rows
+changed since the base keep growing as with real traffic. Reports per worker the load time and the memory the
+store added (RSS, PSS = RSS with shared pages split between their
+sharers, private), the PSS over all workers, per-read latency, and
+whether the workers ended up seeing the writer's changes (readers also
+check that a product's quantity never goes backwards between reads).
+
+Usage (from backend/):
+    python -m benchmarks.bench_shared_catalog --size 20000 --workers 4,16
+"""
+
+import argparse
+import copy
+import json
+import multiprocessing as mp
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks._util import percentile
+from benchmarks.bench_store_backends import normalize, scenario
+from benchmarks.bench_store_index import make_data, make_store
+from data.demo_store import THEME_DATA_FILES, DemoStore
+from data.shared_store import SharedDemoStore
+
+THEME = "bench"
+WATCHED_SKU = "SKU-0000000"
+
+
+# ==================== PARITY ====================
+
+def check_parity(label: str, data: dict, directory: Path, compact_rows: int, compact_generations: int) -> int:
+    """Run the scenario against DemoStore and SharedDemoStore. Returns the number of steps."""
+    steps = scenario(data)
+    memory = make_store(copy.deepcopy(data))
+    shared = SharedDemoStore(theme=label, directory=directory, seed=False,
+                             compact_rows=compact_rows, compact_generations=compact_generations)
+    shared.seed(copy.deepcopy(data))
+    try:
+        for number, (method, args) in enumerate(steps):
+            expected = normalize(getattr(memory, method)(*args))
+            actual = normalize(getattr(shared, method)(*args))
+            if expected != actual or (isinstance(expected, dict) and list(expected) != list(actual)):
+                raise SystemExit(
+                    f"{label}: step {number} {method}{args} differs\n"
+                    f"  json:   {str(expected)[:500]}\n  shared: {str(actual)[:500]}"
+                )
+        assert not shared.check_aggregates()
+
+        other = SharedDemoStore(theme=label, directory=directory, seed=False)
+        for method in ("get_all_inventory", "get_all_pricing", "get_all_customers", "get_discount_structure",
+                       "get_inventory_summary", "get_customer_summary", "get_low_stock_items"):
+            assert normalize(getattr(other, method)()) == normalize(getattr(memory, method)()), f"{label}: {method}"
+        other.close()
+    finally:
+        shared.close()
+    return len(steps)
+
+
+# ==================== WORKERS ====================
+
+def memory_mb() -> Dict[str, float]:
+    """This process's RSS, PSS and private memory in MB (Linux)."""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1]) / 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def open_store(mode: str, source: str) -> DemoStore:
+    if mode == "shared":
+        return SharedDemoStore(theme=THEME, directory=Path(source), seed=False)
+    with open(source) as f:
+        return DemoStore(theme=THEME, data=json.load(f))
+
+
+def reader(mode, source, reads, refresh_every, barrier, results):
+    before = memory_mb()
+    start = time.perf_counter()
+    store = open_store(mode, source)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random()
+    inventory = store.get_all_inventory()
+    skus = rng.sample(list(inventory), 200)
+    names = [inventory[sku]["name"] for sku in skus[:50]]
+    customer_names = [store.get_customer_by_id(cid)["name"] for cid in rng.sample(list(store.get_all_customers()), 50)]
+    operations = [
+        ("get_inventory_by_sku", lambda: store.get_inventory_by_sku(rng.choice(skus))),
+        ("get_price_by_sku", lambda: store.get_price_by_sku(rng.choice(skus))),
+        ("get_inventory_by_name", lambda: store.get_inventory_by_name(rng.choice(names))),
+        ("search_inventory (rare)", lambda: store.search_inventory(rng.choice(names)[-12:])),
+        ("get_customer_by_name", lambda: store.get_customer_by_name(rng.choice(customer_names))),
+        ("get_low_stock_alerts", lambda: store.get_low_stock_alerts(10)),
+    ]
+    samples: Dict[str, List[float]] = {name: [] for name, _ in operations + [("refresh", None)]}
+    watched, backwards = store.get_inventory_by_sku(WATCHED_SKU)["quantity"], 0
+
+    barrier.wait()
+    for n in range(reads):
+        if n % refresh_every == 0:
+            began = time.perf_counter()
+            store.refresh()
+            samples["refresh"].append(time.perf_counter() - began)
+            quantity = store.get_inventory_by_sku(WATCHED_SKU)["quantity"]
+            backwards += quantity < watched
+            watched = quantity
+        name, operation = operations[n % len(operations)]
+        began = time.perf_counter()
+        operation()
+        samples[name].append(time.perf_counter() - began)
+
+    # Writer done: a new request comes in
+    barrier.wait()
+    store.refresh()
+    final = store.get_inventory_by_sku(WATCHED_SKU)["quantity"]
+    after = memory_mb()
+    results.put({
+        "load_ms": load_ms,
+        "memory": {key: after[key] - before[key] for key in after},
+        "samples": samples,
+        "final": final,
+        "backwards": backwards,
+    })
+
+
+def writer(mode, source, writes, interval, barrier, results):
+    store = open_store(mode, source)
+    rng = random.Random(7)
+    skus = list(store.get_all_inventory())
+    samples = []
+    barrier.wait()
+    for _ in range(writes):
+        began = time.perf_counter()
+        store.increment_inventory(WATCHED_SKU, 1)
+        samples.append(time.perf_counter() - began)
+        store.increment_inventory(rng.choice(skus), 1)
+        time.sleep(interval)
+    barrier.wait()
+    results.put({"final": store.get_inventory_by_sku(WATCHED_SKU)["quantity"], "samples": samples})
+
+
+def run_workers(mode: str, source: str, workers: int, reads: int, refresh_every: int, writes: int) -> dict:
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results, writer_results = ctx.Queue(), ctx.Queue()
+    procs = [
+        ctx.Process(target=reader, args=(mode, source, reads, refresh_every, barrier, results))
+        for _ in range(workers - 1)
+    ]
+    procs.append(ctx.Process(target=writer, args=(mode, source, writes, 0.005, barrier, writer_results)))
+    for proc in procs:
+        proc.start()
+    totals = [results.get() for _ in range(workers - 1)]
+    written = writer_results.get()
+    for proc in procs:
+        proc.join()
+    return {"readers": totals, "expected": written["final"], "writes": written["samples"]}
+
+
+def report(mode: str, workers: int, run: dict) -> None:
+    readers = run["readers"]
+    mean = {key: sum(r["memory"][key] for r in readers) / len(readers) for key in ("rss", "pss", "private")}
+    load = sum(r["load_ms"] for r in readers) / len(readers)
+    current = sum(r["final"] == run["expected"] for r in readers)
+    backwards = sum(r["backwards"] for r in readers)
+    print(f"{mode:<7} {workers:>7} {load:>8.0f} {mean['rss']:>8.1f} {mean['pss']:>8.1f} {mean['private']:>10.1f} "
+          f"{mean['pss'] * workers:>10.1f}   {current}/{len(readers)} current, {backwards} backwards")
+    for name in readers[0]["samples"]:
+        samples = [s * 1e6 for r in readers for s in r["samples"][name]]
+        print(f"{'':<17} {name:<26} p50 {percentile(samples, 50):>8.1f} us   p99 {percentile(samples, 99):>9.1f} us")
+    writes = [s * 1e6 for s in run["writes"]]
+    print(f"{'':<17} {'increment_inventory':<26} p50 {percentile(writes, 50):>8.1f} us   "
+          f"p99 {percentile(writes, 99):>9.1f} us  (writer)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20000, help="Products in the catalog")
+    parser.add_argument("--workers", default="4,16")
+    parser.add_argument("--reads", type=int, default=6000, help="Reads per worker")
+    parser.add_argument("--refresh-every", type=int, default=20, help="Reads per request (refresh)")
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--skip-parity", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        if not args.skip_parity:
+            datasets = []
+            for theme, files in THEME_DATA_FILES.items():
+                with open(files["initial"]) as f:
+                    datasets.append((theme, json.load(f)))
+            datasets.append(("synthetic", make_data(3000)))
+            for compact_rows, compact_generations in ((1024, 4096), (3, 4096), (1024, 2)):
+                for label, data in datasets:
+                    steps = check_parity(f"{label}-{compact_rows}-{compact_generations}", data,
+                                         directory / "parity", compact_rows, compact_generations)
+                    print(f"parity ok  {label:<10} compact_rows={compact_rows:<5} "
+                          f"compact_generations={compact_generations:<4} {steps} steps")
+
+        data = make_data(args.size)
+        json_path = directory / f"{THEME}.json"
+        with open(json_path, "w") as f:
+            json.dump(data, f)
+        shared_dir = directory / "shared"
+        seeder = SharedDemoStore(theme=THEME, directory=shared_dir, seed=False)
+        seeder.seed(data)
+        seeder.close()
+        catalog = max(shared_dir.glob("*.catalog"), key=lambda path: path.stat().st_mtime)
+        print(f"\n{args.size} products: JSON {json_path.stat().st_size / 2 ** 20:.1f} MB, "
+              f"snapshot with indexes {catalog.stat().st_size / 2 ** 20:.1f} MB")
+        print("memory: MB the store added per worker (mean over the readers); total = PSS x workers")
+        print(f"{'mode':<7} {'workers':>7} {'load ms':>8} {'RSS':>8} {'PSS':>8} {'private':>10} {'total PSS':>10}")
+
+        for workers in (int(n) for n in args.workers.split(",")):
+            for mode, source in (("json", str(json_path)), ("shared", str(shared_dir))):
+                if mode == "shared":
+                    # Start every run from the seeded catalog
+                    SharedDemoStore(theme=THEME, directory=shared_dir, seed=False).seed(data)
+                run = run_workers(mode, source, workers, args.reads, args.refresh_every, args.writes)
+                report(mode, workers, run)
+                if mode == "shared":
+                    assert all(r["final"] == run["expected"] for r in run["readers"]), "a worker missed a write"
+                    assert not any(r["backwards"] for r in run["readers"]), "a worker read an older generation"
+
+
+if __name__ == "__main__":
+    main()
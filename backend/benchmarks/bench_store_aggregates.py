@@ -0,0 +1,60 @@
+"""
+DemoStore summary aggregates benchmark.
+
+Applies random quantity/price mutations to a synthetic catalog and times
+the summary reads against recomputing from scratch. Consistency with a
+full recompute is covered by tests/test_store_aggregates.py.
+
+Usage (from backend/):
+    python -m benchmarks.bench_store_aggregates --size 100000 --mutations 20000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.bench_store_index import make_data, make_store
+from data.store_aggregates import StoreAggregates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--mutations", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    data = make_data(args.size)
+    store = make_store(data)
+    skus = list(data["inventory"])
+    rng = random.Random(11)
+
+    start = time.perf_counter()
+    for _ in range(args.mutations):
+        sku = rng.choice(skus)
+        if rng.random() < 0.7:
+            operation = rng.choice(["increase", "decrease", "set"])
+            store.update_inventory_quantity(sku, rng.randint(0, 500), operation)
+        else:
+            store.update_price(sku, round(rng.uniform(1, 80), 2))
+    mutation_us = (time.perf_counter() - start) / args.mutations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        store.get_inventory_summary()
+        store.get_customer_summary()
+    read_us = (time.perf_counter() - start) / args.repeat * 1e6
+
+    start = time.perf_counter()
+    for _ in range(max(1, args.repeat // 5)):
+        StoreAggregates().rebuild(data["inventory"], data["pricing"], data["customers"])
+    recompute_us = (time.perf_counter() - start) / max(1, args.repeat // 5) * 1e6
+
+    print(f"catalog size           {args.size}")
+    print(f"mutations applied      {args.mutations} ({mutation_us:.1f} us each)")
+    print(f"summary reads          {read_us:.1f} us")
+    print(f"full recompute         {recompute_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+SQLite DemoStore scaling benchmark and the shared backend parity scenario.
+
+Scaling: seeds SQLite catalogs of each size and times seeding plus the
+hot lookups and writes. The JSON backend is timed alongside unless
+--sqlite-only is given (it needs the whole catalog in memory).
+
+Parity: scenario() is a fixed run of lookups, searches and mutations
+derived from a dataset; tests/test_store_backends.py runs it against the
+JSON (in-memory) and SQLite stores and requires identical results.
+
+All databases live in a temporary directory; the theme data is untouched.
+
+Usage (from backend/):
+    python -m benchmarks.bench_store_backends --sizes 10000,100000,1000000 --sqlite-only
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+from benchmarks._util import percentile
+from benchmarks.bench_store_index import make_data, make_store
+from data.sqlite_store import SQLiteDemoStore
+
+Step = Tuple[str, tuple]
+
+
+def make_sqlite_store(data: dict, directory: Path, name: str = "bench") -> SQLiteDemoStore:
+    """SQLiteDemoStore in directory, seeded from data."""
+    store = SQLiteDemoStore(theme=name, db_path=directory / f"{name}.sqlite3", seed=False)
+    store.seed(data)
+    return store
+
+
+# ==================== PARITY ====================
+
+def scenario(data: dict, seed: int = 11) -> List[Step]:
+    """Lookups and mutations derived from the data, in a fixed order."""
+    rng = random.Random(seed)
+    inventory = data.get("inventory", {})
+    customers = data.get("customers", {})
+    skus = list(inventory)
+    names = [item.get("name", "") for item in inventory.values()]
+    categories = sorted({item.get("category", "") for item in inventory.values()})
+    customer_names = [c.get("name", "") for c in customers.values()]
+    tiers = sorted({c.get("tier", "") for c in customers.values()})
+
+    def sample(values, k):
+        return rng.sample(values, min(k, len(values)))
+
+    queries = ["a", "ch", "", "zzz-none", 'he said "hi"', "100%", "o'", "ÉCLAIR", "  "]
+    for name in sample(names, 15):
+        words = name.split()
+        queries += [name, name.upper(), name[1:-1], words[0], name[:3], f"the {name.lower()} please"]
+    for name in sample(customer_names, 10):
+        queries += [name, name[:4], name.split()[-1]]
+    queries += categories + [c.lower() for c in categories]
+
+    reads: List[Step] = []
+    for query in queries:
+        reads += [
+            ("search_inventory", (query,)),
+            ("get_inventory_by_name", (query,)),
+            ("search_customers", (query,)),
+            ("get_customer_by_name", (query,)),
+        ]
+    for category in categories + ["nonexistent"]:
+        reads += [("get_inventory_by_category", (category,)), ("get_pricing_by_category", (category,))]
+    for tier in tiers + ["nonexistent"]:
+        reads += [("get_customers_by_tier", (tier,)), ("get_tier_discount", (tier,))]
+    for sku in sample(skus, 10) + ["NO-SUCH-SKU"]:
+        reads += [("get_inventory_by_sku", (sku,)), ("get_price_by_sku", (sku,))]
+    for cid in sample(list(customers), 5) + ["NO-SUCH-ID"]:
+        reads.append(("get_customer_by_id", (cid,)))
+    for quantity in (0, 1, 10, 50, 100, 500, 1000, 10 ** 6):
+        reads += [("get_volume_discount", (quantity,)), ("calculate_total_discount", (tiers[0] if tiers else "Gold", quantity))]
+    reads.append(("quote", ([(skus[0], 0, "Gold")] if skus else [],)))
+
+    # Small and batched (vectorized) quotes, by SKU and by name, with an unknown product
+    quote_tiers = tiers + ["NewTier", "nonexistent"]
+    small_quote = [(sku, rng.choice([1, 10, 49, 50, 500]), rng.choice(quote_tiers)) for sku in sample(skus, 3)]
+    small_quote += [(names[0], 120, quote_tiers[0]), ("zzz-none", 5, quote_tiers[0])] if names else []
+    large_quote = [(rng.choice(skus), rng.randint(1, 1200), rng.choice(quote_tiers)) for _ in range(200)] if skus else []
+
+    writes: List[Step] = []
+    for _ in range(40):
+        sku = rng.choice(skus)
+        kind = rng.randrange(8)
+        if kind == 0:
+            writes.append(("update_inventory_quantity", (sku, rng.randint(0, 500), "set")))
+        elif kind == 1:
+            writes.append(("update_inventory_quantity", (sku, rng.randint(1, 200), "decrease")))
+        elif kind == 2:
+            writes.append(("increment_inventory", (sku, rng.randint(-50, 300))))
+        elif kind == 3:
+            writes.append(("scale_inventory_by_percent", (sku, rng.choice([10, 25, 50, 200]), rng.choice(["increase", "decrease"]))))
+        elif kind == 4:
+            writes.append(("compare_and_set_inventory", (sku, inventory[sku].get("quantity", 0), rng.randint(0, 50))))
+        elif kind == 5:
+            writes.append(("update_price", (sku, round(rng.uniform(1, 90), 2))))
+        elif kind == 6:
+            writes.append(("update_inventory_quantity", (inventory[sku].get("name", sku), 5, "increase")))
+        else:
+            writes.append(("update_tier_discount", (rng.choice(tiers + ["NewTier"]), rng.randint(0, 30))))
+    writes += [("update_inventory_quantity", ("NO-SUCH-SKU", 1, "set")), ("update_price", ("NO-SUCH-SKU", 1.0))]
+
+    summaries: List[Step] = [
+        ("get_inventory_summary", ()), ("get_customer_summary", ()), ("get_low_stock_items", ()),
+        ("get_all_inventory", ()), ("get_all_pricing", ()), ("get_all_customers", ()),
+        ("get_discount_structure", ()), ("get_margin_by_category", ()),
+        ("get_low_stock_alerts", (5,)), ("count_low_stock", ()),
+        ("quote", (small_quote,)), ("quote", (large_quote,)),
+    ]
+
+    steps = reads + summaries
+    for write in writes:
+        steps += [write] + summaries
+    return steps + reads
+
+
+def normalize(result: Any) -> Any:
+    """Compare results by content and key order (JSON round trip keeps both), floats to 9 places."""
+    return json.loads(json.dumps(result, default=dict), parse_float=lambda value: round(float(value), 9))
+
+
+# ==================== SCALING ====================
+
+def timed(fn: Callable[[], Any], repeat: int) -> Tuple[float, float]:
+    """(p50, p99) latency of fn in ms."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentile(samples, 50), percentile(samples, 99)
+
+
+def bench(store, data: dict, repeat: int, seed: int = 5) -> List[Tuple[str, float, float]]:
+    rng = random.Random(seed)
+    skus = list(data["inventory"])
+    names = [data["inventory"][sku]["name"] for sku in rng.sample(skus, min(50, len(skus)))]
+    customer_names = [c["name"] for c in list(data["customers"].values())[:50]]
+
+    return [
+        ("get_inventory_by_sku", *timed(lambda: store.get_inventory_by_sku(rng.choice(skus)), repeat)),
+        ("get_inventory_by_name", *timed(lambda: store.get_inventory_by_name(rng.choice(names)), repeat)),
+        ("search_inventory (rare)", *timed(lambda: store.search_inventory(rng.choice(names)[-12:]), repeat)),
+        ("search_customers", *timed(lambda: store.search_customers(rng.choice(customer_names)), repeat)),
+        ("increment_inventory", *timed(lambda: store.increment_inventory(rng.choice(skus), 1), repeat)),
+        ("update_price", *timed(lambda: store.update_price(rng.choice(skus), round(rng.uniform(1, 90), 2)), repeat)),
+        ("get_inventory_summary", *timed(store.get_inventory_summary, max(1, repeat // 10))),
+    ]
+
+
+def run_scaling(sizes: List[int], repeat: int, sqlite_only: bool, directory: Path) -> None:
+    print(f"{'size':>9} {'backend':<8} {'operation':<24} {'p50 ms':>9} {'p99 ms':>9}")
+    for size in sizes:
+        data = make_data(size)
+
+        start = time.perf_counter()
+        store = make_sqlite_store(data, directory, name=f"scale-{size}")
+        seed_seconds = time.perf_counter() - start
+        db_mb = store.db_path.stat().st_size / 1e6
+        print(f"{size:>9} {'sqlite':<8} {'seed':<24} {seed_seconds * 1000:>9.0f} {'':>9}  ({db_mb:.0f} MB)")
+        for name, p50, p99 in bench(store, data, repeat):
+            print(f"{size:>9} {'sqlite':<8} {name:<24} {p50:>9.3f} {p99:>9.3f}")
+        store.close()
+
+        if not sqlite_only:
+            start = time.perf_counter()
+            memory = make_store(data)
+            print(f"{size:>9} {'json':<8} {'load':<24} {(time.perf_counter() - start) * 1000:>9.0f}")
+            for name, p50, p99 in bench(memory, data, repeat):
+                print(f"{size:>9} {'json':<8} {name:<24} {p50:>9.3f} {p99:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--sqlite-only", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run_scaling([int(s) for s in args.sizes.split(",")], args.repeat, args.sqlite_only, Path(tmp))
+
+
+if __name__ == "__main__":
+    main()
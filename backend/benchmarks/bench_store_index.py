@@ -0,0 +1,121 @@
+"""
+DemoStore lookup scaling benchmark.
+
+Builds synthetic catalogs (10k+ SKUs) and times the indexed DemoStore
+lookups against the previous linear scans. Indexed latency should stay
+roughly flat as the catalog grows; the scans grow linearly.
+
+Usage (from backend/):
+    python -m benchmarks.bench_store_index --sizes 10000,100000,1000000
+"""
+
+import argparse
+import random
+import time
+
+from data.demo_store import DemoStore
+
+CATEGORIES = ["Dark Chocolate", "Milk Chocolate", "Truffles", "Gift Collections",
+              "Seasonal", "Baking", "Hot Cocoa", "Bars"]
+ADJECTIVES = ["Classic", "Premium", "Artisan", "Organic", "Single Origin", "Salted",
+              "Roasted", "Velvet", "Smoky", "Golden"]
+FLAVOURS = ["Hazelnut", "Caramel", "Raspberry", "Orange", "Mint", "Almond",
+            "Espresso", "Coconut", "Vanilla", "Sea Salt"]
+TIERS = ["Platinum", "Gold", "Silver", "Bronze"]
+
+
+def make_data(size: int, seed: int = 7) -> dict:
+    """Synthetic theme data with size products and size // 10 customers."""
+    rng = random.Random(seed)
+    inventory, pricing, customers = {}, {}, {}
+    for i in range(size):
+        sku = f"SKU-{i:07d}"
+        inventory[sku] = {
+            "name": f"{rng.choice(ADJECTIVES)} {rng.choice(FLAVOURS)} {rng.choice(CATEGORIES)} {i:07d}",
+            "category": rng.choice(CATEGORIES),
+            "quantity": rng.randint(0, 5000),
+            "reorder_point": 100,
+            "status": "good",
+        }
+        pricing[sku] = {"price": 9.99, "cost": 4.0, "margin": 60.0}
+    for i in range(max(1, size // 10)):
+        customers[f"CUST-{i:07d}"] = {
+            "name": f"{rng.choice(FLAVOURS)} Retail {i:07d}",
+            "contact": f"Contact {i:07d}",
+            "location": f"City {i % 500}",
+            "tier": rng.choice(TIERS),
+            "total_spent": rng.randint(1000, 100000),
+        }
+    return {"inventory": inventory, "pricing": pricing, "customers": customers, "discounts": {}}
+
+
+def make_store(data: dict, theme: str = "bench") -> DemoStore:
+    """DemoStore over in-memory data, without touching the theme files."""
+    return DemoStore(theme=theme, data=data)
+
+
+# Previous linear-scan implementations, for comparison
+def scan_search_inventory(data, query):
+    query_lower = query.lower()
+    return [
+        {**item, "sku": sku} for sku, item in data["inventory"].items()
+        if query_lower in item["name"].lower() or query_lower in item["category"].lower()
+    ]
+
+
+def scan_inventory_by_name(data, name):
+    name_lower = name.lower().strip()
+    for sku, item in data["inventory"].items():
+        if item["name"].lower() == name_lower:
+            return {**item, "sku": sku}
+    return None
+
+
+def scan_customer_by_name(data, name):
+    name_lower = name.lower()
+    for customer in data["customers"].values():
+        if name_lower in customer["name"].lower():
+            return customer
+    return None
+
+
+def timed(func, *args, repeat: int) -> float:
+    """Mean call latency in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated catalog sizes")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'SKUs':>9} {'build s':>8} | {'lookup':<22} {'indexed us':>11} {'scan us':>11}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        data = make_data(size)
+        start = time.perf_counter()
+        store = make_store(data)
+        build = time.perf_counter() - start
+
+        target_sku = f"SKU-{size // 2:07d}"
+        target_name = data["inventory"][target_sku]["name"]
+        target_customer = data["customers"][f"CUST-{size // 20:07d}"]["name"]
+        scan_repeat = max(1, args.repeat // 10)
+
+        cases = [
+            ("search_inventory", store.search_inventory, scan_search_inventory, f"{size // 2:07d}"),
+            ("get_inventory_by_name", store.get_inventory_by_name, scan_inventory_by_name, target_name),
+            ("get_customer_by_name", store.get_customer_by_name, scan_customer_by_name, target_customer),
+        ]
+        for label, indexed, scan, query in cases:
+            assert indexed(query) == scan(data, query)
+            indexed_us = timed(indexed, query, repeat=args.repeat)
+            scan_us = timed(scan, data, query, repeat=scan_repeat)
+            print(f"{size:>9} {build:>8.2f} | {label:<22} {indexed_us:>11.1f} {scan_us:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
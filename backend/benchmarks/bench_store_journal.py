@@ -0,0 +1,108 @@
+"""
+DemoStore persistence benchmark: full JSON rewrite vs write-behind journal.
+
+Runs a burst of inventory/price mutations inside an asyncio loop while a
+ticker coroutine measures event-loop stalls, first with the journal
+disabled (json.dump of the whole dataset per write) and then enabled. It
+finishes with a crash-recovery check: a second store loaded from the same
+files must replay the journal to the same state.
+
+All files live in a temporary directory; the theme data is untouched.
+
+Usage (from backend/):
+    python -m benchmarks.bench_store_journal --size 20000 --writes 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import data.demo_store as demo_store_module
+from benchmarks._util import percentile
+from benchmarks.bench_store_index import make_data
+from data.demo_store import DemoStore, THEME_DATA_FILES
+
+
+async def measure(store: DemoStore, writes: int, seed: int = 3):
+    """Apply writes mutations; return (writes/sec, stall samples in ms)."""
+    skus = list(store.get_all_inventory())
+    rng = random.Random(seed)
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        interval = 0.001
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            stalls.append((time.perf_counter() - start - interval) * 1000)
+
+    async def writer():
+        for _ in range(writes):
+            sku = rng.choice(skus)
+            if rng.random() < 0.7:
+                store.update_inventory_quantity(sku, rng.randint(1, 50), "increase")
+            else:
+                store.update_price(sku, round(rng.uniform(1, 80), 2))
+            await asyncio.sleep(0)
+        done.set()
+
+    tick = asyncio.ensure_future(ticker())
+    start = time.perf_counter()
+    await writer()
+    elapsed = time.perf_counter() - start
+    await tick
+    return writes / elapsed, stalls
+
+
+def run_mode(theme: str, journal: bool, writes: int):
+    demo_store_module.JOURNAL_ENABLED = journal
+    store = DemoStore(theme=theme)
+    store.reset_to_initial()
+    throughput, stalls = asyncio.run(measure(store, writes))
+    label = "journal" if journal else "full rewrite"
+    print(f"{label:<14} {throughput:>10.0f} {percentile(stalls, 50):>9.2f} "
+          f"{percentile(stalls, 99):>9.2f} {max(stalls):>9.2f}")
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--writes", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        THEME_DATA_FILES["bench"] = {
+            "initial": tmp_dir / "bench-data.json",
+            "live": tmp_dir / "bench-live-data.json",
+        }
+        with open(THEME_DATA_FILES["bench"]["initial"], "w") as f:
+            json.dump(make_data(args.size), f)
+
+        print(f"{args.size} SKUs, {args.writes} writes")
+        print(f"{'mode':<14} {'writes/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        run_mode("bench", journal=False, writes=args.writes).close()
+        store = run_mode("bench", journal=True, writes=args.writes)
+
+        # Crash recovery: flush the journal but skip the final checkpoint,
+        # then load a second store from the same files
+        store._journal.flush()
+        stats = store._journal.stats()
+        recovered = DemoStore(theme="bench")
+        assert recovered.get_all_inventory() == store.get_all_inventory()
+        assert recovered.get_all_pricing() == store.get_all_pricing()
+        print(f"recovery ok    fsyncs={stats['fsyncs']} checkpoints={stats['checkpoints']} "
+              f"records={stats['records_written']}")
+        # Two stores on the same files must not checkpoint concurrently
+        store.close()
+        recovered.close()
+
+
+if __name__ == "__main__":
+    main()
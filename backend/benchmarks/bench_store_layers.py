@@ -0,0 +1,126 @@
+"""
+Layered DemoStore benchmark: reset latency and per-session sandbox memory.
+
+Reset: after a burst of writes, times reset_to_initial on a journaled
+store backed by theme files, against the previous reset (re-read the
+initial JSON, rebuild indexes and summaries, rewrite the live file).
+
+Sandboxes: creates session sandboxes that each change k rows and reports
+the memory each one holds (tracemalloc), next to what a private copy of
+the catalog plus its indexes costs.
+
+All files live in a temporary directory; the theme data is untouched.
+
+Usage (from backend/):
+    python -m benchmarks.bench_store_layers --size 100000
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.bench_store_index import make_data
+from data.demo_store import DemoStore, THEME_DATA_FILES
+from data.journal import write_snapshot
+from data.layered import BaseData
+
+
+def old_reset(initial_file: Path, live_file: Path) -> None:
+    """Previous reset_to_initial: reload, re-index, rewrite the live file."""
+    with open(initial_file) as f:
+        data = json.load(f)
+    BaseData(data)
+    write_snapshot(live_file, data)
+
+
+def mutate(store: DemoStore, skus, count: int, rng: random.Random) -> None:
+    for _ in range(count):
+        sku = rng.choice(skus)
+        if rng.random() < 0.8:
+            store.increment_inventory(sku, rng.randint(1, 50))
+        else:
+            store.update_price(sku, round(rng.uniform(1, 80), 2))
+
+
+def held_bytes(fn) -> int:
+    """Bytes still allocated after fn returns (its result kept alive)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--writes", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=50)
+    args = parser.parse_args()
+    rng = random.Random(3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        files = THEME_DATA_FILES["bench"] = {
+            "initial": tmp_dir / "bench-data.json",
+            "live": tmp_dir / "bench-live-data.json",
+        }
+        data = make_data(args.size)
+        with open(files["initial"], "w") as f:
+            json.dump(data, f)
+
+        store = DemoStore(theme="bench")
+        skus = list(store.get_all_inventory())
+
+        print(f"{args.size} SKUs, {args.writes} writes before each reset")
+        print(f"{'reset':<22} {'ms':>10}")
+        start = time.perf_counter()
+        old_reset(files["initial"], files["live"])
+        print(f"{'reload + rewrite (old)':<22} {(time.perf_counter() - start) * 1000:>10.1f}")
+
+        for _ in range(3):
+            mutate(store, skus, args.writes, rng)
+            start = time.perf_counter()
+            store.reset_to_initial()
+            print(f"{'drop deltas':<22} {(time.perf_counter() - start) * 1000:>10.3f}")
+            assert not store.check_aggregates()
+        store.close()
+
+        # Recovery after reset: the background checkpoint wrote the initial state
+        recovered = DemoStore(theme="bench")
+        assert recovered.get_inventory_summary() == store.get_inventory_summary()
+        recovered.close()
+
+        print(f"\n{'changed rows':>12} {'KB/session':>11}")
+        catalog_kb = held_bytes(lambda: BaseData(json.loads(json.dumps(data)))) / 1024
+        print(f"{'full copy':>12} {catalog_kb:>11.0f}")
+        parent = DemoStore(theme="bench")
+        for changed in (0, 10, 100, 1000):
+            def create_sandboxes():
+                sandboxes = [parent.sandbox(f"{changed}-{n}") for n in range(args.sessions)]
+                for sandbox in sandboxes:
+                    mutate(sandbox, skus, changed, rng)
+                return sandboxes
+
+            per_session = held_bytes(create_sandboxes) / args.sessions / 1024
+            print(f"{changed:>12} {per_session:>11.1f}")
+            parent.drop_sandboxes()
+
+        # Sessions are isolated from each other and from the shared store
+        a, b = parent.sandbox("a"), parent.sandbox("b")
+        a.increment_inventory(skus[0], 1000)
+        assert a.get_inventory_by_sku(skus[0])["quantity"] == parent.get_inventory_by_sku(skus[0])["quantity"] + 1000
+        assert b.get_inventory_by_sku(skus[0])["quantity"] == parent.get_inventory_by_sku(skus[0])["quantity"]
+        assert not a.check_aggregates() and not b.check_aggregates()
+        parent.close()
+        print("sandboxes isolated")
+
+
+if __name__ == "__main__":
+    main()
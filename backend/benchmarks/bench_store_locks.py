@@ -0,0 +1,91 @@
+"""
+DemoStore concurrency benchmark.
+
+Hammers a small set of hot SKUs from many threads with increment_inventory
+and compare-and-set retry loops (plus concurrent readers). A naive
+read-then-set run with the same load shows the lost updates the atomic
+primitives prevent. Throughput and lost updates are reported per thread
+count; tests/test_store_locks.py asserts the atomic modes lose nothing.
+
+Usage (from backend/):
+    python -m benchmarks.bench_store_locks --threads 1,2,4,8 --ops 5000
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from benchmarks.bench_store_index import make_data, make_store
+
+HOT_SKUS = 8
+
+
+def run(store, threads: int, ops: int, mode: str) -> float:
+    """Run ops updates per thread; returns elapsed seconds."""
+    skus = list(store.get_all_inventory())[:HOT_SKUS]
+    barrier = threading.Barrier(threads + 1)
+    stop_readers = threading.Event()
+
+    def writer(worker: int):
+        barrier.wait()
+        for i in range(ops):
+            sku = skus[(worker + i) % len(skus)]
+            if mode == "increment":
+                store.increment_inventory(sku, 1)
+            elif mode == "cas":
+                while True:
+                    current = store.get_inventory_by_sku(sku)["quantity"]
+                    if store.compare_and_set_inventory(sku, current, current + 1)["success"]:
+                        break
+            else:  # naive read-modify-write, the old pattern
+                current = store.get_inventory_by_sku(sku)["quantity"]
+                store.update_inventory_quantity(sku, current + 1, "set")
+
+    def reader():
+        while not stop_readers.is_set():
+            store.search_inventory("premium")
+            store.get_inventory_summary()
+
+    workers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    for thread in workers + readers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop_readers.set()
+    for thread in readers:
+        thread.join()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--ops", type=int, default=5000, help="Updates per thread")
+    parser.add_argument("--size", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Switch threads often so races show up quickly
+    sys.setswitchinterval(1e-5)
+
+    print(f"{'mode':<10} {'threads':>7} {'ops/s':>10} {'expected':>9} {'lost':>6}")
+    for mode in ("increment", "cas", "naive"):
+        for threads in [int(t) for t in args.threads.split(",")]:
+            store = make_store(make_data(args.size))
+            hot = list(store.get_all_inventory())[:HOT_SKUS]
+            before = sum(store.get_inventory_by_sku(sku)["quantity"] for sku in hot)
+
+            elapsed = run(store, threads, args.ops, mode)
+
+            after = sum(store.get_inventory_by_sku(sku)["quantity"] for sku in hot)
+            expected = threads * args.ops
+            lost = expected - (after - before)
+            print(f"{mode:<10} {threads:>7} {expected / elapsed:>10.0f} {expected:>9} {lost:>6}")
+
+
+if __name__ == "__main__":
+    main()
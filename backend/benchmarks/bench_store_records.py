@@ -0,0 +1,94 @@
+"""
+DemoStore query allocation benchmark: dict copies vs record views.
+
+Measures bytes allocated per query with tracemalloc for the previous
+copy-per-row results ({**item, "sku": sku}) and the current record views,
+on a synthetic catalog where broad queries match thousands of rows. Also
+reports wall time per query (measured without tracemalloc running).
+
+Usage (from backend/):
+    python -m benchmarks.bench_store_records --size 20000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.bench_store_index import make_data, make_store
+
+
+# Previous copying implementations, for comparison
+def copy_search_inventory(store, query):
+    inventory = store._data["inventory"]
+    return [{**inventory[sku], "sku": sku} for sku in store._index.search_products(query.lower())]
+
+
+def copy_low_stock(store):
+    return [
+        {**item, "sku": sku}
+        for sku, item in store._data["inventory"].items()
+        if item.get("status") == "low" or item.get("quantity", 0) <= item.get("reorder_point", 0)
+    ]
+
+
+def copy_pricing_by_category(store, category):
+    inventory, pricing = store._data["inventory"], store._data["pricing"]
+    return [
+        {"sku": sku, "name": inventory[sku]["name"], **pricing[sku]}
+        for sku in store._index.skus_in_category(category) if sku in pricing
+    ]
+
+
+def allocated(fn) -> int:
+    """Peak bytes allocated while fn runs (result kept alive until measured)."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return peak - before
+
+
+def per_call_ms(fn, repeat: int) -> float:
+    """Best of five batches of repeat calls."""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) * 1000 / repeat)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    store = make_store(make_data(args.size))
+    category = next(iter(store.get_all_inventory().values()))["category"]
+
+    cases = [
+        ("search 'premium'", lambda: copy_search_inventory(store, "premium"),
+         lambda: store.search_inventory("premium")),
+        ("low stock", lambda: copy_low_stock(store), store.get_low_stock_items),
+        ("pricing by category", lambda: copy_pricing_by_category(store, category),
+         lambda: store.get_pricing_by_category(category)),
+    ]
+
+    print(f"{args.size} SKUs")
+    print(f"{'query':<20} {'rows':>6} {'copy KB':>9} {'views KB':>9} {'B/row':>11} {'copy ms':>8} {'views ms':>9}")
+    for label, copying, viewing in cases:
+        rows = len(viewing())
+        assert [dict(r) for r in viewing()] == copying(), label
+        copy_bytes, view_bytes = allocated(copying), allocated(viewing)
+        print(f"{label:<20} {rows:>6} {copy_bytes / 1024:>9.0f} {view_bytes / 1024:>9.0f} "
+              f"{copy_bytes // max(rows, 1):>5}->{view_bytes // max(rows, 1):<5} "
+              f"{per_call_ms(copying, args.repeat):>8.2f} {per_call_ms(viewing, args.repeat):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
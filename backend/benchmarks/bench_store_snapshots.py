@@ -0,0 +1,143 @@
+"""
+DemoStore snapshot (MVCC) benchmark: consistency and cost.
+
+Consistency: writer threads keep incrementing quantities while "turns"
+read the inventory summary and then add up every product's quantity, as
+the inventory and pricing handlers do one after the other. Reading the
+live store, writes land between the two reads and the numbers disagree;
+reading one snapshot per turn, they always match. Runs on both backends
+(the SQLite database lives in a temporary directory).
+
+Cost: time to take a snapshot as the number of changed rows grows, and
+writer throughput with and without turns taking snapshots alongside.
+
+Usage (from backend/):
+    python -m benchmarks.bench_store_snapshots --size 2000 --turns 300
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.bench_store_backends import make_sqlite_store
+from benchmarks.bench_store_index import make_data, make_store
+
+
+def turn_mismatches(store, turns: int, use_snapshot: bool, writers: int = 2) -> int:
+    """Turns whose summary total disagreed with the per-row sum, under concurrent writes."""
+    skus = list(store.get_all_inventory())
+    stop = threading.Event()
+
+    def writer(seed: int):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            store.increment_inventory(rng.choice(skus), rng.randint(1, 5))
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+
+    mismatches = 0
+    try:
+        for _ in range(turns):
+            view = store.snapshot() if use_snapshot else store
+            try:
+                version = getattr(view, "version", None)
+                total = view.get_inventory_summary()["total_items"]
+                counted = sum(item["quantity"] for item in view.get_all_inventory().values())
+                if total != counted:
+                    mismatches += 1
+                if use_snapshot:
+                    assert view.version == version, "snapshot version moved"
+            finally:
+                if use_snapshot:
+                    view.close()
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return mismatches
+
+
+def writes_per_second(store, seconds: float, snapshot_readers: int) -> float:
+    """Single-writer increment throughput while readers take snapshots in a loop."""
+    skus = list(store.get_all_inventory())
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            store.snapshot().get_inventory_summary()
+
+    readers = [threading.Thread(target=reader) for _ in range(snapshot_readers)]
+    for thread in readers:
+        thread.start()
+    writes = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        store.increment_inventory(skus[writes % len(skus)], 1)
+        writes += 1
+    stop.set()
+    for thread in readers:
+        thread.join()
+    return writes / seconds
+
+
+def snapshot_ms(store, repeat: int = 20) -> float:
+    """Best time to take a fresh snapshot (a write in between defeats reuse)."""
+    sku = next(iter(store.get_all_inventory()))
+    best = float("inf")
+    for _ in range(repeat):
+        store.increment_inventory(sku, 1)
+        start = time.perf_counter()
+        store.snapshot()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=300)
+    args = parser.parse_args()
+    # Switch threads often so writes interleave with the turns' reads
+    sys.setswitchinterval(1e-5)
+
+    data = make_data(args.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = [("json", make_store(data)), ("sqlite", make_sqlite_store(data, Path(tmp)))]
+        print(f"{args.size} SKUs, {args.turns} turns under concurrent writes")
+        print(f"{'backend':<8} {'live mismatches':>16} {'snapshot mismatches':>20}")
+        for label, store in stores:
+            live = turn_mismatches(store, args.turns, use_snapshot=False)
+            pinned = turn_mismatches(store, args.turns, use_snapshot=True)
+            print(f"{label:<8} {live:>16} {pinned:>20}")
+            assert pinned == 0, f"{label}: snapshot reads disagreed"
+            assert not store.check_aggregates()
+            store.close()
+
+    sys.setswitchinterval(0.005)
+    store = make_store(data)
+    skus = list(store.get_all_inventory())
+    print(f"\n{'changed rows':>12} {'snapshot ms':>12}")
+    rng = random.Random(1)
+    # Clamped to the catalog, so a small --size still runs
+    for changed in sorted({min(count, len(skus)) for count in (0, 100, 1000, 10000)}):
+        for sku in rng.sample(skus, changed):
+            store.update_price(sku, round(rng.uniform(1, 80), 2))
+        print(f"{len(store._data['inventory'].delta | store._data['pricing'].delta):>12} {snapshot_ms(store):>12.3f}")
+        store.reset_to_initial()
+
+    # Unchanged versions hand out the same snapshot
+    assert store.snapshot() is store.snapshot()
+
+    print(f"\n{'snapshot readers':>16} {'writes/s':>10}")
+    for readers in (0, 2, 4):
+        print(f"{readers:>16} {writes_per_second(store, 1.0, readers):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
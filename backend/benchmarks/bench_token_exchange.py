@@ -0,0 +1,124 @@
+"""
+Multi-agent token exchange fan-out benchmark.
+
+Serves a local fake Okta token endpoint that sleeps for a per-agent delay,
+wires fake SDK clients that call it over HTTP, and compares sequential
+(max_concurrency=1) against concurrent exchange for all four agents.
+Concurrent wall time should be close to the slowest single exchange.
+Also reports the per-user token cache on a repeat turn and on concurrent
+identical requests. Correctness is covered by tests/test_token_exchange.py.
+
+Usage (from backend/):
+    python -m benchmarks.bench_token_exchange --delay-ms 150
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import auth.multi_agent_auth as multi_agent_auth
+from auth.multi_agent_auth import (
+    MultiAgentTokenExchange,
+    AGENT_SALES, AGENT_INVENTORY, AGENT_CUSTOMER, AGENT_PRICING,
+)
+
+AGENTS = [AGENT_SALES, AGENT_INVENTORY, AGENT_CUSTOMER, AGENT_PRICING]
+
+
+class FakeTokenHandler(BaseHTTPRequestHandler):
+    """Token endpoint that sleeps ?delay_ms before answering."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(body["delay_ms"] / 1000)
+        payload = json.dumps({"access_token": f"token-{body['step']}", "expires_in": 3600}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeCrossAppAccess:
+    """Blocking HTTP client shaped like the SDK's cross_app_access API."""
+
+    def __init__(self, url: str, delay_ms: float):
+        self.url = url
+        self.delay_ms = delay_ms
+
+    def _post(self, step: str):
+        data = json.dumps({"step": step, "delay_ms": self.delay_ms}).encode()
+        request = urllib.request.Request(self.url, data=data, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            return SimpleNamespace(**json.loads(response.read()))
+
+    def exchange_id_token(self, id_token, audience, scope):
+        return self._post("id-jag")
+
+    def exchange_id_jag_for_auth_server_token(self, request):
+        return self._post("auth-server")
+
+
+def build_exchange(url: str, delays, max_concurrency: int) -> MultiAgentTokenExchange:
+    """Create an exchange manager whose SDKs talk to the fake endpoint."""
+    exchange = MultiAgentTokenExchange(max_concurrency=max_concurrency)
+    multi_agent_auth.SDK_AVAILABLE = True
+    main_sdks = {}
+    for agent_type, delay in zip(AGENTS, delays):
+        exchange._sdks[agent_type] = SimpleNamespace(cross_app_access=FakeCrossAppAccess(url, delay))
+        exchange._configs[agent_type] = SimpleNamespace(principal_id="wlp-bench", private_jwk={})
+        main_sdks[agent_type] = SimpleNamespace(cross_app_access=FakeCrossAppAccess(url, delay))
+    exchange._get_main_sdk = lambda config: main_sdks[config.agent_type]
+    return exchange
+
+
+async def timed_exchange(exchange: MultiAgentTokenExchange) -> float:
+    start = time.perf_counter()
+    await exchange.exchange_for_all_agents("bench-id-token", AGENTS)
+    return (time.perf_counter() - start) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay-ms", type=float, default=150)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTokenHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/token"
+
+    # Stagger per-agent latency so the slowest agent is well defined
+    delays = [args.delay_ms * factor for factor in (0.5, 0.75, 1.0, 0.6)]
+    slowest = 2 * max(delays)  # two round trips per agent
+
+    sequential = await timed_exchange(build_exchange(url, delays, max_concurrency=1))
+    exchange = build_exchange(url, delays, max_concurrency=4)
+    concurrent = await timed_exchange(exchange)
+    cached = await timed_exchange(exchange)
+
+    # Single-flight: two concurrent turns for the same user share one exchange
+    coalescing = build_exchange(url, delays, max_concurrency=4)
+    await asyncio.gather(
+        coalescing.exchange_for_all_agents("bench-id-token", AGENTS, user_subject="user-1"),
+        coalescing.exchange_for_all_agents("bench-id-token", AGENTS, user_subject="user-1"),
+    )
+    server.shutdown()
+
+    print(f"slowest single exchange ~{slowest:8.1f} ms")
+    print(f"sequential              {sequential:8.1f} ms")
+    print(f"concurrent              {concurrent:8.1f} ms")
+    print(f"cached repeat           {cached:8.1f} ms")
+    print(f"cache stats             {exchange.token_cache.stats()}")
+    print(f"single-flight stats     {coalescing.token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,161 @@
+"""
+Warm restart benchmark: time-to-warm after a restart, with and without
+the warm state snapshot (api/warm_state.py).
+
+Before the restart, a process serves --sessions chat sessions of
+--turns turns, fills the routing cache with one LLM-routed question per
+entry and loads a synthetic catalog of --size products as a theme's
+initial file, then saves the warm state as the API does on shutdown.
+
+After the restart, a fresh process (spawned, like a restarted uvicorn
+worker) either starts cold or restores the snapshot in the background,
+and replays the traffic: one turn per session (read its routing context,
+look its question up in the routing cache) and the first request on the
+catalog's theme (its base: rows plus indexes). The warm run checks that
+histories, routing decisions and index answers match what was saved.
+
+Time-to-warm is the time until every replayed request would be served
+as before the restart. The restore and the catalog load are measured;
+routing cache misses are counted and priced at --llm-ms each, the cost
+of the LLM routing call the cache saves (modeled, not called).
+
+Usage (from backend/):
+    python -m benchmarks.bench_warm_restart --size 20000 --sessions 1000
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_store_index import make_data
+
+AGENTS = ["inventory", "pricing", "customer", "sales"]
+QUERIES = ["hazelnut", "velvet caramel", "retail 00001", "truffles", "city 42"]
+
+
+def question(n: int) -> str:
+    return f"what did customer {n} order last quarter and at what margin"
+
+
+def decision_for(n: int):
+    from orchestrator.routing import RoutingDecision
+    agent = AGENTS[n % len(AGENTS)]
+    return RoutingDecision(agents=[agent], agent_scopes={agent: [f"{agent}:read"]}, confidence=1.0, source="llm")
+
+
+def before_restart(catalog: str, snapshot: str, sessions: int, turns: int, questions: int, results):
+    from api.conversation_store import conversation_store
+    from api.warm_state import save_warm_state
+    from data.layered import load_base
+    from orchestrator.routing import routing_cache
+
+    load_base(Path(catalog))
+    for session in range(sessions):
+        for turn in range(turns):
+            conversation_store.add_messages(f"session-{session}", [
+                ("user", f"session {session} turn {turn}: increase dark chocolate by 10"),
+                ("assistant", f"[Inventory Agent] Updated for session {session} turn {turn}."),
+            ])
+    for n in range(questions):
+        routing_cache.put(routing_cache.make_key(question(n), "bench"), decision_for(n))
+
+    start = time.perf_counter()
+    size = save_warm_state(Path(snapshot))
+    results.put({"save_ms": (time.perf_counter() - start) * 1000, "bytes": size})
+
+
+def after_restart(mode: str, catalog: str, snapshot: str, sessions: int, turns: int, questions: int, results):
+    from api.conversation_store import conversation_store
+    from api.warm_state import start_warm_restore
+    from data.layered import load_base
+    from data.store_index import StoreIndex
+    from orchestrator.routing import routing_cache
+
+    restore_ms = 0.0
+    if mode == "warm":
+        start = time.perf_counter()
+        start_warm_restore(Path(snapshot)).join()
+        restore_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    base = load_base(Path(catalog))
+    catalog_ms = (time.perf_counter() - start) * 1000
+
+    with_context = 0
+    for session in range(sessions):
+        context = conversation_store.get_context_summary(f"session-{session}", max_messages=2)
+        with_context += f"session {session} turn {turns - 1}" in context
+    hits = 0
+    for n in range(questions):
+        decision = routing_cache.get(routing_cache.make_key(question(n), "bench"))
+        if decision is not None:
+            hits += 1
+            expected = decision_for(n)
+            assert (decision.agents, decision.agent_scopes) == (expected.agents, expected.agent_scopes), n
+
+    if mode == "warm":
+        expected = StoreIndex()
+        expected.rebuild(base.tables["inventory"], base.tables["customers"])
+        for query in QUERIES:
+            assert base.index.search_products(query) == expected.search_products(query), query
+            assert base.index.skus_matching_name(query) == expected.skus_matching_name(query), query
+            assert base.index.search_customer_ids(query) == expected.search_customer_ids(query), query
+        history = conversation_store.get_history("session-0", max_messages=turns * 2)
+        assert len(history) == turns * 2 and history[-1]["content"].endswith(f"turn {turns - 1}.")
+
+    results.put({
+        "restore_ms": restore_ms,
+        "catalog_ms": catalog_ms,
+        "with_context": with_context,
+        "hits": hits,
+    })
+
+
+def run(target, *args) -> dict:
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=target, args=(*args, results))
+    proc.start()
+    result = results.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20000, help="Products in the catalog")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--turns", type=int, default=10, help="Turns (2 messages each) per session")
+    parser.add_argument("--questions", type=int, default=512, help="Routing cache entries")
+    parser.add_argument("--llm-ms", type=float, default=800, help="Modeled cost of one LLM routing call")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = Path(tmp) / "bench-data.json"
+        with open(catalog, "w") as f:
+            json.dump(make_data(args.size), f)
+        snapshot = str(Path(tmp) / "warm_state.bin")
+        state = (str(catalog), snapshot, args.sessions, args.turns, args.questions)
+
+        saved = run(before_restart, *state)
+        print(f"{args.sessions} sessions x {args.turns} turns, {args.questions} cached routing decisions, "
+              f"{args.size}-product catalog")
+        print(f"snapshot on shutdown: {saved['bytes'] / 2 ** 20:.1f} MB in {saved['save_ms']:.0f} ms")
+        print(f"{'mode':<5} {'restore ms':>10} {'catalog ms':>10} {'context kept':>13} {'routing hits':>13} "
+              f"{'LLM calls':>9} {'time-to-warm':>13}")
+        for mode in ("cold", "warm"):
+            result = run(after_restart, mode, *state)
+            misses = args.questions - result["hits"]
+            to_warm = result["restore_ms"] + result["catalog_ms"] + misses * args.llm_ms
+            print(f"{mode:<5} {result['restore_ms']:>10.0f} {result['catalog_ms']:>10.1f} "
+                  f"{result['with_context']:>6}/{args.sessions:<6} {result['hits']:>6}/{args.questions:<6} "
+                  f"{misses:>9} {to_warm / 1000:>11.2f} s")
+            if mode == "warm":
+                assert result["with_context"] == args.sessions and not misses, "warm restart lost state"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Local Redis-protocol stand-in for the conversation store benchmarks.
+
+A single-process asyncio server speaking RESP with the commands
+RedisConversationStore uses (RPUSH, LTRIM, LRANGE, PEXPIRE, DEL, SCAN)
+plus PING, AUTH, SELECT and FLUSHDB. Keys expire lazily on access and in
+a periodic sweep, like Redis. Point the benchmarks at a real server with
+--redis-url instead when one is available.
+
+Usage (from backend/):
+    python -m benchmarks.resp_server --port 6399
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import time
+from typing import Dict, List, Optional
+
+
+class RespServer:
+    def __init__(self):
+        self.lists: Dict[bytes, List[bytes]] = {}
+        self.expires: Dict[bytes, float] = {}
+
+    def _alive(self, key: bytes) -> Optional[List[bytes]]:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.lists.pop(key, None)
+            del self.expires[key]
+        return self.lists.get(key)
+
+    @staticmethod
+    def _range(length: int, start: int, stop: int):
+        start = max(start + length if start < 0 else start, 0)
+        stop = stop + length if stop < 0 else min(stop, length - 1)
+        return start, stop
+
+    def execute(self, command: List[bytes]):
+        name, args = command[0].upper(), command[1:]
+        if name in (b"PING", b"AUTH", b"SELECT"):
+            return "PONG" if name == b"PING" else "OK"
+        if name == b"FLUSHDB":
+            self.lists.clear()
+            self.expires.clear()
+            return "OK"
+        if name == b"RPUSH":
+            items = self._alive(args[0])
+            if items is None:
+                items = self.lists[args[0]] = []
+                self.expires.pop(args[0], None)
+            items.extend(args[1:])
+            return len(items)
+        if name == b"LTRIM":
+            items = self._alive(args[0])
+            if items is not None:
+                start, stop = self._range(len(items), int(args[1]), int(args[2]))
+                items[:] = items[start:stop + 1]
+                if not items:
+                    del self.lists[args[0]]
+            return "OK"
+        if name == b"LRANGE":
+            items = self._alive(args[0]) or []
+            start, stop = self._range(len(items), int(args[1]), int(args[2]))
+            return items[start:stop + 1]
+        if name == b"PEXPIRE":
+            if self._alive(args[0]) is None:
+                return 0
+            self.expires[args[0]] = time.monotonic() + int(args[1]) / 1000
+            return 1
+        if name == b"DEL":
+            return sum(self._alive(key) is not None and self.lists.pop(key) is not None for key in args)
+        if name == b"SCAN":
+            pattern = args[args.index(b"MATCH") + 1].decode() if b"MATCH" in args else "*"
+            keys = [key for key in list(self.lists) if self._alive(key) is not None
+                    and fnmatch.fnmatchcase(key.decode(), pattern)]
+            return [b"0", keys]
+        return Exception(f"ERR unknown command '{name.decode()}'")
+
+    @classmethod
+    def encode(cls, reply) -> bytes:
+        if isinstance(reply, Exception):
+            return f"-{reply}\r\n".encode()
+        if isinstance(reply, str):
+            return f"+{reply}\r\n".encode()
+        if isinstance(reply, int):
+            return f":{reply}\r\n".encode()
+        if isinstance(reply, bytes):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        return b"*%d\r\n" % len(reply) + b"".join(cls.encode(item) for item in reply)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = []
+                for _ in range(int(line[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    command.append((await reader.readexactly(length + 2))[:-2])
+                try:
+                    reply = self.execute(command)
+                except (ValueError, IndexError):
+                    reply = Exception("ERR value is not an integer or out of range")
+                writer.write(self.encode(reply))
+                # Flush once per pipelined batch
+                if not reader._buffer:
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def sweep(self, interval: float = 1.0) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            for key in list(self.expires):
+                self._alive(key)
+
+
+async def serve(host: str, port: int, ready=None) -> None:
+    server = RespServer()
+    listener = await asyncio.start_server(server.handle, host, port)
+    sweeper = asyncio.create_task(server.sweep())
+    if ready is not None:
+        ready.set()
+    async with listener:
+        try:
+            await listener.serve_forever()
+        finally:
+            sweeper.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6399)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Change Feed - Typed change events from DemoStore mutations.
+
+Every store write appends a ChangeEvent stamped with the store version it
+produced (DemoStore.version) to a bounded ring buffer. Subscribers keep
+only a cursor, the last version they saw: a new subscriber replays the
+buffered events after its `since` version, then waits for live ones. A
+cursor that fell off the buffer (or comes from before a restart) gets one
+"resync" event and continues from the newest version; the client should
+refetch whatever it shows.
+
+Fan-out is O(1) per event for the writer: every subscriber waiting on an
+event loop shares one future, resolved once per publish, and then reads
+the events after its own cursor from the buffer. Writers may publish from
+any thread.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Events kept for catch-up (per store)
+CHANGE_FEED_SIZE = int(os.getenv("DEMO_STORE_CHANGE_FEED_SIZE", "1024"))
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """One store change and the version it produced."""
+    type: str  # "inventory", "pricing", "discounts", "alert", "reset" or "resync"
+    version: int
+    key: Optional[str] = None  # SKU, or "tier_discounts"
+    fields: Optional[Dict[str, Any]] = None  # Changed fields with their new values
+    theme: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class ChangeFeed:
+    """
+    Bounded, versioned event log with async subscribers.
+
+    Usage:
+        feed.publish(ChangeEvent("inventory", store.version, sku, {"quantity": 5}))
+        async for event in feed.subscribe(since=last_seen):
+            ...
+    """
+
+    def __init__(self, capacity: int = CHANGE_FEED_SIZE):
+        self._events: Deque[ChangeEvent] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._latest = 0
+        # Newest version no longer in the buffer
+        self._evicted = 0
+        self._waiters: Dict[asyncio.AbstractEventLoop, asyncio.Future] = {}
+
+    @property
+    def latest_version(self) -> int:
+        return self._latest
+
+    def publish(self, *events: ChangeEvent) -> None:
+        """
+        Append events (versions must not decrease) and wake every subscriber.
+
+        Events of one version must be published together, so that no
+        subscriber can see only part of them.
+        """
+        with self._lock:
+            for event in events:
+                if len(self._events) == self._events.maxlen:
+                    self._evicted = self._events[0].version
+                self._events.append(event)
+                self._latest = event.version
+            waiters, self._waiters = self._waiters, {}
+
+        for loop, waiter in waiters.items():
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # Loop already closed; its subscribers are gone
+                pass
+
+    def events_since(self, since: int) -> Optional[List[ChangeEvent]]:
+        """Buffered events after version since, or None if some were already dropped."""
+        with self._lock:
+            if since < self._evicted or since > self._latest:
+                return None
+            events = []
+            for event in reversed(self._events):
+                if event.version <= since:
+                    break
+                events.append(event)
+        events.reverse()
+        return events
+
+    async def wait(self, since: int, timeout: Optional[float] = None) -> bool:
+        """Wait for an event after version since; False if timeout passed first."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._latest > since:
+                return True
+            waiter = self._waiters.get(loop)
+            if waiter is None:
+                waiter = self._waiters[loop] = loop.create_future()
+        try:
+            # Shielded: the future is shared by every subscriber on this loop
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def subscribe(
+        self,
+        since: Optional[int] = None,
+        heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[ChangeEvent]]:
+        """
+        Events after version since (default: only new ones), then live events.
+
+        Yields None after heartbeat seconds without events, so callers can
+        send keep-alives.
+        """
+        cursor = self._latest if since is None else since
+        while True:
+            events = self.events_since(cursor)
+            if events is None:
+                cursor = self._latest
+                logger.debug(f"Change feed subscriber resynced at version {cursor}")
+                yield ChangeEvent("resync", cursor)
+                continue
+            if events:
+                for event in events:
+                    yield event
+                cursor = events[-1].version
+            elif not await self.wait(cursor, heartbeat):
+                yield None
@@ -0,0 +1,205 @@
+"""
+Columnar Inventory - NumPy column layout of the inventory and pricing tables.
+
+One row per SKU, in store insertion order:
+- quantity, reorder_point, price_cents (int64), price, cost, margin (float64)
+- category and status as integer codes into small lookup lists
+- sku_to_row for O(1) row updates
+
+Per-category totals, the low-stock mask and margin averages are single
+vectorized reductions over these arrays instead of Python loops over
+every product dict. The dict tables stay the source of truth: the store
+builds columns once per base (see data/layered.py) and adjusts their
+results for changed rows; update_product() mirrors single-row changes
+for callers that keep columns live.
+
+NumPy is optional: without it NUMPY_AVAILABLE is False and the store
+keeps its pure-Python paths.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+NUMPY_AVAILABLE = False
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    logger.info("NumPy not available; columnar inventory disabled")
+
+INITIAL_CAPACITY = 64
+
+
+class ColumnarInventory:
+    """
+    Parallel arrays mirroring the inventory and pricing tables.
+
+    Usage:
+        columns = ColumnarInventory()
+        columns.rebuild(inventory, pricing)
+        columns.update_product(sku, inventory[sku], pricing.get(sku))
+        columns.low_stock_skus()
+    """
+
+    INT_COLUMNS = ("quantity", "reorder_point", "price_cents", "category", "status")
+    FLOAT_COLUMNS = ("price", "cost", "margin")
+    BOOL_COLUMNS = ("live", "has_price")
+
+    def __init__(self):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("ColumnarInventory requires numpy")
+        self.clear()
+
+    def clear(self, capacity: int = INITIAL_CAPACITY) -> None:
+        self.skus: List[str] = []
+        self.sku_to_row: Dict[str, int] = {}
+        self.categories: List[str] = []
+        self._category_codes: Dict[str, int] = {}
+        self.statuses: List[Optional[str]] = []
+        self._status_codes: Dict[Optional[str], int] = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        for name in self.INT_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.int64))
+        for name in self.FLOAT_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        for name in self.BOOL_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=bool))
+
+    def _grow(self) -> None:
+        """Double the capacity of every column."""
+        for name in self.INT_COLUMNS + self.FLOAT_COLUMNS + self.BOOL_COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(len(column) * 2, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def _code(self, codes: Dict, values: List, value) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    # ==================== MAINTENANCE ====================
+
+    def rebuild(self, inventory: Dict[str, dict], pricing: Dict[str, dict]) -> None:
+        """Load every product at once (column-wise, not row by row)."""
+        self.clear(max(INITIAL_CAPACITY, len(inventory)))
+        count = len(inventory)
+        self.skus = list(inventory)
+        self.sku_to_row = {sku: row for row, sku in enumerate(self.skus)}
+        items = inventory.values()
+        prices = [pricing.get(sku) for sku in self.skus]
+
+        self.quantity[:count] = [item.get("quantity", 0) for item in items]
+        self.reorder_point[:count] = [item.get("reorder_point", 0) for item in items]
+        self.category[:count] = [
+            self._code(self._category_codes, self.categories, item.get("category", "Other")) for item in items
+        ]
+        self.status[:count] = [
+            self._code(self._status_codes, self.statuses, item.get("status")) for item in items
+        ]
+        self.price[:count] = [p.get("price", 0) if p else 0 for p in prices]
+        self.cost[:count] = [p.get("cost", 0) if p else 0 for p in prices]
+        self.margin[:count] = [p.get("margin", 0) if p else 0 for p in prices]
+        self.has_price[:count] = [p is not None for p in prices]
+        self.price_cents[:count] = np.rint(self.price[:count] * 100)
+        self.live[:count] = True
+
+    def update_product(self, sku: str, item: dict, price_row: Optional[dict]) -> None:
+        """Write one product's current values into its row (appending new SKUs)."""
+        row = self.sku_to_row.get(sku)
+        if row is None:
+            row = len(self.skus)
+            if row == len(self.quantity):
+                self._grow()
+            self.skus.append(sku)
+            self.sku_to_row[sku] = row
+
+        self.quantity[row] = item.get("quantity", 0)
+        self.reorder_point[row] = item.get("reorder_point", 0)
+        self.category[row] = self._code(self._category_codes, self.categories, item.get("category", "Other"))
+        self.status[row] = self._code(self._status_codes, self.statuses, item.get("status"))
+        price = price_row.get("price", 0) if price_row else 0
+        self.price[row] = price
+        self.price_cents[row] = int(round(price * 100))
+        self.cost[row] = price_row.get("cost", 0) if price_row else 0
+        self.margin[row] = price_row.get("margin", 0) if price_row else 0
+        self.has_price[row] = price_row is not None
+        self.live[row] = True
+
+    def remove_product(self, sku: str) -> None:
+        """Tombstone a product's row (rows keep insertion order)."""
+        row = self.sku_to_row.get(sku)
+        if row is not None:
+            self.live[row] = False
+
+    # ==================== REDUCTIONS ====================
+
+    def _live(self):
+        return self.live[:len(self.skus)]
+
+    def _by_category(self, mask, weights=None):
+        """Per-category-code sums of weights (or counts) over mask rows."""
+        return np.bincount(
+            self.category[:len(mask)][mask],
+            weights=None if weights is None else weights[:len(mask)][mask],
+            minlength=len(self.categories)
+        )
+
+    def inventory_summary(self) -> Dict[str, Any]:
+        """Summary in the DemoStore.get_inventory_summary() shape."""
+        live = self._live()
+        count = len(live)
+        value_cents = self.quantity[:count] * self.price_cents[:count]
+
+        counts = self._by_category(live)
+        quantities = self._by_category(live, self.quantity)
+        values = self._by_category(live, value_cents)
+
+        low_code = self._status_codes.get("low")
+        low_stock_count = 0 if low_code is None else int(np.count_nonzero(live & (self.status[:count] == low_code)))
+
+        return {
+            "total_products": int(np.count_nonzero(live)),
+            "total_items": int(self.quantity[:count][live].sum()),
+            "total_value": round(int(value_cents[live].sum()) / 100, 2),
+            "low_stock_count": low_stock_count,
+            "by_category": {
+                self.categories[code]: {
+                    "count": int(counts[code]),
+                    "total_quantity": int(round(quantities[code])),
+                    "total_value": round(int(round(values[code])) / 100, 2),
+                }
+                for code in np.flatnonzero(counts)
+            },
+        }
+
+    def low_stock_skus(self) -> List[str]:
+        """SKUs with status "low" or quantity at/below reorder point, in row order."""
+        count = len(self.skus)
+        mask = self.quantity[:count] <= self.reorder_point[:count]
+        low_code = self._status_codes.get("low")
+        if low_code is not None:
+            mask |= self.status[:count] == low_code
+        mask &= self._live()
+        return [self.skus[row] for row in np.flatnonzero(mask)]
+
+    def margin_totals(self) -> Dict[str, Tuple[float, int]]:
+        """(sum of margins, count) of priced products per category."""
+        mask = self._live() & self.has_price[:len(self.skus)]
+        counts = self._by_category(mask)
+        totals = self._by_category(mask, self.margin)
+        return {
+            self.categories[code]: (float(totals[code]), int(counts[code]))
+            for code in np.flatnonzero(counts)
+        }
+
+    def margin_by_category(self) -> Dict[str, float]:
+        """Average margin of priced products per category."""
+        return {category: total / count for category, (total, count) in self.margin_totals().items()}
@@ -6,13 +6,30 @@ Data persists to a JSON file and can be reset to initial state.
 Supports multiple themes (chocolate, tech, travel) with separate data files.
 """
 
+import atexit
+import functools
 import json
 import os
-import shutil
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Any
 from pathlib import Path
 
+from data.change_feed import ChangeEvent, ChangeFeed
+from data.columnar import NUMPY_AVAILABLE
+from data.journal import MutationJournal, write_snapshot
+from data.layered import BaseData, LayeredTable, load_base
+from data.low_stock import LowStockAlerts, alert_fields, is_low_stock
+from data.quotes import DiscountTables, price_quote
+from data.locks import RWLock, StripedLocks
+from data.records import CustomerRecord, InventoryRecord, PricingRecord, RowView
+from data.store_ops import InventoryWriteMixin
+from data.store_aggregates import OverlayAggregates
+from data.store_index import StoreIndex
+
 logger = logging.getLogger(__name__)
 
 # File paths
@@ -37,24 +54,143 @@ THEME_DATA_FILES = {
 # Default theme
 DEFAULT_THEME = 'chocolate'
 
+# Append mutations to a journal instead of rewriting the live file each time
+JOURNAL_ENABLED = os.getenv("DEMO_STORE_JOURNAL", "true").lower() != "false"
+
+# Compare running summaries against a full recompute on every read
+CHECK_AGGREGATES = os.getenv("DEMO_STORE_CHECK_AGGREGATES", "false").lower() == "true"
+
+# Vectorize the base low-stock/margin scans with NumPy columns (needs numpy)
+COLUMNAR_ENABLED = NUMPY_AVAILABLE and os.getenv("DEMO_STORE_COLUMNAR", "true").lower() != "false"
+
+# Give each chat session its own sandbox over the initial data
+SESSION_SANDBOXES = os.getenv("DEMO_STORE_SESSION_SANDBOXES", "false").lower() == "true"
+MAX_SANDBOXES = int(os.getenv("DEMO_STORE_MAX_SANDBOXES", "256"))
+
+# Storage backend per theme, e.g. "tech=sqlite,travel=json" (default json)
+THEME_BACKENDS = dict(
+    entry.strip().split("=", 1)
+    for entry in os.getenv("DEMO_STORE_BACKENDS", "").split(",")
+    if "=" in entry
+)
+
+
+def _reads(method):
+    """Run a store method under the shared (read) lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._rw.read_locked():
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
-class DemoStore:
+def _replaces_data(method):
+    """Run a store method that swaps the whole dataset under the exclusive lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._rw.write_locked():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _writes(method):
+    """Store mutation; called on a snapshot, it is applied to the live store instead."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._owner is not None:
+            return getattr(self._owner, method.__name__)(*args, **kwargs)
+        with self._writing():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class DemoStore(InventoryWriteMixin):
     """
     Manages demo data with JSON persistence.
 
     Features:
     - Load/save data to JSON file
-    - Reset to initial state
+    - Reset to initial state in O(1): data is an immutable shared base
+      plus sparse delta layers (see data/layered.py)
+    - Optional per-session sandboxes over the same base
     - CRUD operations for inventory, pricing, customers
     - Multi-theme support (chocolate, tech, travel)
-    - Thread-safe (single process assumption for demo)
+    - Secondary indexes (name, category, tier, substring) for lookups,
+      built once per base
+    - Running inventory/customer summaries updated on each mutation
+    - Optional NumPy columns for the base low-stock and margin scans
+      (see data/columnar.py)
+    - Query results are read-only record views over the stored rows, not
+      copies (see data/records.py)
+    - Write-behind journal with background snapshots (see data/journal.py)
+    - Thread-safe: readers share a reader-writer lock, row writers hold
+      it shared plus a per-key striped lock, reset/theme switches hold it
+      exclusively. Rows are replaced copy-on-write, so readers never see a
+      half-updated row.
+    - Versioned snapshots (MVCC): every write publishes a new version, and
+      snapshot() pins one for a whole workflow without blocking writers
+    - Change events: each published version is announced on the store's
+      ChangeFeed (see data/change_feed.py), with "alert" events when a
+      product crosses its reorder point
+    - Low-stock ranking by shortfall for top-N alert queries (see
+      data/low_stock.py)
+    - Batched multi-line quotes on compiled discount tables (see
+      data/quotes.py)
+    - Optional catalog shared by all worker processes through
+      memory-mapped snapshots (see data/shared_store.py)
     """
 
-    def __init__(self, theme: str = DEFAULT_THEME):
+    def __init__(
+        self,
+        theme: str = DEFAULT_THEME,
+        data: Optional[Dict[str, Any]] = None,
+        base: Optional[BaseData] = None,
+        row_locks: Optional[StripedLocks] = None,
+        deltas: Optional[Dict[str, Dict[str, Any]]] = None,
+        owner: Optional["DemoStore"] = None
+    ):
+        """
+        Args:
+            theme: Theme whose data files back the store
+            data: Preloaded data for an in-memory store that never touches
+                the theme files (benchmarks, scratch copies)
+            base: Shared base for an in-memory sandbox (see sandbox())
+            row_locks: Lock stripes shared with the store that owns the sandbox
+            deltas: Changed rows on top of base (see snapshot())
+            owner: Live store a snapshot was taken from; writes go there
+        """
         self.theme = theme
-        self._data: Dict[str, Any] = {}
-        self._load_data()
+        self._base: Optional[BaseData] = None
+        self._data: Dict[str, LayeredTable] = {}
+        self._index: Optional[StoreIndex] = None
+        self._aggregates: Optional[OverlayAggregates] = None
+        self._alerts: Optional[LowStockAlerts] = None
+        # (tier row, volume row, tables) compiled from the current discount rows
+        self._compiled_discounts: Optional[Tuple[Any, Any, DiscountTables]] = None
+        self._journal: Optional[MutationJournal] = None
+        self._rw = RWLock()
+        self._row_locks = row_locks or StripedLocks()
+        self._publish_lock = threading.Lock()
+        # Odd while a change is being published; version = _seq // 2
+        self._seq = 0
+        self._owner = owner
+        self._last_snapshot: Optional[DemoStore] = None
+        # Snapshots share the live store's feed
+        self.changes: ChangeFeed = owner.changes if owner is not None else ChangeFeed()
+        self._sandboxes: "OrderedDict[str, DemoStore]" = OrderedDict()
+        self._sandboxes_lock = threading.Lock()
+        self._persist = data is None and base is None
+        # In-memory stores reset to the base they were created with
+        self._origin: Optional[BaseData] = base
+        if data is not None:
+            self._origin = BaseData(data, columnar=COLUMNAR_ENABLED)
+        if self._persist:
+            self._load_data()
+        else:
+            self._layer(self._origin, deltas)
 
+    @_writes
+    @_replaces_data
     def set_theme(self, theme: str) -> None:
         """Switch to a different theme and reload data."""
         if theme not in THEME_DATA_FILES:
@@ -62,89 +198,313 @@ class DemoStore:
             theme = DEFAULT_THEME
 
         self.theme = theme
-        self._load_data()
+        self.drop_sandboxes()
+        if self._persist:
+            self._load_data()
+        else:
+            self._origin = None
+            with self._publishing("reset"):
+                self._layer(self._initial_base())
         logger.info(f"Switched to theme: {theme}")
 
     def _get_theme_files(self):
         """Get the initial and live file paths for current theme."""
         return THEME_DATA_FILES.get(self.theme, THEME_DATA_FILES[DEFAULT_THEME])
 
+    def _initial_base(self) -> BaseData:
+        """Shared base for the theme's initial data (or this in-memory store's own)."""
+        if self._origin is not None:
+            return self._origin
+        try:
+            return load_base(self._get_theme_files()['initial'], columnar=COLUMNAR_ENABLED)
+        except Exception as e:
+            logger.error(f"Failed to load initial data: {e}")
+            return BaseData({})
+
     def _load_data(self) -> None:
-        """Load data from live file, or initialize from initial file."""
-        files = self._get_theme_files()
-        live_file = files['live']
+        """Load the live file (or just the initial base), then replay its journal on top."""
+        self.close()
+        base = self._initial_base()
+        deltas = None
+        live_file = self._get_theme_files()['live']
 
         if live_file.exists():
             try:
                 with open(live_file, 'r') as f:
-                    self._data = json.load(f)
+                    data = json.load(f)
+                deltas = base.split(data)
+                if deltas is None:
+                    # Rows were added/removed/renamed by hand; the live data becomes this store's base
+                    logger.warning(f"Live data for theme '{self.theme}' no longer matches its initial data")
+                    base = BaseData(data, columnar=COLUMNAR_ENABLED)
                 logger.info(f"Loaded live data from {live_file} (theme: {self.theme})")
-                return
             except Exception as e:
                 logger.warning(f"Failed to load live data: {e}")
 
-        # Fall back to initial data
-        self.reset_to_initial()
+        with self._publishing("reset"):
+            self._layer(base, deltas)
+            self._open_journal(replay=True)
+            self._refresh_changed()
+
+    def _open_journal(self, replay: bool) -> None:
+        """Start journaling for the live file, applying any leftover records first."""
+        if not (self._persist and JOURNAL_ENABLED) or self._journal is not None:
+            return
+        self._journal = MutationJournal(self._get_theme_files()['live'], snapshot=self._snapshot)
+        if replay:
+            self._journal.replay(self._data)
+        else:
+            self._journal.discard()
+        self._journal.start()
+
+    def close(self) -> None:
+        """Flush and checkpoint the journal so the live file is complete."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """Plain-dict copy of every table (base rows overlaid with changes)."""
+        return {name: table.materialize() for name, table in self._data.items()}
 
     def _save_data(self) -> None:
         """Save current data to live file."""
+        if not self._persist:
+            return
         try:
             files = self._get_theme_files()
             live_file = files['live']
-            with open(live_file, 'w') as f:
-                json.dump(self._data, f, indent=2)
+            write_snapshot(live_file, self._snapshot())
             logger.debug(f"Data saved to {live_file} (theme: {self.theme})")
         except Exception as e:
             logger.error(f"Failed to save data: {e}")
 
-    def reset_to_initial(self) -> None:
-        """Reset all data to initial state for current theme."""
-        try:
-            files = self._get_theme_files()
-            initial_file = files['initial']
-            with open(initial_file, 'r') as f:
-                self._data = json.load(f)
+    def _persist_change(self, table: str, key: str, fields: Dict[str, Any]) -> None:
+        """Record a mutation: one journal record, or a full save without a journal."""
+        if self._journal is not None:
+            self._journal.append(table, key, fields)
+        else:
             self._save_data()
-            logger.info(f"Data reset to initial state (theme: {self.theme})")
-        except Exception as e:
-            logger.error(f"Failed to reset data: {e}")
-            self._data = {"inventory": {}, "pricing": {}, "customers": {}, "discounts": {}}
+
+    @_writes
+    @_replaces_data
+    def reset_to_initial(self) -> None:
+        """
+        Reset all data to initial state for current theme.
+
+        Drops the delta layers (and any session sandboxes). The live file
+        is rewritten before returning (with the journal on, by a checkpoint
+        that also drops the old records), so a crash can't bring back the
+        data being replaced.
+        """
+        with self._publishing("reset"):
+            self._layer(self._initial_base())
+        self.drop_sandboxes()
+        if self._persist:
+            self._open_journal(replay=False)
+            if self._journal is not None:
+                # Old journal records describe the data being replaced
+                self._journal.checkpoint()
+            else:
+                self._save_data()
+        logger.info(f"Data reset to initial state (theme: {self.theme})")
+
+    def _layer(self, base: BaseData, deltas: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """Point the store at base, with the given changed rows (or none) on top (caller publishes)."""
+        self._base = base
+        self._index = base.index
+        self._data = {
+            name: LayeredTable(rows, (deltas or {}).get(name))
+            for name, rows in base.tables.items()
+        }
+        self._aggregates = OverlayAggregates(base.aggregates)
+        self._alerts = LowStockAlerts(base.low_stock_ranking, base.low_stock_entries, base.index.product_ordinal)
+        self._refresh_changed()
+
+    def _refresh_changed(self) -> None:
+        """Bring the summaries up to date with every changed row (after load/replay)."""
+        for sku in set(self._data["inventory"].delta) | set(self._data["pricing"].delta):
+            self._product_changed(sku)
+        for customer_id in list(self._data["customers"].delta):
+            self._customer_changed(customer_id)
+
+    def _product_changed(self, sku: str) -> Optional[str]:
+        """
+        Refresh a product's summary contribution and low-stock rank after a
+        mutation (while publishing). Returns "low"/"cleared" if the product
+        crossed its reorder point.
+        """
+        item = self._data["inventory"].get(sku)
+        if item is None:
+            return None
+        price = (self._data["pricing"].get(sku) or {}).get("price", 0)
+        self._aggregates.update_product(sku, item, price)
+        return self._alerts.update(sku, item)
+
+    def _customer_changed(self, customer_id: str) -> None:
+        """Refresh a customer's summary contribution after a mutation (while publishing)."""
+        customer = self._data["customers"].get(customer_id)
+        if customer is None:
+            return
+        self._aggregates.update_customer(customer_id, customer)
+
+    def check_aggregates(self) -> List[str]:
+        """Mismatches between the running summaries and a full recompute."""
+        with self._rw.read_locked(), self._publish_lock:
+            return self._aggregates.diff(
+                self._data["inventory"],
+                self._data["pricing"],
+                self._data["customers"]
+            )
+
+    def _writing(self):
+        """Context around every mutation (the shared store serializes writers across processes here)."""
+        return nullcontext()
+
+    def refresh(self) -> bool:
+        """Pick up changes published by other processes; only the shared store has any (see data/shared_store.py)."""
+        return False
+
+    # ==================== VERSIONS ====================
+
+    @property
+    def version(self) -> int:
+        """Number of changes published so far; a snapshot keeps the version it was taken at."""
+        return self._seq >> 1
+
+    @contextmanager
+    def _publishing(
+        self,
+        change_type: str,
+        key: Optional[str] = None,
+        fields: Optional[Dict[str, Any]] = None
+    ) -> Iterator[List[tuple]]:
+        """
+        Apply a change (rows plus their summary contributions) as one new version.
+
+        Writers serialize here only for the in-memory swap. _seq is odd
+        while the change is applied, so snapshot() can detect a copy that
+        overlapped it and retry instead of making writers wait. Once
+        applied, the change is announced on the feed, in version order,
+        followed by any (type, key, fields) events the caller added to the
+        yielded list.
+        """
+        with self._publish_lock:
+            self._seq += 1
+            extra: List[tuple] = []
+            try:
+                yield extra
+            finally:
+                self._seq += 1
+            self.changes.publish(*(
+                ChangeEvent(event_type, self.version, event_key, event_fields, self.theme)
+                for event_type, event_key, event_fields in [(change_type, key, fields)] + extra
+            ))
+
+    def snapshot(self) -> "DemoStore":
+        """
+        Read-only view of the current version, for one workflow execution.
+
+        The snapshot shares the base and copies only the changed rows, so
+        taking one costs O(changed rows); it never blocks writers (a copy
+        that overlapped a publish is retried) and its reads take no lock
+        shared with this store. It keeps answering from the same version
+        while writers publish newer ones. Writes made through it are
+        applied to this store and are not visible in the snapshot. While
+        nothing changes, the previous snapshot is handed out again.
+        """
+        if self._owner is not None:
+            return self
+        while True:
+            seq = self._seq
+            cached = self._last_snapshot
+            if cached is not None and cached._seq == seq:
+                return cached
+            if seq & 1:
+                time.sleep(0)
+                continue
+            base = self._base
+            deltas = {name: dict(table.delta) for name, table in self._data.items()}
+            if self._seq == seq:
+                break
+
+        snapshot = DemoStore(
+            theme=self.theme, base=base, row_locks=self._row_locks, deltas=deltas, owner=self
+        )
+        snapshot._seq = seq
+        self._last_snapshot = snapshot
+        return snapshot
+
+    # ==================== SESSION SANDBOXES ====================
+
+    def sandbox(self, session_id: str) -> "DemoStore":
+        """
+        Per-session store over the theme's initial data.
+
+        Sandboxes share the base tables and indexes and keep their own
+        deltas, so sessions don't see each other's changes and each one
+        costs memory in proportion to the rows it changed. The least
+        recently used sandbox is dropped past MAX_SANDBOXES; all are
+        dropped when this store is reset.
+        """
+        with self._sandboxes_lock:
+            store = self._sandboxes.get(session_id)
+            if store is None:
+                store = DemoStore(theme=self.theme, base=self._initial_base(), row_locks=self._row_locks)
+                self._sandboxes[session_id] = store
+                while len(self._sandboxes) > MAX_SANDBOXES:
+                    self._sandboxes.popitem(last=False)
+            else:
+                self._sandboxes.move_to_end(session_id)
+            return store
+
+    def drop_sandboxes(self) -> None:
+        """Discard every session sandbox."""
+        with self._sandboxes_lock:
+            self._sandboxes.clear()
+
+    def _verify_aggregates(self) -> None:
+        """Consistency check mode: fail loudly if the aggregates drifted."""
+        mismatches = self.check_aggregates()
+        if mismatches:
+            logger.error(f"Aggregate mismatch (theme: {self.theme}): {mismatches}")
+            raise RuntimeError(f"DemoStore aggregates out of sync: {mismatches}")
 
     # ==================== INVENTORY ====================
 
+    @_reads
     def get_all_inventory(self) -> Dict[str, Any]:
         """Get all inventory items."""
         return self._data.get("inventory", {})
 
-    def get_inventory_by_sku(self, sku: str) -> Optional[Dict[str, Any]]:
+    @_reads
+    def get_inventory_by_sku(self, sku: str) -> Optional[RowView]:
         """Get a single inventory item by SKU."""
-        return self._data.get("inventory", {}).get(sku)
+        item = self._data.get("inventory", {}).get(sku)
+        return RowView(item) if item is not None else None
 
+    @_reads
     def get_inventory_by_category(self, category: str) -> Dict[str, Any]:
         """Get all inventory items in a category."""
         inventory = self._data.get("inventory", {})
-        return {
-            sku: item for sku, item in inventory.items()
-            if item.get("category", "").lower() == category.lower()
-        }
+        return {sku: RowView(inventory[sku]) for sku in self._index.skus_in_category(category)}
 
-    def get_inventory_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+    @_reads
+    def get_inventory_by_name(self, name: str) -> Optional[InventoryRecord]:
         """Find inventory item by name (prefers exact match, then best partial match)."""
         inventory = self._data.get("inventory", {})
         name_lower = name.lower().strip()
 
         # First try exact match
-        for sku, item in inventory.items():
-            if item.get("name", "").lower() == name_lower:
-                return {**item, "sku": sku}
-
-        # Then try partial matches - collect all and pick the best
-        matches = []
-        for sku, item in inventory.items():
-            item_name = item.get("name", "").lower()
-            # Check if search term is in item name OR item name is in search term
-            if name_lower in item_name or item_name in name_lower:
-                matches.append({**item, "sku": sku})
+        exact = self._index.name_to_skus.get(name_lower)
+        if exact:
+            return InventoryRecord(inventory[exact[0]], exact[0])
+
+        # Then try partial matches - search term in item name OR item name in search term
+        matches = [
+            InventoryRecord(inventory[sku], sku)
+            for sku in self._index.skus_matching_name(name_lower)
+        ]
 
         if not matches:
             return None
@@ -159,133 +519,139 @@ class DemoStore:
         matches.sort(key=match_score, reverse=True)
         return matches[0]
 
-    def search_inventory(self, query: str) -> List[Dict[str, Any]]:
+    @_reads
+    def search_inventory(self, query: str) -> List[InventoryRecord]:
         """Search inventory by name or category."""
         inventory = self._data.get("inventory", {})
-        query_lower = query.lower()
-        results = []
-        for sku, item in inventory.items():
-            if (query_lower in item.get("name", "").lower() or
-                query_lower in item.get("category", "").lower()):
-                results.append({**item, "sku": sku})
-        return results
-
-    def get_low_stock_items(self) -> List[Dict[str, Any]]:
-        """Get all items with low stock status."""
-        inventory = self._data.get("inventory", {})
         return [
-            {**item, "sku": sku}
-            for sku, item in inventory.items()
-            if item.get("status") == "low" or item.get("quantity", 0) <= item.get("reorder_point", 0)
+            InventoryRecord(inventory[sku], sku)
+            for sku in self._index.search_products(query.lower())
         ]
 
-    def update_inventory_quantity(self, sku: str, quantity_change: int, operation: str = "set") -> Dict[str, Any]:
+    @_reads
+    def get_low_stock_items(self) -> List[InventoryRecord]:
+        """Get all items with low stock status."""
+        inventory = self._data["inventory"]
+        changed = dict(inventory.delta)
+        skus = self._base.low_stock_skus
+        if changed:
+            skus = self._index.sort_skus(
+                [sku for sku in skus if sku not in changed] +
+                [sku for sku, item in changed.items() if is_low_stock(item)]
+            )
+        return [InventoryRecord(inventory[sku], sku) for sku in skus]
+
+    @_reads
+    def get_low_stock_alerts(self, limit: int = 10) -> List[InventoryRecord]:
+        """The limit most urgent low-stock items (furthest below their reorder point first)."""
+        inventory = self._data["inventory"]
+        return [InventoryRecord(inventory[sku], sku) for sku in self._alerts.top(limit)]
+
+    def count_low_stock(self) -> int:
+        """Number of items get_low_stock_items would return."""
+        return self._alerts.count
+
+    def _resolve_sku(self, sku: str, table: str = "inventory") -> Optional[str]:
+        """SKU as given if present in table, else the SKU of a product with that name."""
+        if sku in self._data.get(table, {}):
+            return sku
+        item = self.get_inventory_by_name(sku)
+        return item.get("sku") if item else None
+
+    @_writes
+    def _mutate_quantity(self, sku: str, compute: Callable[[int], int]) -> Dict[str, Any]:
         """
-        Update inventory quantity.
+        Atomic read-modify-write of one product's quantity.
 
-        Args:
-            sku: Product SKU
-            quantity_change: Amount to change (or absolute value for 'set')
-            operation: 'increase', 'decrease', or 'set'
-
-        Returns:
-            Updated item info with previous and new quantities
+        compute(previous_qty) returns the new quantity, or raises ValueError
+        to abort without writing. The row is replaced copy-on-write while
+        holding the SKU's stripe lock, so concurrent writers can't lose each
+        other's updates and readers see either the old or the new row.
         """
-        inventory = self._data.get("inventory", {})
-        if sku not in inventory:
-            # Try to find by name
-            item = self.get_inventory_by_name(sku)
-            if item:
-                sku = item.get("sku")
-            else:
-                return {"error": f"Product not found: {sku}"}
-
-        item = inventory[sku]
-        previous_qty = item["quantity"]
-
-        if operation == "increase":
-            item["quantity"] = previous_qty + quantity_change
-        elif operation == "decrease":
-            item["quantity"] = max(0, previous_qty - quantity_change)
-        elif operation == "set":
-            item["quantity"] = quantity_change
-        else:
-            return {"error": f"Unknown operation: {operation}"}
-
-        # Update status based on quantity vs reorder point
-        reorder_point = item.get("reorder_point", 100)
-        if item["quantity"] <= reorder_point:
-            item["status"] = "low"
-        else:
-            item["status"] = "good"
-
-        self._save_data()
+        resolved = self._resolve_sku(sku)
+        if resolved is None:
+            return {"error": f"Product not found: {sku}"}
+        sku = resolved
+
+        with self._rw.read_locked(), self._row_locks.for_key(sku):
+            inventory = self._data.get("inventory", {})
+            item = inventory[sku]
+            previous_qty = item["quantity"]
+            try:
+                new_qty = compute(previous_qty)
+            except ValueError as e:
+                return {"error": str(e), "sku": sku, "name": item["name"], "quantity": previous_qty}
+
+            # Update status based on quantity vs reorder point
+            reorder_point = item.get("reorder_point", 100)
+            status = "low" if new_qty <= reorder_point else "good"
+            fields = {"quantity": new_qty, "status": status}
+            item = {**item, **fields}
+            with self._publishing("inventory", sku, fields) as alerts:
+                inventory[sku] = item
+                crossing = self._product_changed(sku)
+                if crossing:
+                    alerts.append(("alert", sku, alert_fields(crossing, item)))
+            self._persist_change("inventory", sku, fields)
 
         return {
             "sku": sku,
             "name": item["name"],
             "previous_quantity": previous_qty,
-            "new_quantity": item["quantity"],
-            "change": item["quantity"] - previous_qty,
-            "status": item["status"]
+            "new_quantity": new_qty,
+            "change": new_qty - previous_qty,
+            "status": status
         }
 
     # ==================== PRICING ====================
 
+    @_reads
     def get_all_pricing(self) -> Dict[str, Any]:
         """Get all pricing data."""
         return self._data.get("pricing", {})
 
-    def get_price_by_sku(self, sku: str) -> Optional[Dict[str, Any]]:
+    @_reads
+    def get_price_by_sku(self, sku: str) -> Optional[PricingRecord]:
         """Get pricing for a product by SKU."""
         pricing = self._data.get("pricing", {}).get(sku)
         if pricing:
             inventory = self._data.get("inventory", {}).get(sku, {})
-            return {
-                "sku": sku,
-                "name": inventory.get("name", "Unknown"),
-                **pricing
-            }
+            return PricingRecord(pricing, sku, inventory.get("name", "Unknown"))
         return None
 
-    def get_pricing_by_category(self, category: str) -> List[Dict[str, Any]]:
+    @_reads
+    def get_pricing_by_category(self, category: str) -> List[PricingRecord]:
         """Get pricing for all products in a category."""
         inventory = self._data.get("inventory", {})
         pricing = self._data.get("pricing", {})
+        return [
+            PricingRecord(pricing[sku], sku, inventory[sku]["name"])
+            for sku in self._index.skus_in_category(category)
+            if sku in pricing
+        ]
 
-        results = []
-        for sku, item in inventory.items():
-            if item.get("category", "").lower() == category.lower():
-                if sku in pricing:
-                    results.append({
-                        "sku": sku,
-                        "name": item["name"],
-                        **pricing[sku]
-                    })
-        return results
-
+    @_writes
     def update_price(self, sku: str, new_price: float) -> Dict[str, Any]:
-        """Update the price of a product."""
-        pricing = self._data.get("pricing", {})
-        if sku not in pricing:
-            # Try to find by name
-            item = self.get_inventory_by_name(sku)
-            if item:
-                sku = item.get("sku")
-            else:
-                return {"error": f"Product not found: {sku}"}
-
-        if sku not in pricing:
-            return {"error": f"Pricing not found for: {sku}"}
-
-        old_price = pricing[sku]["price"]
-        pricing[sku]["price"] = new_price
-
-        # Recalculate margin
-        cost = pricing[sku]["cost"]
-        pricing[sku]["margin"] = round((new_price - cost) / new_price * 100, 1)
-
-        self._save_data()
+        """Update the price of a product (atomic)."""
+        resolved = self._resolve_sku(sku, table="pricing")
+        if resolved is None:
+            return {"error": f"Product not found: {sku}"}
+        sku = resolved
+
+        with self._rw.read_locked(), self._row_locks.for_key(sku):
+            pricing = self._data.get("pricing", {})
+            if sku not in pricing:
+                return {"error": f"Pricing not found for: {sku}"}
+
+            old_price = pricing[sku]["price"]
+            # Recalculate margin
+            cost = pricing[sku]["cost"]
+            margin = round((new_price - cost) / new_price * 100, 1)
+            fields = {"price": new_price, "margin": margin}
+            with self._publishing("pricing", sku, fields):
+                pricing[sku] = {**pricing[sku], **fields}
+                self._product_changed(sku)
+            self._persist_change("pricing", sku, fields)
 
         inventory = self._data.get("inventory", {}).get(sku, {})
         return {
@@ -293,73 +659,92 @@ class DemoStore:
             "name": inventory.get("name", "Unknown"),
             "old_price": old_price,
             "new_price": new_price,
-            "margin": pricing[sku]["margin"]
+            "margin": margin
         }
 
+    @_reads
+    def get_margin_by_category(self) -> Dict[str, float]:
+        """Average margin of priced products per category (base totals adjusted for changed prices)."""
+        inventory, pricing = self._data["inventory"], self._data["pricing"]
+        totals = dict(self._base.margin_totals)
+        for sku, row in list(pricing.delta.items()):
+            item = inventory.get(sku)
+            if item is None:
+                continue
+            category = item.get("category", "Other")
+            total, count = totals.get(category, (0.0, 0))
+            base_row = pricing.base_row(sku)
+            if base_row is not None:
+                total, count = total - base_row.get("margin", 0), count - 1
+            totals[category] = (total + row.get("margin", 0), count + 1)
+        return {category: total / count for category, (total, count) in totals.items() if count}
+
     # ==================== CUSTOMERS ====================
 
+    @_reads
     def get_all_customers(self) -> Dict[str, Any]:
         """Get all customers."""
         return self._data.get("customers", {})
 
-    def get_customer_by_id(self, customer_id: str) -> Optional[Dict[str, Any]]:
+    @_reads
+    def get_customer_by_id(self, customer_id: str) -> Optional[CustomerRecord]:
         """Get a customer by ID."""
-        return self._data.get("customers", {}).get(customer_id)
+        customer = self._data.get("customers", {}).get(customer_id)
+        return CustomerRecord(customer) if customer is not None else None
 
-    def get_customer_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+    @_reads
+    def get_customer_by_name(self, name: str) -> Optional[CustomerRecord]:
         """Find customer by name (partial match)."""
         customers = self._data.get("customers", {})
-        name_lower = name.lower()
-        for cust_id, customer in customers.items():
-            if name_lower in customer.get("name", "").lower():
-                return customer
-        return None
+        matches = self._index.customer_ids_matching_name(name.lower())
+        return CustomerRecord(customers[matches[0]]) if matches else None
 
-    def get_customers_by_tier(self, tier: str) -> List[Dict[str, Any]]:
+    @_reads
+    def get_customers_by_tier(self, tier: str) -> List[CustomerRecord]:
         """Get all customers in a tier."""
         customers = self._data.get("customers", {})
-        return [
-            customer for customer in customers.values()
-            if customer.get("tier", "").lower() == tier.lower()
-        ]
+        return [CustomerRecord(customers[cid]) for cid in self._index.customer_ids_in_tier(tier)]
 
-    def search_customers(self, query: str) -> List[Dict[str, Any]]:
+    @_reads
+    def search_customers(self, query: str) -> List[CustomerRecord]:
         """Search customers by name, contact, or location."""
         customers = self._data.get("customers", {})
-        query_lower = query.lower()
-        results = []
-        for customer in customers.values():
-            if (query_lower in customer.get("name", "").lower() or
-                query_lower in customer.get("contact", "").lower() or
-                query_lower in customer.get("location", "").lower()):
-                results.append(customer)
-        return results
+        return [CustomerRecord(customers[cid]) for cid in self._index.search_customer_ids(query.lower())]
 
     # ==================== DISCOUNTS ====================
 
+    @_reads
     def get_discount_structure(self) -> Dict[str, Any]:
         """Get the full discount structure."""
         return self._data.get("discounts", {})
 
+    def _discount_tables(self) -> DiscountTables:
+        """Discount tables compiled from the current rows (recompiled when a row is replaced)."""
+        discounts = self._data.get("discounts", {})
+        tiers = discounts.get("tier_discounts", {})
+        volumes = discounts.get("volume_discounts", {})
+        compiled = self._compiled_discounts
+        if compiled is None or compiled[0] is not tiers or compiled[1] is not volumes:
+            compiled = self._compiled_discounts = (tiers, volumes, DiscountTables(tiers, volumes))
+        return compiled[2]
+
+    @_reads
     def get_tier_discount(self, tier: str) -> int:
         """Get discount percentage for a customer tier."""
-        tier_discounts = self._data.get("discounts", {}).get("tier_discounts", {})
-        return tier_discounts.get(tier, 0)
+        return self._discount_tables().tier_discount(tier)
 
+    @_reads
     def get_volume_discount(self, quantity: int) -> int:
         """Get volume discount percentage for a quantity."""
-        volume_discounts = self._data.get("discounts", {}).get("volume_discounts", {})
-        discount = 0
-        for threshold, disc in sorted(volume_discounts.items(), key=lambda x: int(x[0])):
-            if quantity >= int(threshold):
-                discount = disc
-        return discount
+        return self._discount_tables().volume_discount(quantity)
 
+    @_reads
     def calculate_total_discount(self, tier: str, quantity: int) -> Dict[str, Any]:
         """Calculate total discount for a customer tier and quantity."""
-        tier_disc = self.get_tier_discount(tier)
-        volume_disc = self.get_volume_discount(quantity)
-        total = tier_disc + volume_disc
+        tables = self._discount_tables()
+        tier_disc = tables.tier_discount(tier)
+        volume_disc = tables.volume_discount(quantity)
+        total = min(tier_disc + volume_disc, 100)  # Capped as in quotes.price_quote
 
         return {
             "tier": tier,
@@ -369,16 +754,49 @@ class DemoStore:
             "total_discount": total
         }
 
+    @_reads
+    def quote(self, lines: Iterable[Tuple[str, int, str]]) -> Dict[str, Any]:
+        """
+        Price a multi-line order in one call (see data/quotes.py).
+
+        Args:
+            lines: (SKU or product name, quantity, customer tier) per line
+
+        Returns:
+            Priced lines, order totals and margin impact; products without
+            pricing are listed under "unknown"
+        """
+        inventory, pricing = self._data["inventory"], self._data["pricing"]
+        resolved, unknown = [], []
+        for product, quantity, tier in lines:
+            if quantity <= 0:
+                return {"error": f"Invalid quantity for {product}: {quantity}"}
+            sku = self._resolve_sku(product, table="pricing")
+            # A name can resolve to an inventory SKU that has no pricing row
+            if sku is None or sku not in pricing:
+                unknown.append(product)
+                continue
+            row = pricing[sku]
+            resolved.append({
+                "sku": sku,
+                "name": inventory.get(sku, {}).get("name", "Unknown"),
+                "quantity": quantity,
+                "tier": tier,
+                "price": row["price"],
+                "cost": row["cost"],
+            })
+        return price_quote(self._discount_tables(), resolved, unknown)
+
+    @_writes
     def update_tier_discount(self, tier: str, discount: int) -> Dict[str, Any]:
         """Update discount percentage for a tier."""
-        if "discounts" not in self._data:
-            self._data["discounts"] = {"tier_discounts": {}, "volume_discounts": {}}
-        if "tier_discounts" not in self._data["discounts"]:
-            self._data["discounts"]["tier_discounts"] = {}
-
-        old_discount = self._data["discounts"]["tier_discounts"].get(tier, 0)
-        self._data["discounts"]["tier_discounts"][tier] = discount
-        self._save_data()
+        with self._rw.read_locked(), self._row_locks.for_key(("discounts", "tier_discounts")):
+            discounts = self._data["discounts"]
+            tier_discounts = discounts.get("tier_discounts", {})
+            old_discount = tier_discounts.get(tier, 0)
+            with self._publishing("discounts", "tier_discounts", {tier: discount}):
+                discounts["tier_discounts"] = {**tier_discounts, tier: discount}
+            self._persist_change("discounts", "tier_discounts", {tier: discount})
 
         return {
             "tier": tier,
@@ -389,78 +807,61 @@ class DemoStore:
     # ==================== SUMMARY METHODS ====================
 
     def get_inventory_summary(self) -> Dict[str, Any]:
-        """Get summary of inventory by category."""
-        inventory = self._data.get("inventory", {})
-
-        categories = {}
-        total_items = 0
-        total_value = 0
-        low_stock_count = 0
-
-        pricing = self._data.get("pricing", {})
-
-        for sku, item in inventory.items():
-            category = item.get("category", "Other")
-            qty = item.get("quantity", 0)
-            price = pricing.get(sku, {}).get("price", 0)
-
-            if category not in categories:
-                categories[category] = {"count": 0, "total_quantity": 0, "total_value": 0}
-
-            categories[category]["count"] += 1
-            categories[category]["total_quantity"] += qty
-            categories[category]["total_value"] += qty * price
-
-            total_items += qty
-            total_value += qty * price
-
-            if item.get("status") == "low":
-                low_stock_count += 1
-
-        return {
-            "total_products": len(inventory),
-            "total_items": total_items,
-            "total_value": round(total_value, 2),
-            "low_stock_count": low_stock_count,
-            "by_category": categories
-        }
+        """Get summary of inventory by category (maintained incrementally)."""
+        if CHECK_AGGREGATES:
+            self._verify_aggregates()
+        with self._publish_lock:
+            return self._aggregates.inventory_summary()
 
     def get_customer_summary(self) -> Dict[str, Any]:
-        """Get summary of customers by tier."""
-        customers = self._data.get("customers", {})
-
-        tiers = {}
-        total_spent = 0
-
-        for customer in customers.values():
-            tier = customer.get("tier", "Unknown")
-            spent = customer.get("total_spent", 0)
-
-            if tier not in tiers:
-                tiers[tier] = {"count": 0, "total_spent": 0}
-
-            tiers[tier]["count"] += 1
-            tiers[tier]["total_spent"] += spent
-            total_spent += spent
-
-        return {
-            "total_customers": len(customers),
-            "total_revenue": total_spent,
-            "by_tier": tiers
-        }
+        """Get summary of customers by tier (maintained incrementally)."""
+        if CHECK_AGGREGATES:
+            self._verify_aggregates()
+        with self._publish_lock:
+            return self._aggregates.customer_summary()
 
 
 # Global instances (one per theme for caching)
 _store_cache: Dict[str, DemoStore] = {}
 
-def get_demo_store(theme: str = DEFAULT_THEME) -> DemoStore:
+def get_demo_store(theme: str = DEFAULT_THEME, session_id: Optional[str] = None) -> DemoStore:
     """
     Get or create a DemoStore instance for the specified theme.
     Instances are cached for performance.
+
+    Themes listed as "sqlite" in DEMO_STORE_BACKENDS get a SQLiteDemoStore,
+    which has the same API, and themes listed as "shared" a SharedDemoStore
+    over memory-mapped snapshots shared by every worker process (brought
+    up to date with the other workers' writes here, once per request).
+    With DEMO_STORE_SESSION_SANDBOXES on, a session_id gets that session's
+    sandbox of the theme's JSON store.
     """
     if theme not in _store_cache:
-        _store_cache[theme] = DemoStore(theme=theme)
-    return _store_cache[theme]
+        backend = THEME_BACKENDS.get(theme, "json").strip()
+        if backend == "sqlite":
+            from data.sqlite_store import SQLiteDemoStore
+            _store_cache[theme] = SQLiteDemoStore(theme=theme)
+        elif backend == "shared":
+            from data.shared_store import SharedDemoStore
+            _store_cache[theme] = SharedDemoStore(theme=theme)
+        else:
+            _store_cache[theme] = DemoStore(theme=theme)
+    store = _store_cache[theme]
+    if isinstance(store, DemoStore):
+        store.refresh()
+        if session_id and SESSION_SANDBOXES:
+            return store.sandbox(session_id)
+    return store
+
+
+def close_demo_stores() -> None:
+    """Checkpoint every cached store's journal and close databases (call on shutdown)."""
+    for store in _store_cache.values():
+        store.close()
+
+
+atexit.register(close_demo_stores)
+
 
 # Default instance for backward compatibility
 demo_store = get_demo_store(DEFAULT_THEME)
@@ -0,0 +1,304 @@
+"""
+Mutation Journal - Write-behind persistence for the DemoStore.
+
+Instead of rewriting the whole live JSON file on every change, each
+mutation appends one compact record to a journal:
+
+    {"seq": 42, "table": "inventory", "key": "SKU-001", "fields": {"quantity": 120, "status": "good"}}
+
+Records carry the new field values (not deltas), so replaying them is
+idempotent. That makes a "fuzzy" snapshot safe: the live file can be
+written from the in-memory data while requests keep mutating it, because
+every change made during the dump is also in the journal and replay
+overwrites it with the final value.
+
+Features:
+- append() is O(1) and does no I/O on the caller's thread
+- A background flusher batches writes and fsyncs every flush_interval
+- Checkpoints (snapshot + journal rotation) after compact_every records
+  or compact_interval seconds, in the background
+- Recovery replays the journal tail on load; a torn last line is ignored
+
+Write-behind means a crash can lose up to flush_interval of changes; a
+wholesale replacement (reset) checkpoints synchronously, so it is durable
+once it returns.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = float(os.getenv("DEMO_STORE_JOURNAL_FLUSH_SECONDS", "0.05"))
+DEFAULT_COMPACT_EVERY = int(os.getenv("DEMO_STORE_COMPACT_EVERY", "1000"))
+DEFAULT_COMPACT_INTERVAL = float(os.getenv("DEMO_STORE_COMPACT_INTERVAL_SECONDS", "300"))
+
+
+def apply_record(data: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """Apply one journal record to the data dict (replacing the row, never mutating it)."""
+    table = data.setdefault(record["table"], {})
+    table[record["key"]] = {**table.get(record["key"], {}), **record["fields"]}
+
+
+def write_snapshot(path: Path, data: Dict[str, Any]) -> None:
+    """Atomically replace path with a JSON dump of data."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class MutationJournal:
+    """
+    Append-only journal next to a live data file.
+
+    Usage:
+        journal = MutationJournal(live_file, snapshot=lambda: store._data)
+        journal.replay(data)  # after loading live_file
+        journal.start()
+        journal.append("inventory", sku, {"quantity": 10})
+    """
+
+    def __init__(
+        self,
+        live_file: Path,
+        snapshot: Callable[[], Dict[str, Any]],
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        compact_every: int = DEFAULT_COMPACT_EVERY,
+        compact_interval: float = DEFAULT_COMPACT_INTERVAL
+    ):
+        self.live_file = Path(live_file)
+        self.path = self.live_file.with_name(self.live_file.name + ".journal")
+        self._rotated_path = self.path.with_name(self.path.name + ".old")
+        self._snapshot = snapshot
+        self._flush_interval = flush_interval
+        self._compact_every = compact_every
+        self._compact_interval = compact_interval
+
+        # _lock guards the pending queue and counters (held briefly by
+        # append); _io_lock guards the journal file so fsyncs never block
+        # appenders; _checkpoint_lock serializes checkpoints
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._io_lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._pending: List[str] = []
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+
+        self._seq = 0
+        self._since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        self._checkpoint_requested = False
+
+        self.records_written = 0
+        self.fsyncs = 0
+        self.checkpoints = 0
+
+    # ==================== RECOVERY ====================
+
+    def replay(self, data: Dict[str, Any]) -> int:
+        """
+        Apply journal records left by a previous run to freshly loaded data.
+
+        Replays a rotated journal (checkpoint interrupted by a crash) first,
+        then the current one. Returns the number of records applied.
+        """
+        applied = 0
+        for path in (self._rotated_path, self.path):
+            if not path.exists():
+                continue
+            good_offset = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Ignoring torn journal record in {path.name}")
+                        break
+                    apply_record(data, record)
+                    self._seq = max(self._seq, record.get("seq", 0))
+                    good_offset += len(line)
+                    applied += 1
+            # Cut the torn tail so new appends start on a clean line
+            if good_offset < path.stat().st_size:
+                os.truncate(path, good_offset)
+        self._since_checkpoint = applied
+        if applied:
+            logger.info(f"Replayed {applied} journal records into {self.live_file.name}")
+        return applied
+
+    # ==================== WRITING ====================
+
+    def start(self) -> None:
+        """Open the journal for appending and start the background flusher."""
+        if self._thread is not None:
+            return
+        self._file = open(self.path, "a")
+        self._closing = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"journal-{self.live_file.stem}", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, table: str, key: str, fields: Dict[str, Any]) -> int:
+        """Queue a record for the flusher. Returns its sequence number."""
+        with self._lock:
+            self._seq += 1
+            self._pending.append(json.dumps(
+                {"seq": self._seq, "table": table, "key": key, "fields": fields},
+                separators=(",", ":")
+            ))
+            self._since_checkpoint += 1
+            if len(self._pending) == 1:
+                self._wake.notify()
+            return self._seq
+
+    def _run(self) -> None:
+        """Flusher loop: batch pending records into one write + fsync."""
+        while True:
+            with self._lock:
+                # Wake at least once a second to check the checkpoint timer
+                if not self._pending and not self._closing and not self._checkpoint_requested:
+                    self._wake.wait(1.0)
+                has_pending = bool(self._pending)
+                closing = self._closing
+
+            # Let a burst accumulate so one fsync covers it
+            if has_pending and not closing:
+                time.sleep(self._flush_interval)
+            self.flush()
+
+            if closing:
+                return
+            if self._checkpoint_due():
+                self.checkpoint()
+
+    def flush(self) -> None:
+        """Write and fsync everything queued so far."""
+        with self._io_lock:
+            with self._lock:
+                if self._file is None:
+                    return
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            self._file.write("\n".join(batch) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.records_written += len(batch)
+            self.fsyncs += 1
+
+    def request_checkpoint(self) -> None:
+        """Have the flusher checkpoint soon (e.g. after the data was replaced wholesale)."""
+        with self._lock:
+            self._checkpoint_requested = True
+            self._wake.notify()
+
+    def _checkpoint_due(self) -> bool:
+        if self._checkpoint_requested:
+            return True
+        if not self._since_checkpoint:
+            return False
+        return (self._since_checkpoint >= self._compact_every or
+                time.monotonic() - self._last_checkpoint >= self._compact_interval)
+
+    # ==================== COMPACTION ====================
+
+    def checkpoint(self, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Snapshot data into the live file and drop the journal it covers.
+
+        The journal is rotated first so records appended during the dump
+        land in the new journal and survive the checkpoint.
+        """
+        with self._checkpoint_lock:
+            with self._io_lock:
+                with self._lock:
+                    batch, self._pending = self._pending, []
+                    self._since_checkpoint = 0
+                    self._checkpoint_requested = False
+                    self._last_checkpoint = time.monotonic()
+                if self._file is not None:
+                    if batch:
+                        self._file.write("\n".join(batch) + "\n")
+                        self.records_written += len(batch)
+                    self._file.close()
+                if self.path.exists():
+                    if self._rotated_path.exists():
+                        # An earlier checkpoint failed; keep its records too
+                        with open(self._rotated_path, "a") as rotated, open(self.path, "r") as current:
+                            rotated.write(current.read())
+                        self.path.unlink()
+                    else:
+                        os.replace(self.path, self._rotated_path)
+                if self._file is not None:
+                    self._file = open(self.path, "a")
+
+            for attempt in range(3):
+                try:
+                    write_snapshot(self.live_file, data if data is not None else self._snapshot())
+                    break
+                except RuntimeError:
+                    # A row was added mid-dump; the journal still has it
+                    logger.debug(f"Snapshot raced a mutation, retrying ({attempt + 1})")
+            else:
+                logger.error(f"Checkpoint of {self.live_file.name} failed; keeping journal")
+                return
+
+            self._rotated_path.unlink(missing_ok=True)
+            self.checkpoints += 1
+            logger.debug(f"Checkpointed {self.live_file.name}")
+
+    def discard(self) -> None:
+        """
+        Drop all journal records (data was replaced wholesale).
+
+        Doesn't wait for a checkpoint in progress: its snapshot may predate
+        the replacement, so callers follow up with request_checkpoint().
+        """
+        with self._io_lock, self._lock:
+            self._pending = []
+            if self._file is not None:
+                self._file.close()
+                self._file = open(self.path, "w")
+            else:
+                self.path.unlink(missing_ok=True)
+            self._rotated_path.unlink(missing_ok=True)
+            self._since_checkpoint = 0
+
+    def close(self) -> None:
+        """Stop the flusher, then checkpoint so the live file is complete."""
+        if self._thread is not None:
+            with self._lock:
+                self._closing = True
+                self._wake.notify()
+            self._thread.join()
+            self._thread = None
+        if self._since_checkpoint or self._checkpoint_requested:
+            self.checkpoint()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path.exists() and self.path.stat().st_size == 0:
+            self.path.unlink()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        with self._lock:
+            return {
+                "seq": self._seq,
+                "pending": len(self._pending),
+                "since_checkpoint": self._since_checkpoint,
+                "records_written": self.records_written,
+                "fsyncs": self.fsyncs,
+                "checkpoints": self.checkpoints,
+            }
@@ -0,0 +1,218 @@
+"""
+Layered Data - Immutable base tables plus sparse copy-on-write deltas.
+
+A theme's initial data is loaded once into a BaseData: the tables plus
+everything derived from them (secondary indexes, summary aggregates,
+low-stock list and ranking, margin totals). It is never mutated, so the
+shared store and any number of session sandboxes can sit on the same base.
+
+Each store sees its tables through LayeredTables: reads check the
+store's delta first and fall back to the base; writes (whole-row
+replacements, as the store already does copy-on-write) go to the delta.
+Dropping the deltas resets a store in O(1), and a sandbox costs memory
+in proportion to the rows it changed.
+"""
+
+import json
+import logging
+import threading
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from data.columnar import ColumnarInventory
+from data.low_stock import AlertEntry, is_low_stock, rank_low_stock
+from data.store_aggregates import StoreAggregates
+from data.store_index import StoreIndex
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("inventory", "pricing", "customers", "discounts")
+
+# Fields the shared indexes are built from; a delta may not change them
+INDEXED_FIELDS = {
+    "inventory": ("name", "category"),
+    "customers": ("name", "tier", "contact", "location"),
+}
+
+
+class LayeredTable(MutableMapping):
+    """
+    One table as base rows overlaid with changed rows.
+
+    Iteration follows the base order, with rows only in the delta after
+    it, so a layered table lists rows exactly like the dict it replaces.
+    Rows can be replaced or added but not deleted.
+    """
+
+    __slots__ = ("_base", "_delta")
+
+    def __init__(self, base: Dict[str, Any], delta: Optional[Dict[str, Any]] = None):
+        self._base = base
+        self._delta: Dict[str, Any] = delta if delta is not None else {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._delta[key]
+        except KeyError:
+            return self._base[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._delta.get(key, default)
+        if row is default:
+            return self._base.get(key, default)
+        return row
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._delta or key in self._base
+
+    def __setitem__(self, key: str, row: Any) -> None:
+        self._delta[key] = row
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError("Rows can't be deleted from a layered table")
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._base
+        # Copy the keys: writers may add rows to the delta meanwhile
+        yield from (key for key in list(self._delta) if key not in self._base)
+
+    def __len__(self) -> int:
+        return len(self._base) + sum(1 for key in list(self._delta) if key not in self._base)
+
+    def __repr__(self) -> str:
+        return f"LayeredTable(base={len(self._base)} rows, delta={len(self._delta)} rows)"
+
+    @property
+    def delta(self) -> Dict[str, Any]:
+        """Changed (or added) rows; the caller must not mutate it."""
+        return self._delta
+
+    def base_row(self, key: str) -> Any:
+        return self._base.get(key)
+
+    def materialize(self) -> Dict[str, Any]:
+        """Plain dict copy of the table (for snapshots)."""
+        return {key: self[key] for key in self}
+
+
+class BaseData:
+    """
+    Immutable tables and everything derived from them.
+
+    Usage:
+        base = BaseData(json.load(f))
+        inventory = LayeredTable(base.tables["inventory"])
+    """
+
+    def __init__(self, data: Dict[str, Any], columnar: bool = False, index: Optional[StoreIndex] = None):
+        """
+        Args:
+            data: Tables (dicts, or any mappings such as memory-mapped ones)
+            columnar: Vectorize the low-stock/margin scans with NumPy
+            index: Index already built over these tables (e.g. mapped
+                with them, see data/mapped_catalog.py)
+        """
+        self.tables: Dict[str, Dict[str, Any]] = {name: data.get(name) or {} for name in TABLES}
+        inventory, pricing, customers = (self.tables[name] for name in ("inventory", "pricing", "customers"))
+
+        if index is None:
+            index = StoreIndex()
+            index.rebuild(inventory, customers)
+        self.index = index
+        self.aggregates = StoreAggregates()
+        self.aggregates.rebuild(inventory, pricing, customers)
+
+        # Low-stock list and per-category margin (sum, count), vectorized when NumPy is there
+        if columnar:
+            columns = ColumnarInventory()
+            columns.rebuild(inventory, pricing)
+            self.low_stock_skus: List[str] = columns.low_stock_skus()
+            self.margin_totals: Dict[str, Tuple[float, int]] = columns.margin_totals()
+        else:
+            self.low_stock_skus = [sku for sku, item in inventory.items() if is_low_stock(item)]
+            self.margin_totals = {}
+            for sku, item in inventory.items():
+                if sku in pricing:
+                    category = item.get("category", "Other")
+                    total, count = self.margin_totals.get(category, (0.0, 0))
+                    self.margin_totals[category] = (total + pricing[sku].get("margin", 0), count + 1)
+
+        # Low-stock products by urgency, for the top-N alert queries
+        self.low_stock_ranking: List[AlertEntry] = rank_low_stock(
+            inventory, self.low_stock_skus, self.index.product_ordinal
+        )
+        self.low_stock_entries: Dict[str, AlertEntry] = {entry[2]: entry for entry in self.low_stock_ranking}
+
+    def layer(self) -> Dict[str, LayeredTable]:
+        """Fresh tables over this base with empty deltas."""
+        return {name: LayeredTable(rows) for name, rows in self.tables.items()}
+
+    def split(self, data: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Deltas that turn this base into data, or None if data can't be
+        expressed over it (rows removed, or products/customers added or
+        re-indexed - the shared indexes would no longer match).
+        """
+        deltas = {}
+        for name in TABLES:
+            base_rows, rows = self.tables[name], data.get(name) or {}
+            if any(key not in rows for key in base_rows):
+                return None
+            delta = {key: row for key, row in rows.items() if base_rows.get(key) != row}
+            fields = INDEXED_FIELDS.get(name)
+            if fields:
+                for key, row in delta.items():
+                    base_row = base_rows.get(key)
+                    if base_row is None or any(row.get(f) != base_row.get(f) for f in fields):
+                        return None
+            deltas[name] = delta
+        return deltas
+
+
+_base_cache: Dict[Tuple[Path, bool], Tuple[int, BaseData]] = {}
+_base_cache_lock = threading.Lock()
+
+
+def load_base(path: Path, columnar: bool = False) -> BaseData:
+    """
+    BaseData for a theme's initial file, shared by every store on it.
+
+    Reloaded only when the file's mtime changes.
+    """
+    path = Path(path)
+    mtime = path.stat().st_mtime_ns
+    with _base_cache_lock:
+        cached = _base_cache.get((path, columnar))
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r") as f:
+            base = BaseData(json.load(f), columnar=columnar)
+        _base_cache[(path, columnar)] = (mtime, base)
+        logger.debug(f"Loaded base data from {path.name}")
+        return base
+
+
+def cached_bases() -> List[Tuple[Path, bool, int, BaseData]]:
+    """(path, columnar, mtime, base) for every base load_base() has cached."""
+    with _base_cache_lock:
+        return [(path, columnar, mtime, base) for (path, columnar), (mtime, base) in _base_cache.items()]
+
+
+def restore_base(path: Path, columnar: bool, mtime: int, index: StoreIndex) -> bool:
+    """
+    Cache the base for a theme's initial file around an index restored
+    from a warm-restart snapshot, so load_base() skips the index build.
+
+    Only if the file is still at mtime (the version the index was built
+    from) and no base is cached for it yet. Returns True if cached.
+    """
+    path = Path(path)
+    with _base_cache_lock:
+        if (path, columnar) in _base_cache or path.stat().st_mtime_ns != mtime:
+            return False
+        with open(path, "r") as f:
+            base = BaseData(json.load(f), columnar=columnar, index=index)
+        _base_cache[(path, columnar)] = (mtime, base)
+        logger.debug(f"Restored base data for {path.name}")
+        return True
@@ -0,0 +1,97 @@
+"""
+Locks - Concurrency primitives for the DemoStore.
+
+- RWLock: many concurrent readers, one writer; writers are preferred so a
+  steady stream of reads can't starve a reset
+- StripedLocks: a fixed pool of mutexes keyed by hash, so writers to
+  different SKUs rarely contend and the pool never grows
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Hashable, Iterator, List
+
+
+class RWLock:
+    """
+    Writer-preferring reader-writer lock.
+
+    Re-entrant per thread: a thread holding the read or write lock can take
+    the read lock again, and the writer can re-take the write lock, so
+    store methods can call each other freely.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read_locked(self) -> Iterator[None]:
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+    def acquire_read(self) -> None:
+        me = threading.get_ident()
+        depth = getattr(self._local, "depth", 0)
+        if depth or self._writer == me:
+            self._local.depth = depth + 1
+            return
+        with self._cond:
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        self._local.depth = 1
+
+    def release_read(self) -> None:
+        self._local.depth -= 1
+        if self._local.depth or self._writer == threading.get_ident():
+            return
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._write_depth -= 1
+            if not self._write_depth:
+                self._writer = None
+                self._cond.notify_all()
+
+
+class StripedLocks:
+    """Fixed pool of mutexes; a key always maps to the same stripe."""
+
+    def __init__(self, stripes: int = 64):
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(stripes)]
+
+    def for_key(self, key: Hashable) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
@@ -0,0 +1,111 @@
+"""
+Low Stock - Low-stock products ranked by urgency.
+
+Products are ranked by shortfall, quantity minus reorder point (lowest
+first, ties in catalog order), as (shortfall, ordinal, sku) entries. The
+base's ranking is sorted once per BaseData (see data/layered.py); each
+store keeps a small sorted list for its changed products and skips their
+base entries. A quantity write only touches the ranking when the product
+is or was low, and reports threshold crossings so the store can push
+alert events. The top N is a lazy merge of the two sorted lists, O(k log n)
+with the bisect maintenance, instead of a scan of the catalog.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# (shortfall, catalog ordinal, sku)
+AlertEntry = Tuple[int, int, str]
+
+
+def is_low_stock(item: Mapping) -> bool:
+    """Low-stock alert condition used by get_low_stock_items."""
+    return item.get("status") == "low" or item.get("quantity", 0) <= item.get("reorder_point", 0)
+
+
+def shortfall(item: Mapping) -> int:
+    """Units above (positive) or below (negative) the reorder point."""
+    return item.get("quantity", 0) - item.get("reorder_point", 0)
+
+
+def rank_low_stock(
+    inventory: Mapping[str, Mapping],
+    low_skus: Iterable[str],
+    ordinal: Callable[[str], int]
+) -> List[AlertEntry]:
+    """Sorted entries for the given low-stock SKUs."""
+    return sorted((shortfall(inventory[sku]), ordinal(sku), sku) for sku in low_skus)
+
+
+def alert_fields(state: str, item: Mapping) -> Dict[str, Any]:
+    """Payload of an "alert" change event ("low" or "cleared")."""
+    return {
+        "state": state,
+        "quantity": item.get("quantity", 0),
+        "reorder_point": item.get("reorder_point", 0),
+        "shortfall": shortfall(item),
+    }
+
+
+class LowStockAlerts:
+    """
+    A store's low-stock ranking: shared base entries plus changed products.
+
+    Usage:
+        alerts = LowStockAlerts(base.low_stock_ranking, base.low_stock_entries, index.product_ordinal)
+        crossing = alerts.update(sku, item)  # "low", "cleared" or None
+        alerts.top(10)
+    """
+
+    def __init__(
+        self,
+        base_ranking: List[AlertEntry],
+        base_entries: Dict[str, AlertEntry],
+        ordinal: Callable[[str], int]
+    ):
+        self._base_ranking = base_ranking
+        self._base_entries = base_entries
+        self._ordinal = ordinal
+        # Changed products: current entry, or None when not low
+        self._changed: Dict[str, Optional[AlertEntry]] = {}
+        # Sorted entries of changed products that are low; replaced, never mutated, so readers can iterate it
+        self._ranking: List[AlertEntry] = []
+        self.count = len(base_ranking)
+
+    def _entry(self, sku: str) -> Optional[AlertEntry]:
+        if sku in self._changed:
+            return self._changed[sku]
+        return self._base_entries.get(sku)
+
+    def update(self, sku: str, item: Mapping) -> Optional[str]:
+        """Re-rank a product after a write; "low"/"cleared" if it crossed its threshold."""
+        old = self._entry(sku)
+        low = is_low_stock(item)
+        if old is None and not low:
+            return None
+        new = (shortfall(item), self._ordinal(sku), sku) if low else None
+        if new == old:
+            return None
+
+        ranking = list(self._ranking)
+        if old is not None and sku in self._changed:
+            del ranking[bisect_left(ranking, old)]
+        if new is not None:
+            insort(ranking, new)
+        self._changed[sku] = new
+        self._ranking = ranking
+        self.count += (new is not None) - (old is not None)
+
+        if old is None:
+            return "low"
+        if new is None:
+            return "cleared"
+        return None
+
+    def top(self, limit: int) -> List[str]:
+        """SKUs of the limit most urgent low-stock products."""
+        changed = self._changed
+        base = (entry for entry in self._base_ranking if entry[2] not in changed)
+        return [sku for _, _, sku in islice(heapq.merge(base, self._ranking), limit)]
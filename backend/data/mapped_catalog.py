@@ -0,0 +1,572 @@
+"""
+Mapped Catalog - Binary catalog snapshots read through mmap.
+
+A snapshot holds a theme's tables and, for a full (base) snapshot, the
+secondary indexes StoreIndex would build from them. Worker processes map
+the same file read-only, so the catalog and its indexes sit once in the
+page cache instead of once per process; nothing is decoded until a row
+is read.
+
+Layout (little-endian on the machines that write it; the byte order is
+checked on open):
+- header: magic, format version, metadata size, generation, base generation
+- metadata (JSON): byte offsets of every section
+- hashed sections: entries (key offset, key length, value offset, value
+  length) in insertion order, an open-addressing slot table keyed by
+  crc32, then the values and the keys. Table values are compact JSON
+  rows; index values are arrays of row positions.
+- text columns: the lowercased search text of every product/customer,
+  one blob with an offsets array, scanned with mmap.find() for queries
+  too short for trigrams
+
+A delta snapshot (generation != base generation) only holds the rows
+changed on top of its base and no index.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import ItemsView, Mapping, ValuesView
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from zlib import crc32
+
+from data.store_index import _trigrams
+
+MAGIC = b"DSCATLOG"
+FORMAT_VERSION = 1
+# magic, format version, metadata size, generation, base generation
+HEADER = struct.Struct("<8sIIQQ")
+
+TABLES = ("inventory", "pricing", "customers", "discounts")
+
+# Two rows, decoded once on open: the compiled discount tables are cached by row identity
+EAGER_TABLES = ("discounts",)
+
+# Offsets are stored as u32
+MAX_FILE_SIZE = 2 ** 32 - 1
+
+# Rows are UTF-8 JSON; decoding str directly skips json.loads' encoding detection
+_decode_row = json.JSONDecoder().decode
+
+
+# ==================== WRITING ====================
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+def _hashed_section(pairs: List[Tuple[bytes, bytes]], start: int) -> Tuple[bytes, Dict[str, int]]:
+    """Encode (key, value) pairs as a hashed section starting at file offset start."""
+    count = len(pairs)
+    slot_count = 8
+    while slot_count < 2 * count:
+        slot_count *= 2
+    mask = slot_count - 1
+
+    values_start = start + 16 * count + 4 * slot_count
+    keys_start = values_start + sum(len(value) for _, value in pairs)
+    if keys_start + sum(len(key) for key, _ in pairs) > MAX_FILE_SIZE:
+        raise ValueError("Catalog too large for the snapshot format")
+
+    entries = []
+    slots = array("I", bytes(4 * slot_count))
+    value_pos, key_pos = values_start, keys_start
+    for position, (key, value) in enumerate(pairs):
+        entries += (key_pos, len(key), value_pos, len(value))
+        value_pos += len(value)
+        key_pos += len(key)
+        slot = crc32(key) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = position + 1
+
+    body = b"".join([
+        array("I", entries).tobytes(), slots.tobytes(),
+        *(value for _, value in pairs), *(key for key, _ in pairs)
+    ])
+    return body, {"offset": start, "count": count, "slots": slot_count}
+
+
+def _text_column(texts: List[str], start: int) -> Tuple[bytes, Dict[str, int]]:
+    """Encode texts as an offsets array (count + 1 entries) followed by one blob."""
+    encoded = [text.encode() for text in texts]
+    blob_start = start + 4 * (len(encoded) + 1)
+    offsets, position = [], blob_start
+    for data in encoded:
+        offsets.append(position)
+        position += len(data)
+    offsets.append(position)
+    if position > MAX_FILE_SIZE:
+        raise ValueError("Catalog too large for the snapshot format")
+    return array("I", offsets).tobytes() + b"".join(encoded), {"offset": start, "count": len(encoded)}
+
+
+def _postings(groups: Dict[str, List[int]]) -> List[Tuple[bytes, bytes]]:
+    return [(key.encode(), array("I", positions).tobytes()) for key, positions in groups.items()]
+
+
+def _index_sections(inventory: Mapping, customers: Mapping) -> Tuple[Dict[str, List[Tuple[bytes, bytes]]], Dict[str, List[str]], List[int]]:
+    """The StoreIndex lookups as posting lists of row positions, plus text columns and name lengths."""
+    names: Dict[str, List[int]] = {}
+    categories: Dict[str, List[int]] = {}
+    name_grams: Dict[str, List[int]] = {}
+    text_grams: Dict[str, List[int]] = {}
+    name_lengths: Dict[int, None] = {}
+    product_text = []
+    for position, item in enumerate(inventory.values()):
+        name = item.get("name", "").lower()
+        category = item.get("category", "").lower()
+        text = f"{name}\0{category}"
+        product_text.append(text)
+        names.setdefault(name, []).append(position)
+        categories.setdefault(category, []).append(position)
+        name_lengths[len(name)] = None
+        for gram in _trigrams(name):
+            name_grams.setdefault(gram, []).append(position)
+        for gram in _trigrams(text):
+            text_grams.setdefault(gram, []).append(position)
+
+    tiers: Dict[str, List[int]] = {}
+    customer_name_grams: Dict[str, List[int]] = {}
+    customer_text_grams: Dict[str, List[int]] = {}
+    customer_text = []
+    for position, customer in enumerate(customers.values()):
+        name = customer.get("name", "").lower()
+        text = f"{name}\0{customer.get('contact', '').lower()}\0{customer.get('location', '').lower()}"
+        customer_text.append(text)
+        tiers.setdefault(customer.get("tier", "").lower(), []).append(position)
+        for gram in _trigrams(name):
+            customer_name_grams.setdefault(gram, []).append(position)
+        for gram in _trigrams(text):
+            customer_text_grams.setdefault(gram, []).append(position)
+
+    sections = {
+        "names": _postings(names),
+        "categories": _postings(categories),
+        "name_grams": _postings(name_grams),
+        "text_grams": _postings(text_grams),
+        "tiers": _postings(tiers),
+        "customer_name_grams": _postings(customer_name_grams),
+        "customer_text_grams": _postings(customer_text_grams),
+    }
+    return sections, {"product_text": product_text, "customer_text": customer_text}, list(name_lengths)
+
+
+def write_catalog(path: Path, tables: Dict[str, Mapping], generation: int, base_generation: int) -> None:
+    """
+    Atomically write a snapshot of tables to path.
+
+    With base_generation == generation it is a full snapshot and carries
+    the indexes; otherwise tables are the changed rows over that base.
+    """
+    full = base_generation == generation
+    meta: Dict[str, Any] = {"byteorder": sys.byteorder, "tables": {}}
+    sections: List[Tuple[str, str, Any]] = [
+        ("tables", name, [
+            (key.encode(), json.dumps(row, separators=(",", ":"), ensure_ascii=False).encode())
+            for key, row in (tables.get(name) or {}).items()
+        ])
+        for name in TABLES
+    ]
+    if full:
+        index, columns, name_lengths = _index_sections(tables.get("inventory") or {}, tables.get("customers") or {})
+        meta.update(index={}, columns={}, name_lengths=name_lengths)
+        sections += [("index", name, pairs) for name, pairs in index.items()]
+        sections += [("columns", name, texts) for name, texts in columns.items()]
+
+    # Section offsets depend on the metadata size and vice versa: lay out again with
+    # more room reserved until the metadata fits
+    reserved = 0
+    while True:
+        start = HEADER.size + reserved
+        start += _pad(start)
+        parts = []
+        for kind, name, payload in sections:
+            encode = _text_column if kind == "columns" else _hashed_section
+            body, layout = encode(payload, start)
+            meta.setdefault(kind, {})[name] = layout
+            parts.append(body + bytes(_pad(len(body))))
+            start += len(parts[-1])
+        meta_bytes = json.dumps(meta, separators=(",", ":")).encode()
+        if len(meta_bytes) <= reserved:
+            break
+        reserved = len(meta_bytes) + 64
+    meta_bytes = meta_bytes.ljust(reserved)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(meta_bytes), generation, base_generation)
+    lead = header + meta_bytes
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(lead + bytes(_pad(len(lead))))
+        for part in parts:
+            f.write(part)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# ==================== READING ====================
+
+class _HashedSection:
+    """Lookup by key in a hashed section: entry position, key and value bounds."""
+
+    __slots__ = ("_mm", "_entries", "_slots", "_mask", "count")
+
+    def __init__(self, mm: mmap.mmap, view: memoryview, layout: Dict[str, int]):
+        start, count, slot_count = layout["offset"], layout["count"], layout["slots"]
+        self._mm = mm
+        self._entries = view[start:start + 16 * count].cast("I")
+        self._slots = view[start + 16 * count:start + 16 * count + 4 * slot_count].cast("I")
+        self._mask = slot_count - 1
+        self.count = count
+
+    def find(self, key: str) -> int:
+        """Position of key, or -1."""
+        data = key.encode()
+        entries, slots, mask, mm = self._entries, self._slots, self._mask, self._mm
+        slot = crc32(data) & mask
+        while True:
+            position = slots[slot]
+            if not position:
+                return -1
+            entry = (position - 1) * 4
+            offset, size = entries[entry], entries[entry + 1]
+            if size == len(data) and mm[offset:offset + size] == data:
+                return position - 1
+            slot = (slot + 1) & mask
+
+    def key_at(self, position: int) -> str:
+        entry = position * 4
+        offset = self._entries[entry]
+        return self._mm[offset:offset + self._entries[entry + 1]].decode()
+
+    def value_at(self, position: int) -> bytes:
+        entry = position * 4 + 2
+        offset = self._entries[entry]
+        return self._mm[offset:offset + self._entries[entry + 1]]
+
+    def row_at(self, position: int) -> Any:
+        return _decode_row(self.value_at(position).decode())
+
+    def bounds_at(self, position: int) -> Tuple[int, int]:
+        entry = position * 4 + 2
+        return self._entries[entry], self._entries[entry + 1]
+
+
+class _MappedItems(ItemsView):
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class _MappedValues(ValuesView):
+    def __iter__(self):
+        return (row for _, row in self._mapping.iter_items())
+
+
+class MappedTable(Mapping):
+    """
+    Read-only table over a mapped snapshot: {key: row}.
+
+    Lookups hash into the file; each read decodes the row's JSON into a
+    new dict (rows are immutable, like the store's copy-on-write rows).
+    Iteration follows the original insertion order.
+    """
+
+    __slots__ = ("_section",)
+
+    def __init__(self, section: _HashedSection):
+        self._section = section
+
+    def __getitem__(self, key: str) -> Any:
+        position = self._section.find(key)
+        if position < 0:
+            raise KeyError(key)
+        return self._section.row_at(position)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        position = self._section.find(key)
+        if position < 0:
+            return default
+        return self._section.row_at(position)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._section.find(key) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        section = self._section
+        return (section.key_at(position) for position in range(section.count))
+
+    def __len__(self) -> int:
+        return self._section.count
+
+    def __repr__(self) -> str:
+        return f"MappedTable({self._section.count} rows)"
+
+    def items(self) -> ItemsView:
+        return _MappedItems(self)
+
+    def values(self) -> ValuesView:
+        return _MappedValues(self)
+
+    def iter_items(self) -> Iterator[Tuple[str, Any]]:
+        section = self._section
+        for position in range(section.count):
+            yield section.key_at(position), section.row_at(position)
+
+    def position(self, key: str) -> int:
+        """Insertion position of key; KeyError if absent."""
+        position = self._section.find(key)
+        if position < 0:
+            raise KeyError(key)
+        return position
+
+    def key_at(self, position: int) -> str:
+        return self._section.key_at(position)
+
+
+class _Postings:
+    """Index section: key -> row positions (ascending)."""
+
+    __slots__ = ("_section", "_view")
+
+    def __init__(self, section: _HashedSection, view: memoryview):
+        self._section = section
+        self._view = view
+
+    def get(self, key: str) -> Optional[memoryview]:
+        position = self._section.find(key)
+        if position < 0:
+            return None
+        offset, size = self._section.bounds_at(position)
+        return self._view[offset:offset + size].cast("I")
+
+
+class _KeyLists:
+    """name_to_skus: lowercase name -> SKUs, like StoreIndex's dict."""
+
+    __slots__ = ("_postings", "_table")
+
+    def __init__(self, postings: _Postings, table: MappedTable):
+        self._postings = postings
+        self._table = table
+
+    def get(self, name: str, default: Any = None) -> Any:
+        positions = self._postings.get(name)
+        if positions is None:
+            return default
+        return [self._table.key_at(position) for position in positions]
+
+
+class _TextColumn:
+    """Lowercased search text per row, scanned in place for short queries."""
+
+    __slots__ = ("_mm", "_offsets", "_start", "_end", "count")
+
+    def __init__(self, mm: mmap.mmap, view: memoryview, layout: Dict[str, int]):
+        start, count = layout["offset"], layout["count"]
+        self._mm = mm
+        self._offsets = view[start:start + 4 * (count + 1)].cast("I")
+        self._start, self._end = self._offsets[0], self._offsets[count]
+        self.count = count
+
+    def text(self, position: int) -> str:
+        return self._mm[self._offsets[position]:self._offsets[position + 1]].decode()
+
+    def containing(self, query: str) -> Iterable[int]:
+        """Positions whose text contains query (plus any match straddling two rows)."""
+        if not query:
+            return range(self.count)
+        needle, mm, offsets, end = query.encode(), self._mm, self._offsets, self._end
+        found = []
+        found_at = mm.find(needle, self._start, end)
+        while found_at >= 0:
+            position = bisect_right(offsets, found_at) - 1
+            found.append(position)
+            found_at = mm.find(needle, offsets[position + 1], end)
+        return found
+
+
+def _candidates(grams: _Postings, column: _TextColumn, query: str) -> Iterable[int]:
+    """
+    Superset of the positions whose text contains query, as TrigramIndex
+    answers it; queries under three characters scan the text column.
+    """
+    query_grams = _trigrams(query)
+    if not query_grams:
+        return column.containing(query)
+    postings = []
+    for gram in query_grams:
+        positions = grams.get(gram)
+        if positions is None:
+            return ()
+        postings.append(positions)
+    postings.sort(key=len)
+    result: Set[int] = set(postings[0])
+    for positions in postings[1:]:
+        if len(result) * 16 < len(positions):
+            # Probe the sorted positions instead of expanding them
+            result = {position for position in result if _has(positions, position)}
+        else:
+            result.intersection_update(positions)
+        if not result:
+            break
+    return result
+
+
+def _has(positions: memoryview, position: int) -> bool:
+    found = bisect_left(positions, position)
+    return found < len(positions) and positions[found] == position
+
+
+class MappedIndex:
+    """
+    StoreIndex's read API over the index sections of a full snapshot.
+
+    Answers match StoreIndex on the same tables. Ordinals are row
+    positions; products and customers are ordered independently, which
+    is all callers compare.
+    """
+
+    def __init__(self, mm: mmap.mmap, view: memoryview, meta: Dict[str, Any],
+                 inventory: MappedTable, customers: MappedTable):
+        index, columns = meta["index"], meta["columns"]
+        postings = {name: _Postings(_HashedSection(mm, view, layout), view) for name, layout in index.items()}
+        self._inventory = inventory
+        self._customers = customers
+        self._names = postings["names"]
+        self._categories = postings["categories"]
+        self._name_grams = postings["name_grams"]
+        self._text_grams = postings["text_grams"]
+        self._tiers = postings["tiers"]
+        self._customer_name_grams = postings["customer_name_grams"]
+        self._customer_text_grams = postings["customer_text_grams"]
+        self._product_text = _TextColumn(mm, view, columns["product_text"])
+        self._customer_text = _TextColumn(mm, view, columns["customer_text"])
+        self._name_lengths: List[int] = meta["name_lengths"]
+        self.name_to_skus = _KeyLists(self._names, inventory)
+
+    # ==================== PRODUCTS ====================
+
+    def product_ordinal(self, sku: str) -> int:
+        """Position of a product in store insertion order."""
+        return self._inventory.position(sku)
+
+    def sort_skus(self, skus: Iterable[str]) -> List[str]:
+        """SKUs in store insertion order."""
+        return sorted(skus, key=self._inventory.position)
+
+    def _skus(self, positions: Iterable[int]) -> List[str]:
+        key_at = self._inventory.key_at
+        return [key_at(position) for position in sorted(positions)]
+
+    def skus_in_category(self, category: str) -> List[str]:
+        return self._skus(self._categories.get(category.lower()) or ())
+
+    def skus_matching_name(self, name_lower: str) -> List[str]:
+        """SKUs whose name contains name_lower or is contained in it."""
+        text = self._product_text.text
+        found = {
+            position for position in _candidates(self._name_grams, self._product_text, name_lower)
+            if name_lower in text(position).split("\0", 1)[0]
+        }
+        length = len(name_lower)
+        for size in self._name_lengths:
+            if size > length:
+                continue
+            for start in range(length - size + 1):
+                positions = self._names.get(name_lower[start:start + size])
+                if positions is not None:
+                    found.update(positions)
+        return self._skus(found)
+
+    def search_products(self, query_lower: str) -> List[str]:
+        """SKUs whose name or category contains query_lower."""
+        text = self._product_text.text
+        return self._skus(
+            position for position in _candidates(self._text_grams, self._product_text, query_lower)
+            if any(query_lower in field for field in text(position).split("\0", 1))
+        )
+
+    # ==================== CUSTOMERS ====================
+
+    def _customer_ids(self, positions: Iterable[int]) -> List[str]:
+        key_at = self._customers.key_at
+        return [key_at(position) for position in sorted(positions)]
+
+    def sort_customer_ids(self, customer_ids: Iterable[str]) -> List[str]:
+        """Customer IDs in store insertion order."""
+        return sorted(customer_ids, key=self._customers.position)
+
+    def customer_ids_in_tier(self, tier: str) -> List[str]:
+        return self._customer_ids(self._tiers.get(tier.lower()) or ())
+
+    def customer_ids_matching_name(self, name_lower: str) -> List[str]:
+        """Customer IDs whose name contains name_lower."""
+        text = self._customer_text.text
+        return self._customer_ids(
+            position for position in _candidates(self._customer_name_grams, self._customer_text, name_lower)
+            if name_lower in text(position).split("\0", 1)[0]
+        )
+
+    def search_customer_ids(self, query_lower: str) -> List[str]:
+        """Customer IDs whose name, contact or location contains query_lower."""
+        text = self._customer_text.text
+        return self._customer_ids(
+            position for position in _candidates(self._customer_text_grams, self._customer_text, query_lower)
+            if any(query_lower in field for field in text(position).split("\0"))
+        )
+
+
+class MappedCatalog:
+    """
+    One snapshot file mapped read-only.
+
+    Usage:
+        catalog = MappedCatalog(path)
+        catalog.tables["inventory"]["SKU-001"]
+        catalog.index.search_products("dark")   # full snapshots only
+
+    Raises ValueError for a file that isn't a snapshot or was written in
+    another format version or byte order. The mapping is released when
+    the last table, index or view over it is dropped.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"{self.path.name} is not a catalog snapshot")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, meta_size, self.generation, self.base_generation = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path.name} is not a catalog snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{self.path.name} has snapshot format {version}, expected {FORMAT_VERSION}")
+        meta = json.loads(mm[HEADER.size:HEADER.size + meta_size])
+        if meta["byteorder"] != sys.byteorder:
+            raise ValueError(f"{self.path.name} was written on a {meta['byteorder']}-endian machine")
+
+        view = memoryview(mm)
+        self.tables: Dict[str, Mapping] = {
+            name: MappedTable(_HashedSection(mm, view, layout)) for name, layout in meta["tables"].items()
+        }
+        for name in EAGER_TABLES:
+            self.tables[name] = dict(self.tables[name].items())
+        self.index: Optional[MappedIndex] = None
+        if "index" in meta:
+            self.index = MappedIndex(mm, view, meta, self.tables["inventory"], self.tables["customers"])
+
+    @property
+    def is_base(self) -> bool:
+        """Full snapshot (with indexes) rather than changed rows over a base."""
+        return self.generation == self.base_generation
+
+    def decode(self) -> Dict[str, Dict[str, Any]]:
+        """Every table as plain dicts (for delta snapshots)."""
+        return {name: dict(table.items()) for name, table in self.tables.items()}
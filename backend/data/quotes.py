@@ -0,0 +1,149 @@
+"""
+Quotes - Multi-line order pricing on compiled discount tables.
+
+The discount structure is stored as {"tier_discounts": {tier: pct},
+"volume_discounts": {"threshold": pct}}. DiscountTables compiles it once
+(the store rebuilds it only when a discount row is replaced): tiers into a
+dict, volume thresholds into a sorted int array searched with bisect
+instead of re-sorting and int()-parsing the keys on every lookup.
+
+price_quote() prices a whole order in one call. Each line gets its tier
+discount plus the volume discount for its quantity, capped at 100% as
+calculate_total_discount does for a single line, and amounts are exact
+integer cents. With NumPy the per-line lookups and arithmetic run as
+array operations (searchsorted over the thresholds); without it the same
+formulas run in a loop.
+"""
+
+import logging
+from bisect import bisect_right
+from typing import Any, Dict, List, Mapping, Sequence
+
+from data.store_aggregates import from_cents, to_cents
+
+logger = logging.getLogger(__name__)
+
+NUMPY_AVAILABLE = False
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    logger.info("NumPy not available; quotes priced line by line")
+
+# Below this many lines the array setup costs more than it saves
+VECTORIZE_MIN_LINES = 64
+
+
+class DiscountTables:
+    """
+    Tier and volume discount tables compiled for lookups.
+
+    Usage:
+        tables = DiscountTables(discounts["tier_discounts"], discounts["volume_discounts"])
+        tables.volume_discount(120)
+    """
+
+    def __init__(self, tier_discounts: Mapping[str, int], volume_discounts: Mapping[str, int]):
+        self.tiers: Dict[str, int] = dict(tier_discounts)
+        steps = sorted(((int(threshold), rate) for threshold, rate in volume_discounts.items()), key=lambda step: step[0])
+        self.thresholds: List[int] = [threshold for threshold, _ in steps]
+        # rates[i] applies from thresholds[i - 1] up; rates[0] (no threshold reached) is 0
+        self.rates: List[int] = [0] + [rate for _, rate in steps]
+        if NUMPY_AVAILABLE:
+            self._threshold_array = np.array(self.thresholds, dtype=np.int64)
+            self._rate_array = np.array(self.rates, dtype=np.int64)
+
+    def tier_discount(self, tier: str) -> int:
+        return self.tiers.get(tier, 0)
+
+    def volume_discount(self, quantity: int) -> int:
+        """Rate of the highest threshold at or below quantity."""
+        return self.rates[bisect_right(self.thresholds, quantity)]
+
+    def volume_discount_array(self, quantities):
+        """volume_discount for an int64 array of quantities (needs NumPy)."""
+        return self._rate_array[np.searchsorted(self._threshold_array, quantities, side="right")]
+
+
+def _margin(revenue_cents: int, cost_cents: int) -> float:
+    return round((revenue_cents - cost_cents) / revenue_cents * 100, 1) if revenue_cents else 0.0
+
+
+def price_quote(
+    tables: DiscountTables,
+    lines: Sequence[Mapping[str, Any]],
+    unknown: Sequence[Any] = ()
+) -> Dict[str, Any]:
+    """
+    Price resolved order lines.
+
+    Args:
+        tables: Compiled discount tables
+        lines: One mapping per line with sku, name, quantity, tier, price and cost
+        unknown: Requested products that couldn't be priced (reported back)
+
+    Returns:
+        Dict with "lines" (per-line list total, tier/volume/total discount %,
+        discount amount, line total, list and net margin), "totals" (the
+        same summed over the order, plus the margin impact in points) and
+        "unknown"
+    """
+    quantities = [int(line["quantity"]) for line in lines]
+    price_cents = [to_cents(line["price"]) for line in lines]
+    cost_cents = [to_cents(line["cost"]) for line in lines]
+    tier_rates = [tables.tier_discount(line["tier"]) for line in lines]
+
+    if NUMPY_AVAILABLE and len(lines) >= VECTORIZE_MIN_LINES:
+        qty = np.array(quantities, dtype=np.int64)
+        volume = tables.volume_discount_array(qty)
+        total_rate = np.minimum(np.array(tier_rates, dtype=np.int64) + volume, 100)
+        list_cents = np.array(price_cents, dtype=np.int64) * qty
+        # Round half up to the cent
+        discount_cents = (list_cents * total_rate + 50) // 100
+        line_cost_cents = np.array(cost_cents, dtype=np.int64) * qty
+        volume_rates, total_rates = volume.tolist(), total_rate.tolist()
+        list_totals, discounts, costs = list_cents.tolist(), discount_cents.tolist(), line_cost_cents.tolist()
+    else:
+        volume_rates = [tables.volume_discount(q) for q in quantities]
+        total_rates = [min(t + v, 100) for t, v in zip(tier_rates, volume_rates)]
+        list_totals = [p * q for p, q in zip(price_cents, quantities)]
+        discounts = [(total * rate + 50) // 100 for total, rate in zip(list_totals, total_rates)]
+        costs = [c * q for c, q in zip(cost_cents, quantities)]
+
+    priced = []
+    for n, line in enumerate(lines):
+        list_total, discount, cost = list_totals[n], discounts[n], costs[n]
+        priced.append({
+            "sku": line["sku"],
+            "name": line["name"],
+            "quantity": quantities[n],
+            "tier": line["tier"],
+            "unit_price": from_cents(price_cents[n]),
+            "list_total": from_cents(list_total),
+            "tier_discount": tier_rates[n],
+            "volume_discount": volume_rates[n],
+            "total_discount": total_rates[n],
+            "discount_amount": from_cents(discount),
+            "line_total": from_cents(list_total - discount),
+            "margin": _margin(list_total, cost),
+            "net_margin": _margin(list_total - discount, cost),
+        })
+
+    list_sum, discount_sum, cost_sum = sum(list_totals), sum(discounts), sum(costs)
+    margin, net_margin = _margin(list_sum, cost_sum), _margin(list_sum - discount_sum, cost_sum)
+    return {
+        "lines": priced,
+        "totals": {
+            "lines": len(priced),
+            "quantity": sum(quantities),
+            "list_total": from_cents(list_sum),
+            "discount_total": from_cents(discount_sum),
+            "net_total": from_cents(list_sum - discount_sum),
+            "cost_total": from_cents(cost_sum),
+            "margin": margin,
+            "net_margin": net_margin,
+            "margin_impact": round(net_margin - margin, 1),
+        },
+        "unknown": list(unknown),
+    }
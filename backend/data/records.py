@@ -0,0 +1,90 @@
+"""
+Records - Read-only row views returned by DemoStore queries.
+
+Query results used to copy every matched row just to add a key:
+{**item, "sku": sku}. A record instead wraps the stored row and holds the
+extra key fields in __slots__, so a result costs one small object per row
+and nothing is copied. Stored rows are replaced copy-on-write (never
+mutated in place), so a record is a stable snapshot of its row.
+
+Records are Mappings: item["name"], item.get("status"), `in`, iteration
+and equality with dicts all work. They are read-only; dict(record)
+gives a mutable copy (json.dumps needs default=dict).
+"""
+
+from collections.abc import Mapping
+from typing import Any, Iterator, Tuple
+
+
+class RowView(Mapping):
+    """
+    Read-only view of a stored row plus extra key fields.
+
+    Subclasses list the extra fields in _EXTRA (also their __slots__).
+    With _EXTRA_FIRST the extras lead and row values win on a clash, as in
+    {"sku": sku, **row}; otherwise they trail and win, as in {**row, "sku": sku}.
+    """
+
+    __slots__ = ("_row",)
+    _EXTRA: Tuple[str, ...] = ()
+    _EXTRA_FIRST = False
+
+    def __init__(self, row: dict):
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._EXTRA and not (self._EXTRA_FIRST and key in self._row):
+            return getattr(self, key)
+        return self._row[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._EXTRA:
+            return self[key]
+        return self._row.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._EXTRA or key in self._row
+
+    def __iter__(self) -> Iterator[str]:
+        if self._EXTRA_FIRST:
+            yield from self._EXTRA
+            yield from (key for key in self._row if key not in self._EXTRA)
+        else:
+            yield from self._row
+            yield from (key for key in self._EXTRA if key not in self._row)
+
+    def __len__(self) -> int:
+        return len(self._row) + sum(1 for key in self._EXTRA if key not in self._row)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+class InventoryRecord(RowView):
+    """Inventory row with its SKU: {**item, "sku": sku}."""
+
+    __slots__ = ("sku",)
+    _EXTRA = ("sku",)
+
+    def __init__(self, row: dict, sku: str):
+        self._row = row
+        self.sku = sku
+
+
+class PricingRecord(RowView):
+    """Pricing row with SKU and product name: {"sku": sku, "name": name, **pricing}."""
+
+    __slots__ = ("sku", "name")
+    _EXTRA = ("sku", "name")
+    _EXTRA_FIRST = True
+
+    def __init__(self, row: dict, sku: str, name: str):
+        self._row = row
+        self.sku = sku
+        self.name = name
+
+
+class CustomerRecord(RowView):
+    """Customer row (already carries its id)."""
+
+    __slots__ = ()
@@ -0,0 +1,369 @@
+"""
+Shared Demo Store - One catalog per theme for every worker process.
+
+A DemoStore per uvicorn worker holds its own copy of each theme (tables
+plus indexes) and its own diverging changes. A SharedDemoStore instead
+maps the theme's newest catalog snapshot (see data/mapped_catalog.py)
+read-only, so all workers share one copy in the page cache, and every
+change is published as a new snapshot generation:
+
+- A full generation holds every table and the indexes; a delta
+  generation holds only the rows its write changed, chained after the
+  previous generation on the same base. A reader on that chain applies
+  just the generations it hasn't seen, so a write costs every reader
+  O(rows written) instead of O(rows changed since the base). A reader on
+  another base maps the base and replays the chain. Past compact_rows
+  changed rows, or compact_generations deltas, the writer publishes a
+  full generation instead.
+- One writer at a time across processes: a mutation takes the theme's
+  lock file (flock), catches up with the newest generation, applies the
+  change, writes the next generation file and then points
+  <theme>.current at it.
+- Readers pick up a new generation in one swap, at request boundaries
+  (get_demo_store calls refresh()) and in snapshot(), so a request never
+  mixes generations. Superseded files are deleted, but stay mapped until
+  their last reader moves on; a chain's files are kept until a newer
+  base replaces it.
+
+The generation files are the persistent state (instead of the live JSON
+file and journal). A missing or incompatible catalog is seeded from the
+theme's initial data, as in the SQLite backend. Needs fcntl (POSIX).
+"""
+
+import fcntl
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set
+
+from data.demo_store import (
+    COLUMNAR_ENABLED, DEFAULT_THEME, THEME_DATA_FILES, DemoStore, _writes
+)
+from data.layered import BaseData
+from data.mapped_catalog import MappedCatalog, write_catalog
+
+logger = logging.getLogger(__name__)
+
+SHARED_DIR = Path(os.getenv("DEMO_STORE_SHARED_DIR", str(Path(__file__).parent / "shared")))
+
+# Changed rows a base may carry in deltas before the writer publishes a full generation
+COMPACT_ROWS = int(os.getenv("DEMO_STORE_SHARED_COMPACT_ROWS", "1024"))
+# Delta generations chained on a base before the writer publishes a full one
+COMPACT_GENERATIONS = int(os.getenv("DEMO_STORE_SHARED_COMPACT_GENERATIONS", "4096"))
+
+GENERATION = struct.Struct("<Q")
+
+
+class CatalogFiles:
+    """
+    A theme's snapshot generations in one directory:
+    <theme>.<generation>.catalog files, the <theme>.current pointer and
+    the <theme>.lock writer lock.
+    """
+
+    def __init__(self, directory: Path, theme: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.theme = theme
+        self._current_path = self.directory / f"{theme}.current"
+        self._lock_fd = os.open(self.directory / f"{theme}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._current: Optional[mmap.mmap] = None
+
+    def path(self, generation: int) -> Path:
+        return self.directory / f"{self.theme}.{generation:012d}.catalog"
+
+    def current_generation(self) -> int:
+        """Newest published generation (0 if none yet): one read from a shared mapping."""
+        current = self._current
+        if current is None:
+            try:
+                fd = os.open(self._current_path, os.O_RDONLY)
+            except FileNotFoundError:
+                return 0
+            try:
+                if os.fstat(fd).st_size < GENERATION.size:
+                    return 0
+                current = self._current = mmap.mmap(fd, GENERATION.size, access=mmap.ACCESS_READ)
+            finally:
+                os.close(fd)
+        return GENERATION.unpack_from(current, 0)[0]
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the theme's writer lock (other processes' writers wait)."""
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def open(self, generation: int) -> MappedCatalog:
+        return MappedCatalog(self.path(generation))
+
+    def publish(self, tables: Mapping[str, Mapping], base_generation: Optional[int] = None) -> int:
+        """
+        Write the next generation and point readers at it (hold locked()).
+
+        A full generation unless base_generation is given, in which case
+        tables are the rows changed since the previous generation (on that
+        base). Returns the generation.
+        """
+        generation = self.current_generation() + 1
+        base_generation = base_generation or generation
+        write_catalog(self.path(generation), tables, generation, base_generation)
+        # Written in place: readers have this file mapped
+        fd = os.open(self._current_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.pwrite(fd, GENERATION.pack(generation), 0)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if base_generation == generation:
+            # A delta only extends the chain; a new base supersedes every older file
+            self._prune(oldest=generation)
+        return generation
+
+    def _prune(self, oldest: int) -> None:
+        """Delete generation files older than oldest (readers that mapped them keep their mapping)."""
+        prefix = f"{self.theme}."
+        for path in self.directory.glob(f"{glob.escape(self.theme)}.*.catalog"):
+            try:
+                generation = int(path.name[len(prefix):-len(".catalog")])
+            except ValueError:
+                continue
+            if generation < oldest:
+                path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        if self._lock_fd >= 0:
+            os.close(self._lock_fd)
+            self._lock_fd = -1
+
+
+class SharedDemoStore(DemoStore):
+    """
+    DemoStore over memory-mapped catalog generations shared by every
+    worker process. Same public API.
+
+    Usage:
+        store = SharedDemoStore(theme="tech")
+        store.refresh()                 # once per request
+        store.get_inventory_by_name("Laptop")
+    """
+
+    def __init__(
+        self,
+        theme: str = DEFAULT_THEME,
+        directory: Optional[Path] = None,
+        seed: bool = True,
+        compact_rows: int = COMPACT_ROWS,
+        compact_generations: int = COMPACT_GENERATIONS
+    ):
+        """
+        Args:
+            theme: Theme whose initial JSON seeds the catalog
+            directory: Directory of the generation files (defaults to SHARED_DIR)
+            seed: Seed from the theme's initial JSON if there is no catalog yet
+            compact_rows: Changed rows before a full generation is written
+            compact_generations: Delta generations before a full one is written
+        """
+        self._directory = Path(directory) if directory else SHARED_DIR
+        self._seed_initial = seed
+        self._compact_rows = compact_rows
+        self._compact_generations = compact_generations
+        self._files: Optional[CatalogFiles] = None
+        self._generation = 0
+        self._base_generation = 0
+        # In-process writers serialize here before taking the lock file (flock is per process)
+        self._write_lock = threading.RLock()
+        # table -> keys changed by the write in progress
+        self._pending: Dict[str, Set[str]] = {}
+        super().__init__(theme=theme)
+
+    # ==================== GENERATIONS ====================
+
+    def _load_data(self) -> None:
+        """Map the theme's newest generation, seeding the catalog if there is none."""
+        with self._write_lock:
+            self.close()
+            self._files = CatalogFiles(self._directory, self.theme)
+            self._generation = self._base_generation = 0
+            with self._files.locked():
+                if self._map(self._files.current_generation()):
+                    return
+                if self._seed_initial:
+                    self._publish_full(self._initial_tables())
+                else:
+                    with self._rw.write_locked(), self._publishing("reset"):
+                        self._layer(BaseData({}))
+
+    def _map(self, generation: int) -> bool:
+        """
+        Swap the store onto a generation. False if it can't be read.
+
+        On the same chain only the newer generations' rows are applied;
+        otherwise the base is mapped and the chain's rows decoded.
+        """
+        if generation <= 0:
+            return False
+        changes: Optional[List[Dict[str, Dict[str, Any]]]] = None
+        try:
+            catalog = self._files.open(generation)
+            if (not catalog.is_base and catalog.base_generation == self._base_generation
+                    and self._base_generation <= self._generation < generation):
+                changes = [self._files.open(g).decode() for g in range(self._generation + 1, generation)]
+                changes.append(catalog.decode())
+            else:
+                if catalog.base_generation == self._base_generation:
+                    base = self._base
+                else:
+                    base_catalog = catalog if catalog.is_base else self._files.open(catalog.base_generation)
+                    base = BaseData(base_catalog.tables, columnar=COLUMNAR_ENABLED, index=base_catalog.index)
+                    logger.info(f"Mapped catalog generation {catalog.base_generation} (theme: {self.theme})")
+                deltas = None if catalog.is_base else self._chain_rows(catalog)
+        except FileNotFoundError:
+            # Superseded and pruned meanwhile: the next refresh reads the newer pointer
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Can't read catalog generation {generation} (theme: {self.theme}): {e}")
+            return False
+
+        if changes is not None:
+            with self._rw.read_locked(), self._publishing("reset"):
+                self._apply_rows(changes)
+        else:
+            with self._rw.write_locked(), self._publishing("reset"):
+                self._layer(base, deltas)
+        self._generation, self._base_generation = generation, catalog.base_generation
+        return True
+
+    def _chain_rows(self, catalog: MappedCatalog) -> Dict[str, Dict[str, Any]]:
+        """Rows changed over the catalog's base, merged from every delta generation up to it."""
+        deltas: Dict[str, Dict[str, Any]] = {}
+        for generation in range(catalog.base_generation + 1, catalog.generation + 1):
+            delta = catalog if generation == catalog.generation else self._files.open(generation)
+            for name, rows in delta.decode().items():
+                deltas.setdefault(name, {}).update(rows)
+        return deltas
+
+    def _apply_rows(self, changes: List[Dict[str, Dict[str, Any]]]) -> None:
+        """Replace the changed rows, oldest generation first, and refresh their summaries (while publishing)."""
+        products: Set[str] = set()
+        customers: Set[str] = set()
+        for rows in changes:
+            for name, table_rows in rows.items():
+                table = self._data[name]
+                for key, row in table_rows.items():
+                    table[key] = row
+            products.update(rows.get("inventory", ()), rows.get("pricing", ()))
+            customers.update(rows.get("customers", ()))
+        for sku in products:
+            self._product_changed(sku)
+        for customer_id in customers:
+            self._customer_changed(customer_id)
+
+    def _publish_full(self, tables: Mapping[str, Mapping]) -> None:
+        """Publish tables as a full generation and map it (hold the writer locks)."""
+        self._map(self._files.publish(tables))
+
+    def refresh(self) -> bool:
+        """
+        Catch up with the newest generation any worker published. Returns
+        True if the data changed.
+
+        Costs one read of the shared pointer when nothing changed. Skipped
+        while another thread of this process is writing: that writer
+        catches up first and publishes what it applies.
+        """
+        files = self._files
+        if files is None:
+            return False
+        generation = files.current_generation()
+        if generation <= self._generation or not self._write_lock.acquire(blocking=False):
+            return False
+        try:
+            return self._map(generation)
+        finally:
+            self._write_lock.release()
+
+    def snapshot(self) -> DemoStore:
+        """Read-only view of the newest generation, for one workflow execution."""
+        self.refresh()
+        return super().snapshot()
+
+    # ==================== WRITES ====================
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """Single writer: catch up, apply the change, publish it as the next generation."""
+        with self._write_lock, self._files.locked():
+            generation = self._files.current_generation()
+            if generation > self._generation:
+                self._map(generation)
+            try:
+                yield
+            finally:
+                if self._pending:
+                    pending, self._pending = self._pending, {}
+                    self._publish_changes(pending)
+
+    def _persist_change(self, table: str, key: str, fields: Dict[str, Any]) -> None:
+        """The change is published as a generation when the write finishes."""
+        self._pending.setdefault(table, set()).add(key)
+
+    def _publish_changes(self, pending: Dict[str, Set[str]]) -> None:
+        """Publish the rows this write changed as the next delta, or compact into a full generation."""
+        changed_rows = sum(len(table.delta) for table in self._data.values())
+        chained = self._generation - self._base_generation
+        if changed_rows > self._compact_rows or chained >= self._compact_generations:
+            self._publish_full(self._snapshot())
+        else:
+            rows = {name: {key: self._data[name][key] for key in keys} for name, keys in pending.items()}
+            self._generation = self._files.publish(rows, base_generation=self._base_generation)
+
+    def _initial_tables(self) -> Dict[str, Any]:
+        try:
+            with open(self._get_theme_files()['initial'], 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load initial data: {e}")
+            return {}
+
+    @_writes
+    def seed(self, data: Dict[str, Any]) -> None:
+        """Replace all tables with data (same shape as the theme JSON) for every worker."""
+        self._publish_full(data)
+
+    @_writes
+    def reset_to_initial(self) -> None:
+        """Publish the theme's initial data as a new full generation."""
+        self._publish_full(self._initial_tables())
+        self.drop_sandboxes()
+        logger.info(f"Data reset to initial state (theme: {self.theme}, shared)")
+
+    def set_theme(self, theme: str) -> None:
+        """Switch to a different theme's catalog."""
+        if theme not in THEME_DATA_FILES:
+            logger.warning(f"Unknown theme '{theme}', using default")
+            theme = DEFAULT_THEME
+        with self._write_lock:
+            self.theme = theme
+            self.drop_sandboxes()
+            self._load_data()
+        logger.info(f"Switched to theme: {theme}")
+
+    def close(self) -> None:
+        """Release the pointer mapping and lock file (mapped generations go with the store)."""
+        super().close()
+        if self._files is not None:
+            self._files.close()
+            self._files = None
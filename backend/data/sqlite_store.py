@@ -0,0 +1,846 @@
+"""
+SQLite Demo Store - DemoStore backend for catalogs too large for a dict.
+
+Same public API as DemoStore, backed by an SQLite database in WAL mode:
+- Indexed columns for SKU, lowercase name, category, tier and status
+- FTS5 trigram tables behind search_inventory/search_customers (and the
+  substring half of the name lookups)
+- Category totals kept by triggers, so summaries don't scan the catalog
+- The theme JSON files are only read to seed the database (reset_to_initial)
+
+Each thread gets its own connection; writes run in IMMEDIATE transactions,
+which makes every read-modify-write atomic across threads and processes.
+snapshot() pins one committed version for a workflow execution (an open
+WAL read transaction, see SQLiteSnapshot). Committed writes made through
+this store are announced on its ChangeFeed.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from data.change_feed import ChangeEvent, ChangeFeed
+from data.low_stock import alert_fields, is_low_stock
+from data.quotes import DiscountTables, price_quote
+from data.store_aggregates import from_cents, to_cents
+from data.store_ops import InventoryWriteMixin
+
+logger = logging.getLogger(__name__)
+
+SQLITE_DIR = Path(os.getenv("DEMO_STORE_SQLITE_DIR", str(Path(__file__).parent)))
+
+# Longest name query whose substrings are matched against names through
+# the index; longer queries fall back to a scan for that half of the match
+MAX_SUBSTRING_QUERY = 120
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS inventory (
+    sku TEXT PRIMARY KEY,
+    ordinal INTEGER NOT NULL,
+    name_lower TEXT NOT NULL,
+    category TEXT NOT NULL,
+    category_lower TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    reorder_point INTEGER NOT NULL,
+    status TEXT,
+    value_cents INTEGER NOT NULL DEFAULT 0,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_inventory_ordinal ON inventory(ordinal);
+CREATE INDEX IF NOT EXISTS idx_inventory_name ON inventory(name_lower, ordinal);
+CREATE INDEX IF NOT EXISTS idx_inventory_category ON inventory(category_lower, ordinal);
+CREATE INDEX IF NOT EXISTS idx_inventory_status ON inventory(status, ordinal);
+-- Low-stock products by shortfall (get_low_stock_alerts reads the first k entries)
+CREATE INDEX IF NOT EXISTS idx_inventory_alerts ON inventory(quantity - reorder_point, ordinal)
+    WHERE status = 'low' OR quantity <= reorder_point;
+
+CREATE TABLE IF NOT EXISTS pricing (
+    sku TEXT PRIMARY KEY,
+    price_cents INTEGER NOT NULL,
+    doc TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS customers (
+    id TEXT PRIMARY KEY,
+    ordinal INTEGER NOT NULL,
+    name_lower TEXT NOT NULL,
+    tier TEXT NOT NULL,
+    tier_lower TEXT NOT NULL,
+    spent_cents INTEGER NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_customers_ordinal ON customers(ordinal);
+CREATE INDEX IF NOT EXISTS idx_customers_tier ON customers(tier_lower, ordinal);
+
+CREATE TABLE IF NOT EXISTS discounts (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    doc TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS category_totals (
+    category TEXT PRIMARY KEY,
+    first_ordinal INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    total_quantity INTEGER NOT NULL,
+    total_value_cents INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS inventory_totals_insert AFTER INSERT ON inventory BEGIN
+    INSERT INTO category_totals VALUES (NEW.category, NEW.ordinal, 1, NEW.quantity, NEW.value_cents)
+    ON CONFLICT(category) DO UPDATE SET
+        count = count + 1,
+        total_quantity = total_quantity + NEW.quantity,
+        total_value_cents = total_value_cents + NEW.value_cents;
+END;
+
+CREATE TRIGGER IF NOT EXISTS inventory_totals_update AFTER UPDATE OF quantity, value_cents ON inventory BEGIN
+    UPDATE category_totals SET
+        total_quantity = total_quantity + NEW.quantity - OLD.quantity,
+        total_value_cents = total_value_cents + NEW.value_cents - OLD.value_cents
+    WHERE category = NEW.category;
+END;
+
+CREATE TRIGGER IF NOT EXISTS inventory_totals_delete AFTER DELETE ON inventory BEGIN
+    UPDATE category_totals SET
+        count = count - 1,
+        total_quantity = total_quantity - OLD.quantity,
+        total_value_cents = total_value_cents - OLD.value_cents
+    WHERE category = OLD.category;
+    DELETE FROM category_totals WHERE category = OLD.category AND count = 0;
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS inventory_fts USING fts5(
+    sku UNINDEXED, name, category, tokenize = 'trigram'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5(
+    id UNINDEXED, name, contact, location, tokenize = 'trigram'
+);
+
+-- Bumped by every write transaction
+CREATE TABLE IF NOT EXISTS store_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_version VALUES (1, 0);
+"""
+
+
+def _fts_phrase(query: str) -> str:
+    """Quote a query as an FTS5 phrase."""
+    return '"' + query.replace('"', '""') + '"'
+
+
+class SQLiteDemoStore(InventoryWriteMixin):
+    """
+    DemoStore backend on SQLite (WAL mode).
+
+    Usage:
+        store = SQLiteDemoStore(theme="tech")
+        store.search_inventory("laptop")
+    """
+
+    # (discounts document, tables) compiled from it
+    _compiled_discounts: Optional[Tuple[str, DiscountTables]] = None
+
+    def __init__(self, theme: str, db_path: Optional[Path] = None, seed: bool = True):
+        """
+        Args:
+            theme: Theme whose initial JSON seeds the database
+            db_path: Database file (defaults to SQLITE_DIR/<theme>-live.sqlite3)
+            seed: Seed from the theme's initial JSON if the database is empty
+        """
+        self.theme = theme
+        self._explicit_path = db_path is not None
+        self.db_path = Path(db_path) if db_path else self._default_path(theme)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # Writers already serialize on the database lock; this one also keeps events in commit order
+        self._write_lock = threading.Lock()
+        self._pending_changes: List[tuple] = []
+        self.changes = ChangeFeed()
+
+        self._connect().executescript(SCHEMA)
+        if seed and self._is_empty():
+            self.reset_to_initial()
+
+    @staticmethod
+    def _default_path(theme: str) -> Path:
+        return SQLITE_DIR / f"{theme}-live.sqlite3"
+
+    # ==================== CONNECTIONS ====================
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection (created on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """
+        IMMEDIATE transaction: takes the write lock up front, so reads inside it are current.
+
+        Changes recorded with _changed() are published once it commits.
+        """
+        with self._write_lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            self._pending_changes = []
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                version = conn.execute(
+                    "UPDATE store_version SET version = version + 1 RETURNING version"
+                ).fetchone()[0]
+                conn.execute("COMMIT")
+                if self._pending_changes:
+                    self.changes.publish(*(
+                        ChangeEvent(change_type, version, key, fields, self.theme)
+                        for change_type, key, fields in self._pending_changes
+                    ))
+
+    def _changed(self, change_type: str, key: Optional[str] = None, fields: Optional[Dict[str, Any]] = None) -> None:
+        """Record a change made in the current write transaction."""
+        self._pending_changes.append((change_type, key, fields))
+
+    def _query(self, sql: str, params=()) -> List[tuple]:
+        return self._connect().execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        """Close every thread's connection."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+    @property
+    def version(self) -> int:
+        """Number of write transactions committed to this database."""
+        return self._query("SELECT version FROM store_version")[0][0]
+
+    def snapshot(self) -> "SQLiteSnapshot":
+        """Read-only view of the current version; close() it when the workflow is done."""
+        return SQLiteSnapshot(self)
+
+    def _is_empty(self) -> bool:
+        return not self._query("SELECT 1 FROM inventory LIMIT 1") and not self._query("SELECT 1 FROM discounts")
+
+    # ==================== SEEDING ====================
+
+    def set_theme(self, theme: str) -> None:
+        """
+        Switch to a different theme's database.
+
+        Versions are per database, so the store starts a new change feed;
+        subscribers of the old one see no further events.
+        """
+        from data.demo_store import THEME_DATA_FILES, DEFAULT_THEME
+        if theme not in THEME_DATA_FILES:
+            logger.warning(f"Unknown theme '{theme}', using default")
+            theme = DEFAULT_THEME
+
+        self.close()
+        self.theme = theme
+        self.changes = ChangeFeed()
+        if not self._explicit_path:
+            self.db_path = self._default_path(theme)
+        self._connect().executescript(SCHEMA)
+        if self._is_empty():
+            self.reset_to_initial()
+        logger.info(f"Switched to theme: {theme}")
+
+    def reset_to_initial(self) -> None:
+        """Reseed the database from the theme's initial JSON file."""
+        from data.demo_store import THEME_DATA_FILES, DEFAULT_THEME
+        files = THEME_DATA_FILES.get(self.theme, THEME_DATA_FILES[DEFAULT_THEME])
+        try:
+            with open(files['initial'], 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to reset data: {e}")
+            data = {"inventory": {}, "pricing": {}, "customers": {}, "discounts": {}}
+        self.seed(data)
+        logger.info(f"Data reset to initial state (theme: {self.theme}, sqlite)")
+
+    def seed(self, data: Dict[str, Any]) -> None:
+        """Replace all tables with data (same shape as the theme JSON)."""
+        inventory = data.get("inventory", {})
+        pricing = data.get("pricing", {})
+        customers = data.get("customers", {})
+
+        with self._write() as conn:
+            for table in ("inventory", "pricing", "customers", "discounts", "category_totals",
+                          "inventory_fts", "customers_fts"):
+                conn.execute(f"DELETE FROM {table}")
+
+            conn.executemany(
+                "INSERT INTO pricing VALUES (?, ?, ?)",
+                ((sku, to_cents(p.get("price", 0)), json.dumps(p)) for sku, p in pricing.items())
+            )
+            conn.executemany(
+                "INSERT INTO inventory VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        sku, ordinal, item.get("name", "").lower(),
+                        item.get("category", "Other"), item.get("category", "").lower(),
+                        item.get("quantity", 0), item.get("reorder_point", 0), item.get("status"),
+                        item.get("quantity", 0) * to_cents(pricing.get(sku, {}).get("price", 0)),
+                        json.dumps(item),
+                    )
+                    for ordinal, (sku, item) in enumerate(inventory.items())
+                )
+            )
+            conn.executemany(
+                "INSERT INTO inventory_fts VALUES (?, ?, ?)",
+                ((sku, item.get("name", "").lower(), item.get("category", "").lower())
+                 for sku, item in inventory.items())
+            )
+            conn.executemany(
+                "INSERT INTO customers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        cid, ordinal, c.get("name", "").lower(), c.get("tier", "Unknown"),
+                        c.get("tier", "").lower(), to_cents(c.get("total_spent", 0)), json.dumps(c),
+                    )
+                    for ordinal, (cid, c) in enumerate(customers.items())
+                )
+            )
+            conn.executemany(
+                "INSERT INTO customers_fts VALUES (?, ?, ?, ?)",
+                ((cid, c.get("name", "").lower(), c.get("contact", "").lower(), c.get("location", "").lower())
+                 for cid, c in customers.items())
+            )
+            conn.execute("INSERT INTO discounts VALUES (1, ?)", (json.dumps(data.get("discounts", {})),))
+            self._changed("reset")
+
+    # ==================== INVENTORY ====================
+
+    def _items(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        """Rows of (sku, doc) as item dicts with "sku" set."""
+        return [{**json.loads(doc), "sku": sku} for sku, doc in self._query(sql, params)]
+
+    def get_all_inventory(self) -> Dict[str, Any]:
+        """Get all inventory items."""
+        return {
+            sku: json.loads(doc)
+            for sku, doc in self._query("SELECT sku, doc FROM inventory ORDER BY ordinal")
+        }
+
+    def get_inventory_by_sku(self, sku: str) -> Optional[Dict[str, Any]]:
+        """Get a single inventory item by SKU."""
+        rows = self._query("SELECT doc FROM inventory WHERE sku = ?", (sku,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def get_inventory_by_category(self, category: str) -> Dict[str, Any]:
+        """Get all inventory items in a category."""
+        return {
+            sku: json.loads(doc)
+            for sku, doc in self._query(
+                "SELECT sku, doc FROM inventory WHERE category_lower = ? ORDER BY ordinal",
+                (category.lower(),)
+            )
+        }
+
+    def _skus_containing(self, query_lower: str, columns: str = "") -> List[str]:
+        """
+        SKUs whose indexed text contains query_lower (candidates only).
+
+        Uses the trigram index for queries of 3+ characters; shorter ones
+        can't be answered from trigrams and scan instead.
+        """
+        if len(query_lower) >= 3:
+            match = f"{columns} : {_fts_phrase(query_lower)}" if columns else _fts_phrase(query_lower)
+            return [row[0] for row in self._query(
+                "SELECT sku FROM inventory_fts WHERE inventory_fts MATCH ?", (match,)
+            )]
+        return [row[0] for row in self._query("SELECT sku FROM inventory")]
+
+    def get_inventory_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Find inventory item by name (prefers exact match, then best partial match)."""
+        name_lower = name.lower().strip()
+
+        # First try exact match
+        items = self._items(
+            "SELECT sku, doc FROM inventory WHERE name_lower = ? ORDER BY ordinal LIMIT 1", (name_lower,)
+        )
+        if items:
+            return items[0]
+
+        # Then try partial matches - search term in item name...
+        candidates = self._skus_containing(name_lower, columns="name")
+        rows = self._query(
+            "SELECT sku, doc, ordinal FROM inventory WHERE sku IN (SELECT value FROM json_each(?))",
+            (json.dumps(candidates),)
+        )
+        matches = {sku: (ordinal, doc) for sku, doc, ordinal in rows
+                   if name_lower in json.loads(doc).get("name", "").lower()}
+
+        # ...or item name in search term
+        if len(name_lower) <= MAX_SUBSTRING_QUERY:
+            substrings = {name_lower[i:j] for i in range(len(name_lower)) for j in range(i + 1, len(name_lower) + 1)}
+            substrings.add("")
+            rows = self._query(
+                "SELECT sku, doc, ordinal FROM inventory WHERE name_lower IN (SELECT value FROM json_each(?))",
+                (json.dumps(sorted(substrings)),)
+            )
+        else:
+            rows = self._query(
+                "SELECT sku, doc, ordinal FROM inventory WHERE instr(?, name_lower) > 0", (name_lower,)
+            )
+        for sku, doc, ordinal in rows:
+            matches[sku] = (ordinal, doc)
+
+        if not matches:
+            return None
+
+        ordered = [{**json.loads(doc), "sku": sku} for sku, (_, doc) in sorted(matches.items(), key=lambda m: m[1][0])]
+
+        # Return the best match - prefer where search term is larger portion of name
+        def match_score(item):
+            item_name = item.get("name", "").lower()
+            if name_lower == item_name:
+                return 1000  # Exact match
+            return len(name_lower) / len(item_name) * 100
+
+        ordered.sort(key=match_score, reverse=True)
+        return ordered[0]
+
+    def search_inventory(self, query: str) -> List[Dict[str, Any]]:
+        """Search inventory by name or category."""
+        query_lower = query.lower()
+        rows = self._query(
+            "SELECT sku, doc FROM inventory WHERE sku IN (SELECT value FROM json_each(?)) ORDER BY ordinal",
+            (json.dumps(self._skus_containing(query_lower)),)
+        )
+        results = []
+        for sku, doc in rows:
+            item = json.loads(doc)
+            if query_lower in item.get("name", "").lower() or query_lower in item.get("category", "").lower():
+                results.append({**item, "sku": sku})
+        return results
+
+    def get_low_stock_items(self) -> List[Dict[str, Any]]:
+        """Get all items with low stock status."""
+        return self._items(
+            "SELECT sku, doc FROM inventory WHERE status = 'low' OR quantity <= reorder_point ORDER BY ordinal"
+        )
+
+    def get_low_stock_alerts(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """The limit most urgent low-stock items (furthest below their reorder point first)."""
+        return self._items(
+            """SELECT sku, doc FROM inventory WHERE status = 'low' OR quantity <= reorder_point
+               ORDER BY quantity - reorder_point, ordinal LIMIT ?""",
+            (limit,)
+        )
+
+    def count_low_stock(self) -> int:
+        """Number of items get_low_stock_items would return."""
+        return self._query("SELECT COUNT(*) FROM inventory WHERE status = 'low' OR quantity <= reorder_point")[0][0]
+
+    def _resolve_sku(self, sku: str, table: str = "inventory") -> Optional[str]:
+        """SKU as given if present in table, else the SKU of a product with that name."""
+        if self._query(f"SELECT 1 FROM {table} WHERE sku = ?", (sku,)):
+            return sku
+        item = self.get_inventory_by_name(sku)
+        return item.get("sku") if item else None
+
+    def _mutate_quantity(self, sku: str, compute: Callable[[int], int]) -> Dict[str, Any]:
+        """Atomic read-modify-write of one product's quantity in an IMMEDIATE transaction."""
+        resolved = self._resolve_sku(sku)
+        if resolved is None:
+            return {"error": f"Product not found: {sku}"}
+        sku = resolved
+
+        with self._write() as conn:
+            previous_qty, doc = conn.execute(
+                "SELECT quantity, doc FROM inventory WHERE sku = ?", (sku,)
+            ).fetchone()
+            item = json.loads(doc)
+            try:
+                new_qty = compute(previous_qty)
+            except ValueError as e:
+                return {"error": str(e), "sku": sku, "name": item["name"], "quantity": previous_qty}
+
+            # Update status based on quantity vs reorder point
+            reorder_point = item.get("reorder_point", 100)
+            status = "low" if new_qty <= reorder_point else "good"
+            conn.execute(
+                """UPDATE inventory SET
+                       quantity = ?, status = ?,
+                       value_cents = ? * COALESCE((SELECT price_cents FROM pricing WHERE sku = ?), 0),
+                       doc = json_set(doc, '$.quantity', ?, '$.status', ?)
+                   WHERE sku = ?""",
+                (new_qty, status, new_qty, sku, new_qty, status, sku)
+            )
+            self._changed("inventory", sku, {"quantity": new_qty, "status": status})
+            updated = {**item, "quantity": new_qty, "status": status}
+            if is_low_stock(item) != is_low_stock(updated):
+                self._changed("alert", sku, alert_fields("low" if is_low_stock(updated) else "cleared", updated))
+
+        return {
+            "sku": sku,
+            "name": item["name"],
+            "previous_quantity": previous_qty,
+            "new_quantity": new_qty,
+            "change": new_qty - previous_qty,
+            "status": status
+        }
+
+    # ==================== PRICING ====================
+
+    def get_all_pricing(self) -> Dict[str, Any]:
+        """Get all pricing data."""
+        return {sku: json.loads(doc) for sku, doc in self._query("SELECT sku, doc FROM pricing ORDER BY rowid")}
+
+    def get_price_by_sku(self, sku: str) -> Optional[Dict[str, Any]]:
+        """Get pricing for a product by SKU."""
+        rows = self._query(
+            """SELECT p.doc, json_extract(i.doc, '$.name') FROM pricing p
+               LEFT JOIN inventory i ON i.sku = p.sku WHERE p.sku = ?""",
+            (sku,)
+        )
+        if rows:
+            return {"sku": sku, "name": rows[0][1] or "Unknown", **json.loads(rows[0][0])}
+        return None
+
+    def get_pricing_by_category(self, category: str) -> List[Dict[str, Any]]:
+        """Get pricing for all products in a category."""
+        rows = self._query(
+            """SELECT i.sku, json_extract(i.doc, '$.name'), p.doc FROM inventory i
+               JOIN pricing p ON p.sku = i.sku
+               WHERE i.category_lower = ? ORDER BY i.ordinal""",
+            (category.lower(),)
+        )
+        return [{"sku": sku, "name": name, **json.loads(doc)} for sku, name, doc in rows]
+
+    def update_price(self, sku: str, new_price: float) -> Dict[str, Any]:
+        """Update the price of a product (atomic)."""
+        resolved = self._resolve_sku(sku, table="pricing")
+        if resolved is None:
+            return {"error": f"Product not found: {sku}"}
+        sku = resolved
+
+        with self._write() as conn:
+            row = conn.execute("SELECT doc FROM pricing WHERE sku = ?", (sku,)).fetchone()
+            if row is None:
+                return {"error": f"Pricing not found for: {sku}"}
+            pricing = json.loads(row[0])
+
+            old_price = pricing["price"]
+            # Recalculate margin
+            cost = pricing["cost"]
+            margin = round((new_price - cost) / new_price * 100, 1)
+            price_cents = to_cents(new_price)
+
+            conn.execute(
+                "UPDATE pricing SET price_cents = ?, doc = json_set(doc, '$.price', ?, '$.margin', ?) WHERE sku = ?",
+                (price_cents, new_price, margin, sku)
+            )
+            conn.execute("UPDATE inventory SET value_cents = quantity * ? WHERE sku = ?", (price_cents, sku))
+            self._changed("pricing", sku, {"price": new_price, "margin": margin})
+            name_row = conn.execute("SELECT json_extract(doc, '$.name') FROM inventory WHERE sku = ?", (sku,)).fetchone()
+
+        return {
+            "sku": sku,
+            "name": name_row[0] if name_row else "Unknown",
+            "old_price": old_price,
+            "new_price": new_price,
+            "margin": margin
+        }
+
+    def get_margin_by_category(self) -> Dict[str, float]:
+        """Average margin of priced products per category."""
+        return {
+            category: margin
+            for category, margin in self._query(
+                """SELECT i.category, AVG(json_extract(p.doc, '$.margin')) FROM inventory i
+                   JOIN pricing p ON p.sku = i.sku
+                   GROUP BY i.category ORDER BY MIN(i.ordinal)"""
+            )
+        }
+
+    # ==================== CUSTOMERS ====================
+
+    def _customers(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        return [json.loads(row[0]) for row in self._query(sql, params)]
+
+    def get_all_customers(self) -> Dict[str, Any]:
+        """Get all customers."""
+        return {cid: json.loads(doc) for cid, doc in self._query("SELECT id, doc FROM customers ORDER BY ordinal")}
+
+    def get_customer_by_id(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """Get a customer by ID."""
+        rows = self._customers("SELECT doc FROM customers WHERE id = ?", (customer_id,))
+        return rows[0] if rows else None
+
+    def _customer_candidates(self, query_lower: str, columns: str = "") -> str:
+        """JSON list of customer IDs that may contain query_lower."""
+        if len(query_lower) >= 3:
+            match = f"{columns} : {_fts_phrase(query_lower)}" if columns else _fts_phrase(query_lower)
+            ids = [row[0] for row in self._query(
+                "SELECT id FROM customers_fts WHERE customers_fts MATCH ?", (match,)
+            )]
+        else:
+            ids = [row[0] for row in self._query("SELECT id FROM customers")]
+        return json.dumps(ids)
+
+    def get_customer_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Find customer by name (partial match)."""
+        name_lower = name.lower()
+        for customer in self._customers(
+            "SELECT doc FROM customers WHERE id IN (SELECT value FROM json_each(?)) ORDER BY ordinal",
+            (self._customer_candidates(name_lower, columns="name"),)
+        ):
+            if name_lower in customer.get("name", "").lower():
+                return customer
+        return None
+
+    def get_customers_by_tier(self, tier: str) -> List[Dict[str, Any]]:
+        """Get all customers in a tier."""
+        return self._customers(
+            "SELECT doc FROM customers WHERE tier_lower = ? ORDER BY ordinal", (tier.lower(),)
+        )
+
+    def search_customers(self, query: str) -> List[Dict[str, Any]]:
+        """Search customers by name, contact, or location."""
+        query_lower = query.lower()
+        return [
+            customer for customer in self._customers(
+                "SELECT doc FROM customers WHERE id IN (SELECT value FROM json_each(?)) ORDER BY ordinal",
+                (self._customer_candidates(query_lower),)
+            )
+            if (query_lower in customer.get("name", "").lower() or
+                query_lower in customer.get("contact", "").lower() or
+                query_lower in customer.get("location", "").lower())
+        ]
+
+    # ==================== DISCOUNTS ====================
+
+    def get_discount_structure(self) -> Dict[str, Any]:
+        """Get the full discount structure."""
+        rows = self._query("SELECT doc FROM discounts WHERE id = 1")
+        return json.loads(rows[0][0]) if rows else {}
+
+    def _discount_tables(self) -> DiscountTables:
+        """Discount tables compiled from the stored document (recompiled when it changes)."""
+        rows = self._query("SELECT doc FROM discounts WHERE id = 1")
+        doc = rows[0][0] if rows else "{}"
+        compiled = self._compiled_discounts
+        if compiled is None or compiled[0] != doc:
+            discounts = json.loads(doc)
+            tables = DiscountTables(discounts.get("tier_discounts", {}), discounts.get("volume_discounts", {}))
+            compiled = self._compiled_discounts = (doc, tables)
+        return compiled[1]
+
+    def get_tier_discount(self, tier: str) -> int:
+        """Get discount percentage for a customer tier."""
+        return self._discount_tables().tier_discount(tier)
+
+    def get_volume_discount(self, quantity: int) -> int:
+        """Get volume discount percentage for a quantity."""
+        return self._discount_tables().volume_discount(quantity)
+
+    def calculate_total_discount(self, tier: str, quantity: int) -> Dict[str, Any]:
+        """Calculate total discount for a customer tier and quantity."""
+        tables = self._discount_tables()
+        tier_disc = tables.tier_discount(tier)
+        volume_disc = tables.volume_discount(quantity)
+        return {
+            "tier": tier,
+            "tier_discount": tier_disc,
+            "quantity": quantity,
+            "volume_discount": volume_disc,
+            "total_discount": min(tier_disc + volume_disc, 100)  # Capped as in quotes.price_quote
+        }
+
+    def _quote_prices(self, skus) -> Dict[str, tuple]:
+        """(name, price, cost) of the priced products among skus."""
+        if not skus:
+            return {}
+        rows = self._query(
+            """SELECT p.sku, json_extract(i.doc, '$.name'), json_extract(p.doc, '$.price'),
+                      json_extract(p.doc, '$.cost')
+               FROM pricing p LEFT JOIN inventory i ON i.sku = p.sku
+               WHERE p.sku IN (SELECT value FROM json_each(?))""",
+            (json.dumps(list(skus)),)
+        )
+        return {sku: (name, price, cost) for sku, name, price, cost in rows}
+
+    def quote(self, lines: Iterable[Tuple[str, int, str]]) -> Dict[str, Any]:
+        """Price a multi-line order in one call (see data/quotes.py)."""
+        lines = list(lines)
+        for product, quantity, _ in lines:
+            if quantity <= 0:
+                return {"error": f"Invalid quantity for {product}: {quantity}"}
+
+        # Lines given by SKU are priced in one query; names are resolved first
+        products = {product for product, _, _ in lines}
+        prices = self._quote_prices(products)
+        skus = {product: product for product in prices}
+        for product in products - prices.keys():
+            skus[product] = self._resolve_sku(product, table="pricing")
+        prices.update(self._quote_prices({sku for sku in skus.values() if sku and sku not in prices}))
+
+        resolved, unknown = [], []
+        for product, quantity, tier in lines:
+            sku = skus[product]
+            if sku not in prices:
+                unknown.append(product)
+                continue
+            name, price, cost = prices[sku]
+            resolved.append({
+                "sku": sku, "name": name or "Unknown", "quantity": quantity,
+                "tier": tier, "price": price, "cost": cost,
+            })
+        return price_quote(self._discount_tables(), resolved, unknown)
+
+    def update_tier_discount(self, tier: str, discount: int) -> Dict[str, Any]:
+        """Update discount percentage for a tier."""
+        with self._write() as conn:
+            row = conn.execute("SELECT doc FROM discounts WHERE id = 1").fetchone()
+            discounts = json.loads(row[0]) if row else {"tier_discounts": {}, "volume_discounts": {}}
+            discounts.setdefault("tier_discounts", {})
+            old_discount = discounts["tier_discounts"].get(tier, 0)
+            discounts["tier_discounts"][tier] = discount
+            conn.execute("INSERT OR REPLACE INTO discounts VALUES (1, ?)", (json.dumps(discounts),))
+            self._changed("discounts", "tier_discounts", {tier: discount})
+
+        return {
+            "tier": tier,
+            "old_discount": old_discount,
+            "new_discount": discount
+        }
+
+    # ==================== SUMMARY METHODS ====================
+
+    def get_inventory_summary(self) -> Dict[str, Any]:
+        """Get summary of inventory by category (from trigger-maintained totals)."""
+        by_category = {}
+        total_products = total_items = total_value_cents = 0
+        for category, count, qty, value in self._query(
+            "SELECT category, count, total_quantity, total_value_cents FROM category_totals ORDER BY first_ordinal"
+        ):
+            by_category[category] = {
+                "count": count,
+                "total_quantity": qty,
+                "total_value": round(value / 100, 2),
+            }
+            total_products += count
+            total_items += qty
+            total_value_cents += value
+
+        return {
+            "total_products": total_products,
+            "total_items": total_items,
+            "total_value": round(total_value_cents / 100, 2),
+            "low_stock_count": self.count_low_stock(),
+            "by_category": by_category
+        }
+
+    def get_customer_summary(self) -> Dict[str, Any]:
+        """Get summary of customers by tier."""
+        tiers = {}
+        total_customers = total_spent = 0
+        for tier, count, spent in self._query(
+            """SELECT tier, COUNT(*), SUM(spent_cents) FROM customers
+               GROUP BY tier ORDER BY MIN(ordinal)"""
+        ):
+            tiers[tier] = {"count": count, "total_spent": from_cents(spent)}
+            total_customers += count
+            total_spent += spent
+
+        return {
+            "total_customers": total_customers,
+            "total_revenue": from_cents(total_spent),
+            "by_tier": tiers
+        }
+
+    def check_aggregates(self) -> List[str]:
+        """Mismatches between the trigger-maintained totals and a full recompute."""
+        actual = self._query(
+            "SELECT category, count, total_quantity, total_value_cents FROM category_totals ORDER BY category"
+        )
+        expected = self._query(
+            """SELECT category, COUNT(*), SUM(quantity), SUM(value_cents) FROM inventory
+               GROUP BY category ORDER BY category"""
+        )
+        if actual != expected:
+            return [f"category_totals: incremental={actual} recomputed={expected}"]
+        return []
+
+
+class SQLiteSnapshot(SQLiteDemoStore):
+    """
+    Reads pinned to one committed version of a SQLiteDemoStore.
+
+    Holds a read transaction on its own connection. In WAL mode that
+    reader keeps seeing the version it started on while writers commit
+    newer ones, and neither waits for the other. Writes made through the
+    snapshot are applied to the live store and are not visible here.
+    close() ends the transaction so WAL checkpoints can move past it.
+    """
+
+    def __init__(self, owner: SQLiteDemoStore):
+        self.theme = owner.theme
+        self.db_path = owner.db_path
+        self._owner = owner
+        self.changes = owner.changes
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(
+            self.db_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("BEGIN")
+        # The first read fixes the version the transaction sees
+        self._version = self._conn.execute("SELECT version FROM store_version").fetchone()[0]
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError("Snapshot is closed")
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def snapshot(self) -> "SQLiteSnapshot":
+        return self
+
+    # Writes go to the live store
+
+    def _mutate_quantity(self, sku: str, compute: Callable[[int], int]) -> Dict[str, Any]:
+        return self._owner._mutate_quantity(sku, compute)
+
+    def update_price(self, sku: str, new_price: float) -> Dict[str, Any]:
+        return self._owner.update_price(sku, new_price)
+
+    def update_tier_discount(self, tier: str, discount: int) -> Dict[str, Any]:
+        return self._owner.update_tier_discount(tier, discount)
+
+    def seed(self, data: Dict[str, Any]) -> None:
+        self._owner.seed(data)
+
+    def reset_to_initial(self) -> None:
+        self._owner.reset_to_initial()
+
+    def set_theme(self, theme: str) -> None:
+        self._owner.set_theme(theme)
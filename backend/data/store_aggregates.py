@@ -0,0 +1,337 @@
+"""
+Store Aggregates - Running totals behind the DemoStore summaries.
+
+Each product and customer's contribution is remembered, so a mutation
+swaps the old contribution for the new one in O(1) instead of re-summing
+the whole table. Money is tracked in integer cents so repeated updates
+can't drift.
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from data.low_stock import is_low_stock
+
+
+def to_cents(amount: float) -> int:
+    """Dollars to integer cents."""
+    return int(round(amount * 100))
+
+
+def from_cents(cents: int):
+    """Cents back to dollars; whole-dollar amounts stay ints, like the source data."""
+    # Division is correctly rounded, so cents / 100 is already round(cents / 100, 2)
+    return cents // 100 if cents % 100 == 0 else cents / 100
+
+
+class StoreAggregates:
+    """
+    Incrementally maintained inventory and customer summaries.
+
+    Products contribute (category, quantity, value, low) where value is
+    quantity * price and low is the is_low_stock alert rule (so the
+summary's count matches count_low_stock). Customers contribute
+    (tier, total_spent).
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self._products: Dict[str, Tuple[str, int, int, bool]] = {}
+        self._categories: Dict[str, Dict[str, int]] = {}
+        self.total_items = 0
+        self.total_value_cents = 0
+        self.low_stock: Set[str] = set()
+
+        self._customers: Dict[str, Tuple[str, int]] = {}
+        self._tiers: Dict[str, Dict[str, int]] = {}
+        self.total_spent_cents = 0
+
+    def rebuild(self, inventory: Dict[str, dict], pricing: Dict[str, dict], customers: Dict[str, dict]) -> None:
+        """Recompute everything from the tables."""
+        self.clear()
+        for sku, item in inventory.items():
+            self.update_product(sku, item, pricing.get(sku, {}).get("price", 0))
+        for customer_id, customer in customers.items():
+            self.update_customer(customer_id, customer)
+
+    # ==================== PRODUCTS ====================
+
+    def update_product(self, sku: str, item: dict, price: float) -> None:
+        """Replace a product's contribution after a quantity/price/status change."""
+        previous = self._subtract_product(sku)
+
+        category = item.get("category", "Other")
+        qty = item.get("quantity", 0)
+        value = qty * to_cents(price)
+        low = is_low_stock(item)
+
+        bucket = self._categories.setdefault(category, {"count": 0, "total_quantity": 0, "total_value": 0})
+        bucket["count"] += 1
+        bucket["total_quantity"] += qty
+        bucket["total_value"] += value
+        self.total_items += qty
+        self.total_value_cents += value
+        if low:
+            self.low_stock.add(sku)
+
+        self._products[sku] = (category, qty, value, low)
+
+        # Only drop an emptied bucket once the new contribution is in, so an
+        # in-place update keeps its category's position in by_category
+        if previous and previous[0] != category:
+            self._prune_category(previous[0])
+
+    def remove_product(self, sku: str) -> None:
+        """Subtract a product's contribution, if any."""
+        previous = self._subtract_product(sku)
+        if previous:
+            self._prune_category(previous[0])
+
+    def _subtract_product(self, sku: str) -> Optional[Tuple[str, int, int, bool]]:
+        previous = self._products.pop(sku, None)
+        if previous is None:
+            return None
+        category, qty, value, _ = previous
+
+        bucket = self._categories[category]
+        bucket["count"] -= 1
+        bucket["total_quantity"] -= qty
+        bucket["total_value"] -= value
+        self.total_items -= qty
+        self.total_value_cents -= value
+        self.low_stock.discard(sku)
+        return previous
+
+    def _prune_category(self, category: str) -> None:
+        if not self._categories[category]["count"]:
+            del self._categories[category]
+
+    def inventory_summary(self) -> Dict[str, Any]:
+        """Summary in the DemoStore.get_inventory_summary() shape."""
+        return {
+            "total_products": len(self._products),
+            "total_items": self.total_items,
+            "total_value": round(self.total_value_cents / 100, 2),
+            "low_stock_count": len(self.low_stock),
+            "by_category": {
+                category: {
+                    "count": bucket["count"],
+                    "total_quantity": bucket["total_quantity"],
+                    "total_value": round(bucket["total_value"] / 100, 2),
+                }
+                for category, bucket in self._categories.items()
+            },
+        }
+
+    # ==================== CUSTOMERS ====================
+
+    def update_customer(self, customer_id: str, customer: dict) -> None:
+        """Replace a customer's contribution after a tier/spend change."""
+        previous = self._subtract_customer(customer_id)
+
+        tier = customer.get("tier", "Unknown")
+        spent = to_cents(customer.get("total_spent", 0))
+
+        bucket = self._tiers.setdefault(tier, {"count": 0, "total_spent": 0})
+        bucket["count"] += 1
+        bucket["total_spent"] += spent
+        self.total_spent_cents += spent
+
+        self._customers[customer_id] = (tier, spent)
+
+        if previous and previous[0] != tier:
+            self._prune_tier(previous[0])
+
+    def remove_customer(self, customer_id: str) -> None:
+        """Subtract a customer's contribution, if any."""
+        previous = self._subtract_customer(customer_id)
+        if previous:
+            self._prune_tier(previous[0])
+
+    def _subtract_customer(self, customer_id: str) -> Optional[Tuple[str, int]]:
+        previous = self._customers.pop(customer_id, None)
+        if previous is None:
+            return None
+        tier, spent = previous
+
+        bucket = self._tiers[tier]
+        bucket["count"] -= 1
+        bucket["total_spent"] -= spent
+        self.total_spent_cents -= spent
+        return previous
+
+    def _prune_tier(self, tier: str) -> None:
+        if not self._tiers[tier]["count"]:
+            del self._tiers[tier]
+
+    def customer_summary(self) -> Dict[str, Any]:
+        """Summary in the DemoStore.get_customer_summary() shape."""
+        return {
+            "total_customers": len(self._customers),
+            "total_revenue": from_cents(self.total_spent_cents),
+            "by_tier": {
+                tier: {"count": bucket["count"], "total_spent": from_cents(bucket["total_spent"])}
+                for tier, bucket in self._tiers.items()
+            },
+        }
+
+    # ==================== CONSISTENCY CHECK ====================
+
+    def diff(self, inventory: Dict[str, dict], pricing: Dict[str, dict],
+             customers: Dict[str, dict]) -> List[str]:
+        """
+        Compare against a full recompute.
+
+        Returns:
+            Human-readable mismatches (empty when consistent)
+        """
+        expected = StoreAggregates()
+        expected.rebuild(inventory, pricing, customers)
+
+        mismatches = []
+        for label, actual, wanted in (
+            ("inventory", self.inventory_summary(), expected.inventory_summary()),
+            ("customers", self.customer_summary(), expected.customer_summary()),
+            ("low_stock", sorted(self.low_stock), sorted(expected.low_stock)),
+        ):
+            if actual != wanted:
+                mismatches.append(f"{label}: incremental={actual} recomputed={wanted}")
+        return mismatches
+
+
+class OverlayAggregates:
+    """
+    Summaries of a shared base plus the rows changed on top of it.
+
+    Holds only the changed rows' contributions and per-category/tier
+    differences from the base, so memory follows the number of changed
+    rows and clear() is O(1). The base StoreAggregates is never modified.
+    """
+
+    def __init__(self, base: StoreAggregates):
+        self.base = base
+        self.clear()
+
+    def clear(self) -> None:
+        self._products: Dict[str, Tuple[str, int, int, bool]] = {}
+        self._categories: Dict[str, Dict[str, int]] = {}
+        self.total_items = 0
+        self.total_value_cents = 0
+        self._low_added: Set[str] = set()
+        self._low_removed: Set[str] = set()
+
+        self._customers: Dict[str, Tuple[str, int]] = {}
+        self._tiers: Dict[str, Dict[str, int]] = {}
+        self.total_spent_cents = 0
+        self._customer_count = 0
+        self._product_count = 0
+
+    # ==================== PRODUCTS ====================
+
+    def update_product(self, sku: str, item: dict, price: float) -> None:
+        """Replace a product's contribution (base or changed) with its current one."""
+        previous = self._products.get(sku) or self.base._products.get(sku)
+        if previous is None:
+            self._product_count += 1
+        else:
+            self._add_product(previous, -1)
+
+        contribution = (item.get("category", "Other"), item.get("quantity", 0),
+                        item.get("quantity", 0) * to_cents(price), is_low_stock(item))
+        self._add_product(contribution, 1)
+        self._products[sku] = contribution
+
+        base_low = sku in self.base.low_stock
+        self._low_added.discard(sku)
+        self._low_removed.discard(sku)
+        if contribution[3] and not base_low:
+            self._low_added.add(sku)
+        elif base_low and not contribution[3]:
+            self._low_removed.add(sku)
+
+    def _add_product(self, contribution: Tuple[str, int, int, bool], sign: int) -> None:
+        category, qty, value, _ = contribution
+        bucket = self._categories.setdefault(category, {"count": 0, "total_quantity": 0, "total_value": 0})
+        bucket["count"] += sign
+        bucket["total_quantity"] += sign * qty
+        bucket["total_value"] += sign * value
+        self.total_items += sign * qty
+        self.total_value_cents += sign * value
+
+    def low_stock(self) -> Set[str]:
+        return (self.base.low_stock - self._low_removed) | self._low_added
+
+    def inventory_summary(self) -> Dict[str, Any]:
+        """Summary in the DemoStore.get_inventory_summary() shape."""
+        by_category = {}
+        for category in list(self.base._categories) + [c for c in self._categories if c not in self.base._categories]:
+            bucket = dict(self.base._categories.get(category, {"count": 0, "total_quantity": 0, "total_value": 0}))
+            for field, change in self._categories.get(category, {}).items():
+                bucket[field] += change
+            if bucket["count"]:
+                by_category[category] = {
+                    "count": bucket["count"],
+                    "total_quantity": bucket["total_quantity"],
+                    "total_value": round(bucket["total_value"] / 100, 2),
+                }
+        return {
+            "total_products": len(self.base._products) + self._product_count,
+            "total_items": self.base.total_items + self.total_items,
+            "total_value": round((self.base.total_value_cents + self.total_value_cents) / 100, 2),
+            "low_stock_count": len(self.base.low_stock) - len(self._low_removed) + len(self._low_added),
+            "by_category": by_category,
+        }
+
+    # ==================== CUSTOMERS ====================
+
+    def update_customer(self, customer_id: str, customer: dict) -> None:
+        """Replace a customer's contribution (base or changed) with its current one."""
+        previous = self._customers.get(customer_id) or self.base._customers.get(customer_id)
+        if previous is None:
+            self._customer_count += 1
+        else:
+            self._add_customer(previous, -1)
+        contribution = (customer.get("tier", "Unknown"), to_cents(customer.get("total_spent", 0)))
+        self._add_customer(contribution, 1)
+        self._customers[customer_id] = contribution
+
+    def _add_customer(self, contribution: Tuple[str, int], sign: int) -> None:
+        tier, spent = contribution
+        bucket = self._tiers.setdefault(tier, {"count": 0, "total_spent": 0})
+        bucket["count"] += sign
+        bucket["total_spent"] += sign * spent
+        self.total_spent_cents += sign * spent
+
+    def customer_summary(self) -> Dict[str, Any]:
+        """Summary in the DemoStore.get_customer_summary() shape."""
+        by_tier = {}
+        for tier in list(self.base._tiers) + [t for t in self._tiers if t not in self.base._tiers]:
+            bucket = dict(self.base._tiers.get(tier, {"count": 0, "total_spent": 0}))
+            for field, change in self._tiers.get(tier, {}).items():
+                bucket[field] += change
+            if bucket["count"]:
+                by_tier[tier] = {"count": bucket["count"], "total_spent": from_cents(bucket["total_spent"])}
+        return {
+            "total_customers": len(self.base._customers) + self._customer_count,
+            "total_revenue": from_cents(self.base.total_spent_cents + self.total_spent_cents),
+            "by_tier": by_tier,
+        }
+
+    # ==================== CONSISTENCY CHECK ====================
+
+    def diff(self, inventory: Dict[str, dict], pricing: Dict[str, dict],
+             customers: Dict[str, dict]) -> List[str]:
+        """Compare against a full recompute (see StoreAggregates.diff)."""
+        expected = StoreAggregates()
+        expected.rebuild(inventory, pricing, customers)
+
+        mismatches = []
+        for label, actual, wanted in (
+            ("inventory", self.inventory_summary(), expected.inventory_summary()),
+            ("customers", self.customer_summary(), expected.customer_summary()),
+            ("low_stock", sorted(self.low_stock()), sorted(expected.low_stock)),
+        ):
+            if actual != wanted:
+                mismatches.append(f"{label}: incremental={actual} recomputed={wanted}")
+        return mismatches
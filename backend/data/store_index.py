@@ -0,0 +1,298 @@
+"""
+Store Index - Secondary indexes for the DemoStore.
+
+Keeps lookups independent of catalog size:
+- lowercase name -> SKUs
+- category -> SKUs
+- tier -> customer IDs
+- trigram inverted indexes for substring search
+
+Results are returned in the store's insertion order (via per-key
+ordinals) so indexed lookups match the original linear scans exactly.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Distinct 3-character substrings of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigrams to keys, for substring queries.
+
+    candidates() returns a superset of the keys whose text contains the
+    query; callers verify each candidate. Queries shorter than three
+    characters can't be answered from trigrams and return None.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}
+
+    def add(self, key: str, text: str) -> None:
+        for gram in _trigrams(text):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key: str, text: str) -> None:
+        for gram in _trigrams(text):
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def candidates(self, query: str) -> Optional[Set[str]]:
+        grams = _trigrams(query)
+        if not grams:
+            return None
+
+        postings = []
+        for gram in grams:
+            keys = self._postings.get(gram)
+            if not keys:
+                return set()
+            postings.append(keys)
+
+        # Intersect smallest first
+        postings.sort(key=len)
+        result = set(postings[0])
+        for keys in postings[1:]:
+            result &= keys
+            if not result:
+                break
+        return result
+
+
+class StoreIndex:
+    """
+    Secondary indexes over the inventory and customer tables.
+
+    Indexed text is lowercased. Product text is "name\\0category" and
+    customer text is "name\\0contact\\0location"; the separator keeps
+    trigrams from spanning fields in a way that could hide a match.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        self._product_ordinals: Dict[str, int] = {}
+        self._product_text: Dict[str, str] = {}
+        self._product_names: Dict[str, str] = {}
+        self._product_categories: Dict[str, str] = {}
+        self.name_to_skus: Dict[str, List[str]] = {}
+        self.category_to_skus: Dict[str, Dict[str, None]] = {}
+        self._name_lengths: Dict[int, int] = {}
+        self.product_names = TrigramIndex()
+        self.product_text = TrigramIndex()
+
+        self._customer_ordinals: Dict[str, int] = {}
+        self._customer_text: Dict[str, str] = {}
+        self._customer_names: Dict[str, str] = {}
+        self._customer_tiers: Dict[str, str] = {}
+        self.tier_to_ids: Dict[str, Dict[str, None]] = {}
+        self.customer_names = TrigramIndex()
+        self.customer_text = TrigramIndex()
+
+        self._next_ordinal = 0
+
+    def rebuild(self, inventory: Dict[str, dict], customers: Dict[str, dict]) -> None:
+        """Index every product and customer from scratch."""
+        self.clear()
+        for sku, item in inventory.items():
+            self.upsert_product(sku, item)
+        for customer_id, customer in customers.items():
+            self.upsert_customer(customer_id, customer)
+
+    # Bump when the fields export_state() returns change
+    STATE_VERSION = 1
+
+    def export_state(self) -> Dict[str, Any]:
+        """
+        Every index as plain containers, for a warm-restart snapshot (see
+        api/warm_state.py). Postings are lists: marshal sorts sets it
+        writes, which costs more than the rest of the snapshot.
+        """
+        return {
+            name: {gram: list(keys) for gram, keys in value._postings.items()}
+            if isinstance(value, TrigramIndex) else value
+            for name, value in vars(self).items()
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StoreIndex":
+        """Index restored from export_state() output, without re-deriving trigrams."""
+        index = cls()
+        for name, value in state.items():
+            current = getattr(index, name)
+            if isinstance(current, TrigramIndex):
+                current._postings = {gram: set(keys) for gram, keys in value.items()}
+            else:
+                setattr(index, name, value)
+        return index
+
+    def _ordinal(self) -> int:
+        self._next_ordinal += 1
+        return self._next_ordinal
+
+    # ==================== PRODUCTS ====================
+
+    def upsert_product(self, sku: str, item: dict) -> None:
+        """Index (or re-index) a product after its name/category changed."""
+        if sku in self._product_ordinals:
+            self.remove_product(sku, keep_ordinal=True)
+        else:
+            self._product_ordinals[sku] = self._ordinal()
+
+        name = item.get("name", "").lower()
+        category = item.get("category", "").lower()
+        text = f"{name}\0{category}"
+
+        self._product_names[sku] = name
+        self._product_categories[sku] = category
+        self._product_text[sku] = text
+        self.name_to_skus.setdefault(name, []).append(sku)
+        self.name_to_skus[name].sort(key=self._product_ordinals.__getitem__)
+        self.category_to_skus.setdefault(category, {})[sku] = None
+        self._name_lengths[len(name)] = self._name_lengths.get(len(name), 0) + 1
+        self.product_names.add(sku, name)
+        self.product_text.add(sku, text)
+
+    def remove_product(self, sku: str, keep_ordinal: bool = False) -> None:
+        """Drop a product from every index."""
+        name = self._product_names.pop(sku, None)
+        if name is None:
+            return
+        category = self._product_categories.pop(sku)
+        text = self._product_text.pop(sku)
+
+        skus = self.name_to_skus.get(name, [])
+        if sku in skus:
+            skus.remove(sku)
+        if not skus:
+            self.name_to_skus.pop(name, None)
+        members = self.category_to_skus.get(category, {})
+        members.pop(sku, None)
+        if not members:
+            self.category_to_skus.pop(category, None)
+        self._name_lengths[len(name)] -= 1
+        if not self._name_lengths[len(name)]:
+            del self._name_lengths[len(name)]
+        self.product_names.remove(sku, name)
+        self.product_text.remove(sku, text)
+        if not keep_ordinal:
+            self._product_ordinals.pop(sku, None)
+
+    def product_ordinal(self, sku: str) -> int:
+        """Position of a product in store insertion order."""
+        return self._product_ordinals[sku]
+
+    def sort_skus(self, skus: Iterable[str]) -> List[str]:
+        """SKUs in store insertion order."""
+        return sorted(skus, key=self._product_ordinals.__getitem__)
+
+    def skus_in_category(self, category: str) -> List[str]:
+        return list(self.category_to_skus.get(category.lower(), {}))
+
+    def skus_matching_name(self, name_lower: str) -> List[str]:
+        """
+        SKUs whose name contains name_lower or is contained in it.
+
+        The second case enumerates substrings of the query (bounded by the
+        query length, limited to lengths some name actually has) instead
+        of scanning names.
+        """
+        found: Set[str] = set()
+
+        candidates = self.product_names.candidates(name_lower)
+        if candidates is None:
+            candidates = self._product_names.keys()
+        for sku in candidates:
+            if name_lower in self._product_names[sku]:
+                found.add(sku)
+
+        length = len(name_lower)
+        for size in self._name_lengths:
+            if size > length:
+                continue
+            for start in range(length - size + 1):
+                skus = self.name_to_skus.get(name_lower[start:start + size])
+                if skus:
+                    found.update(skus)
+
+        return self.sort_skus(found)
+
+    def search_products(self, query_lower: str) -> List[str]:
+        """SKUs whose name or category contains query_lower."""
+        candidates = self.product_text.candidates(query_lower)
+        if candidates is None:
+            candidates = self._product_text.keys()
+        return self.sort_skus(
+            sku for sku in candidates
+            if query_lower in self._product_names[sku] or query_lower in self._product_categories[sku]
+        )
+
+    # ==================== CUSTOMERS ====================
+
+    def upsert_customer(self, customer_id: str, customer: dict) -> None:
+        """Index (or re-index) a customer."""
+        if customer_id in self._customer_ordinals:
+            self.remove_customer(customer_id, keep_ordinal=True)
+        else:
+            self._customer_ordinals[customer_id] = self._ordinal()
+
+        name = customer.get("name", "").lower()
+        tier = customer.get("tier", "").lower()
+        text = f"{name}\0{customer.get('contact', '').lower()}\0{customer.get('location', '').lower()}"
+
+        self._customer_names[customer_id] = name
+        self._customer_tiers[customer_id] = tier
+        self._customer_text[customer_id] = text
+        self.tier_to_ids.setdefault(tier, {})[customer_id] = None
+        self.customer_names.add(customer_id, name)
+        self.customer_text.add(customer_id, text)
+
+    def remove_customer(self, customer_id: str, keep_ordinal: bool = False) -> None:
+        """Drop a customer from every index."""
+        name = self._customer_names.pop(customer_id, None)
+        if name is None:
+            return
+        tier = self._customer_tiers.pop(customer_id)
+        text = self._customer_text.pop(customer_id)
+
+        members = self.tier_to_ids.get(tier, {})
+        members.pop(customer_id, None)
+        if not members:
+            self.tier_to_ids.pop(tier, None)
+        self.customer_names.remove(customer_id, name)
+        self.customer_text.remove(customer_id, text)
+        if not keep_ordinal:
+            self._customer_ordinals.pop(customer_id, None)
+
+    def sort_customer_ids(self, customer_ids: Iterable[str]) -> List[str]:
+        """Customer IDs in store insertion order."""
+        return sorted(customer_ids, key=self._customer_ordinals.__getitem__)
+
+    def customer_ids_in_tier(self, tier: str) -> List[str]:
+        return list(self.tier_to_ids.get(tier.lower(), {}))
+
+    def customer_ids_matching_name(self, name_lower: str) -> List[str]:
+        """Customer IDs whose name contains name_lower."""
+        candidates = self.customer_names.candidates(name_lower)
+        if candidates is None:
+            candidates = self._customer_names.keys()
+        return self.sort_customer_ids(
+            cid for cid in candidates if name_lower in self._customer_names[cid]
+        )
+
+    def search_customer_ids(self, query_lower: str) -> List[str]:
+        """Customer IDs whose name, contact or location contains query_lower."""
+        candidates = self.customer_text.candidates(query_lower)
+        if candidates is None:
+            candidates = self._customer_text.keys()
+        return self.sort_customer_ids(
+            cid for cid in candidates
+            if any(query_lower in field for field in self._customer_text[cid].split("\0"))
+        )
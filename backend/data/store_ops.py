@@ -0,0 +1,100 @@
+"""
+Store Ops - Inventory write operations shared by the DemoStore backends.
+
+Every quantity update is expressed as a compute(previous_qty) -> new_qty
+function handed to the backend's _mutate_quantity(), which runs it as one
+atomic read-modify-write (row lock for the JSON store, an IMMEDIATE
+transaction for SQLite).
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict
+
+
+class InventoryWriteMixin(ABC):
+    """
+    Quantity updates on top of _mutate_quantity(sku, compute).
+
+    compute may raise ValueError to abort without writing; the backend then
+    returns {"error", "sku", "name", "quantity"}.
+    """
+
+    @abstractmethod
+    def _mutate_quantity(self, sku: str, compute: Callable[[int], int]) -> Dict[str, Any]:
+        """Backend hook: apply compute to the SKU's quantity as one atomic read-modify-write."""
+
+    def update_inventory_quantity(self, sku: str, quantity_change: int, operation: str = "set") -> Dict[str, Any]:
+        """
+        Update inventory quantity (atomic).
+
+        Args:
+            sku: Product SKU
+            quantity_change: Amount to change (or absolute value for 'set')
+            operation: 'increase', 'decrease', or 'set'
+
+        Returns:
+            Updated item info with previous and new quantities
+        """
+        if operation == "increase":
+            return self._mutate_quantity(sku, lambda qty: qty + quantity_change)
+        if operation == "decrease":
+            return self._mutate_quantity(sku, lambda qty: max(0, qty - quantity_change))
+        if operation == "set":
+            return self._mutate_quantity(sku, lambda qty: quantity_change)
+        return {"error": f"Unknown operation: {operation}"}
+
+    def increment_inventory(self, sku: str, delta: int) -> Dict[str, Any]:
+        """Atomically add delta (may be negative; floors at zero) to a product's quantity."""
+        return self._mutate_quantity(sku, lambda qty: max(0, qty + delta))
+
+    def scale_inventory_by_percent(self, sku: str, percentage: float, operation: str = "increase") -> Dict[str, Any]:
+        """
+        Atomically change a quantity by a percentage of its current value.
+
+        The change is computed from the quantity read under the row lock,
+        so concurrent percentage updates compound instead of overwriting
+        each other.
+
+        Args:
+            sku: Product SKU or name
+            percentage: Percent of the current quantity (20 for 20%)
+            operation: 'increase', 'decrease', or 'set' (set to percentage% of current)
+
+        Returns:
+            Updated item info, or an error if the change rounds to zero units
+            (for 'set', if the new quantity would be zero or negative)
+        """
+        if operation not in ("increase", "decrease", "set"):
+            return {"error": f"Unknown operation: {operation}"}
+
+        def compute(qty: int) -> int:
+            change = int(round(qty * (percentage / 100)))
+            if change == 0:
+                raise ValueError("Percentage change too small - would result in 0 unit change")
+            if operation == "set":
+                if change < 0:
+                    raise ValueError("Percentage must be positive - would result in a negative quantity")
+                return change
+            return qty + change if operation == "increase" else max(0, qty - change)
+
+        return self._mutate_quantity(sku, compute)
+
+    def compare_and_set_inventory(self, sku: str, expected_quantity: int, new_quantity: int) -> Dict[str, Any]:
+        """
+        Set a quantity only if it still equals expected_quantity.
+
+        Returns:
+            Updated item info with success True, or success False with the
+            current quantity when another writer got there first
+        """
+        def compute(qty: int) -> int:
+            if qty != expected_quantity:
+                raise ValueError("Quantity changed")
+            return new_quantity
+
+        result = self._mutate_quantity(sku, compute)
+        if result.get("error") == "Quantity changed":
+            return {"success": False, "sku": result["sku"], "current_quantity": result["quantity"]}
+        if "error" in result:
+            return result
+        return {"success": True, **result}
@@ -1,4 +1,4 @@
 # ProGear Sales AI - Orchestrator Package
-from .orchestrator import Orchestrator
+from .orchestrator import Orchestrator, get_orchestrator
 
-__all__ = ["Orchestrator"]
+__all__ = ["Orchestrator", "get_orchestrator"]
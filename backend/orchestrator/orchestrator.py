@@ -13,12 +13,13 @@ Key feature for demo: Shows which agents are accessible based on user's
 group membership, with clear success/denied visualization.
 """
 
-from typing import Dict, Any, List, Optional, TypedDict
+from typing import Dict, Any, List, Optional, TypedDict, Callable
 from langgraph.graph import StateGraph, END
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
 import logging
 import json
+import os
 
 from auth.multi_agent_auth import (
     get_multi_agent_exchange,
@@ -26,9 +27,17 @@ from auth.multi_agent_auth import (
 )
 from auth.agent_config import get_agent_config, DEMO_AGENTS
 from data.demo_store import get_demo_store
+from orchestrator.routing import (
+    AGENT_KEYWORDS, SCOPE_DEFINITIONS, FastPathRouter, RoutingDecision,
+    routing_cache, routing_stats
+)
+from orchestrator.quote_request import parse_quote_request
 
 logger = logging.getLogger(__name__)
 
+# Most urgent low-stock items listed in an alert answer
+LOW_STOCK_ALERT_LIMIT = int(os.getenv("LOW_STOCK_ALERT_LIMIT", "10"))
+
 
 class WorkflowState(TypedDict):
     """State passed through the LangGraph workflow."""
@@ -37,6 +46,10 @@ class WorkflowState(TypedDict):
     conversation_context: str  # Previous conversation for context-aware routing
     user_info: Dict[str, Any]
     user_token: str
+    demo_store: Any  # Snapshot of the theme's DemoStore: one version for every read this turn
+    live_store: Any  # The store the snapshot was taken from; writes land here
+    store_version: Optional[int]  # Version the snapshot was taken at, or the live version after a write
+    event_sink: Optional[Callable[[str, Any], None]]  # Live event callback for streaming
 
     # Routing decision
     agents_to_invoke: List[str]
@@ -53,105 +66,6 @@ class WorkflowState(TypedDict):
     final_response: Optional[str]
 
 
-# Agent type to keywords mapping for fallback routing
-# NOTE: These must include both read AND write operation keywords for proper routing
-AGENT_KEYWORDS = {
-    AGENT_SALES: [
-        "order", "quote", "deal", "sale", "revenue", "pipeline", "opportunity",
-        "proposal", "estimate", "fulfill", "create order", "place order",
-        "ship", "deliver"
-    ],
-    AGENT_INVENTORY: [
-        "stock", "inventory", "product", "warehouse", "supply", "available", "in stock",
-        "add", "update", "increase", "decrease", "adjust", "restock", "replenish",
-        "reduce", "remove", "alert", "notify", "reorder", "low stock",
-        "equipment", "item", "goods", "merchandise", "units"
-    ],
-    AGENT_CUSTOMER: [
-        "customer", "account", "client", "contact", "tier", "loyalty", "history",
-        "lookup", "find", "search", "purchased", "transactions"
-    ],
-    AGENT_PRICING: [
-        "price", "discount", "margin", "cost", "profit", "bulk", "wholesale", "retail",
-        "markup", "profitability", "volume", "special price",
-        "reduce", "cut", "lower", "mark down", "mark up"
-    ],
-}
-
-# Scope definitions for each MCP - maps operation type to required scope
-# This enables intent-based scope detection to demonstrate Okta governance
-SCOPE_DEFINITIONS = {
-    AGENT_INVENTORY: {
-        "read": {
-            "scope": "inventory:read",
-            "keywords": ["what", "show", "list", "check", "available", "in stock", "how many", "do we have", "stock level"],
-            "description": "View inventory levels"
-        },
-        "write": {
-            "scope": "inventory:write",
-            "keywords": ["add", "update", "change", "modify", "increase", "decrease", "set", "put", "remove", "delete", "adjust"],
-            "description": "Modify inventory"
-        },
-        "alert": {
-            "scope": "inventory:alert",
-            "keywords": ["alert", "notify", "reorder", "low stock", "warning"],
-            "description": "Inventory alerts"
-        },
-    },
-    AGENT_PRICING: {
-        "read": {
-            "scope": "pricing:read",
-            "keywords": ["price", "cost", "how much", "what's the price", "pricing"],
-            "description": "View prices"
-        },
-        "margin": {
-            "scope": "pricing:margin",
-            "keywords": ["margin", "profit", "markup", "profitability", "cost breakdown"],
-            "description": "View profit margins"
-        },
-        "discount": {
-            "scope": "pricing:discount",
-            "keywords": ["discount", "bulk pricing", "wholesale", "deal", "special price", "volume"],
-            "description": "View/apply discounts"
-        },
-    },
-    AGENT_CUSTOMER: {
-        "read": {
-            "scope": "customer:read",
-            "keywords": ["who", "customer", "account", "client", "contact"],
-            "description": "View customer info"
-        },
-        "lookup": {
-            "scope": "customer:lookup",
-            "keywords": ["lookup", "find", "search", "look up"],
-            "description": "Search customers"
-        },
-        "history": {
-            "scope": "customer:history",
-            "keywords": ["history", "orders", "purchased", "past", "previous", "transactions"],
-            "description": "View purchase history"
-        },
-    },
-    AGENT_SALES: {
-        "read": {
-            "scope": "sales:read",
-            "keywords": ["orders", "sales", "revenue", "pipeline", "show orders"],
-            "description": "View sales data"
-        },
-        "quote": {
-            "scope": "sales:quote",
-            "keywords": ["quote", "proposal", "estimate", "quotation"],
-            "description": "Create quotes"
-        },
-        "order": {
-            "scope": "sales:order",
-            "keywords": ["create order", "place order", "new order", "fulfill", "submit order"],
-            "description": "Create orders"
-        },
-    },
-}
-
-
 class Orchestrator:
     """
     Multi-agent orchestrator using LangGraph.
@@ -160,34 +74,37 @@ class Orchestrator:
     complex multi-agent workflows with proper access control.
     """
 
-    def __init__(self, user_token: str, user_info: Optional[Dict[str, Any]] = None, demo_store=None):
+    def __init__(self, router_llm=None, response_llm=None):
         """
-        Initialize the orchestrator with user context.
+        Build the shared workflow engine.
+
+        The compiled graph and LLM clients are created once and reused for
+        every request. Per-request context (user token, user info, demo store)
+        is passed to process() and travels through WorkflowState.
 
         Args:
-            user_token: User's ID token (for token exchange)
-            user_info: Optional user info from token validation
-            demo_store: Optional theme-specific demo store instance
+            router_llm: Optional chat model for routing decisions
+            response_llm: Optional chat model for response synthesis
         """
-        self.user_token = user_token
-        self.user_info = user_info or {}
-        self.demo_store = demo_store or get_demo_store()
-
         # Get multi-agent token exchange manager
         self.token_exchange = get_multi_agent_exchange()
 
         # Initialize router LLM (fast model for routing decisions)
-        self.router_llm = ChatAnthropic(
+        self.router_llm = router_llm or ChatAnthropic(
             model="claude-sonnet-4-20250514",
             temperature=0,
         )
 
         # Initialize response LLM (for combining results)
-        self.response_llm = ChatAnthropic(
+        self.response_llm = response_llm or ChatAnthropic(
             model="claude-sonnet-4-20250514",
             temperature=0.7,
         )
 
+        # Deterministic router that skips the LLM for unambiguous messages
+        self.fast_router = FastPathRouter()
+        self.fast_path_enabled = os.getenv("ROUTER_FAST_PATH", "true").lower() != "false"
+
         # Build the workflow
         self.workflow = self._build_workflow()
 
@@ -210,22 +127,99 @@ class Orchestrator:
 
         return workflow.compile()
 
+    def _emit(self, state: WorkflowState, event: str, data: Any) -> None:
+        """Push a live event to the request's stream, if it has one."""
+        sink = state.get("event_sink")
+        if sink:
+            sink(event, data)
+
+    def _record_flow(self, state: WorkflowState, step: Dict[str, Any]) -> None:
+        """Append an agent_flow step and stream it."""
+        state["agent_flow"].append(step)
+        self._emit(state, "agent_flow", step)
+
+    def _record_token_exchange(self, state: WorkflowState, record: Dict[str, Any]) -> None:
+        """Append a token exchange record and stream it."""
+        state["token_exchanges"].append(record)
+        self._emit(state, "token_exchange", record)
+
     async def _router_node(self, state: WorkflowState) -> WorkflowState:
         """
         Determine which agents to invoke and what scopes are needed.
 
-        Uses LLM-powered routing with keyword fallback.
+        Uses the local fast-path router for unambiguous messages, otherwise
+        LLM-powered routing with keyword fallback.
         CRITICAL: Detects intent to determine specific scopes needed.
         """
         message = state["user_message"]
         conversation_context = state.get("conversation_context", "")
 
-        state["agent_flow"].append({
+        self._record_flow(state, {
             "step": "router",
             "action": "Analyzing request to determine relevant agents and required scopes",
             "status": "processing"
         })
 
+        # Unambiguous messages are routed locally; the rest go to the LLM
+        decision = None
+        if self.fast_path_enabled:
+            decision = self.fast_router.timed_route(message, state["demo_store"])
+
+        # Repeated questions reuse an earlier LLM decision
+        cache_key = None
+        if decision is None:
+            cache_key = routing_cache.make_key(
+                message,
+                getattr(state["demo_store"], "theme", ""),
+                conversation_context,
+                context_dependent=self.fast_router.is_context_dependent(message)
+            )
+            decision = routing_cache.get(cache_key)
+            if decision:
+                routing_stats.record("cache")
+
+        if decision:
+            agents, agent_scopes = decision.agents, decision.agent_scopes
+            routing_source = decision.source
+            logger.info(f"Routing decision ({routing_source}): agents={agents}, scopes={agent_scopes}")
+        else:
+            agents, agent_scopes, routing_source = await self._llm_route(message, conversation_context)
+            # Keyword fallback means the LLM failed - don't pin that answer
+            if routing_source == "llm" and agents:
+                routing_cache.put(cache_key, RoutingDecision(
+                    agents=agents, agent_scopes=agent_scopes, confidence=1.0, source="llm"
+                ))
+
+        # Default to at least one agent
+        if not agents:
+            agents = [AGENT_SALES]
+            agent_scopes = {AGENT_SALES: ["sales:read"]}
+
+        state["agents_to_invoke"] = agents
+        state["agent_scopes"] = agent_scopes
+
+        # Build scope summary for display
+        scope_summary = ", ".join([f"{a}: {agent_scopes.get(a, [])}" for a in agents])
+        self._record_flow(state, {
+            "step": "router",
+            "action": f"Selected agents: {', '.join(agents)}",
+            "status": "completed",
+            "agents": agents,
+            "scopes": agent_scopes,
+            "routing": routing_source
+        })
+
+        return state
+
+    async def _llm_route(self, message: str, conversation_context: str):
+        """
+        Ask the router LLM which agents and scopes a message needs.
+
+        Falls back to keyword routing if the LLM call or its JSON fails.
+
+        Returns:
+            Tuple of (agents, agent_scopes, routing_source)
+        """
         # Build context section if we have conversation history
         context_section = ""
         if conversation_context:
@@ -302,31 +296,17 @@ Return ONLY the JSON object, no other text."""
                     agent_scopes[agent_type] = config.get("scopes", [f"{agent_type}:read"])
 
             logger.info(f"LLM routing decision: agents={agents}, scopes={agent_scopes}")
+            routing_stats.record("llm")
+            routing_source = "llm"
 
         except Exception as e:
             logger.warning(f"LLM routing failed, using keyword fallback: {e}")
             agents = self._keyword_routing(message)
             agent_scopes = self._detect_scopes_from_keywords(message, agents)
+            routing_stats.record("keyword_fallback")
+            routing_source = "keyword_fallback"
 
-        # Default to at least one agent
-        if not agents:
-            agents = [AGENT_SALES]
-            agent_scopes = {AGENT_SALES: ["sales:read"]}
-
-        state["agents_to_invoke"] = agents
-        state["agent_scopes"] = agent_scopes
-
-        # Build scope summary for display
-        scope_summary = ", ".join([f"{a}: {agent_scopes.get(a, [])}" for a in agents])
-        state["agent_flow"].append({
-            "step": "router",
-            "action": f"Selected agents: {', '.join(agents)}",
-            "status": "completed",
-            "agents": agents,
-            "scopes": agent_scopes
-        })
-
-        return state
+        return agents, agent_scopes, routing_source
 
     def _detect_scopes_from_keywords(self, message: str, agents: List[str]) -> Dict[str, List[str]]:
         """Detect required scopes based on keywords in the message."""
@@ -371,7 +351,7 @@ Return ONLY the JSON object, no other text."""
         agents_to_invoke = state["agents_to_invoke"]
         agent_scopes = state.get("agent_scopes", {})
 
-        state["agent_flow"].append({
+        self._record_flow(state, {
             "step": "token_exchange",
             "action": "Requesting access tokens with required scopes",
             "status": "processing"
@@ -379,9 +359,10 @@ Return ONLY the JSON object, no other text."""
 
         # Exchange tokens for all selected agents with their specific scopes
         exchange_results = await self.token_exchange.exchange_for_all_agents(
-            self.user_token,
+            state["user_token"],
             agents_to_invoke,
-            agent_scopes  # Pass the intent-based scopes
+            agent_scopes,  # Pass the intent-based scopes
+            user_subject=state["user_info"].get("sub")
         )
 
         # Record token exchanges - use "name" for Token Exchange card (MCP name)
@@ -409,7 +390,7 @@ Return ONLY the JSON object, no other text."""
                 exchange_record["error"] = result.get("error", "Unknown error")
                 exchange_record["status"] = "error"
 
-            state["token_exchanges"].append(exchange_record)
+            self._record_token_exchange(state, exchange_record)
 
         # Store results for next node
         state["agent_results"] = exchange_results
@@ -418,7 +399,7 @@ Return ONLY the JSON object, no other text."""
         granted = sum(1 for r in exchange_results.values() if r["success"] and not r.get("access_denied"))
         denied = sum(1 for r in exchange_results.values() if r.get("access_denied"))
 
-        state["agent_flow"].append({
+        self._record_flow(state, {
             "step": "token_exchange",
             "action": f"Token exchange complete: {granted} granted, {denied} denied",
             "status": "completed",
@@ -439,7 +420,7 @@ Return ONLY the JSON object, no other text."""
         """
         agent_results = state["agent_results"]
 
-        state["agent_flow"].append({
+        self._record_flow(state, {
             "step": "process_agents",
             "action": "Running authorized agents",
             "status": "processing"
@@ -455,14 +436,18 @@ Return ONLY the JSON object, no other text."""
             if exchange_result["success"] and not exchange_result.get("access_denied"):
                 # Agent has access - process the request
                 agent_response = await self._invoke_agent(
+                    state["demo_store"],
                     agent_type,
                     state["user_message"],
                     exchange_result,
                     state.get("conversation_context", "")
                 )
                 agent_results[agent_type]["response"] = agent_response
+                if "inventory:write" in exchange_result.get("scopes", []):
+                    # The write published a newer version than the snapshot's
+                    state["store_version"] = state["live_store"].version
 
-                state["agent_flow"].append({
+                self._record_flow(state, {
                     "step": f"{agent_type}_agent",
                     "action": f"{display_name}",
                     "detail": f"Via {exchange_result['agent_info']['name']}",
@@ -471,7 +456,7 @@ Return ONLY the JSON object, no other text."""
                     "scopes": exchange_result.get("scopes", [])
                 })
             elif exchange_result.get("access_denied"):
-                state["agent_flow"].append({
+                self._record_flow(state, {
                     "step": f"{agent_type}_agent",
                     "action": f"{display_name}",
                     "detail": f"DENIED: {', '.join(requested_scopes)}",
@@ -485,6 +470,7 @@ Return ONLY the JSON object, no other text."""
 
     async def _invoke_agent(
         self,
+        store,
         agent_type: str,
         message: str,
         exchange_result: Dict[str, Any],
@@ -502,12 +488,13 @@ Return ONLY the JSON object, no other text."""
         scopes = exchange_result.get("scopes", [])
 
         # Get real data based on agent type
-        data = self._execute_agent_action(agent_type, message, scopes, conversation_context)
+        data = self._execute_agent_action(store, agent_type, message, scopes, conversation_context)
 
         return f"[{agent_name}]\n{data}"
 
     def _execute_agent_action(
         self,
+        store,
         agent_type: str,
         message: str,
         scopes: List[str],
@@ -518,17 +505,17 @@ Return ONLY the JSON object, no other text."""
         full_context = f"{conversation_context}\n{message}".lower()
 
         if agent_type == AGENT_INVENTORY:
-            return self._handle_inventory_action(message_lower, scopes, full_context)
+            return self._handle_inventory_action(store, message_lower, scopes, full_context)
         elif agent_type == AGENT_PRICING:
-            return self._handle_pricing_action(message_lower, scopes, full_context)
+            return self._handle_pricing_action(store, message_lower, scopes, full_context)
         elif agent_type == AGENT_CUSTOMER:
-            return self._handle_customer_action(message_lower, scopes, full_context)
+            return self._handle_customer_action(store, message_lower, scopes, full_context)
         elif agent_type == AGENT_SALES:
-            return self._handle_sales_action(message_lower, scopes, full_context)
+            return self._handle_sales_action(store, message_lower, scopes, full_context)
 
         return "Data not available for this query."
 
-    def _handle_inventory_action(self, message: str, scopes: List[str], context: str) -> str:
+    def _handle_inventory_action(self, store, message: str, scopes: List[str], context: str) -> str:
         """Handle inventory-related actions with real data."""
 
         # Check for write operations (increase, decrease, update, add)
@@ -538,7 +525,7 @@ Return ONLY the JSON object, no other text."""
         if is_write_operation:
             if "inventory:write" in scopes:
                 # Parse the operation from the message
-                return self._execute_inventory_write(message, context)
+                return self._execute_inventory_write(store, message, context)
             else:
                 # User wants to write but doesn't have permission
                 return (
@@ -552,12 +539,15 @@ Return ONLY the JSON object, no other text."""
 
         # Check for low stock / alerts
         if any(kw in message for kw in ["low stock", "alert", "reorder", "warning"]):
-            low_stock = self.demo_store.get_low_stock_items()
-            if not low_stock:
+            # Most urgent first, from the store's low-stock ranking (no catalog scan)
+            total = store.count_low_stock()
+            if not total:
                 return "✅ No low stock alerts - all inventory levels are good!"
-            lines = [f"⚠️ **Low Stock Alert - {len(low_stock)} items need attention:**\n"]
-            for item in low_stock:
+            lines = [f"⚠️ **Low Stock Alert - {total} items need attention:**\n"]
+            for item in store.get_low_stock_alerts(LOW_STOCK_ALERT_LIMIT):
                 lines.append(f"- 🔴 **{item['name']}**: {item['quantity']} units (reorder point: {item['reorder_point']})")
+            if total > LOW_STOCK_ALERT_LIMIT:
+                lines.append(f"\n...and {total - LOW_STOCK_ALERT_LIMIT} more")
             return "\n".join(lines)
 
         # Check for specific product search - use generic search across all keywords
@@ -565,7 +555,7 @@ Return ONLY the JSON object, no other text."""
         words = message.lower().split()
         for word in words:
             if len(word) > 3:  # Only search for words longer than 3 characters
-                results = self.demo_store.search_inventory(word)
+                results = store.search_inventory(word)
                 if results:
                     lines = [f"**{word.title()} Inventory:**\n"]
                     total_qty = 0
@@ -577,7 +567,7 @@ Return ONLY the JSON object, no other text."""
                     return "\n".join(lines)
 
         # Default: return inventory summary
-        summary = self.demo_store.get_inventory_summary()
+        summary = store.get_inventory_summary()
         lines = [
             "**Inventory Summary**\n",
             f"Total Products: {summary['total_products']}",
@@ -593,7 +583,7 @@ Return ONLY the JSON object, no other text."""
 
         return "\n".join(lines)
 
-    def _execute_inventory_write(self, message: str, context: str) -> str:
+    def _execute_inventory_write(self, store, message: str, context: str) -> str:
         """Execute an inventory write operation."""
         import re
 
@@ -615,46 +605,35 @@ Return ONLY the JSON object, no other text."""
         else:
             operation = "set"
 
-        # Try to identify the product - search dynamically from inventory
-        # First get all products and check if any product name appears in the context
-        all_inventory = self.demo_store.get_all_inventory()
-        product_name = None
-
-        # Sort by name length (longest first) to match more specific names first
-        sorted_items = sorted(all_inventory.items(), key=lambda x: len(x[1]['name']), reverse=True)
-
-        for sku, item in sorted_items:
-            name = item['name']
-            if name.lower() in context:
-                product_name = name
-                break
+        # Try to identify the product with indexed lookups (no catalog scan).
+        # First a product name that appears in the context...
+        item = store.get_inventory_by_name(context)
+        if item:
+            # ...preferring the longest such name when names nest
+            for longer in store.search_inventory(item['name']):
+                if len(longer['name']) > len(item['name']) and longer['name'].lower() in context:
+                    item = longer
 
         # If no exact match, try partial matching with search
-        if not product_name:
+        if not item:
             # Extract meaningful words from context (longer than 3 chars)
             words = [w for w in context.split() if len(w) > 3]
             for word in words:
-                results = self.demo_store.search_inventory(word)
+                results = store.search_inventory(word)
                 if results:
                     # Use the first matching product
-                    product_name = results[0]['name']
+                    item = results[0]
                     break
 
-        if not product_name:
-            return "I couldn't identify which product to update. Please specify the product name."
-
-        # Get current quantity for percentage calculation
-        item = self.demo_store.get_inventory_by_name(product_name)
         if not item:
-            return f"Product not found: {product_name}"
+            return "I couldn't identify which product to update. Please specify the product name."
 
+        # Execute the update - percentages are taken of the quantity at
+        # write time, inside the store's row lock
         if is_percentage:
-            # Calculate percentage of current quantity
-            actual_quantity = int(item['quantity'] * quantity / 100)
-            quantity = actual_quantity
-
-        # Execute the update
-        result = self.demo_store.update_inventory_quantity(item['sku'], quantity, operation)
+            result = store.scale_inventory_by_percent(item['sku'], quantity, operation)
+        else:
+            result = store.update_inventory_quantity(item['sku'], quantity, operation)
 
         if "error" in result:
             return f"Error: {result['error']}"
@@ -671,13 +650,46 @@ Return ONLY the JSON object, no other text."""
             f"- Status: {status_icon} {result['status'].upper()}"
         )
 
-    def _handle_pricing_action(self, message: str, scopes: List[str], context: str) -> str:
+    def _execute_quote(self, store, message: str, context: str) -> str:
+        """Price every "<quantity> <product>" line of a quote request in one store call."""
+        # "quote 50 dark truffles, 200 x hazelnut bars and 10 units of champagne truffles for sweet delights"
+        customer, tier, lines = parse_quote_request(store, message, context)
+
+        if not lines:
+            return "Please list the products and quantities to quote, e.g. \"quote 50 dark truffles and 20 milk chocolate bars\"."
+
+        quote = store.quote(lines)
+        if "error" in quote:
+            return f"Error: {quote['error']}"
+        if not quote["lines"]:
+            return f"I couldn't find these products: {', '.join(quote['unknown'])}"
+
+        totals = quote["totals"]
+        header = f"**Quote for {customer['name']} ({tier} tier)**" if customer else f"**Quote ({tier or 'list'} pricing)**"
+        out = [header + "\n"]
+        for line in quote["lines"]:
+            out.append(
+                f"- {line['quantity']:,} x **{line['name']}** @ ${line['unit_price']:,.2f}: "
+                f"${line['list_total']:,.2f} - {line['total_discount']}% "
+                f"(tier {line['tier_discount']}% + volume {line['volume_discount']}%) = **${line['line_total']:,.2f}**"
+            )
+        out.extend([
+            f"\nList Total: ${totals['list_total']:,.2f}",
+            f"Discounts: -${totals['discount_total']:,.2f}",
+            f"**Quote Total: ${totals['net_total']:,.2f}** ({totals['quantity']:,} units)",
+            f"Margin Impact: {totals['margin_impact']:+.1f} pts",
+        ])
+        if quote["unknown"]:
+            out.append(f"\n*Not quoted (product not found): {', '.join(quote['unknown'])}*")
+        return "\n".join(out)
+
+    def _handle_pricing_action(self, store, message: str, scopes: List[str], context: str) -> str:
         """Handle pricing-related actions with real data."""
 
         # Check for discount calculation
         if any(kw in message for kw in ["discount", "calculate", "total"]):
             # Try to find customer and quantity
-            customers = self.demo_store.get_all_customers()
+            customers = store.get_all_customers()
             for customer in customers.values():
                 if customer['name'].lower() in context:
                     # Found a customer, look for quantity
@@ -685,7 +697,7 @@ Return ONLY the JSON object, no other text."""
                     qty_match = re.search(r'(\d+)\s*(?:units?)?', context)
                     quantity = int(qty_match.group(1)) if qty_match else 100
 
-                    discount_info = self.demo_store.calculate_total_discount(customer['tier'], quantity)
+                    discount_info = store.calculate_total_discount(customer['tier'], quantity)
                     return (
                         f"**Discount Calculation for {customer['name']}**\n\n"
                         f"- Customer Tier: {discount_info['tier']}\n"
@@ -696,14 +708,14 @@ Return ONLY the JSON object, no other text."""
                     )
 
         # Check for specific product pricing by searching for matching categories
-        inventory = self.demo_store.get_all_inventory()
-        categories = set(item.get("category") for item in inventory.values())
+        # (category names come from the incrementally maintained summary)
+        categories = store.get_inventory_summary()["by_category"]
 
         for category in categories:
             # Check if the category name or any word in it appears in the message
             category_words = category.lower().split()
             if any(word in message for word in category_words) or category.lower() in message:
-                pricing_list = self.demo_store.get_pricing_by_category(category)
+                pricing_list = store.get_pricing_by_category(category)
                 if pricing_list:
                     lines = [f"**{category} Pricing:**\n"]
                     has_margin_access = "pricing:margin" in scopes
@@ -731,27 +743,15 @@ Return ONLY the JSON object, no other text."""
                     "I can still help you with product prices and discount structures."
                 )
 
-            # Get all pricing and calculate averages by category
-            inventory = self.demo_store.get_all_inventory()
-            pricing = self.demo_store.get_all_pricing()
-
-            categories = {}
-            for sku, item in inventory.items():
-                if sku in pricing:
-                    cat = item['category']
-                    if cat not in categories:
-                        categories[cat] = []
-                    categories[cat].append(pricing[sku]['margin'])
-
+            # Average margins by category (vectorized in the store)
             lines = ["**Margin Analysis by Category:**\n"]
-            for cat, margins in sorted(categories.items()):
-                avg = sum(margins) / len(margins)
+            for cat, avg in sorted(store.get_margin_by_category().items()):
                 lines.append(f"- {cat}: {avg:.1f}% average margin")
 
             return "\n".join(lines)
 
         # Default: return discount structure
-        discounts = self.demo_store.get_discount_structure()
+        discounts = store.get_discount_structure()
         return (
             "**Pricing & Discounts**\n\n"
             "**Tier Discounts:**\n"
@@ -761,11 +761,11 @@ Return ONLY the JSON object, no other text."""
             + "\n\n*Discounts are combinable (e.g., Platinum + 500 units = 25% off)*"
         )
 
-    def _handle_customer_action(self, message: str, scopes: List[str], context: str) -> str:
+    def _handle_customer_action(self, store, message: str, scopes: List[str], context: str) -> str:
         """Handle customer-related actions with real data."""
 
         # Check for specific customer lookup
-        customers = self.demo_store.get_all_customers()
+        customers = store.get_all_customers()
         for customer in customers.values():
             if customer['name'].lower() in context or customer['contact'].lower() in context:
                 tier_emoji = {"Platinum": "💎", "Gold": "🥇", "Silver": "🥈", "Bronze": "🥉"}.get(customer['tier'], "")
@@ -782,7 +782,7 @@ Return ONLY the JSON object, no other text."""
         # Check for tier-based query
         for tier in ["platinum", "gold", "silver", "bronze"]:
             if tier in message:
-                tier_customers = self.demo_store.get_customers_by_tier(tier.title())
+                tier_customers = store.get_customers_by_tier(tier.title())
                 if tier_customers:
                     tier_emoji = {"Platinum": "💎", "Gold": "🥇", "Silver": "🥈", "Bronze": "🥉"}.get(tier.title(), "")
                     customers_sorted = sorted(tier_customers, key=lambda x: x['total_spent'], reverse=True)
@@ -795,7 +795,7 @@ Return ONLY the JSON object, no other text."""
                     return "\n".join(lines)
 
         # Default: customer summary
-        summary = self.demo_store.get_customer_summary()
+        summary = store.get_customer_summary()
         tier_emoji = {"Platinum": "💎", "Gold": "🥇", "Silver": "🥈", "Bronze": "🥉"}
 
         lines = [
@@ -813,15 +813,19 @@ Return ONLY the JSON object, no other text."""
 
         return "\n".join(lines)
 
-    def _handle_sales_action(self, message: str, scopes: List[str], context: str) -> str:
+    def _handle_sales_action(self, store, message: str, scopes: List[str], context: str) -> str:
         """Handle sales-related actions."""
+        quote_keywords = SCOPE_DEFINITIONS[AGENT_SALES]["quote"]["keywords"]
+        if "sales:quote" in scopes and any(kw in message for kw in quote_keywords):
+            return self._execute_quote(store, message, context)
+
         # Sales data is more complex - for now return summary with real customer/inventory context
 
-        summary = self.demo_store.get_customer_summary()
-        inv_summary = self.demo_store.get_inventory_summary()
+        summary = store.get_customer_summary()
+        inv_summary = store.get_inventory_summary()
 
         # Get top customers for orders context
-        platinum = self.demo_store.get_customers_by_tier("Platinum")
+        platinum = store.get_customers_by_tier("Platinum")
         top_customer = max(platinum, key=lambda x: x['total_spent']) if platinum else None
 
         lines = [
@@ -835,7 +839,7 @@ Return ONLY the JSON object, no other text."""
             lines.append(f"\n**Top Customer:** {top_customer['name']} (${top_customer['total_spent']:,})")
 
         # Add discount info for context
-        discounts = self.demo_store.get_discount_structure()
+        discounts = store.get_discount_structure()
         lines.append("\n**Available Discounts:**")
         lines.append(f"- Tier-based: up to {max(discounts.get('tier_discounts', {}).values() or [0])}%")
         lines.append(f"- Volume-based: up to {max(discounts.get('volume_discounts', {}).values() or [0])}%")
@@ -886,15 +890,33 @@ Provide a concise, helpful response that combines the relevant information.
 If the user's message refers to something from the conversation history (like "it", "that", "yes"), use the context to understand what they mean.
 If some agents were denied, acknowledge what information is missing but focus on what IS available."""
 
+            synthesis_messages = [
+                SystemMessage(content="You are a helpful AI sales assistant."),
+                HumanMessage(content=synthesis_prompt)
+            ]
+            parts = []
             try:
-                response = await self.response_llm.ainvoke([
-                    SystemMessage(content="You are a helpful AI sales assistant."),
-                    HumanMessage(content=synthesis_prompt)
-                ])
-                final_response = response.content
+                if state.get("event_sink"):
+                    # Stream tokens to the client as they arrive
+                    async for chunk in self.response_llm.astream(synthesis_messages):
+                        text = _chunk_text(chunk)
+                        if text:
+                            parts.append(text)
+                            self._emit(state, "token", text)
+                    final_response = "".join(parts)
+                else:
+                    response = await self.response_llm.ainvoke(synthesis_messages)
+                    final_response = response.content
             except Exception as e:
                 logger.error(f"Response synthesis failed: {e}")
                 final_response = combined_data
+                if parts:
+                    # The client already shows part of the synthesized text;
+                    # tell it to drop that rather than append the fallback.
+                    # The final event carries the fallback content.
+                    self._emit(state, "error", {"message": "Response synthesis failed", "discard_tokens": True})
+                else:
+                    self._emit(state, "token", final_response)
 
         elif denied_agents:
             final_response = (
@@ -908,13 +930,18 @@ If some agents were denied, acknowledge what information is missing but focus on
                 "Try asking about orders, inventory, pricing, or customer information."
             )
 
+        if not responses:
+            self._emit(state, "token", final_response)
+
         state["final_response"] = final_response
 
         # Add denied agents info if any
         if denied_agents:
-            state["final_response"] += f"\n\n[Note: Limited access - denied agents: {', '.join(denied_agents)}]"
+            note = f"\n\n[Note: Limited access - denied agents: {', '.join(denied_agents)}]"
+            state["final_response"] += note
+            self._emit(state, "token", note)
 
-        state["agent_flow"].append({
+        self._record_flow(state, {
             "step": "generate_response",
             "action": "Generated combined response",
             "status": "completed"
@@ -922,27 +949,51 @@ If some agents were denied, acknowledge what information is missing but focus on
 
         return state
 
-    async def process(self, message: str, conversation_context: str = "") -> Dict[str, Any]:
+    async def process(
+        self,
+        message: str,
+        conversation_context: str = "",
+        user_token: str = "",
+        user_info: Optional[Dict[str, Any]] = None,
+        demo_store=None,
+        event_sink: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
         """
         Process a user message through the orchestrator.
 
         Args:
             message: User's message
             conversation_context: Previous conversation history for context-aware routing
+            user_token: User's ID token (for token exchange)
+            user_info: Optional user info from token validation
+            demo_store: Optional theme-specific demo store instance; the
+                workflow reads from one snapshot of it (writes go through)
+            event_sink: Optional callback(event, data) receiving agent_flow,
+                token_exchange and token events as the workflow runs
 
         Returns:
             Dict with:
             - content: Final response
             - agent_flow: Steps taken
             - token_exchanges: Token exchange results per agent
+            - store_version: Store version every agent read from, or the
+              version after this turn's write
         """
+        # One version for every handler in this turn; writers keep publishing without waiting on it
+        live_store = demo_store or get_demo_store()
+        snapshot = live_store.snapshot()
+
         # Initialize state
         initial_state: WorkflowState = {
             "messages": [],
             "user_message": message,
             "conversation_context": conversation_context,
-            "user_info": self.user_info,
-            "user_token": self.user_token,
+            "user_info": user_info or {},
+            "user_token": user_token,
+            "demo_store": snapshot,
+            "live_store": live_store,
+            "store_version": snapshot.version,
+            "event_sink": event_sink,
             "agents_to_invoke": [],
             "agent_scopes": {},  # Will be populated by router based on intent
             "agent_results": {},
@@ -952,10 +1003,37 @@ If some agents were denied, acknowledge what information is missing but focus on
         }
 
         # Run the workflow
-        final_state = await self.workflow.ainvoke(initial_state)
+        try:
+            final_state = await self.workflow.ainvoke(initial_state)
+        finally:
+            snapshot.close()
 
         return {
             "content": final_state["final_response"],
             "agent_flow": final_state["agent_flow"],
             "token_exchanges": final_state["token_exchanges"],
+            "store_version": final_state["store_version"],
         }
+
+
+def _chunk_text(chunk) -> str:
+    """Extract text from a streamed message chunk (string or content blocks)."""
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") for block in content
+        if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+
+# Singleton instance - graph and LLM clients are shared across requests
+_orchestrator: Optional[Orchestrator] = None
+
+
+def get_orchestrator() -> Orchestrator:
+    """Get or create the Orchestrator singleton."""
+    global _orchestrator
+    if _orchestrator is None:
+        _orchestrator = Orchestrator()
+    return _orchestrator
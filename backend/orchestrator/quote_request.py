@@ -0,0 +1,105 @@
+"""
+Quote Request - Turns a free-text quote request into store.quote() lines.
+
+"quote 50 dark truffles, 200 x hazelnut bars and 10 units of champagne
+truffles for sweet delights" is split into "<quantity> <product>" lines.
+People rarely type a catalog name verbatim, so each product phrase is
+matched by its words: every word (singularised) must appear in the
+product's name or category, found through the store's indexed
+search_inventory, and candidates are ranked by how many words hit the
+name and then by how much of the name the phrase covers.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from orchestrator.routing import STOP_WORDS
+
+TIERS = ["Platinum", "Gold", "Silver", "Bronze"]
+
+_WORD_RE = re.compile(r"[a-z0-9%']+")
+_LINE_RE = re.compile(r"(\d+)\s*(?:x\s+|units?\s+(?:of\s+)?)?([a-z][a-z0-9 %.'&-]*)")
+_TRAILER_RE = re.compile(r"\s(?:for|at|to|per)\s")
+_CUSTOMER_RE = re.compile(r"\bfor\s+([a-z][a-z0-9 '&.-]*)")
+
+
+def _singular(word: str) -> str:
+    """Crude English singular: truffles -> truffle, boxes -> box, berries -> berry."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("xes", "ches", "shes", "sses")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def match_product(store, phrase: str) -> Optional[Dict[str, Any]]:
+    """
+    Best catalog product for a product phrase, or None.
+
+    Products must contain every phrase word in their name or category;
+    words shorter than three characters and stop words are ignored.
+    """
+    words = [
+        _singular(word) for word in _WORD_RE.findall(phrase.lower())
+        if len(word) >= 3 and word not in STOP_WORDS
+    ]
+    if not words:
+        return None
+
+    candidates: Optional[Dict[str, Any]] = None
+    for word in dict.fromkeys(words):
+        found = {item["sku"]: item for item in store.search_inventory(word)}
+        candidates = found if candidates is None else {
+            sku: item for sku, item in candidates.items() if sku in found
+        }
+        if not candidates:
+            return None
+
+    def score(item) -> Tuple[int, float]:
+        name = item.get("name", "").lower()
+        name_hits = sum(1 for word in words if word in name)
+        return name_hits, len(phrase) / max(len(name), 1)
+
+    # max() keeps the first of equal scores, i.e. store order
+    return max(candidates.values(), key=score)
+
+
+def parse_quote_request(
+    store,
+    message: str,
+    context: str
+) -> Tuple[Optional[Dict[str, Any]], Optional[str], List[Tuple[str, int, str]]]:
+    """
+    Customer, tier and (SKU or product phrase, quantity, tier) lines of a quote request.
+
+    The customer is one named in the conversation, else the one after
+    "for"; the tier is the customer's, else a tier named in the message.
+    Phrases that match no product are passed through so store.quote()
+    reports them under "unknown".
+    """
+    message = message.lower()
+    customer = next(
+        (c for c in store.get_all_customers().values() if c["name"].lower() in context),
+        None
+    )
+    if customer is None:
+        named = _CUSTOMER_RE.search(message)
+        if named and named.group(1).strip().title() not in TIERS:
+            customer = store.get_customer_by_name(named.group(1).strip())
+    tier = customer["tier"] if customer else next(
+        (t for t in TIERS if t.lower() in message),
+        None
+    )
+
+    lines = []
+    for segment in re.split(r",|;|\band\b", message):
+        match = _LINE_RE.search(segment)
+        if not match:
+            continue
+        product = _TRAILER_RE.split(f" {match.group(2)} ")[0].strip()
+        item = match_product(store, product) if product else None
+        lines.append((item["sku"] if item else product, int(match.group(1)), tier or ""))
+
+    return customer, tier, lines
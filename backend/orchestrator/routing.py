@@ -0,0 +1,520 @@
+"""
+Routing - Agent/scope routing tables and the deterministic fast-path router.
+
+Most chat messages can be routed from keywords alone ("show low stock",
+"margins on truffles", "platinum customers"). The FastPathRouter scores a
+message against AGENT_KEYWORDS, SCOPE_DEFINITIONS and the theme's product,
+category and customer names, and only answers when the decision is
+unambiguous. Everything else (including context-dependent follow-ups like
+"yes, do it") falls through to the LLM router.
+"""
+
+import copy
+import hashlib
+import os
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from auth.agent_config import on_agent_registry_reload
+from auth.multi_agent_auth import (
+    AGENT_SALES, AGENT_INVENTORY, AGENT_CUSTOMER, AGENT_PRICING
+)
+
+DEFAULT_ROUTING_CACHE_SIZE = int(os.getenv("ROUTER_CACHE_MAX_ENTRIES", "512"))
+DEFAULT_ROUTING_CACHE_TTL = float(os.getenv("ROUTER_CACHE_TTL_SECONDS", "3600"))
+# Entity vocabularies kept by the fast-path router (one per base dataset)
+DEFAULT_VOCAB_CACHE_SIZE = int(os.getenv("ROUTER_VOCAB_CACHE_SIZE", "32"))
+
+
+# Agent type to keywords mapping for fallback routing
+# NOTE: These must include both read AND write operation keywords for proper routing
+AGENT_KEYWORDS = {
+    AGENT_SALES: [
+        "order", "quote", "deal", "sale", "revenue", "pipeline", "opportunity",
+        "proposal", "estimate", "fulfill", "create order", "place order",
+        "ship", "deliver"
+    ],
+    AGENT_INVENTORY: [
+        "stock", "inventory", "product", "warehouse", "supply", "available", "in stock",
+        "add", "update", "increase", "decrease", "adjust", "restock", "replenish",
+        "reduce", "remove", "alert", "notify", "reorder", "low stock",
+        "equipment", "item", "goods", "merchandise", "units"
+    ],
+    AGENT_CUSTOMER: [
+        "customer", "account", "client", "contact", "tier", "loyalty", "history",
+        "lookup", "find", "search", "purchased", "transactions"
+    ],
+    AGENT_PRICING: [
+        "price", "discount", "margin", "cost", "profit", "bulk", "wholesale", "retail",
+        "markup", "profitability", "volume", "special price",
+        "reduce", "cut", "lower", "mark down", "mark up"
+    ],
+}
+
+# Scope definitions for each MCP - maps operation type to required scope
+# This enables intent-based scope detection to demonstrate Okta governance
+SCOPE_DEFINITIONS = {
+    AGENT_INVENTORY: {
+        "read": {
+            "scope": "inventory:read",
+            "keywords": ["what", "show", "list", "check", "available", "in stock", "how many", "do we have", "stock level"],
+            "description": "View inventory levels"
+        },
+        "write": {
+            "scope": "inventory:write",
+            "keywords": ["add", "update", "change", "modify", "increase", "decrease", "set", "put", "remove", "delete", "adjust"],
+            "description": "Modify inventory"
+        },
+        "alert": {
+            "scope": "inventory:alert",
+            "keywords": ["alert", "notify", "reorder", "low stock", "warning"],
+            "description": "Inventory alerts"
+        },
+    },
+    AGENT_PRICING: {
+        "read": {
+            "scope": "pricing:read",
+            "keywords": ["price", "cost", "how much", "what's the price", "pricing"],
+            "description": "View prices"
+        },
+        "margin": {
+            "scope": "pricing:margin",
+            "keywords": ["margin", "profit", "markup", "profitability", "cost breakdown"],
+            "description": "View profit margins"
+        },
+        "discount": {
+            "scope": "pricing:discount",
+            "keywords": ["discount", "bulk pricing", "wholesale", "deal", "special price", "volume"],
+            "description": "View/apply discounts"
+        },
+    },
+    AGENT_CUSTOMER: {
+        "read": {
+            "scope": "customer:read",
+            "keywords": ["who", "customer", "account", "client", "contact"],
+            "description": "View customer info"
+        },
+        "lookup": {
+            "scope": "customer:lookup",
+            "keywords": ["lookup", "find", "search", "look up"],
+            "description": "Search customers"
+        },
+        "history": {
+            "scope": "customer:history",
+            "keywords": ["history", "orders", "purchased", "past", "previous", "transactions"],
+            "description": "View purchase history"
+        },
+    },
+    AGENT_SALES: {
+        "read": {
+            "scope": "sales:read",
+            "keywords": ["orders", "sales", "revenue", "pipeline", "show orders"],
+            "description": "View sales data"
+        },
+        "quote": {
+            "scope": "sales:quote",
+            "keywords": ["quote", "proposal", "estimate", "quotation"],
+            "description": "Create quotes"
+        },
+        "order": {
+            "scope": "sales:order",
+            "keywords": ["create order", "place order", "new order", "fulfill", "submit order"],
+            "description": "Create orders"
+        },
+    },
+}
+
+
+# Messages that only make sense with the previous turn
+FOLLOW_UP_PHRASES = [
+    "yes", "yeah", "yep", "sure", "ok", "okay", "confirm", "confirmed",
+    "do it", "go ahead", "please do", "sounds good", "that one", "same",
+    "no", "nope", "cancel",
+]
+ANAPHORA_WORDS = {"it", "that", "this", "those", "them", "these", "same"}
+
+# Words too generic to identify a product or customer on their own
+STOP_WORDS = {
+    "the", "and", "for", "with", "from", "our", "your", "inc", "llc", "corp",
+    "group", "co", "&", "of", "a", "an",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9%']+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return _SPACE_RE.sub(" ", message.lower()).strip().rstrip("?!.").strip()
+
+
+def _keyword_pattern(keyword: str) -> "re.Pattern":
+    """Whole-word (plural tolerant) pattern for a keyword or phrase."""
+    return re.compile(r"\b" + re.escape(keyword) + r"(?:s|es)?\b")
+
+
+@dataclass
+class RoutingDecision:
+    """Agents and scopes chosen for a message."""
+    agents: List[str]
+    agent_scopes: Dict[str, List[str]]
+    confidence: float
+    source: str  # "local", "llm", "keyword_fallback", "cache"
+
+
+class RoutingStats:
+    """Thread-safe counters for how routing decisions were made."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._local_time = 0.0
+
+    def record(self, source: str, elapsed: float = 0.0) -> None:
+        with self._lock:
+            self._counts[source] = self._counts.get(source, 0) + 1
+            if source == "local":
+                self._local_time += elapsed
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self._counts.values())
+            local = self._counts.get("local", 0)
+            return {
+                "total": total,
+                "by_source": dict(self._counts),
+                "local_ratio": round(local / total, 4) if total else 0.0,
+                "avg_local_ms": round(self._local_time / local * 1000, 4) if local else 0.0,
+            }
+
+
+routing_stats = RoutingStats()
+
+
+class RoutingCache:
+    """
+    Bounded LRU/TTL cache of routing decisions.
+
+    Keys are (theme, normalized message, context hash). The context hash is
+    only filled in for context-dependent messages, so "show low stock" is
+    shared across conversations while "yes, do it" is never reused outside
+    the conversation state it was routed in. Agent registry reloads clear
+    the cache; themes are part of the key.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_ROUTING_CACHE_SIZE,
+        ttl: float = DEFAULT_ROUTING_CACHE_TTL,
+        clock=time.monotonic
+    ):
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, RoutingDecision]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._clock = clock
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def make_key(message: str, theme: str, conversation_context: str = "",
+                 context_dependent: bool = False) -> Tuple[str, str, str]:
+        """Cache key for a message; context only counts for follow-ups."""
+        context_hash = ""
+        if context_dependent:
+            context_hash = hashlib.sha256(conversation_context.encode()).hexdigest()
+        return (theme, normalize_message(message), context_hash)
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[RoutingDecision]:
+        """Cached decision (as a copy with source "cache"), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            decision = entry[1]
+
+        return RoutingDecision(
+            agents=list(decision.agents),
+            agent_scopes=copy.deepcopy(decision.agent_scopes),
+            confidence=decision.confidence,
+            source="cache",
+        )
+
+    def put(self, key: Tuple[str, str, str], decision: RoutingDecision) -> None:
+        """Store a decision, evicting the least recently used past the bound."""
+        stored = RoutingDecision(
+            agents=list(decision.agents),
+            agent_scopes=copy.deepcopy(decision.agent_scopes),
+            confidence=decision.confidence,
+            source=decision.source,
+        )
+        with self._lock:
+            self._entries[key] = (self._clock() + self._ttl, stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    # Bump when the tuples export_state() returns change
+    STATE_VERSION = 1
+
+    def export_state(self) -> List[tuple]:
+        """
+        Unexpired entries, least recently used first, for a warm-restart
+        snapshot (see api/warm_state.py): (key, seconds left, agents,
+        agent_scopes, confidence, source).
+        """
+        now = self._clock()
+        with self._lock:
+            return [
+                (key, deadline - now, decision.agents, decision.agent_scopes, decision.confidence, decision.source)
+                for key, (deadline, decision) in self._entries.items()
+                if deadline > now
+            ]
+
+    def restore_state(self, entries: List[tuple], elapsed: float = 0.0) -> int:
+        """
+        Add entries from export_state() output taken elapsed seconds ago.
+        Returns how many.
+
+        Restored entries keep their remaining TTL and rank as less recently
+        used than the entries this process already has (which win on a
+        shared key).
+        """
+        now = self._clock()
+        restored = 0
+        with self._lock:
+            for key, left, agents, agent_scopes, confidence, source in reversed(entries):
+                if len(self._entries) >= self._max_entries:
+                    break
+                key = tuple(key)
+                if left <= elapsed or key in self._entries:
+                    continue
+                self._entries[key] = (now + left - elapsed, RoutingDecision(
+                    agents=list(agents), agent_scopes=dict(agent_scopes), confidence=confidence, source=source
+                ))
+                self._entries.move_to_end(key, last=False)
+                restored += 1
+        return restored
+
+    def invalidate(self, theme: Optional[str] = None) -> int:
+        """Drop entries for one theme, or everything. Returns count removed."""
+        with self._lock:
+            if theme is None:
+                keys = list(self._entries)
+            else:
+                keys = [key for key in self._entries if key[0] == theme]
+            for key in keys:
+                del self._entries[key]
+            self._invalidations += 1
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_seconds": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+routing_cache = RoutingCache()
+on_agent_registry_reload(routing_cache.invalidate)
+
+
+class FastPathRouter:
+    """
+    Confidence-scored local classifier over the routing tables.
+
+    Keywords shared by several agents (e.g. "reduce" for inventory and
+    pricing) carry split weight; an agent is only selected with full-weight
+    evidence, and any agent with partial evidence makes the decision
+    ambiguous. Product/category and customer names from the theme's demo
+    store resolve messages with no action keywords.
+    """
+
+    def __init__(self, min_score: float = 1.0, vocab_cache_size: int = DEFAULT_VOCAB_CACHE_SIZE):
+        self.min_score = min_score
+
+        # keyword -> (pattern, agents listing it)
+        owners: Dict[str, Set[str]] = {}
+        for agent_type, keywords in AGENT_KEYWORDS.items():
+            for keyword in keywords:
+                owners.setdefault(keyword, set()).add(agent_type)
+        self._agent_patterns = [
+            (_keyword_pattern(keyword), agents, 1.0 / len(agents))
+            for keyword, agents in owners.items()
+        ]
+
+        self._scope_patterns = {
+            agent_type: [
+                (op_config["scope"], [_keyword_pattern(kw) for kw in op_config["keywords"]])
+                for op_config in operations.values()
+            ]
+            for agent_type, operations in SCOPE_DEFINITIONS.items()
+        }
+        self._follow_up_patterns = [_keyword_pattern(p) for p in FOLLOW_UP_PHRASES]
+
+        # (id(anchor), theme) -> (weakref to anchor, entity vocabulary), LRU order
+        self._vocab_cache: "OrderedDict[Tuple[int, str], Tuple[weakref.ref, Dict[str, Dict[str, List[str]]]]]" = OrderedDict()
+        self._vocab_cache_size = vocab_cache_size
+        self._vocab_lock = threading.Lock()
+
+    def is_context_dependent(self, message: str) -> bool:
+        """True if the message needs the previous turn to be understood."""
+        message_lower = message.lower().strip()
+        words = _WORD_RE.findall(message_lower)
+        if not words:
+            return True
+        if len(words) <= 4 and any(p.search(message_lower) for p in self._follow_up_patterns):
+            return True
+        return any(word in ANAPHORA_WORDS for word in words)
+
+    def route(self, message: str, store=None) -> Optional[RoutingDecision]:
+        """
+        Route a message locally.
+
+        Returns:
+            RoutingDecision for unambiguous messages, or None to defer to the LLM
+        """
+        if self.is_context_dependent(message):
+            return None
+
+        message_lower = message.lower()
+        entities: Dict[str, List[str]] = {}
+        if store is not None:
+            entities = self._match_entities(message_lower, store)
+
+        # Score keywords on the text outside entity names, so a customer
+        # called "... Retail" doesn't look like a pricing question
+        keyword_text = message_lower
+        for names in entities.values():
+            for name in names:
+                keyword_text = keyword_text.replace(name, " ")
+
+        scores: Dict[str, float] = {}
+        for pattern, agents, weight in self._agent_patterns:
+            if pattern.search(keyword_text):
+                for agent_type in agents:
+                    scores[agent_type] = scores.get(agent_type, 0.0) + weight
+
+        # A named customer always brings in the customer agent; a named
+        # product only decides the route when nothing else does
+        if "customer" in entities:
+            scores[AGENT_CUSTOMER] = max(scores.get(AGENT_CUSTOMER, 0.0), 1.0)
+        if not scores and "product" in entities:
+            scores[AGENT_INVENTORY] = 1.0
+
+        if not scores:
+            return None
+
+        # Any partial-evidence agent means we can't tell if it is wanted
+        if any(score < self.min_score for score in scores.values()):
+            return None
+
+        agents = [a for a in (AGENT_SALES, AGENT_INVENTORY, AGENT_CUSTOMER, AGENT_PRICING) if a in scores]
+        return RoutingDecision(
+            agents=agents,
+            agent_scopes={a: self.detect_scopes(message_lower, a) for a in agents},
+            confidence=min(1.0, min(scores[a] for a in agents) / (self.min_score * 2)),
+            source="local",
+        )
+
+    def detect_scopes(self, message_lower: str, agent_type: str) -> List[str]:
+        """Scopes for an agent from whole-word scope keywords (defaults to read)."""
+        scopes = [
+            scope for scope, patterns in self._scope_patterns.get(agent_type, [])
+            if any(p.search(message_lower) for p in patterns)
+        ]
+        return scopes or [f"{agent_type}:read"]
+
+    def _match_entities(self, message_lower: str, store) -> Dict[str, List[str]]:
+        """Named entities the message mentions, by kind ("product", "customer")."""
+        vocab = self._vocabulary(store)
+        words = set(_WORD_RE.findall(message_lower))
+        found: Dict[str, List[str]] = {}
+        for kind, index in vocab.items():
+            for word in words & index.keys():
+                names = [name for name in index[word] if name in message_lower]
+                if names:
+                    # Longest first so replacing one doesn't clip another
+                    found.setdefault(kind, []).extend(names)
+        for names in found.values():
+            names.sort(key=len, reverse=True)
+        return found
+
+    def _vocabulary(self, store) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Entity vocabulary for a store, indexed by each name's first word.
+
+        Products contribute full names and category words; customers their
+        company and contact names.
+
+        Cached per immutable base dataset rather than per store object:
+        every version snapshot and session sandbox over the same base
+        shares one entry (writes change quantities, prices and tiers, not
+        names). Stores without a base (SQLite) are keyed by their live
+        store. Entries hold the anchor weakly, so a recycled id() can't
+        return another dataset's vocabulary, and the cache is LRU-bounded.
+        """
+        anchor = getattr(store, "_base", None) or getattr(store, "_owner", None) or store
+        key = (id(anchor), getattr(store, "theme", ""))
+        with self._vocab_lock:
+            entry = self._vocab_cache.get(key)
+            if entry is not None and entry[0]() is anchor:
+                self._vocab_cache.move_to_end(key)
+                return entry[1]
+
+        products: Dict[str, List[str]] = {}
+        customers: Dict[str, List[str]] = {}
+
+        def add(index: Dict[str, List[str]], name: str) -> None:
+            words = _WORD_RE.findall(name.lower())
+            if words:
+                index.setdefault(words[0], []).append(name.lower())
+
+        for item in store.get_all_inventory().values():
+            add(products, item.get("name", ""))
+            for word in _WORD_RE.findall(item.get("category", "").lower()):
+                if len(word) > 3 and word not in STOP_WORDS:
+                    products.setdefault(word, []).append(word)
+                    products.setdefault(word.rstrip("s"), []).append(word.rstrip("s"))
+        for customer in store.get_all_customers().values():
+            add(customers, customer.get("name", ""))
+            add(customers, customer.get("contact", ""))
+
+        vocab = {"product": products, "customer": customers}
+        with self._vocab_lock:
+            self._vocab_cache[key] = (weakref.ref(anchor), vocab)
+            self._vocab_cache.move_to_end(key)
+            while len(self._vocab_cache) > self._vocab_cache_size:
+                self._vocab_cache.popitem(last=False)
+        return vocab
+
+    def timed_route(self, message: str, store=None) -> Optional[RoutingDecision]:
+        """route() that records a "local" stat on success."""
+        start = time.perf_counter()
+        decision = self.route(message, store)
+        if decision is not None:
+            routing_stats.record("local", time.perf_counter() - start)
+        return decision
@@ -0,0 +1,13 @@
+"""
+Shared pytest setup: make backend/ importable however pytest is invoked.
+
+Run from the repository root or backend/:
+    python -m pytest backend/tests
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
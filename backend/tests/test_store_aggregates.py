@@ -0,0 +1,54 @@
+"""
+DemoStore running summary aggregates stay equal to a full recompute.
+
+Uses the synthetic catalog from benchmarks/bench_store_index.py.
+"""
+
+import random
+
+import pytest
+
+from benchmarks.bench_store_index import make_data, make_store
+from data.store_aggregates import StoreAggregates
+
+
+@pytest.fixture
+def store():
+    return make_store(make_data(2000))
+
+
+def _mutate(store, rng, count):
+    skus = list(store.get_all_inventory())
+    for _ in range(count):
+        sku = rng.choice(skus)
+        roll = rng.random()
+        if roll < 0.6:
+            operation = rng.choice(["increase", "decrease", "set"])
+            store.update_inventory_quantity(sku, rng.randint(0, 500), operation)
+        elif roll < 0.8:
+            store.update_price(sku, round(rng.uniform(1, 80), 2))
+        else:
+            store.increment_inventory(sku, rng.randint(-50, 50))
+
+
+def test_aggregates_match_recompute_after_mutations(store):
+    _mutate(store, random.Random(11), 3000)
+
+    assert store.check_aggregates() == []
+
+
+def test_summary_matches_fresh_rebuild(store):
+    _mutate(store, random.Random(5), 1000)
+    inventory = store.get_all_inventory()
+    rebuilt = StoreAggregates()
+    rebuilt.rebuild(inventory, store._data["pricing"], store.get_all_customers())
+
+    assert store.get_inventory_summary() == rebuilt.inventory_summary()
+    assert store.get_customer_summary() == rebuilt.customer_summary()
+
+
+def test_aggregates_match_after_reset(store):
+    _mutate(store, random.Random(3), 500)
+    store.reset_to_initial()
+
+    assert store.check_aggregates() == []
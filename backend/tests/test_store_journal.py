@@ -0,0 +1,61 @@
+"""
+DemoStore write-behind journal durability.
+
+Stores run on a synthetic theme in a temporary directory; a "crash" is a
+second store loaded from the same files without closing the first.
+"""
+
+import copy
+import json
+
+import pytest
+
+import data.demo_store as demo_store_module
+from benchmarks.bench_store_index import make_data
+from data.demo_store import DemoStore, THEME_DATA_FILES
+
+
+@pytest.fixture
+def theme(tmp_path, monkeypatch):
+    files = {"initial": tmp_path / "test-data.json", "live": tmp_path / "test-live-data.json"}
+    with open(files["initial"], "w") as f:
+        json.dump(make_data(200), f)
+    monkeypatch.setitem(THEME_DATA_FILES, "test", files)
+    monkeypatch.setattr(demo_store_module, "JOURNAL_ENABLED", True)
+    return "test"
+
+
+def test_journal_replays_after_crash(theme):
+    store = DemoStore(theme=theme)
+    sku = next(iter(store.get_all_inventory()))
+    store.increment_inventory(sku, 7)
+    store.update_price(sku, 12.34)
+    store._journal.flush()
+
+    recovered = DemoStore(theme=theme)
+    try:
+        assert recovered.get_all_inventory() == store.get_all_inventory()
+        assert recovered.get_all_pricing() == store.get_all_pricing()
+    finally:
+        store.close()
+        recovered.close()
+
+
+def test_reset_is_durable_when_it_returns(theme):
+    store = DemoStore(theme=theme)
+    initial = copy.deepcopy(store.get_all_inventory())
+    sku = next(iter(initial))
+    store.increment_inventory(sku, 7)
+    store.close()
+
+    store = DemoStore(theme=theme)
+    assert store.get_inventory_by_sku(sku)["quantity"] == initial[sku]["quantity"] + 7
+    store.reset_to_initial()
+
+    recovered = DemoStore(theme=theme)
+    try:
+        assert recovered.get_all_inventory() == initial
+        assert recovered.get_inventory_by_sku(sku)["quantity"] == initial[sku]["quantity"]
+    finally:
+        store.close()
+        recovered.close()
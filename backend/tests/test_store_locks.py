@@ -0,0 +1,39 @@
+"""
+DemoStore atomic update primitives under concurrent writers.
+
+Drives the stress loop from benchmarks/bench_store_locks.py: many threads
+update a few hot SKUs while readers search and summarize, and every
+update must land.
+"""
+
+import sys
+
+import pytest
+
+from benchmarks.bench_store_locks import HOT_SKUS, run
+from benchmarks.bench_store_index import make_data, make_store
+
+THREADS = 8
+OPS = 400
+
+
+@pytest.fixture
+def fast_switching():
+    # Switch threads often so races show up quickly
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield
+    sys.setswitchinterval(previous)
+
+
+@pytest.mark.parametrize("mode", ["increment", "cas"])
+def test_atomic_updates_lose_nothing(fast_switching, mode):
+    store = make_store(make_data(500))
+    hot = list(store.get_all_inventory())[:HOT_SKUS]
+    before = sum(store.get_inventory_by_sku(sku)["quantity"] for sku in hot)
+
+    run(store, THREADS, OPS, mode)
+
+    after = sum(store.get_inventory_by_sku(sku)["quantity"] for sku in hot)
+    assert after - before == THREADS * OPS
+    assert store.check_aggregates() == []
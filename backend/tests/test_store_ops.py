@@ -0,0 +1,46 @@
+"""
+InventoryWriteMixin quantity updates, against the in-memory DemoStore.
+"""
+
+import pytest
+
+from benchmarks.bench_store_index import make_data, make_store
+
+
+@pytest.fixture
+def store():
+    return make_store(make_data(50))
+
+
+def _stocked_sku(store, minimum=100):
+    return next(sku for sku, item in store.get_all_inventory().items() if item["quantity"] >= minimum)
+
+
+@pytest.mark.parametrize("operation, percentage, expected", [
+    ("increase", 10, lambda qty, change: qty + change),
+    ("decrease", 10, lambda qty, change: qty - change),
+    ("set", 50, lambda qty, change: change),
+])
+def test_scale_by_percent(store, operation, percentage, expected):
+    sku = _stocked_sku(store)
+    quantity = store.get_inventory_by_sku(sku)["quantity"]
+
+    result = store.scale_inventory_by_percent(sku, percentage, operation)
+
+    assert result["new_quantity"] == expected(quantity, int(round(quantity * percentage / 100)))
+
+
+@pytest.mark.parametrize("operation, percentage", [
+    ("increase", 0.001),
+    ("set", 0.001),
+    ("set", 0),
+    ("set", -50),
+])
+def test_scale_by_percent_rejects_zero_and_negative(store, operation, percentage):
+    sku = _stocked_sku(store)
+    quantity = store.get_inventory_by_sku(sku)["quantity"]
+
+    result = store.scale_inventory_by_percent(sku, percentage, operation)
+
+    assert "error" in result
+    assert store.get_inventory_by_sku(sku)["quantity"] == quantity
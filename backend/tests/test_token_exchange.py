@@ -0,0 +1,74 @@
+"""
+MultiAgentTokenExchange fan-out and per-user token cache.
+
+Runs against the fake Okta token endpoint from the token exchange
+benchmark (benchmarks/bench_token_exchange.py), which sleeps a per-agent
+delay before answering.
+"""
+
+import asyncio
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.bench_token_exchange import AGENTS, FakeTokenHandler, build_exchange
+
+DELAYS_MS = [40, 60, 80, 50]
+
+
+@pytest.fixture(scope="module")
+def token_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTokenHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1/token"
+    server.shutdown()
+
+
+def _exchange_all(exchange, **kwargs):
+    start = time.perf_counter()
+    results = asyncio.run(exchange.exchange_for_all_agents("test-id-token", AGENTS, **kwargs))
+    return results, (time.perf_counter() - start) * 1000
+
+
+def test_results_follow_agent_order(token_url):
+    results, _ = _exchange_all(build_exchange(token_url, DELAYS_MS, max_concurrency=4))
+
+    assert list(results) == AGENTS
+    assert all(result["success"] for result in results.values()), results
+
+
+def test_concurrent_exchange_approaches_slowest_agent(token_url):
+    # Two round trips per agent
+    slowest = 2 * max(DELAYS_MS)
+    sequential_total = 2 * sum(DELAYS_MS)
+
+    _, elapsed = _exchange_all(build_exchange(token_url, DELAYS_MS, max_concurrency=4))
+
+    assert elapsed < slowest * 1.5 < sequential_total
+
+
+def test_repeat_turn_is_served_from_cache(token_url):
+    exchange = build_exchange(token_url, DELAYS_MS, max_concurrency=4)
+    _exchange_all(exchange)
+    results, _ = _exchange_all(exchange)
+
+    assert all(result["success"] for result in results.values())
+    assert exchange.token_cache.stats()["hits"] == len(AGENTS)
+
+
+def test_concurrent_identical_turns_share_one_exchange(token_url):
+    exchange = build_exchange(token_url, DELAYS_MS, max_concurrency=4)
+
+    async def two_turns():
+        return await asyncio.gather(
+            exchange.exchange_for_all_agents("test-id-token", AGENTS, user_subject="user-1"),
+            exchange.exchange_for_all_agents("test-id-token", AGENTS, user_subject="user-1"),
+        )
+
+    first, second = asyncio.run(two_turns())
+
+    assert exchange.token_cache.stats()["misses"] == len(AGENTS)
+    assert all(result["success"] for result in first.values())
+    assert all(result["success"] for result in second.values())
@@ -18,6 +18,7 @@ from tools.pricing_tools import (
     get_pricing_by_category,
     update_price,
     calculate_discount,
+    create_quote,
     get_pricing_summary,
     PRICING_TOOLS
 )
@@ -121,18 +121,12 @@ def update_inventory_by_percentage(product_name: str, percentage: float, operati
     if not item:
         return f"Product not found: {product_name}"
 
-    current_qty = item['quantity']
-    sku = item['sku']
-
-    # Calculate the change amount
-    change_amount = int(round(current_qty * (percentage / 100)))
-
-    if change_amount == 0:
-        return f"Percentage change too small - would result in 0 unit change for {item['name']} (current: {current_qty:,} units)"
-
-    result = demo_store.update_inventory_quantity(sku, change_amount, operation)
+    # Percentage of the quantity at write time, applied atomically
+    result = demo_store.scale_inventory_by_percent(item['sku'], percentage, operation)
 
     if "error" in result:
+        if "quantity" in result:
+            return f"{result['error']} for {result['name']} (current: {result['quantity']:,} units)"
         return f"Error: {result['error']}"
 
     change_text = f"+{result['change']}" if result['change'] > 0 else str(result['change'])
@@ -156,14 +150,14 @@ def get_low_stock_alerts() -> str:
     Use this to check what items need to be reordered.
 
     Returns:
-        List of products with low stock status
+        List of products with low stock status, most urgent first
     """
-    low_stock = demo_store.get_low_stock_items()
-    if not low_stock:
+    total = demo_store.count_low_stock()
+    if not total:
         return "✅ No low stock alerts - all inventory levels are good!"
 
-    lines = [f"**⚠️ Low Stock Alert - {len(low_stock)} items need attention:**\n"]
-    for item in low_stock:
+    lines = [f"**⚠️ Low Stock Alert - {total} items need attention:**\n"]
+    for item in demo_store.get_low_stock_alerts(total):
         lines.append(
             f"- 🔴 **{item['name']}**: {item['quantity']} units "
             f"(reorder point: {item['reorder_point']})"
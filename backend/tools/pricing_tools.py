@@ -5,7 +5,7 @@ These tools interact with the demo data store and require appropriate
 scopes from the MCP token to execute.
 """
 
-from typing import Optional
+from typing import Dict, Optional
 from langchain_core.tools import tool
 from data.demo_store import demo_store
 import logging
@@ -142,6 +142,46 @@ def calculate_discount(customer_name: str, quantity: int) -> str:
     )
 
 
+@tool
+def create_quote(customer_name: str, items: Dict[str, int]) -> str:
+    """
+    Price a multi-line order for a customer in one call.
+    Use this to build a quote with tier and volume discounts per line.
+
+    Args:
+        customer_name: Name of the customer
+        items: Product name (or SKU) to quantity, e.g. {"Pro Game Basketball": 50}
+
+    Returns:
+        Line totals with discounts, the quote total and its margin impact
+    """
+    customer = demo_store.get_customer_by_name(customer_name)
+    if not customer:
+        return f"Customer not found: {customer_name}"
+
+    tier = customer.get('tier', 'Bronze')
+    quote = demo_store.quote([(product, quantity, tier) for product, quantity in items.items()])
+    if "error" in quote:
+        return f"Error: {quote['error']}"
+
+    lines = [f"**Quote for {customer['name']}** ({tier} tier)\n"]
+    for line in quote['lines']:
+        lines.append(
+            f"- {line['name']}: {line['quantity']:,} x ${line['unit_price']:.2f} = ${line['list_total']:,.2f}, "
+            f"{line['total_discount']}% off -> ${line['line_total']:,.2f} (net margin {line['net_margin']}%)"
+        )
+
+    totals = quote['totals']
+    lines.append(f"\n- List Total: ${totals['list_total']:,.2f}")
+    lines.append(f"- Discounts: -${totals['discount_total']:,.2f}")
+    lines.append(f"- **Quote Total: ${totals['net_total']:,.2f}**")
+    lines.append(f"- Margin: {totals['margin']}% -> {totals['net_margin']}% ({totals['margin_impact']:+.1f} pts)")
+    if quote['unknown']:
+        lines.append(f"\nNot found: {', '.join(quote['unknown'])}")
+
+    return "\n".join(lines)
+
+
 @tool
 def get_pricing_summary() -> str:
     """
@@ -199,5 +239,6 @@ PRICING_TOOLS = [
     get_pricing_by_category,
     update_price,
     calculate_discount,
+    create_quote,
     get_pricing_summary
 ]